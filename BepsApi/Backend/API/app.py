@@ -10,6 +10,7 @@ from flask import Flask, request
 from config import Config
 from extensions import db, jwt, cache
 from blueprints import register_blueprints
+from utils.r2_metrics import start_request_r2_stats, get_bound_r2_stats, flush_r2_stats
 import traceback
 from apscheduler.schedulers.background import BackgroundScheduler
 from flasgger import Swagger
@@ -17,6 +18,8 @@ from flasgger import Swagger
 def init_scheduler(app):
     try:
         from services.statistics_excel_service import scheduled_cleanup
+        from services.content_flag_reconciler import scheduled_reconcile_has_content
+        from services.archive_retention_service import scheduled_archive_retention
         with app.app_context():
             lock_acquired = db.session.execute(db.text("SELECT pg_try_advisory_lock(1234567890)")).scalar()
             if not lock_acquired:
@@ -25,6 +28,13 @@ def init_scheduler(app):
             logging.info("DB 잠금 획득 성공")
             scheduler = BackgroundScheduler()
             scheduler.add_job(scheduled_cleanup, 'interval', minutes=65, max_instances=1, coalesce=True)
+            scheduler.add_job(scheduled_reconcile_has_content, 'interval', args=[app],
+                              minutes=app.config.get('HAS_CONTENT_RECONCILE_MINUTES', 30),
+                              max_instances=1, coalesce=True)
+            if app.config.get('ARCHIVE_RETENTION_ENABLED'):
+                scheduler.add_job(scheduled_archive_retention, 'cron', args=[app],
+                                  hour=app.config.get('ARCHIVE_RETENTION_HOUR', 3),
+                                  max_instances=1, coalesce=True)
             
             def shutdown():
                 with app.app_context():
@@ -98,16 +108,30 @@ def create_app():
     @app.before_request
     def log_request():
         request._start_time = time.time()
+        start_request_r2_stats()
         logging.info(f"요청: {request.method} {request.url} - 데이터: {request.get_json(silent=True)}")
 
     @app.after_request
     def log_response(response):
         duration = time.time() - getattr(request, '_start_time', time.time())
-        data = response.get_json(silent=True)
+        # 스트리밍(파일/사전 압축) 응답은 본문을 읽지 않음
+        data = response.get_json(silent=True) if not response.direct_passthrough else None
         data_str = str(data) if data else ''
         if len(data_str) > 1000:
             data_str = data_str[:1000] + '...(truncated)'
         logging.info(f"응답: [{request.path}] {response.status_code} - {duration:.3f}s - 데이터: {data_str}")
+
+        # 🔹 요청별 R2 호출 집계 (느린 요청은 경고 로그, 응답 헤더에 R2 소요 시간 표시)
+        r2_stats = get_bound_r2_stats()
+        if r2_stats is not None and r2_stats.total_calls:
+            timing = f'r2;dur={r2_stats.total_ms:.1f};desc="{r2_stats.total_calls} calls"'
+            existing = response.headers.get('Server-Timing')
+            response.headers['Server-Timing'] = f"{existing}, {timing}" if existing else timing
+        if duration * 1000 >= app.config.get('SLOW_REQUEST_MS', 1000):
+            r2_summary = (f"R2 {r2_stats.total_calls}회 {r2_stats.total_ms:.1f}ms "
+                          f"{r2_stats.summary()} {dict(r2_stats.operations)}") if r2_stats else 'R2 0회'
+            logging.warning(f"느린 요청: [{request.method} {request.path}] {duration:.3f}s - {r2_summary}")
+        flush_r2_stats(r2_stats)
         return response
 
     @app.errorhandler(Exception)
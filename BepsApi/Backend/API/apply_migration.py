@@ -25,8 +25,9 @@ try:
     conn.autocommit = True
     cursor = conn.cursor()
 
-    # Read migration file
-    migration_file = '../DB/migrations/001_content_manager_refactor.sql'
+    # Read migration file (usage: python apply_migration.py [path/to/migration.sql])
+    default_migration = '../DB/migrations/001_content_manager_refactor.sql'
+    migration_file = sys.argv[1] if len(sys.argv) > 1 else default_migration
     print(f"Reading migration file: {migration_file}")
 
     with open(migration_file, 'r', encoding='utf-8') as f:
@@ -39,6 +40,11 @@ try:
 
     print("✅ Migration applied successfully!")
 
+    if migration_file != default_migration:
+        cursor.close()
+        conn.close()
+        sys.exit(0)
+
     # Verify tables exist
     cursor.execute("""
         SELECT table_name
@@ -10,23 +10,22 @@ This module handles CRUD operations for additional content files:
 
 import os
 import re
-import logging
-from datetime import datetime
-from flask import Blueprint, jsonify, request
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required
 from extensions import db
 from models import ContentRelPageDetails, ContentRelPages, PendingContent
 from .permission_middleware import require_upload_permission, get_current_user
 from .r2_utils import (
-    get_r2_client,
     generate_pending_path,
     check_r2_object_exists,
     delete_r2_object,
     generate_r2_signed_url,
-    get_r2_object_metadata
+    get_r2_object_metadata,
+    upload_r2_fileobj
 )
+from services.r2_storage_service import R2StorageService
+from services.content_serializers import select_details, serialize_details, WITH_STORAGE_STATUS
 from log_config import get_content_logger
-from flask import current_app
 
 # Initialize logger
 logger = get_content_logger()
@@ -56,37 +55,27 @@ def register_additional_content_routes(api_contents_bp):
         """
         try:
             # Verify page exists
-            page = ContentRelPages.query.filter_by(id=page_id, is_deleted=False).first()
+            page = ContentRelPages.query.with_entities(
+                ContentRelPages.id, ContentRelPages.name
+            ).filter_by(id=page_id, is_deleted=False).first()
             if not page:
                 return jsonify({'error': 'Page not found'}), 404
 
-            # Get all additional content for this page
-            additionals = ContentRelPageDetails.query.filter_by(
-                page_id=page_id,
-                is_deleted=False
+            # Get all additional content for this page (columns only, pending status in one batch)
+            additionals = select_details(
+                ContentRelPageDetails.query.filter_by(page_id=page_id, is_deleted=False),
+                WITH_STORAGE_STATUS
             ).order_by(ContentRelPageDetails.created_at).all()
 
             result = []
-            for additional in additionals:
-                # Check if has pending content
-                pending = PendingContent.query.filter_by(
-                    content_type='additional',
-                    additional_id=additional.id
-                ).first()
-
-                additional_data = additional.to_dict()
-                additional_data['has_pending'] = pending is not None
+            for additional_data in serialize_details(additionals, WITH_STORAGE_STATUS):
                 # Include file extension from name
-                _, ext = os.path.splitext(additional.name)
+                _, ext = os.path.splitext(additional_data['name'])
                 additional_data['file_extension'] = ext
-                additional_data['filename'] = additional.name
+                additional_data['filename'] = additional_data['name']
 
                 # Get file size from pending only (skip R2 check for performance)
-                file_size = 0
-                if pending:
-                    file_size = pending.file_size
-
-                additional_data['file_size'] = file_size
+                additional_data['file_size'] = additional_data.pop('pending_file_size')
 
                 result.append(additional_data)
 
@@ -180,21 +169,13 @@ def register_additional_content_routes(api_contents_bp):
             # Generate pending path
             pending_object_key = generate_pending_path(object_key)
 
-            # Upload to R2 pending location
-            r2_client = get_r2_client()
-            bucket_name = current_app.config.get('R2_BUCKET_NAME')
-
-            # Read file data
-            file_data = file.read()
-            file_size = len(file_data)
-
-            # Upload to pending
-            r2_client.put_object(
-                Bucket=bucket_name,
-                Key=pending_object_key,
-                Body=file_data,
-                ContentType=file.content_type or 'application/octet-stream'
+            # Stream to pending (size and checksum computed on the fly)
+            upload_result = upload_r2_fileobj(
+                file.stream,
+                pending_object_key,
+                content_type=file.content_type or 'application/octet-stream'
             )
+            file_size = upload_result['size']
 
             logger.info(f"Uploaded additional content to pending: {pending_object_key}")
 
@@ -218,12 +199,15 @@ def register_additional_content_routes(api_contents_bp):
                     object_key=pending_object_key,
                     filename=new_filename,
                     file_size=file_size,
+                    content_hash=upload_result['sha256'],
                     uploaded_by=user.id
                 )
                 db.session.add(pending)
 
                 db.session.commit()
 
+                R2StorageService.invalidate_page_detail(additional.id, page_id)
+
                 return jsonify({
                     'message': 'Additional content uploaded to pending successfully',
                     'additional': additional.to_dict(),
@@ -316,10 +300,13 @@ def register_additional_content_routes(api_contents_bp):
                     delete_r2_object(pending.object_key)
                 db.session.delete(pending)
 
-            # Mark as deleted in DB
+            # Mark as deleted in DB (the page flag is corrected by the reconciler)
             additional.is_deleted = True
+            additional.has_content = False
             db.session.commit()
 
+            R2StorageService.invalidate_page_detail(additional_id, additional.page_id)
+
             return jsonify({
                 'message': 'Additional content deleted successfully',
                 'additional_id': additional_id
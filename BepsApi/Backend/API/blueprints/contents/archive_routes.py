@@ -0,0 +1,68 @@
+"""
+Archive routes
+
+Archived versions (old/ objects + archived_content rows) are pruned by the
+nightly retention job (services.archive_retention_service). This module lets
+developers preview or run it on demand.
+"""
+
+from flask import jsonify, request
+from flask_jwt_extended import jwt_required
+from extensions import db
+from services.archive_retention_service import ArchiveRetentionService
+from .permission_middleware import get_current_user, is_developer
+from log_config import get_content_logger
+
+# Initialize logger
+logger = get_content_logger()
+
+
+def register_archive_routes(api_contents_bp):
+    """Register archive retention routes to the blueprint"""
+
+    @api_contents_bp.route('/archives/retention', methods=['POST'])
+    @jwt_required()
+    def run_archive_retention():
+        """
+        Preview (default) or apply the archive retention policy
+
+        Request body (all optional):
+        {
+            "dry_run": true,
+            "keep_versions": 10,    // newest versions kept per page / page detail
+            "max_age_days": 180     // versions younger than this are kept
+        }
+        """
+        try:
+            user = get_current_user()
+            if not user:
+                return jsonify({'error': 'Authentication required'}), 401
+            if not is_developer(user.id):
+                return jsonify({'error': '보관본 정리 권한이 없습니다.'}), 403
+
+            data = request.get_json(silent=True) or {}
+            keep_versions = data.get('keep_versions')
+            max_age_days = data.get('max_age_days')
+            if keep_versions is not None:
+                keep_versions = int(keep_versions)
+            if max_age_days is not None:
+                max_age_days = int(max_age_days)
+            if (keep_versions or 0) < 0 or (max_age_days or 0) < 0:
+                return jsonify({'error': 'keep_versions and max_age_days must not be negative'}), 400
+
+            dry_run = bool(data.get('dry_run', True))
+            report = ArchiveRetentionService.run(
+                keep_versions=keep_versions,
+                max_age_days=max_age_days,
+                dry_run=dry_run
+            )
+            if not dry_run:
+                logger.info(f"[ARCHIVE RETENTION] Run by {user.id}: {report['deleted_rows']} versions removed")
+            return jsonify(report)
+
+        except (TypeError, ValueError):
+            return jsonify({'error': 'keep_versions and max_age_days must be integers'}), 400
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error running archive retention: {str(e)}")
+            return jsonify({'error': str(e)}), 500
@@ -7,15 +7,14 @@ This module handles:
 - Access control and permissions
 """
 
-import logging
 import datetime
 from datetime import timezone
-from flask import Blueprint, jsonify, request
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models import ContentRelChannels, ContentRelFolders, ContentRelPages, Users, ContentManager, Assignees
+from models import ContentRelChannels, ContentRelFolders, ContentRelPages, Users
+from services.content_access_service import ContentAccessService
 from log_config import get_content_logger
-from werkzeug.utils import secure_filename
 
 # Initialize logger
 logger = get_content_logger()
@@ -45,27 +44,21 @@ def register_channel_folder_routes(api_contents_bp):
         
         Query parameters:
         - user_id: The user ID to check permissions for
+        
+        Folders include subfolders of assigned folders (and every folder of
+        assigned channels); files are the pages in them plus assigned pages.
         """
         try:
             user_id = request.args.get('user_id')
             if not user_id:
                 return jsonify({'error': 'Missing user_id parameter'}), 400
             
-            # Get user's accessible content from ContentManager table
-            managers = ContentManager.query.filter_by(user_id=user_id).all()
-            
-            folder_ids = []
-            file_ids = []
-            
-            for manager in managers:
-                if manager.folder_id:
-                    folder_ids.append(manager.folder_id)
-                if manager.file_id:
-                    file_ids.append(manager.file_id)
+            # Cached access set (content_manager joined through assignees)
+            access = ContentAccessService.get_access_set(user_id)
             
             return jsonify({
-                'folderIds': folder_ids,
-                'fileIds': file_ids
+                'folderIds': sorted(access['folders']),
+                'fileIds': sorted(access['pages'])
             })
         except Exception as e:
             logger.error(f"Error getting user accessible content: {str(e)}")
@@ -84,18 +77,8 @@ def register_channel_folder_routes(api_contents_bp):
             if not user_id:
                 return jsonify({'error': 'Missing user_id parameter'}), 400
             
-            # Check if user has any folder access in this channel
-            has_access = db.session.query(ContentManager).join(
-                ContentRelFolders, ContentManager.folder_id == ContentRelFolders.id
-            ).join(
-                ContentRelChannels, ContentRelFolders.channel_id == ContentRelChannels.id
-            ).join(
-                Assignees, ContentManager.assignee_id == Assignees.id
-            ).filter(
-                Assignees.user_id == user_id,
-                ContentRelChannels.id == channel_id,
-                ContentRelChannels.is_deleted == False
-            ).first() is not None
+            # Any accessible folder or page in this channel
+            has_access = ContentAccessService.has_access(user_id, 'channels', channel_id)
             
             return jsonify({
                 'hasAccess': has_access
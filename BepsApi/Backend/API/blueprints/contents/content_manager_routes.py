@@ -7,10 +7,8 @@ This module handles:
 - Manager CRUD operations
 """
 
-import logging
 import re
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import jsonify, request
 from extensions import db
 from models import ContentManager, Users, ContentRelChannels, ContentRelFolders, ContentRelPages,Assignees
 from log_config import get_content_logger
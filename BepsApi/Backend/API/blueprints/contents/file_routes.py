@@ -8,13 +8,13 @@ This module handles:
 - Basic file management
 """
 
-import logging
 import datetime
 from datetime import timezone
-from flask import Blueprint, jsonify, request, send_file
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models import ContentRelPages, ContentRelFolders, Users
+from models import ContentRelPages, Users
+from services.r2_storage_service import R2StorageService
 from log_config import get_content_logger
 from werkzeug.utils import secure_filename
 import uuid
@@ -126,15 +126,19 @@ def register_file_routes(api_contents_bp):
             
             # Soft delete the files
             deleted_count = 0
+            deleted_ids = []
             for file_id in file_ids:
                 file_record = ContentRelPages.query.filter_by(id=file_id, is_deleted=False).first()
                 if file_record:
                     file_record.is_deleted = True
                     file_record.updated_at = datetime.datetime.now(timezone.utc)
                     deleted_count += 1
+                    deleted_ids.append(file_record.id)
             
             db.session.commit()
             
+            R2StorageService.invalidate_pages(deleted_ids)
+            
             logger.info(f"User {current_user_id} deleted {deleted_count} files")
             
             return jsonify({
@@ -7,23 +7,110 @@ This module handles:
 - Channel and folder children lookup
 """
 
-import logging
+import hashlib
 import datetime
-from flask import Blueprint, jsonify, request
+from flask import jsonify, request, current_app
+from werkzeug.wsgi import wrap_file
 from extensions import db
-from models import ContentRelPages, ContentRelFolders, ContentRelChannels, ContentRelPageDetails
+from models import ContentRelPages, ContentRelFolders, ContentRelChannels, ContentRelPageDetails, R2MoveJob
 from services.content_hierarchy_service import ContentHierarchyService
+from services.folder_closure import get_folder_ancestry
+from services.hierarchy_cache import get_hierarchy_versions
+from services.hierarchy_children import get_children, DEFAULT_LIMIT as CHILDREN_DEFAULT_LIMIT
+from services.hierarchy_snapshot import load_snapshot, save_snapshot
+from services.r2_storage_service import R2StorageService
+from utils.r2_paths import safe_name
+from services.r2_bulk_move_service import R2BulkMoveService
 from log_config import get_content_logger
 from blueprints.contents.r2_utils import (
     move_r2_object,
-    list_r2_objects,
-    check_r2_object_exists
+    iter_r2_objects,
+    r2_prefix_has_objects
 )
 
 # Initialize logger
 logger = get_content_logger()
 
 
+def _channel_dict(channel):
+    return {
+        'id': channel.id,
+        'name': channel.name,
+        'updated_at': channel.updated_at.isoformat() if channel.updated_at else None
+    }
+
+
+def _folder_dict(folder):
+    return {
+        'id': folder.id,
+        'name': folder.name,
+        'channel_id': folder.channel_id,
+        'updated_at': folder.updated_at.isoformat() if folder.updated_at else None
+    }
+
+
+def _with_etag(response, etag):
+    """Tag a hierarchy response with its version; clients must revalidate before reuse"""
+    if etag:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _not_modified(etag):
+    return _with_etag(current_app.response_class(status=304), etag)
+
+
+def _snapshot_response(snapshot):
+    """Stream the prebuilt variant matching Accept-Encoding, or None if it is gone"""
+    opened = snapshot.open(request.accept_encodings)
+    if opened is None:
+        return None
+    encoding, f, size = opened
+    response = current_app.response_class(
+        wrap_file(request.environ, f), mimetype='application/json', direct_passthrough=True
+    )
+    response.content_length = size
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def rename_job_response(job, label, build_result):
+    """
+    Start a rename move job and answer with its outcome
+
+    Small renames usually finish within R2_BULK_MOVE_SYNC_WAIT seconds and get
+    the same 200 response as before; larger ones return 202 with the job so
+    the client can poll /r2-move-jobs/<id>.
+    """
+    wait_seconds = current_app.config.get('R2_BULK_MOVE_SYNC_WAIT', 10)
+    finished = R2BulkMoveService.start_job(job.id, wait_seconds=wait_seconds)
+
+    # The job commits through its own session; drop anything this request has cached
+    db.session.expire_all()
+    job = R2MoveJob.query.get(job.id)
+
+    if finished and job.status == 'completed':
+        logger.info(f"{label.capitalize()} {job.entity_id} renamed (move job {job.id}, {job.total_objects} objects)")
+        result = {'success': True, 'job': job.to_dict()}
+        result.update(build_result())
+        return jsonify(result)
+
+    if finished and job.status == 'failed':
+        return jsonify({
+            'error': f'R2 파일 이름 변경 실패: {job.error}',
+            'job': job.to_dict()
+        }), 500
+
+    return jsonify({
+        'success': True,
+        'message': 'Rename is running in the background',
+        'job': job.to_dict()
+    }), 202
+
+
 def register_hierarchy_routes(api_contents_bp):
     """Register all hierarchy-related routes to the blueprint"""
 
@@ -61,22 +148,11 @@ def register_hierarchy_routes(api_contents_bp):
                 else:
                     return jsonify({'error': 'File not found in content tables'}), 404
 
-            # Traverse the folder hierarchy
-            while folder_id is not None:
-                folder = ContentRelFolders.query.filter_by(id=folder_id, is_deleted=False).first()
-                if not folder:
-                    break
-
-                path_components.append(folder.name)
-
-                if folder.parent_id is None:
-                    # Top-level folder, get the channel
-                    channel = ContentRelChannels.query.filter_by(id=folder.channel_id, is_deleted=False).first()
-                    if channel:
-                        path_components.append(channel.name)
-                    break
-
-                folder_id = folder.parent_id
+            # Folder ancestry and channel in one query (closure table)
+            ancestry = get_folder_ancestry(folder_id)
+            path_components.extend(folder['name'] for folder in reversed(ancestry['folders']))
+            if ancestry['channel']:
+                path_components.append(ancestry['channel']['name'])
 
             # Reverse the path components to build the path
             path_components.reverse()
@@ -146,6 +222,39 @@ def register_hierarchy_routes(api_contents_bp):
             logger.error(f"Error in get_folder_child: {str(e)}")
             return jsonify({'error': str(e)}), 500
 
+    @api_contents_bp.route('/hierarchy/children', methods=['GET'])
+    def get_hierarchy_children():
+        """
+        Get one level of the hierarchy as nodes, page by page
+
+        Query parameters:
+        - parent_type: 'channel', 'folder' or 'page'
+        - parent_id: ID of the parent node
+        - limit: Nodes per page (default 50, max 500)
+        - cursor: next_cursor from the previous page
+
+        Each node has name, type, direct child counts, content status and a
+        pending flag; one query per page (keyset pagination).
+        """
+        try:
+            parent_type = request.args.get('parent_type')
+            parent_id = request.args.get('parent_id', type=int)
+            if not parent_type or parent_id is None:
+                return jsonify({'error': 'Missing parent_type or parent_id parameter'}), 400
+
+            result = get_children(
+                parent_type, parent_id,
+                limit=request.args.get('limit', CHILDREN_DEFAULT_LIMIT, type=int),
+                cursor=request.args.get('cursor')
+            )
+            result['parent'] = {'type': parent_type, 'id': parent_id}
+            return jsonify(result)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error in get_hierarchy_children: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
     @api_contents_bp.route('/hierarchy', methods=['GET'])
     def get_content_hierarchy():
         """
@@ -154,16 +263,43 @@ def register_hierarchy_routes(api_contents_bp):
         Optional query parameters:
         - refresh: If true, rebuilds the hierarchy instead of using cache
         - format: 'full' (default) or 'summary'
+
+        The response carries the hierarchy version as ETag; a matching
+        If-None-Match gets 304 Not Modified without building anything.
+        Otherwise the body comes from the version's prebuilt snapshot
+        (services.hierarchy_snapshot), already gzip/brotli encoded according
+        to Accept-Encoding.
         """
         try:
             # Check if we should bypass cache
             refresh = request.args.get('refresh', 'false').lower() == 'true'
 
+            versions = get_hierarchy_versions()
+            etag = f"h{versions.version}" if versions else None
+            if etag and not refresh and request.if_none_match.contains_weak(etag):
+                return _not_modified(etag)
+
+            # Prebuilt body of this version (json / gzip / br), sent without re-serializing
+            use_snapshot = etag is not None and not refresh
+            snapshot = load_snapshot(versions.version) if use_snapshot else None
+            if snapshot is not None:
+                response = _snapshot_response(snapshot)
+                if response is not None:
+                    return _with_etag(response, etag)
+
             # Get hierarchy
             service = ContentHierarchyService()
-            hierarchy = service.get_full_hierarchy(use_cache=not refresh)
+            hierarchy = service.get_full_hierarchy(use_cache=not refresh, versions=versions)
+            if 'error' in hierarchy:
+                return jsonify(hierarchy)
 
-            return jsonify(hierarchy)
+            if use_snapshot:
+                snapshot = save_snapshot(versions.version, hierarchy)
+                response = _snapshot_response(snapshot) if snapshot is not None else None
+                if response is not None:
+                    return _with_etag(response, etag)
+
+            return _with_etag(jsonify(hierarchy), etag)
         except Exception as e:
             logger.error(f"Error getting content hierarchy: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -194,6 +330,10 @@ def register_hierarchy_routes(api_contents_bp):
 
         Optional query parameters:
         - filters: JSON string with filter configuration
+
+        The ETag follows this channel's version only, so changes in other
+        channels keep answering 304 Not Modified. Filtered views are
+        evaluated in memory from the channel's cached page status index.
         """
         try:
             import json
@@ -206,11 +346,22 @@ def register_hierarchy_routes(api_contents_bp):
             except json.JSONDecodeError:
                 filters = {}
 
+            versions = get_hierarchy_versions()
+            etag = None
+            if versions:
+                etag = f"c{channel_id}-{versions.channel(channel_id)}"
+                if filters:
+                    # Status filters also depend on pending uploads and managers
+                    digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode('utf-8')).hexdigest()
+                    etag = f"{etag}-a{versions.assignments}-{digest[:12]}"
+                if request.if_none_match.contains_weak(etag):
+                    return _not_modified(etag)
+
             # Use the hierarchy service
             service = ContentHierarchyService()
-            hierarchy = service.get_channel_hierarchy(channel_id, filters)
+            hierarchy = service.get_channel_hierarchy(channel_id, filters, versions=versions)
 
-            return jsonify(hierarchy)
+            return _with_etag(jsonify(hierarchy), etag)
         except Exception as e:
             logger.error(f"Error getting channel hierarchy: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -226,107 +377,46 @@ def register_hierarchy_routes(api_contents_bp):
         - Pages (페이지) with 실무자 (page managers)
 
         Response is sorted by: channel → category → page
-        """
-        try:
-            from models import ContentManager, Assignees
 
-            # Get all channels
-            channels = ContentRelChannels.query.filter_by(is_deleted=False).order_by(ContentRelChannels.name).all()
+        Optional query parameters:
+        - channel_id: Only this channel
+        - offset, limit: Page through the channels; adds 'pagination' to the response
 
-            result = {
-                'channels': []
-            }
+        Built with a fixed number of set-based queries and cached under the
+        hierarchy and assignment versions, which are also sent as ETag.
+        """
+        try:
+            channel_id = request.args.get('channel_id', type=int)
+            offset = max(request.args.get('offset', 0, type=int), 0)
+            limit = request.args.get('limit', type=int)
+            if limit is not None and limit <= 0:
+                return jsonify({'error': 'limit must be positive'}), 400
+
+            versions = get_hierarchy_versions()
+            etag = None
+            if versions:
+                if channel_id is None:
+                    etag = f"m{versions.version}-{versions.assignments}"
+                else:
+                    etag = f"m{channel_id}-{versions.channel(channel_id)}-{versions.assignments}"
+                if limit is not None:
+                    etag = f"{etag}-{offset}-{limit}"
+                if request.if_none_match.contains_weak(etag):
+                    return _not_modified(etag)
 
-            for channel in channels:
-                channel_data = {
-                    'id': channel.id,
-                    'name': channel.name,
-                    'description': channel.description,
-                    'categories': []
+            service = ContentHierarchyService()
+            hierarchy = service.get_hierarchy_with_managers(channel_id=channel_id, versions=versions)
+
+            result = {'channels': hierarchy['channels']}
+            if limit is not None:
+                result['channels'] = hierarchy['channels'][offset:offset + limit]
+                result['pagination'] = {
+                    'offset': offset,
+                    'limit': limit,
+                    'total_channels': len(hierarchy['channels'])
                 }
 
-                # Get top-level folders (categories) for this channel
-                categories = ContentRelFolders.query.filter_by(
-                    channel_id=channel.id,
-                    parent_id=None,
-                    is_deleted=False
-                ).order_by(ContentRelFolders.name).all()
-
-                for category in categories:
-                    # Get category manager (책임자)
-                    category_manager = None
-                    manager_record = ContentManager.query.filter_by(
-                        type='folder',
-                        folder_id=category.id
-                    ).first()
-
-                    if manager_record and manager_record.assignee_id:
-                        assignee = Assignees.query.get(manager_record.assignee_id)
-                        if assignee:
-                            category_manager = {
-                                'name': assignee.name,
-                                'position': assignee.position,
-                                'user_id': assignee.user_id
-                            }
-
-                    category_data = {
-                        'id': category.id,
-                        'name': category.name,
-                        'description': category.description,
-                        'channel_id': category.channel_id,
-                        'manager': category_manager,  # 책임자
-                        'pages': []
-                    }
-
-                    # Get pages for this category
-                    pages = ContentRelPages.query.filter_by(
-                        folder_id=category.id,
-                        is_deleted=False
-                    ).order_by(ContentRelPages.name).all()
-
-                    for page in pages:
-                        # Get page manager (실무자)
-                        page_manager = None
-                        page_manager_record = ContentManager.query.filter_by(
-                            type='file',
-                            file_id=page.id
-                        ).first()
-
-                        if page_manager_record and page_manager_record.assignee_id:
-                            assignee = Assignees.query.get(page_manager_record.assignee_id)
-                            if assignee:
-                                page_manager = {
-                                    'name': assignee.name,
-                                    'position': assignee.position,
-                                    'user_id': assignee.user_id
-                                }
-
-                        # Check if page has pending content
-                        from models import PendingContent
-                        has_pending = PendingContent.query.filter_by(
-                            content_type='page',
-                            page_id=page.id
-                        ).first() is not None
-
-                        page_data = {
-                            'id': page.id,
-                            'name': page.name,
-                            'description': page.description,
-                            'object_id': page.object_id,
-                            'folder_id': page.folder_id,
-                            'manager': page_manager,  # 실무자
-                            'has_pending': has_pending,
-                            'created_at': page.created_at.isoformat() if page.created_at else None,
-                            'updated_at': page.updated_at.isoformat() if page.updated_at else None
-                        }
-
-                        category_data['pages'].append(page_data)
-
-                    channel_data['categories'].append(category_data)
-
-                result['channels'].append(channel_data)
-
-            return jsonify(result)
+            return _with_etag(jsonify(result), etag)
 
         except Exception as e:
             logger.error(f"Error getting hierarchy with managers: {str(e)}")
@@ -339,9 +429,9 @@ def register_hierarchy_routes(api_contents_bp):
 
         Process:
         1. Validate new name
-        2. Rename all R2 files first
-        3. If R2 rename succeeds, update database
-        4. If any step fails, abort and rollback
+        2. Start a background job moving "<Channel>/" to the new prefix
+        3. The job updates the database once every R2 object has moved
+        4. Answer 200 if it finished within R2_BULK_MOVE_SYNC_WAIT, otherwise 202 with the job
 
         Request body:
         {
@@ -380,112 +470,39 @@ def register_hierarchy_routes(api_contents_bp):
             if existing:
                 return jsonify({'error': '같은 이름의 탭이 이미 존재합니다'}), 400
 
-            # STEP 1: Rename R2 objects FIRST (before DB commit)
-            if old_name != new_name:
-                import os as os_module
-
-                logger.info(f"[R2 CHANNEL RENAME] Starting for channel {channel_id}")
-                logger.info(f"[R2 CHANNEL RENAME] Channel: '{old_name}' → '{new_name}'")
-
-                # Sanitize names
-                old_channel_safe = old_name.replace('/', '⁄').replace('\\', '⁄')
-                new_channel_safe = new_name.replace('/', '⁄').replace('\\', '⁄')
-
-                # Get all folders under this channel
-                folders = ContentRelFolders.query.filter_by(
-                    channel_id=channel_id,
-                    parent_id=None,
-                    is_deleted=False
-                ).all()
-
-                logger.info(f"[R2 CHANNEL RENAME] Found {len(folders)} folders")
-
-                # Check if target paths already exist
-                for folder in folders:
-                    folder_safe = folder.name.replace('/', '⁄').replace('\\', '⁄')
-                    new_path = f"{new_channel_safe}/{folder_safe}"
-
-                    # Check for any existing files at new path
-                    existing_files = list_r2_objects(new_path)
-                    if len(existing_files) > 0:
-                        logger.error(f"[R2 CHANNEL RENAME] Target path already exists: {new_path}")
-                        return jsonify({'error': 'R2에 이름이 변경될 경로가 이미 존재합니다'}), 400
-
-                # Rename all files
-                total_files_renamed = 0
-
-                for folder in folders:
-                    folder_safe = folder.name.replace('/', '⁄').replace('\\', '⁄')
-
-                    # Get all pages under this folder
-                    pages = ContentRelPages.query.filter_by(
-                        folder_id=folder.id,
-                        is_deleted=False
-                    ).all()
-
-                    logger.info(f"[R2 CHANNEL RENAME] Folder '{folder.name}': {len(pages)} pages")
-
-                    for page in pages:
-                        page_safe = page.name.replace('/', '⁄').replace('\\', '⁄')
-                        page_name_without_ext = os_module.path.splitext(page_safe)[0]
-
-                        # Old and new paths
-                        old_path = f"{old_channel_safe}/{folder_safe}"
-                        new_path = f"{new_channel_safe}/{folder_safe}"
-
-                        # 1. Rename the page file
-                        old_page_prefix = f"{old_path}/{page_name_without_ext}"
-                        page_files = list_r2_objects(old_page_prefix)
-
-                        for old_file in page_files:
-                            remainder = old_file[len(old_page_prefix):]
-                            if remainder.startswith('.') and '/' not in remainder:
-                                # Direct page file
-                                file_ext = os_module.path.splitext(old_file)[1]
-                                new_page_file = f"{new_path}/{page_name_without_ext}{file_ext}"
-
-                                if not move_r2_object(old_file, new_page_file):
-                                    logger.error(f"[R2 CHANNEL RENAME] Failed to rename: {old_file}")
-                                    return jsonify({'error': f'R2 파일 이름 변경 실패: {old_file}'}), 500
-
-                                logger.info(f"✓ Renamed: {old_file} → {new_page_file}")
-                                total_files_renamed += 1
-
-                        # 2. Rename additional content folder
-                        old_folder_prefix = f"{old_path}/{page_name_without_ext}/"
-                        new_folder_path = f"{new_path}/{page_name_without_ext}"
-
-                        objects = list_r2_objects(old_folder_prefix)
-                        for old_key in objects:
-                            new_key = old_key.replace(
-                                f"{old_path}/{page_name_without_ext}/",
-                                f"{new_folder_path}/"
-                            )
-                            if not move_r2_object(old_key, new_key):
-                                logger.error(f"[R2 CHANNEL RENAME] Failed to rename: {old_key}")
-                                return jsonify({'error': f'R2 추가 콘텐츠 이름 변경 실패: {old_key}'}), 500
-
-                            logger.info(f"✓ Renamed: {old_key} → {new_key}")
-                            total_files_renamed += 1
-
-                logger.info(f"[R2 CHANNEL RENAME] Completed. Renamed {total_files_renamed} files")
-
-            # STEP 2: Update database ONLY after R2 rename succeeds
-            channel.name = new_name
-            channel.updated_at = datetime.datetime.now()
-
-            db.session.commit()
-
-            logger.info(f"Channel {channel_id} updated in DB: name='{channel.name}'")
-
-            return jsonify({
-                'success': True,
+            if old_name == new_name:
+                return jsonify({
+                    'success': True,
+                    'message': 'Channel updated successfully',
+                    'channel': _channel_dict(channel)
+                })
+
+            # Renames already in flight for this channel must finish (or be resumed) first
+            active_job = R2BulkMoveService.get_active_job('channel_rename', channel_id)
+            if active_job:
+                return jsonify({
+                    'error': '이 탭의 이름 변경 작업이 이미 진행 중입니다',
+                    'job': active_job.to_dict()
+                }), 409
+
+            logger.info(f"[R2 CHANNEL RENAME] Channel {channel_id}: '{old_name}' → '{new_name}'")
+
+            # Every object of the channel lives under "<Channel>/"
+            old_prefix = f"{safe_name(old_name)}/"
+            new_prefix = f"{safe_name(new_name)}/"
+
+            # Check if target path already exists
+            if r2_prefix_has_objects(new_prefix):
+                logger.error(f"[R2 CHANNEL RENAME] Target path already exists: {new_prefix}")
+                return jsonify({'error': 'R2에 이름이 변경될 경로가 이미 존재합니다'}), 400
+
+            # R2 objects move in a background job; the DB name changes only after every object moved
+            job = R2BulkMoveService.create_job(
+                'channel_rename', channel_id, old_prefix, new_prefix, {'name': new_name}
+            )
+            return rename_job_response(job, 'channel', lambda: {
                 'message': 'Channel updated successfully',
-                'channel': {
-                    'id': channel.id,
-                    'name': channel.name,
-                    'updated_at': channel.updated_at.isoformat() if channel.updated_at else None
-                }
+                'channel': _channel_dict(ContentRelChannels.query.get(channel_id))
             })
 
         except Exception as e:
@@ -500,9 +517,9 @@ def register_hierarchy_routes(api_contents_bp):
 
         Process:
         1. Validate new name and channel
-        2. Rename all R2 files first
-        3. If R2 rename succeeds, update database
-        4. If any step fails, abort and rollback
+        2. Start a background job moving "<Channel>/<Folder>/" to the new prefix
+        3. The job updates the database once every R2 object has moved
+        4. Answer 200 if it finished within R2_BULK_MOVE_SYNC_WAIT, otherwise 202 with the job
 
         Request body:
         {
@@ -565,100 +582,41 @@ def register_hierarchy_routes(api_contents_bp):
 
             new_channel_name = new_channel.name
 
-            # STEP 1: Rename R2 objects FIRST (before DB commit)
-            if old_folder_name != new_name or old_channel_id != new_channel_id:
-                import os as os_module
-
-                logger.info(f"[R2 FOLDER RENAME] Starting for folder {folder_id}")
-                logger.info(f"[R2 FOLDER RENAME] Folder: '{old_folder_name}' → '{new_name}'")
-                logger.info(f"[R2 FOLDER RENAME] Channel: '{old_channel_name}' → '{new_channel_name}'")
-
-                # Sanitize names
-                old_channel_safe = old_channel_name.replace('/', '⁄').replace('\\', '⁄')
-                old_folder_safe = old_folder_name.replace('/', '⁄').replace('\\', '⁄')
-                new_channel_safe = new_channel_name.replace('/', '⁄').replace('\\', '⁄')
-                new_folder_safe = new_name.replace('/', '⁄').replace('\\', '⁄')
-
-                # Check if target path already exists
-                new_path = f"{new_channel_safe}/{new_folder_safe}"
-                existing_files = list_r2_objects(new_path)
-                if len(existing_files) > 0:
-                    logger.error(f"[R2 FOLDER RENAME] Target path already exists: {new_path}")
-                    return jsonify({'error': 'R2에 이름이 변경될 경로가 이미 존재합니다'}), 400
-
-                # Get all pages under this folder
-                pages = ContentRelPages.query.filter_by(
-                    folder_id=folder_id,
-                    is_deleted=False
-                ).all()
-
-                logger.info(f"[R2 FOLDER RENAME] Found {len(pages)} pages to rename")
-
-                total_files_renamed = 0
-
-                for page in pages:
-                    page_safe = page.name.replace('/', '⁄').replace('\\', '⁄')
-                    page_name_without_ext = os_module.path.splitext(page_safe)[0]
-
-                    # Old and new paths
-                    old_path = f"{old_channel_safe}/{old_folder_safe}"
-                    new_path = f"{new_channel_safe}/{new_folder_safe}"
-
-                    # 1. Rename the page file
-                    old_page_prefix = f"{old_path}/{page_name_without_ext}"
-                    page_files = list_r2_objects(old_page_prefix)
-
-                    for old_file in page_files:
-                        remainder = old_file[len(old_page_prefix):]
-                        if remainder.startswith('.') and '/' not in remainder:
-                            # Direct page file
-                            file_ext = os_module.path.splitext(old_file)[1]
-                            new_page_file = f"{new_path}/{page_name_without_ext}{file_ext}"
-
-                            if not move_r2_object(old_file, new_page_file):
-                                logger.error(f"[R2 FOLDER RENAME] Failed to rename: {old_file}")
-                                return jsonify({'error': f'R2 파일 이름 변경 실패: {old_file}'}), 500
-
-                            logger.info(f"✓ Renamed: {old_file} → {new_page_file}")
-                            total_files_renamed += 1
-
-                    # 2. Rename additional content folder
-                    old_folder_prefix = f"{old_path}/{page_name_without_ext}/"
-                    new_folder_path = f"{new_path}/{page_name_without_ext}"
-
-                    objects = list_r2_objects(old_folder_prefix)
-                    for old_key in objects:
-                        new_key = old_key.replace(
-                            f"{old_path}/{page_name_without_ext}/",
-                            f"{new_folder_path}/"
-                        )
-                        if not move_r2_object(old_key, new_key):
-                            logger.error(f"[R2 FOLDER RENAME] Failed to rename: {old_key}")
-                            return jsonify({'error': f'R2 추가 콘텐츠 이름 변경 실패: {old_key}'}), 500
-
-                        logger.info(f"✓ Renamed: {old_key} → {new_key}")
-                        total_files_renamed += 1
-
-                logger.info(f"[R2 FOLDER RENAME] Completed. Renamed {total_files_renamed} files")
-
-            # STEP 2: Update database ONLY after R2 rename succeeds
-            folder.name = new_name
-            folder.channel_id = new_channel_id
-            folder.updated_at = datetime.datetime.now()
-
-            db.session.commit()
-
-            logger.info(f"Folder {folder_id} updated in DB: name='{folder.name}', channel_id={folder.channel_id}")
-
-            return jsonify({
-                'success': True,
+            if old_folder_name == new_name and old_channel_id == new_channel_id:
+                return jsonify({
+                    'success': True,
+                    'message': 'Folder updated successfully',
+                    'folder': _folder_dict(folder)
+                })
+
+            # Renames already in flight for this folder must finish (or be resumed) first
+            active_job = R2BulkMoveService.get_active_job('folder_rename', folder_id)
+            if active_job:
+                return jsonify({
+                    'error': '이 카테고리의 이름 변경 작업이 이미 진행 중입니다',
+                    'job': active_job.to_dict()
+                }), 409
+
+            logger.info(f"[R2 FOLDER RENAME] Folder {folder_id}: '{old_folder_name}' → '{new_name}', "
+                        f"channel '{old_channel_name}' → '{new_channel_name}'")
+
+            # Every object of the category (including sub folders) lives under "<Channel>/<Folder>/"
+            old_prefix = f"{safe_name(old_channel_name)}/{safe_name(old_folder_name)}/"
+            new_prefix = f"{safe_name(new_channel_name)}/{safe_name(new_name)}/"
+
+            # Check if target path already exists
+            if r2_prefix_has_objects(new_prefix):
+                logger.error(f"[R2 FOLDER RENAME] Target path already exists: {new_prefix}")
+                return jsonify({'error': 'R2에 이름이 변경될 경로가 이미 존재합니다'}), 400
+
+            # R2 objects move in a background job; the DB row changes only after every object moved
+            job = R2BulkMoveService.create_job(
+                'folder_rename', folder_id, old_prefix, new_prefix,
+                {'name': new_name, 'channel_id': new_channel_id}
+            )
+            return rename_job_response(job, 'folder', lambda: {
                 'message': 'Folder updated successfully',
-                'folder': {
-                    'id': folder.id,
-                    'name': folder.name,
-                    'channel_id': folder.channel_id,
-                    'updated_at': folder.updated_at.isoformat() if folder.updated_at else None
-                }
+                'folder': _folder_dict(ContentRelFolders.query.get(folder_id))
             })
 
         except Exception as e:
@@ -794,10 +752,9 @@ def register_hierarchy_routes(api_contents_bp):
 
                 # Check if target already exists in R2
                 new_page_prefix = f"{new_base_path}/{new_name_without_ext}"
-                existing_files = list_r2_objects(new_page_prefix)
 
-                # Check for direct file conflicts (not subdirectory files)
-                for existing_file in existing_files:
+                # Check for direct file conflicts (the delimiter skips subdirectory files)
+                for existing_file in iter_r2_objects(new_page_prefix, delimiter='/'):
                     remainder = existing_file[len(new_page_prefix):]
                     if remainder.startswith('.') and '/' not in remainder:
                         logger.error(f"[R2 PAGE RENAME] Target already exists: {existing_file}")
@@ -805,16 +762,18 @@ def register_hierarchy_routes(api_contents_bp):
 
                 # 1. Rename the page file
                 old_page_prefix = f"{old_base_path}/{old_name_without_ext}"
-                page_files = list_r2_objects(old_page_prefix)
+                # Materialized because the loop moves objects under the listed prefix
+                page_files = list(iter_r2_objects(old_page_prefix, delimiter='/', with_metadata=True))
 
                 page_file_renamed = False
-                for old_file in page_files:
+                for page_file in page_files:
+                    old_file = page_file['key']
                     remainder = old_file[len(old_page_prefix):]
                     if remainder.startswith('.') and '/' not in remainder:
                         file_ext = os_module.path.splitext(old_file)[1]
                         new_page_file = f"{new_base_path}/{new_name_without_ext}{file_ext}"
 
-                        if not move_r2_object(old_file, new_page_file):
+                        if not move_r2_object(old_file, new_page_file, size=page_file['size']):
                             logger.error(f"[R2 PAGE RENAME] Failed to rename: {old_file}")
                             return jsonify({'error': 'R2 파일 이름 변경 실패'}), 500
 
@@ -825,14 +784,15 @@ def register_hierarchy_routes(api_contents_bp):
                 old_folder_path = f"{old_base_path}/{old_name_without_ext}"
                 new_folder_path = f"{new_base_path}/{new_name_without_ext}"
 
-                objects = list_r2_objects(f"{old_folder_path}/")
-                for old_key in objects:
+                objects = list(iter_r2_objects(f"{old_folder_path}/", with_metadata=True))
+                for obj in objects:
+                    old_key = obj['key']
                     new_key = old_key.replace(
                         f"{old_folder_path}/",
                         f"{new_folder_path}/"
                     )
 
-                    if not move_r2_object(old_key, new_key):
+                    if not move_r2_object(old_key, new_key, size=obj['size']):
                         logger.error(f"[R2 PAGE RENAME] Failed to rename: {old_key}")
                         return jsonify({'error': 'R2 추가 콘텐츠 이름 변경 실패'}), 500
 
@@ -847,6 +807,8 @@ def register_hierarchy_routes(api_contents_bp):
 
             db.session.commit()
 
+            R2StorageService.invalidate_page(page_id)
+
             logger.info(f"Page {page_id} updated in DB: name='{page.name}', folder_id={page.folder_id}")
 
             return jsonify({
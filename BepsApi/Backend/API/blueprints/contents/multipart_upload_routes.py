@@ -0,0 +1,492 @@
+"""
+Presigned multipart upload routes
+
+This module lets clients upload large content straight to R2 in parallel parts:
+- Initiate a multipart upload for a page or additional content (pending location)
+- Hand out presigned URLs for a batch of part numbers
+- Complete the upload (creates the PendingContent record)
+- Abort the upload
+
+The API process never touches the file bytes. Upload sessions live in Redis
+until they are completed, aborted or expire.
+"""
+
+import os
+import json
+from flask import jsonify, request, current_app
+from flask_jwt_extended import jwt_required
+from extensions import db, redis_client
+from models import ContentRelPages, ContentRelPageDetails, PendingContent
+from .permission_middleware import (
+    require_upload_permission,
+    can_upload_to_page,
+    get_current_user
+)
+from .r2_utils import get_r2_client, generate_pending_path, generate_r2_object_key
+from .pending_approve_routes import (
+    PAGE_ALLOWED_EXTENSIONS,
+    PAGE_CONTENT_TYPES,
+    MAX_PAGE_SIZE,
+    replace_pending_content
+)
+from services.r2_existence_index import r2_existence_index
+from services.signed_url_cache import signed_url_cache
+from services.r2_storage_service import R2StorageService
+from log_config import get_content_logger
+
+# Initialize logger
+logger = get_content_logger()
+
+SESSION_KEY_PREFIX = 'r2:multipart'
+MAX_PARTS = 10000            # S3/R2 limit
+MAX_PART_URLS_PER_CALL = 100
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3/R2 minimum for every part but the last
+ETAG_HASH_PREFIX = 'etag:'   # content_hash of multipart uploads: their ETag, not a SHA-256
+
+
+def _session_key(upload_id):
+    return f"{SESSION_KEY_PREFIX}:{upload_id}"
+
+
+def _save_session(upload_id, session):
+    ttl = current_app.config.get('R2_MULTIPART_SESSION_TTL', 24 * 3600)
+    redis_client.set(_session_key(upload_id), json.dumps(session), ex=ttl)
+
+
+def _load_session(upload_id):
+    raw = redis_client.get(_session_key(upload_id))
+    return json.loads(raw) if raw else None
+
+
+def _delete_session(upload_id):
+    redis_client.delete(_session_key(upload_id))
+
+
+def _recommended_part_size(file_size):
+    """Configured part size, grown if needed so the file fits in MAX_PARTS parts"""
+    part_size = max(MIN_PART_SIZE, current_app.config.get('R2_MULTIPART_CHUNKSIZE', 16 * 1024 * 1024))
+    if file_size:
+        while -(-file_size // part_size) > MAX_PARTS:
+            part_size *= 2
+    return part_size
+
+
+def _start_upload(pending_object_key, content_type, session):
+    """Create the R2 multipart upload and store its session"""
+    r2_client = get_r2_client()
+    bucket_name = current_app.config.get('R2_BUCKET_NAME')
+
+    response = r2_client.create_multipart_upload(
+        Bucket=bucket_name,
+        Key=pending_object_key,
+        ContentType=content_type
+    )
+    upload_id = response['UploadId']
+
+    part_size = _recommended_part_size(session.get('file_size'))
+    part_count = -(-session['file_size'] // part_size) if session.get('file_size') else None
+    session.update({
+        'object_key': pending_object_key,
+        'content_type': content_type,
+        'part_size': part_size,
+        'part_count': part_count
+    })
+    _save_session(upload_id, session)
+
+    logger.info(f"Initiated multipart upload {upload_id} for {pending_object_key}")
+
+    return {
+        'upload_id': upload_id,
+        'object_key': pending_object_key,
+        'part_size': part_size,
+        'part_count': part_count,
+        'max_parts': MAX_PARTS
+    }
+
+
+def _etag_content_hash(etag):
+    """
+    content_hash for a completed multipart upload
+
+    There is no SHA-256 without reading the object back. Identical multipart
+    uploads (same bytes, same part size) share the ETag, so it still lets
+    approvals skip re-uploads and share archive objects; it never equals a
+    SHA-256, so mixed comparisons just count as different content.
+    """
+    etag = (etag or '').strip('"')
+    return f"{ETAG_HASH_PREFIX}{etag}" if etag else None
+
+
+def _parse_parts(raw_parts, max_part):
+    """
+    Client-sent parts as CompleteMultipartUpload parts, sorted by number
+
+    Raises:
+        ValueError: if an entry is not {"part_number": 1..max_part, "etag": "..."}
+            or a part number repeats
+    """
+    if not isinstance(raw_parts, list):
+        raise ValueError('parts must be an array')
+
+    parts = {}
+    for part in raw_parts:
+        if not isinstance(part, dict):
+            raise ValueError('each part must be an object with part_number and etag')
+        try:
+            number = int(part.get('part_number'))
+        except (TypeError, ValueError):
+            raise ValueError('part_number must be an integer')
+        if number < 1 or number > max_part:
+            raise ValueError(f'part numbers must be between 1 and {max_part}')
+        if number in parts:
+            raise ValueError(f'part {number} is listed more than once')
+        etag = part.get('etag')
+        if not isinstance(etag, str) or not etag:
+            raise ValueError(f'part {number} needs an etag')
+        parts[number] = etag
+
+    return [{'PartNumber': number, 'ETag': parts[number]} for number in sorted(parts)]
+
+
+def _get_owned_session(upload_id):
+    """
+    Load an upload session owned by the current user
+
+    Returns:
+        (session, user, error_response)
+    """
+    user = get_current_user()
+    if not user:
+        return None, None, (jsonify({'error': 'Authentication required'}), 401)
+
+    session = _load_session(upload_id)
+    if not session:
+        return None, user, (jsonify({'error': 'Upload session not found or expired'}), 404)
+
+    if session.get('uploaded_by') != user.id:
+        return None, user, (jsonify({'error': '업로드 권한이 없습니다.'}), 403)
+
+    return session, user, None
+
+
+def _list_uploaded_parts(r2_client, bucket_name, object_key, upload_id):
+    """All parts R2 has received for an upload (follows pagination)"""
+    parts = []
+    paginator = r2_client.get_paginator('list_parts')
+    for page in paginator.paginate(Bucket=bucket_name, Key=object_key, UploadId=upload_id):
+        for part in page.get('Parts', []):
+            parts.append({'PartNumber': part['PartNumber'], 'ETag': part['ETag']})
+    return parts
+
+
+def register_multipart_upload_routes(api_contents_bp):
+    """Register presigned multipart upload routes to the blueprint"""
+
+    @api_contents_bp.route('/page/<int:page_id>/multipart/initiate', methods=['POST'])
+    @jwt_required()
+    @require_upload_permission()
+    def initiate_page_multipart_upload(page_id):
+        """
+        Start a multipart upload of page content to the pending location
+
+        Request body:
+        {
+            "filename": "video.mp4",
+            "file_size": 12345678    (required: checked against the page size limit,
+                                      and only its parts get upload URLs)
+        }
+        """
+        try:
+            page = ContentRelPages.query.filter_by(id=page_id, is_deleted=False).first()
+            if not page:
+                return jsonify({'error': 'Page not found'}), 404
+
+            data = request.get_json() or {}
+            filename = data.get('filename')
+            if not filename:
+                return jsonify({'error': 'filename is required'}), 400
+
+            # Validate file extension (images, videos, PDFs)
+            _, file_ext = os.path.splitext(filename)
+            if file_ext.lower() not in PAGE_ALLOWED_EXTENSIONS:
+                return jsonify({'error': f'Invalid file format. Allowed: {", ".join(PAGE_ALLOWED_EXTENSIONS)}'}), 400
+
+            try:
+                file_size = int(data.get('file_size') or 0)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'file_size must be an integer'}), 400
+            if file_size <= 0:
+                return jsonify({'error': 'file_size is required'}), 400
+            if file_size > MAX_PAGE_SIZE:
+                return jsonify({
+                    'error': f'Page content must be under 100MB. Current size: {file_size / 1024 / 1024:.2f}MB'
+                }), 413
+
+            original_object_key = generate_r2_object_key(page_id, page.name, is_page_detail=False)
+            pending_object_key = generate_pending_path(original_object_key)
+            content_type = PAGE_CONTENT_TYPES.get(file_ext.lower(), 'application/octet-stream')
+
+            user = get_current_user()
+            result = _start_upload(pending_object_key, content_type, {
+                'content_type_kind': 'page',
+                'page_id': page_id,
+                'additional_id': None,
+                'filename': page.name,
+                'file_size': file_size,
+                'max_size': MAX_PAGE_SIZE,
+                'uploaded_by': user.id
+            })
+            return jsonify(result), 201
+
+        except Exception as e:
+            logger.error(f"Error initiating page multipart upload: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @api_contents_bp.route('/additional/<int:additional_id>/multipart/initiate', methods=['POST'])
+    @jwt_required()
+    def initiate_additional_multipart_upload(additional_id):
+        """
+        Start a multipart upload of additional content to the pending location
+
+        Request body:
+        {
+            "filename": "001_01.mp4",
+            "file_size": 5368709120   (optional, used for part size)
+        }
+        """
+        try:
+            additional = ContentRelPageDetails.query.filter_by(
+                id=additional_id,
+                is_deleted=False
+            ).first()
+            if not additional:
+                return jsonify({'error': 'Additional content not found'}), 404
+
+            user = get_current_user()
+            if not user:
+                return jsonify({'error': 'Authentication required'}), 401
+
+            if not can_upload_to_page(user.id, additional.page_id):
+                return jsonify({'error': '업로드 권한이 없습니다.'}), 403
+
+            data = request.get_json() or {}
+            filename = data.get('filename')
+            if not filename:
+                return jsonify({'error': 'filename is required'}), 400
+
+            # Validate file extension matches
+            _, file_ext = os.path.splitext(filename)
+            _, original_ext = os.path.splitext(additional.name)
+            if file_ext.lower() != original_ext.lower():
+                return jsonify({
+                    'error': f'File extension must match original: {original_ext}'
+                }), 400
+
+            pending_object_key = generate_pending_path(additional.object_id)
+            content_type = data.get('content_type') or 'application/octet-stream'
+
+            result = _start_upload(pending_object_key, content_type, {
+                'content_type_kind': 'additional',
+                'page_id': additional.page_id,
+                'additional_id': additional_id,
+                'filename': additional.name,
+                'file_size': int(data.get('file_size') or 0),
+                'max_size': None,
+                'uploaded_by': user.id
+            })
+            return jsonify(result), 201
+
+        except Exception as e:
+            logger.error(f"Error initiating additional multipart upload: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @api_contents_bp.route('/multipart/<upload_id>/part-urls', methods=['POST'])
+    @jwt_required()
+    def get_multipart_part_urls(upload_id):
+        """
+        Presigned URLs for a batch of part numbers
+
+        Request body:
+        {
+            "part_numbers": [1, 2, 3]
+        }
+
+        Each part is uploaded with PUT to its URL; the ETag response header
+        must be sent back on complete (or the server lists the parts).
+        """
+        try:
+            session, user, error = _get_owned_session(upload_id)
+            if error:
+                return error
+
+            data = request.get_json() or {}
+            part_numbers = data.get('part_numbers')
+            if not isinstance(part_numbers, list) or not part_numbers:
+                return jsonify({'error': 'part_numbers array is required'}), 400
+            if len(part_numbers) > MAX_PART_URLS_PER_CALL:
+                return jsonify({'error': f'At most {MAX_PART_URLS_PER_CALL} part numbers per request'}), 400
+
+            try:
+                part_numbers = [int(number) for number in part_numbers]
+            except (TypeError, ValueError):
+                return jsonify({'error': 'part_numbers must be integers'}), 400
+            # Size-limited uploads only get the parts of their declared size
+            max_part = session.get('part_count') if session.get('max_size') else MAX_PARTS
+            if any(number < 1 or number > max_part for number in part_numbers):
+                return jsonify({'error': f'part numbers must be between 1 and {max_part}'}), 400
+
+            r2_client = get_r2_client()
+            bucket_name = current_app.config.get('R2_BUCKET_NAME')
+            expires_in = current_app.config.get('R2_MULTIPART_PART_URL_EXPIRES', 3600)
+
+            urls = {}
+            for part_number in part_numbers:
+                urls[str(part_number)] = r2_client.generate_presigned_url(
+                    'upload_part',
+                    Params={
+                        'Bucket': bucket_name,
+                        'Key': session['object_key'],
+                        'UploadId': upload_id,
+                        'PartNumber': part_number
+                    },
+                    ExpiresIn=expires_in
+                )
+
+            return jsonify({
+                'upload_id': upload_id,
+                'urls': urls,
+                'expires_in': expires_in
+            })
+
+        except Exception as e:
+            logger.error(f"Error generating multipart part URLs for {upload_id}: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @api_contents_bp.route('/multipart/<upload_id>/complete', methods=['POST'])
+    @jwt_required()
+    def complete_multipart_upload(upload_id):
+        """
+        Complete a multipart upload and record it as pending content
+
+        Request body (optional):
+        {
+            "parts": [{"part_number": 1, "etag": "\\"abc...\\""}, ...]
+        }
+        Without parts, the uploaded parts are listed from R2. The session is
+        kept until the pending record is committed, so a failed call can be
+        retried (after R2 completed the upload, retries skip that step).
+        """
+        try:
+            session, user, error = _get_owned_session(upload_id)
+            if error:
+                return error
+
+            r2_client = get_r2_client()
+            bucket_name = current_app.config.get('R2_BUCKET_NAME')
+            object_key = session['object_key']
+
+            if not session.get('completed'):
+                data = request.get_json(silent=True) or {}
+                if data.get('parts'):
+                    max_part = session.get('part_count') if session.get('max_size') else MAX_PARTS
+                    try:
+                        parts = _parse_parts(data['parts'], max_part)
+                    except ValueError as e:
+                        return jsonify({'error': str(e)}), 400
+                else:
+                    parts = _list_uploaded_parts(r2_client, bucket_name, object_key, upload_id)
+
+                if not parts:
+                    return jsonify({'error': 'No uploaded parts found'}), 400
+
+                r2_client.complete_multipart_upload(
+                    Bucket=bucket_name,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    MultipartUpload={'Parts': parts}
+                )
+                session.update({'completed': True, 'completed_parts': len(parts)})
+                _save_session(upload_id, session)
+
+            # Size comes from R2, not from the client
+            head = r2_client.head_object(Bucket=bucket_name, Key=object_key)
+            file_size = head.get('ContentLength', 0)
+
+            max_size = session.get('max_size')
+            if max_size and file_size > max_size:
+                r2_client.delete_object(Bucket=bucket_name, Key=object_key)
+                _delete_session(upload_id)
+                return jsonify({
+                    'error': f'Page content must be under 100MB. Current size: {file_size / 1024 / 1024:.2f}MB'
+                }), 413
+
+            r2_existence_index.add_key(object_key)
+            signed_url_cache.evict([object_key])
+
+            pending = replace_pending_content(
+                session['content_type_kind'],
+                session['page_id'],
+                session['additional_id'],
+                object_key,
+                session['filename'],
+                file_size,
+                user.id,
+                content_hash=_etag_content_hash(head.get('ETag'))
+            )
+            db.session.commit()
+            _delete_session(upload_id)
+
+            if session['content_type_kind'] == 'page':
+                R2StorageService.invalidate_page(session['page_id'])
+            else:
+                R2StorageService.invalidate_page_detail(session['additional_id'], session['page_id'])
+
+            logger.info(f"Completed multipart upload {upload_id}: {object_key} ({file_size} bytes, {session.get('completed_parts')} parts)")
+
+            return jsonify({
+                'message': 'Multipart upload completed and stored as pending',
+                'pending': pending.to_dict()
+            }), 201
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error completing multipart upload {upload_id}: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @api_contents_bp.route('/multipart/<upload_id>', methods=['DELETE'])
+    @jwt_required()
+    def abort_multipart_upload(upload_id):
+        """Abort a multipart upload and discard its uploaded parts"""
+        try:
+            session, user, error = _get_owned_session(upload_id)
+            if error:
+                return error
+
+            r2_client = get_r2_client()
+            bucket_name = current_app.config.get('R2_BUCKET_NAME')
+
+            if session.get('completed'):
+                # R2 already assembled the object. The pending key is fixed per
+                # content, so a pending record from an earlier upload may still
+                # point at it; then the object is that record's and must stay.
+                referenced = PendingContent.query.filter_by(object_key=session['object_key']).first()
+                if not referenced:
+                    r2_client.delete_object(Bucket=bucket_name, Key=session['object_key'])
+            else:
+                r2_client.abort_multipart_upload(
+                    Bucket=bucket_name,
+                    Key=session['object_key'],
+                    UploadId=upload_id
+                )
+            _delete_session(upload_id)
+
+            logger.info(f"Aborted multipart upload {upload_id}: {session['object_key']}")
+
+            return jsonify({
+                'message': 'Multipart upload aborted',
+                'upload_id': upload_id
+            })
+
+        except Exception as e:
+            logger.error(f"Error aborting multipart upload {upload_id}: {str(e)}")
+            return jsonify({'error': str(e)}), 500
@@ -7,17 +7,15 @@ This module handles:
 - Page detail specific operations
 """
 
-import logging
 import datetime
 from datetime import timezone
-from flask import Blueprint, jsonify, request, send_file
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models import ContentRelPageDetails, ContentRelPages, Users
+from models import ContentRelPageDetails, Users
 from log_config import get_content_logger
 from werkzeug.utils import secure_filename
 from .r2_utils import generate_r2_object_key, generate_r2_signed_url
-import uuid
 
 # Initialize logger
 logger = get_content_logger()
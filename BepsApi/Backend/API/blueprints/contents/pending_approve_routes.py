@@ -9,9 +9,10 @@ This module handles:
 """
 
 import os
-import logging
+import uuid
+import mimetypes
 from datetime import datetime
-from flask import Blueprint, jsonify, request
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required
 from extensions import db
 from models import (
@@ -24,19 +25,195 @@ from .permission_middleware import (
     get_current_user
 )
 from .r2_utils import (
-    get_r2_client,
     generate_pending_path,
     generate_archived_path,
     move_r2_object,
-    check_r2_object_exists,
-    get_r2_object_metadata
+    copy_r2_object,
+    delete_r2_object,
+    get_r2_object_metadata,
+    CONTENT_HASH_METADATA_KEY,
+    upload_r2_fileobj,
+    UploadTooLargeError
 )
+from services.r2_storage_service import R2StorageService
+from services.archive_retention_service import ArchiveRetentionService
 from log_config import get_content_logger
-from flask import current_app
 
 # Initialize logger
 logger = get_content_logger()
 
+# Page uploads: allowed extensions (images, videos, PDFs), content types and size limit
+PAGE_ALLOWED_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp', '.svg',
+                           '.webm', '.mp4', '.avi', '.mov', '.wmv', '.pdf']
+PAGE_CONTENT_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.bmp': 'image/bmp',
+    '.svg': 'image/svg+xml',
+    '.webm': 'video/webm',
+    '.mp4': 'video/mp4',
+    '.avi': 'video/x-msvideo',
+    '.mov': 'video/quicktime',
+    '.wmv': 'video/x-ms-wmv',
+    '.pdf': 'application/pdf'
+}
+MAX_PAGE_SIZE = 100 * 1024 * 1024  # 100 MB
+
+
+def replace_pending_content(content_type, page_id, additional_id, object_key,
+                            filename, file_size, uploaded_by, content_hash=None):
+    """
+    Replace the PendingContent record of a page/additional (caller commits)
+
+    Args:
+        content_type: 'page' or 'additional'
+        page_id: Page ID
+        additional_id: Additional (page detail) ID, None for pages
+        object_key: R2 key of the uploaded pending object
+        filename: Filename to record
+        file_size: Size in bytes
+        uploaded_by: User ID of the uploader
+        content_hash: SHA-256 of the uploaded bytes, if known
+
+    Returns:
+        The new PendingContent (added to the session)
+    """
+    query = PendingContent.query.filter_by(content_type=content_type)
+    if content_type == 'page':
+        query = query.filter_by(page_id=page_id)
+    else:
+        query = query.filter_by(additional_id=additional_id)
+
+    # Delete existing pending if any
+    existing_pending = query.first()
+    if existing_pending:
+        db.session.delete(existing_pending)
+
+    pending = PendingContent(
+        content_type=content_type,
+        page_id=page_id,
+        additional_id=additional_id,
+        object_key=object_key,
+        filename=filename,
+        file_size=file_size,
+        content_hash=content_hash,
+        uploaded_by=uploaded_by
+    )
+    db.session.add(pending)
+    return pending
+
+
+def _content_type_for(object_key, fallback=None):
+    """Content-Type for an object key, from its extension"""
+    _, ext = os.path.splitext(object_key)
+    return (PAGE_CONTENT_TYPES.get(ext.lower()) or mimetypes.guess_type(object_key)[0]
+            or fallback or 'application/octet-stream')
+
+
+def _is_same_content(pending, original_metadata):
+    """
+    Whether a pending upload has the same bytes as the current object
+
+    Uses the SHA-256 recorded on both sides when available; objects stored
+    before hashes were recorded are compared by ETag instead.
+    """
+    if pending.file_size is not None and pending.file_size != original_metadata.get('size'):
+        return False
+
+    original_hash = original_metadata.get('content_hash')
+    if pending.content_hash and original_hash:
+        return pending.content_hash == original_hash
+
+    pending_metadata = get_r2_object_metadata(pending.object_key)
+    return bool(
+        pending_metadata and pending_metadata.get('etag')
+        and pending_metadata['etag'] == original_metadata.get('etag')
+    )
+
+
+def apply_pending_content(pending, original_object_key, archived_by):
+    """
+    Put approved pending content in place of the original (caller commits)
+
+    - Same bytes as the current object: only the pending copy is removed
+    - Otherwise the original is archived (reusing an archive object with the
+      same hash if one exists) and the pending object replaces it. The new
+      object carries its hash so the next approval can compare without a read.
+
+    A reused archive object is locked against the retention job until the
+    caller commits, so it can't be deleted before the new row references it.
+
+    Args:
+        pending: PendingContent being approved (deleted from the session)
+        original_object_key: R2 key of the current version
+        archived_by: User ID of the approver
+
+    Returns:
+        {'archived': archived object key or None, 'unchanged': bool}
+    """
+    original_metadata = get_r2_object_metadata(original_object_key)
+
+    if original_metadata and _is_same_content(pending, original_metadata):
+        delete_r2_object(pending.object_key)
+        db.session.delete(pending)
+        logger.info(f"Pending content identical to {original_object_key}, skipped archive and move")
+        return {'archived': None, 'unchanged': True}
+
+    archived_object_key = None
+    if original_metadata:
+        original_hash = original_metadata.get('content_hash')
+        shared = None
+        if original_hash:
+            shared = ArchivedContent.query.with_entities(ArchivedContent.object_key).filter_by(
+                content_hash=original_hash
+            ).first()
+
+        if shared:
+            # Retention may have freed the object after the lookup; re-check under its lock
+            ArchiveRetentionService.lock_archive_objects([shared.object_key])
+            if not ArchivedContent.query.filter_by(object_key=shared.object_key).first():
+                shared = None
+
+        if shared:
+            archived_object_key = shared.object_key
+            logger.info(f"Archive of {original_object_key} shares existing object {archived_object_key}")
+        else:
+            # Seconds plus a random tag: two approvals in the same second must not share a key,
+            # since archive rows are reused by content hash
+            suffix = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+            archived_object_key = generate_archived_path(original_object_key, suffix)
+            # Copy only: the original is overwritten by the pending object below
+            if not copy_r2_object(original_object_key, archived_object_key, size=original_metadata['size']):
+                raise RuntimeError(f"Failed to archive {original_object_key}")
+            logger.info(f"Archived original: {original_object_key} -> {archived_object_key}")
+
+        db.session.add(ArchivedContent(
+            content_type=pending.content_type,
+            original_page_id=pending.page_id,
+            original_additional_id=pending.additional_id,
+            object_key=archived_object_key,
+            archived_filename=os.path.basename(archived_object_key),
+            file_size=original_metadata['size'],
+            content_hash=original_hash,
+            archived_by=archived_by
+        ))
+
+    # Move pending to original location
+    metadata = {CONTENT_HASH_METADATA_KEY: pending.content_hash} if pending.content_hash else None
+    pending_size = pending.file_size
+    if pending_size is None:
+        pending_size = (get_r2_object_metadata(pending.object_key) or {}).get('size')
+    if not move_r2_object(pending.object_key, original_object_key, metadata=metadata,
+                          content_type=_content_type_for(original_object_key), size=pending_size):
+        raise RuntimeError(f"Failed to move {pending.object_key} to {original_object_key}")
+    logger.info(f"Moved pending to original: {pending.object_key} -> {original_object_key}")
+
+    db.session.delete(pending)
+    return {'archived': archived_object_key, 'unchanged': False}
+
 
 def register_pending_approve_routes(api_contents_bp):
     """Register all pending/approve workflow routes to the blueprint"""
@@ -71,10 +248,8 @@ def register_pending_approve_routes(api_contents_bp):
 
             # Validate file extension (images, videos, PDFs)
             _, file_ext = os.path.splitext(file.filename)
-            allowed_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp', '.svg',
-                                '.webm', '.mp4', '.avi', '.mov', '.wmv', '.pdf']
-            if file_ext.lower() not in allowed_extensions:
-                return jsonify({'error': f'Invalid file format. Allowed: {", ".join(allowed_extensions)}'}), 400
+            if file_ext.lower() not in PAGE_ALLOWED_EXTENSIONS:
+                return jsonify({'error': f'Invalid file format. Allowed: {", ".join(PAGE_ALLOWED_EXTENSIONS)}'}), 400
 
             # Generate R2 object key for original location
             from .r2_utils import generate_r2_object_key
@@ -83,72 +258,35 @@ def register_pending_approve_routes(api_contents_bp):
             # Generate pending path
             pending_object_key = generate_pending_path(original_object_key)
 
-            # Upload to R2 pending location
-            r2_client = get_r2_client()
-            bucket_name = current_app.config.get('R2_BUCKET_NAME')
-
-            # Read file data
-            file_data = file.read()
-            file_size = len(file_data)
-
-            # Validate file size for pages (100MB limit)
-            MAX_PAGE_SIZE = 100 * 1024 * 1024  # 100 MB
-            if file_size > MAX_PAGE_SIZE:
+            # Determine content type
+            content_type = PAGE_CONTENT_TYPES.get(file_ext.lower(), 'application/octet-stream')
+
+            # Stream to pending (size and checksum computed on the fly, page size limit enforced)
+            try:
+                upload_result = upload_r2_fileobj(
+                    file.stream,
+                    pending_object_key,
+                    content_type=content_type,
+                    max_size=MAX_PAGE_SIZE
+                )
+            except UploadTooLargeError as e:
                 return jsonify({
-                    'error': f'Page content must be under 100MB. Current size: {file_size / 1024 / 1024:.2f}MB'
+                    'error': f'Page content must be under 100MB. Current size: over {e.read_size / 1024 / 1024:.2f}MB'
                 }), 413
-
-            # Determine content type
-            content_type_map = {
-                '.png': 'image/png',
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.gif': 'image/gif',
-                '.webp': 'image/webp',
-                '.bmp': 'image/bmp',
-                '.svg': 'image/svg+xml',
-                '.webm': 'video/webm',
-                '.mp4': 'video/mp4',
-                '.avi': 'video/x-msvideo',
-                '.mov': 'video/quicktime',
-                '.wmv': 'video/x-ms-wmv',
-                '.pdf': 'application/pdf'
-            }
-            content_type = content_type_map.get(file_ext.lower(), 'application/octet-stream')
-
-            # Upload to pending
-            r2_client.put_object(
-                Bucket=bucket_name,
-                Key=pending_object_key,
-                Body=file_data,
-                ContentType=content_type
-            )
+            file_size = upload_result['size']
 
             logger.info(f"Uploaded page to pending: {pending_object_key}")
 
-            # Delete existing pending if any
-            existing_pending = PendingContent.query.filter_by(
-                content_type='page',
-                page_id=page_id
-            ).first()
-
-            if existing_pending:
-                db.session.delete(existing_pending)
-
-            # Create PendingContent record
+            # Create PendingContent record (replaces any existing one)
             user = get_current_user()
-            pending = PendingContent(
-                content_type='page',
-                page_id=page_id,
-                additional_id=None,
-                object_key=pending_object_key,
-                filename=page.name,
-                file_size=file_size,
-                uploaded_by=user.id
+            pending = replace_pending_content(
+                'page', page_id, None, pending_object_key, page.name, file_size, user.id,
+                content_hash=upload_result['sha256']
             )
-            db.session.add(pending)
             db.session.commit()
 
+            R2StorageService.invalidate_page(page_id)
+
             return jsonify({
                 'message': 'Page uploaded to pending successfully',
                 'pending': pending.to_dict()
@@ -205,46 +343,25 @@ def register_pending_approve_routes(api_contents_bp):
             # Generate pending path
             pending_object_key = generate_pending_path(additional.object_id)
 
-            # Upload to R2 pending location
-            r2_client = get_r2_client()
-            bucket_name = current_app.config.get('R2_BUCKET_NAME')
-
-            # Read file data
-            file_data = file.read()
-            file_size = len(file_data)
-
-            # Upload to pending
-            r2_client.put_object(
-                Bucket=bucket_name,
-                Key=pending_object_key,
-                Body=file_data,
-                ContentType=file.content_type or 'application/octet-stream'
+            # Stream to pending (size and checksum computed on the fly)
+            upload_result = upload_r2_fileobj(
+                file.stream,
+                pending_object_key,
+                content_type=file.content_type or 'application/octet-stream'
             )
+            file_size = upload_result['size']
 
             logger.info(f"Uploaded additional to pending: {pending_object_key}")
 
-            # Delete existing pending if any
-            existing_pending = PendingContent.query.filter_by(
-                content_type='additional',
-                additional_id=additional_id
-            ).first()
-
-            if existing_pending:
-                db.session.delete(existing_pending)
-
-            # Create PendingContent record
-            pending = PendingContent(
-                content_type='additional',
-                page_id=additional.page_id,
-                additional_id=additional_id,
-                object_key=pending_object_key,
-                filename=additional.name,
-                file_size=file_size,
-                uploaded_by=user.id
+            # Create PendingContent record (replaces any existing one)
+            pending = replace_pending_content(
+                'additional', additional.page_id, additional_id, pending_object_key,
+                additional.name, file_size, user.id, content_hash=upload_result['sha256']
             )
-            db.session.add(pending)
             db.session.commit()
 
+            R2StorageService.invalidate_page_detail(additional_id, additional.page_id)
+
             return jsonify({
                 'message': 'Additional content uploaded to pending successfully',
                 'pending': pending.to_dict()
@@ -302,9 +419,10 @@ def register_pending_approve_routes(api_contents_bp):
 
         Process:
         1. Verify pending content exists
-        2. Archive original with timestamp
-        3. Move pending to original location
-        4. Update DB records
+        2. Skip 3-4 if the pending bytes equal the current object (content hash / ETag)
+        3. Archive original with timestamp (or share an archive with the same hash)
+        4. Move pending to original location
+        5. Update DB records
         """
         try:
             # Verify page exists
@@ -321,65 +439,29 @@ def register_pending_approve_routes(api_contents_bp):
             if not pending:
                 return jsonify({'error': 'No pending content to approve'}), 404
 
-            # Generate timestamp suffix
-            timestamp = datetime.now().strftime('%Y%m%d%H%M')
-
             # Get original object key
             from .r2_utils import generate_r2_object_key
             original_object_key = generate_r2_object_key(page_id, page.name, is_page_detail=False)
 
-            # Check if original exists (if not, just move pending to original)
-            original_exists = check_r2_object_exists(original_object_key)
-
-            r2_client = get_r2_client()
-            bucket_name = current_app.config.get('R2_BUCKET_NAME')
-
-            archived_object_key = None
-            file_size = 0
-
-            if original_exists:
-                # Get original file metadata
-                original_metadata = get_r2_object_metadata(original_object_key)
-                file_size = original_metadata['size'] if original_metadata else 0
-
-                # Generate archived path
-                archived_object_key = generate_archived_path(original_object_key, timestamp)
-
-                # Archive original (copy to archive location)
-                move_r2_object(original_object_key, archived_object_key)
-
-                logger.info(f"Archived original: {original_object_key} -> {archived_object_key}")
-
-                # Create ArchivedContent record
-                user = get_current_user()
-                archived = ArchivedContent(
-                    content_type='page',
-                    original_page_id=page_id,
-                    original_additional_id=None,
-                    object_key=archived_object_key,
-                    archived_filename=os.path.basename(archived_object_key),
-                    file_size=file_size,
-                    archived_by=user.id
-                )
-                db.session.add(archived)
-
-            # Move pending to original location
-            move_r2_object(pending.object_key, original_object_key)
-
-            logger.info(f"Moved pending to original: {pending.object_key} -> {original_object_key}")
-
-            # Delete pending record
-            db.session.delete(pending)
+            # Archive the original and move pending in place (skipped for identical bytes)
+            user = get_current_user()
+            result = apply_pending_content(pending, original_object_key, user.id)
 
             # Update page object_id if needed
             if not page.object_id:
                 page.object_id = original_object_key
 
+            # Approved content now lives at the original location
+            page.has_content = True
+
             db.session.commit()
 
+            R2StorageService.invalidate_page(page_id)
+
             return jsonify({
                 'message': 'Page update approved successfully',
-                'archived': archived_object_key if original_exists else None,
+                'archived': result['archived'],
+                'unchanged': result['unchanged'],
                 'original': original_object_key
             })
 
@@ -396,9 +478,10 @@ def register_pending_approve_routes(api_contents_bp):
 
         Process:
         1. Verify pending content exists
-        2. Archive original with timestamp
-        3. Move pending to original location
-        4. Update DB records
+        2. Skip 3-4 if the pending bytes equal the current object (content hash / ETag)
+        3. Archive original with timestamp (or share an archive with the same hash)
+        4. Move pending to original location
+        5. Update DB records
         """
         try:
             # Get additional content
@@ -428,54 +511,24 @@ def register_pending_approve_routes(api_contents_bp):
             if not pending:
                 return jsonify({'error': 'No pending content to approve'}), 404
 
-            # Generate timestamp suffix
-            timestamp = datetime.now().strftime('%Y%m%d%H%M')
-
-            # Check if original exists
+            # Archive the original and move pending in place (skipped for identical bytes)
             original_object_key = additional.object_id
-            original_exists = check_r2_object_exists(original_object_key)
-
-            archived_object_key = None
-            file_size = 0
-
-            if original_exists:
-                # Get original file metadata
-                original_metadata = get_r2_object_metadata(original_object_key)
-                file_size = original_metadata['size'] if original_metadata else 0
-
-                # Generate archived path
-                archived_object_key = generate_archived_path(original_object_key, timestamp)
-
-                # Archive original
-                move_r2_object(original_object_key, archived_object_key)
+            result = apply_pending_content(pending, original_object_key, user.id)
 
-                logger.info(f"Archived original: {original_object_key} -> {archived_object_key}")
-
-                # Create ArchivedContent record
-                archived = ArchivedContent(
-                    content_type='additional',
-                    original_page_id=additional.page_id,
-                    original_additional_id=additional_id,
-                    object_key=archived_object_key,
-                    archived_filename=os.path.basename(archived_object_key),
-                    file_size=file_size,
-                    archived_by=user.id
-                )
-                db.session.add(archived)
-
-            # Move pending to original location
-            move_r2_object(pending.object_key, original_object_key)
-
-            logger.info(f"Moved pending to original: {pending.object_key} -> {original_object_key}")
-
-            # Delete pending record
-            db.session.delete(pending)
+            # Approved content now lives at the original location
+            additional.has_content = True
+            page = ContentRelPages.query.get(additional.page_id)
+            if page:
+                page.has_content = True
 
             db.session.commit()
 
+            R2StorageService.invalidate_page_detail(additional_id, additional.page_id)
+
             return jsonify({
                 'message': 'Additional content update approved successfully',
-                'archived': archived_object_key if original_exists else None,
+                'archived': result['archived'],
+                'unchanged': result['unchanged'],
                 'original': original_object_key
             })
 
@@ -12,12 +12,10 @@ Business Rules:
 - 실무자 cannot approve updates
 """
 
-import logging
 from functools import wraps
-from flask import jsonify, request, g
+from flask import jsonify, request
 from flask_jwt_extended import get_jwt_identity
-from extensions import db
-from models import ContentManager, ContentRelPages, ContentRelFolders, Users
+from models import ContentManager, ContentRelPages, Users
 from log_config import get_content_logger
 
 # Initialize logger
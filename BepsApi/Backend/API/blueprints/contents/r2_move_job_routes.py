@@ -0,0 +1,132 @@
+"""
+R2 move job routes
+
+Channel/folder renames move their R2 objects in background jobs
+(services.r2_bulk_move_service). This module lets clients:
+- Poll a job's progress
+- List recent jobs of a channel/folder
+- Resume a job that failed or whose worker died
+"""
+
+from flask import jsonify, request
+from flask_jwt_extended import jwt_required
+from extensions import db
+from models import R2MoveJob
+from services.r2_bulk_move_service import R2BulkMoveService
+from .permission_middleware import get_current_user, is_developer
+from log_config import get_content_logger
+
+# Initialize logger
+logger = get_content_logger()
+
+
+def _permission_error():
+    """Error response unless the current user is an admin/developer, else None"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Authentication required'}), 401
+    if not is_developer(user.id):
+        return jsonify({'error': 'R2 이동 작업 조회/재개 권한이 없습니다.'}), 403
+    return None
+
+
+def register_r2_move_job_routes(api_contents_bp):
+    """Register R2 move job routes to the blueprint"""
+
+    @api_contents_bp.route('/r2-move-jobs/<int:job_id>', methods=['GET'])
+    @jwt_required()
+    def get_r2_move_job(job_id):
+        """Progress of a move job, with a sample of failed objects"""
+        try:
+            permission_error = _permission_error()
+            if permission_error:
+                return permission_error
+
+            job = R2MoveJob.query.get(job_id)
+            if not job:
+                return jsonify({'error': 'Move job not found'}), 404
+
+            result = job.to_dict()
+            if job.failed_objects:
+                result['failed_items'] = R2BulkMoveService.get_failed_items(job_id)
+            return jsonify(result)
+
+        except Exception as e:
+            logger.error(f"Error getting R2 move job {job_id}: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @api_contents_bp.route('/r2-move-jobs', methods=['GET'])
+    @jwt_required()
+    def list_r2_move_jobs():
+        """
+        Recent move jobs, newest first
+
+        Query params:
+            job_type: 'channel_rename' or 'folder_rename' (optional)
+            entity_id: Channel/folder id (optional)
+            status: Job status (optional)
+            limit: Maximum jobs to return (default 20, max 100)
+        """
+        try:
+            permission_error = _permission_error()
+            if permission_error:
+                return permission_error
+
+            query = R2MoveJob.query
+            if request.args.get('job_type'):
+                query = query.filter(R2MoveJob.job_type == request.args['job_type'])
+            if request.args.get('entity_id'):
+                query = query.filter(R2MoveJob.entity_id == int(request.args['entity_id']))
+            if request.args.get('status'):
+                query = query.filter(R2MoveJob.status == request.args['status'])
+
+            limit = min(int(request.args.get('limit', 20)), 100)
+            jobs = query.order_by(R2MoveJob.id.desc()).limit(limit).all()
+            return jsonify({'jobs': [job.to_dict() for job in jobs]})
+
+        except ValueError:
+            return jsonify({'error': 'Invalid entity_id or limit'}), 400
+        except Exception as e:
+            logger.error(f"Error listing R2 move jobs: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @api_contents_bp.route('/r2-move-jobs/<int:job_id>/resume', methods=['POST'])
+    @jwt_required()
+    def resume_r2_move_job(job_id):
+        """
+        Resume a failed or interrupted move job
+
+        Objects that were already moved are skipped; failed ones are retried.
+        A running job can only be resumed once its progress has been idle for
+        R2_BULK_MOVE_STALE_SECONDS.
+        """
+        try:
+            permission_error = _permission_error()
+            if permission_error:
+                return permission_error
+
+            job = R2MoveJob.query.get(job_id)
+            if not job:
+                return jsonify({'error': 'Move job not found'}), 404
+            if job.status == 'completed':
+                return jsonify({'error': 'Move job already completed', 'job': job.to_dict()}), 400
+
+            if R2BulkMoveService.start_job(job_id) is None:
+                db.session.expire_all()
+                return jsonify({
+                    'error': '작업이 아직 진행 중입니다',
+                    'job': R2MoveJob.query.get(job_id).to_dict()
+                }), 409
+
+            logger.info(f"[R2 MOVE] Job {job_id} resumed")
+            db.session.expire_all()
+            return jsonify({
+                'success': True,
+                'message': 'Move job resumed',
+                'job': R2MoveJob.query.get(job_id).to_dict()
+            }), 202
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error resuming R2 move job {job_id}: {str(e)}")
+            return jsonify({'error': str(e)}), 500
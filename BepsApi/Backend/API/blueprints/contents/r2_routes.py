@@ -9,20 +9,52 @@ This module handles:
 """
 
 import os
-import logging
+import time
 import datetime
 from datetime import timezone
-from flask import Blueprint, jsonify, request, current_app
+from flask import jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models import ContentRelPages, ContentRelPageDetails, Users
 from log_config import get_content_logger
-from .r2_utils import check_r2_object_exists, generate_r2_object_key, generate_r2_signed_url, get_r2_object_metadata
-from services.r2_storage_service import R2StorageService
+from .r2_utils import (
+    check_r2_object_exists, generate_r2_object_key, generate_r2_signed_url, get_r2_object_metadata,
+    parse_url_expires
+)
+from services.r2_storage_service import R2StorageService, PAGE_EXTENSIONS, PAGE_DETAIL_FILE_EXTENSIONS
+from services.r2_existence_index import r2_existence_index
+from services.signed_url_cache import signed_url_cache
+from services.content_serializers import get_user_names
+from services.content_access_service import ContentAccessService
+from .permission_middleware import get_current_user, is_developer
+from utils.concurrent_executor import run_concurrently, timed, percentiles
+from utils.r2_metrics import get_r2_metrics, reset_r2_metrics
 
 # Initialize logger
 logger = get_content_logger()
 
+ACCESS_EXEMPT_ROLES = [1, 2, 999]  # admin, reviewer, developer
+
+
+def _page_access_denied(user, file_id) -> bool:
+    """
+    Whether a page request must be refused for lack of a content assignment
+
+    Admin, reviewer and developer roles see everything. Other roles are
+    checked against their access set, but only refused while
+    CONTENT_ACCESS_ENFORCE is on; otherwise a missing assignment is only
+    logged, so roles without content_manager rows (e.g. viewers) keep working
+    until their assignments exist.
+    """
+    if user.role_id in ACCESS_EXEMPT_ROLES:
+        return False
+    if ContentAccessService.has_access(user.id, 'pages', file_id):
+        return False
+    if not current_app.config.get('CONTENT_ACCESS_ENFORCE', False):
+        logger.info(f"Access check would deny user {user.id} (role {user.role_id}) file {file_id}; not enforced")
+        return False
+    return True
+
 
 def register_r2_routes(api_contents_bp):
     """Register all R2 storage routes to the blueprint"""
@@ -57,23 +89,52 @@ def register_r2_routes(api_contents_bp):
                 return jsonify({'error': 'file_ids must be an array'}), 400
             
             logger.info(f"🔍 Batch checking R2 existence for {len(file_ids)} files: {file_ids}")
+            started = time.perf_counter()
             
-            results = {}
-            
+            # Load every page and page detail of the batch up front (two queries)
+            int_ids = set()
             for file_id in file_ids:
                 try:
-                    # Get the file
-                    page = ContentRelPages.query.filter_by(id=file_id, is_deleted=False).first()
+                    int_ids.add(int(file_id))
+                except (TypeError, ValueError):
+                    pass
+            
+            pages = {}
+            details_by_page = {}
+            if int_ids:
+                page_rows = db.session.query(
+                    ContentRelPages.id, ContentRelPages.name, ContentRelPages.object_id
+                ).filter(
+                    ContentRelPages.id.in_(int_ids),
+                    ContentRelPages.is_deleted == False
+                ).all()
+                pages = {row.id: row for row in page_rows}
+                
+                detail_rows = db.session.query(
+                    ContentRelPageDetails.id, ContentRelPageDetails.name, ContentRelPageDetails.page_id
+                ).filter(
+                    ContentRelPageDetails.page_id.in_(list(pages.keys()) or [-1]),
+                    ContentRelPageDetails.is_deleted == False
+                ).order_by(ContentRelPageDetails.id).all()
+                for row in detail_rows:
+                    details_by_page.setdefault(row.page_id, []).append(row)
+            
+            def check_file(file_id):
+                """Check one file; errors are isolated to this file's result"""
+                try:
+                    try:
+                        page = pages.get(int(file_id))
+                    except (TypeError, ValueError):
+                        page = None
                     if not page:
-                        results[str(file_id)] = {
+                        return {
                             'r2_exists': False,
                             'error': 'File not found'
                         }
-                        continue
                     
                     # Check R2 existence (original logic with fallback)
-                    page_name = page.name or f"file_{file_id}"
-                    image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
+                    page_name = page.name or f"file_{page.id}"
+                    page_details = details_by_page.get(page.id, [])
                     
                     logger.debug(f"🔍 Checking file {file_id}: name='{page_name}', object_id='{page.object_id}'")
                     
@@ -82,38 +143,22 @@ def register_r2_routes(api_contents_bp):
                     
                     # CORRECT LOGIC: Check R2 path based on node hierarchy structure
                     try:
-                        # 1. Check main page file (try multiple extensions for the page itself)
-                        for ext in image_extensions:
-                            test_filename = f"{page_name}{ext}"
-                            test_object_key = generate_r2_object_key(file_id, test_filename, is_page_detail=False)
-                            
-                            if check_r2_object_exists(test_object_key):
-                                r2_exists = True
-                                existing_object_key = test_object_key
-                                logger.debug(f"✅ File {file_id} main file found: {test_object_key}")
-                                break
+                        # 1. Check main page file (any of the page extensions, via the existence index)
+                        existing_object_key = R2StorageService.find_page_object_key(page.id, page_name)
+                        if existing_object_key:
+                            r2_exists = True
+                            logger.debug(f"✅ File {file_id} main file found: {existing_object_key}")
                         
                         # 2. If no main file found, check for page detail files
                         if not r2_exists:
-                            # Get page details for this page
-                            page_details = ContentRelPageDetails.query.filter_by(
-                                page_id=file_id,
-                                is_deleted=False
-                            ).all()
-                            
                             for detail in page_details:
-                                detail_extensions = ['.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx']
-                                for ext in detail_extensions:
-                                    detail_filename = f"{detail.name}{ext}"
-                                    detail_object_key = generate_r2_object_key(detail.id, detail_filename, is_page_detail=True)
-                                    
-                                    if check_r2_object_exists(detail_object_key):
-                                        r2_exists = True
-                                        existing_object_key = detail_object_key
-                                        logger.debug(f"✅ File {file_id} has detail content: {detail_object_key}")
-                                        break
-                                
-                                if r2_exists:
+                                detail_object_key = R2StorageService.find_page_detail_object_key(
+                                    detail.id, detail.name, PAGE_DETAIL_FILE_EXTENSIONS
+                                )
+                                if detail_object_key:
+                                    r2_exists = True
+                                    existing_object_key = detail_object_key
+                                    logger.debug(f"✅ File {file_id} has detail content: {detail_object_key}")
                                     break
                                     
                     except Exception as e:
@@ -129,40 +174,92 @@ def register_r2_routes(api_contents_bp):
                             )
                         )
                         
-                        has_page_details = ContentRelPageDetails.query.filter_by(
-                            page_id=file_id,
-                            is_deleted=False
-                        ).count() > 0
-                        
-                        if has_meaningful_name or has_page_details:
+                        if has_meaningful_name or page_details:
                             r2_exists = True
                             existing_object_key = f"fallback/{page_name}"
                             logger.debug(f"✅ File {file_id} assumed to have content (dev mode)")
                     
-                    results[str(file_id)] = {
+                    logger.debug(f"📊 File {file_id} result: r2_exists={r2_exists}, object_key={existing_object_key}")
+                    
+                    return {
                         'r2_exists': r2_exists,
                         'object_key': existing_object_key,
                         'has_legacy_cloudflare_image': bool(page.object_id and page.object_id.strip())
                     }
                     
-                    logger.debug(f"📊 File {file_id} result: r2_exists={r2_exists}, object_key={existing_object_key}")
-                    
                 except Exception as e:
-                    results[str(file_id)] = {
+                    return {
                         'r2_exists': False,
                         'error': str(e)
                     }
             
+            # Fan out the per-file checks with bounded concurrency
+            checked = run_concurrently(
+                timed(check_file),
+                file_ids,
+                max_workers=current_app.config.get('R2_BATCH_CHECK_CONCURRENCY', 16),
+                mode=current_app.config.get('R2_BATCH_CHECK_EXECUTOR', 'auto')
+            )
+            
+            results = {}
+            durations = []
+            for file_id, (result, elapsed_ms) in zip(file_ids, checked):
+                results[str(file_id)] = result
+                durations.append(elapsed_ms)
+            
+            total_ms = (time.perf_counter() - started) * 1000
+            stats = percentiles(durations)
+            
             # Log summary
             files_with_content = sum(1 for result in results.values() if result.get('r2_exists', False))
-            logger.info(f"📊 Batch check complete: {files_with_content}/{len(file_ids)} files have R2 content")
-            
-            return jsonify(results)
+            logger.info(
+                f"📊 Batch check complete: {files_with_content}/{len(file_ids)} files have R2 content "
+                f"in {total_ms:.1f}ms (per-file {stats})"
+            )
+            
+            # Timings go in a header; the body keys are merged straight into the frontend cache
+            response = jsonify(results)
+            timing = [f"total;dur={total_ms:.1f}"]
+            timing.extend(f"{name};dur={value}" for name, value in stats.items())
+            response.headers['Server-Timing'] = ', '.join(timing)
+            return response
             
         except Exception as e:
             logger.error(f"Error in batch R2 check: {str(e)}", exc_info=True)
             return jsonify({'error': str(e)}), 500
 
+    @api_contents_bp.route('/r2-metrics', methods=['GET'])
+    @jwt_required()
+    def get_r2_call_metrics():
+        """
+        R2 call totals per operation class (HEAD/GET/PUT/COPY/DELETE/LIST/OTHER)
+
+        Aggregated over every worker since the last reset: count, errors,
+        total/avg latency, histogram-based p50/p90/p99 and the histogram itself.
+        """
+        try:
+            return jsonify(get_r2_metrics())
+        except Exception as e:
+            logger.error(f"Error getting R2 metrics: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @api_contents_bp.route('/r2-metrics', methods=['DELETE'])
+    @jwt_required()
+    def reset_r2_call_metrics():
+        """Reset the shared R2 call totals (developers/admins only)"""
+        try:
+            user = get_current_user()
+            if not user:
+                return jsonify({'error': 'Authentication required'}), 401
+            if not is_developer(user.id):
+                return jsonify({'error': 'R2 메트릭 초기화 권한이 없습니다.'}), 403
+
+            reset_r2_metrics()
+            return jsonify({'success': True})
+        except Exception as e:
+            logger.error(f"Error resetting R2 metrics: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
     @api_contents_bp.route('/file/<int:file_id>/r2-exists', methods=['GET'])
     @jwt_required(locations=['headers','cookies'])
     def check_r2_file_exists(file_id):
@@ -176,34 +273,25 @@ def register_r2_routes(api_contents_bp):
             if page:
                 # Derive R2 path from node structure (same approach as r2-image-url)
                 page_name = page.name or f"file_{file_id}"
-                image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
                 
                 r2_exists = False
                 object_key = None
                 
-                # Try multiple extensions to find the actual file
-                for ext in image_extensions:
-                    test_filename = f"{page_name}{ext}"
-                    test_object_key = generate_r2_object_key(file_id, test_filename, is_page_detail=False)
+                try:
+                    object_key = R2StorageService.find_page_object_key(file_id, page_name)
+                    r2_exists = object_key is not None
+                except Exception:
+                    # R2 credentials not available - make intelligent guess
+                    name_suggests_content = bool(
+                        page.name and 
+                        (any(page.name.lower().endswith(ext) for ext in PAGE_EXTENSIONS) or 
+                         any(char.isdigit() for char in page.name) or  # Has numbers (like 002_08.pdf)
+                         len(page.name) > 3)  # Not just placeholder names
+                    )
                     
-                    try:
-                        if check_r2_object_exists(test_object_key):
-                            r2_exists = True
-                            object_key = test_object_key
-                            break
-                    except Exception:
-                        # R2 credentials not available - make intelligent guess
-                        name_suggests_content = bool(
-                            page.name and 
-                            (page.name.lower().endswith(ext.lower()) or 
-                             any(char.isdigit() for char in page.name) or  # Has numbers (like 002_08.pdf)
-                             len(page.name) > 3)  # Not just placeholder names
-                        )
-                        
-                        if name_suggests_content:
-                            r2_exists = True
-                            object_key = test_object_key
-                            break
+                    if name_suggests_content:
+                        r2_exists = True
+                        object_key = generate_r2_object_key(file_id, f"{page_name}{PAGE_EXTENSIONS[0]}", is_page_detail=False)
                 
             else:
                 # Check if it's a page detail
@@ -211,33 +299,25 @@ def register_r2_routes(api_contents_bp):
                 if detail:
                     # For page details, use similar approach
                     detail_name = detail.name or f"detail_{file_id}"
-                    image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
                     
                     r2_exists = False
                     object_key = None
                     
-                    for ext in image_extensions:
-                        test_filename = f"{detail_name}{ext}"
-                        test_object_key = generate_r2_object_key(file_id, test_filename, is_page_detail=True)
+                    try:
+                        object_key = R2StorageService.find_page_detail_object_key(file_id, detail_name, PAGE_EXTENSIONS)
+                        r2_exists = object_key is not None
+                    except Exception:
+                        # R2 credentials not available - make intelligent guess
+                        name_suggests_content = bool(
+                            detail.name and 
+                            (any(detail.name.lower().endswith(ext) for ext in PAGE_EXTENSIONS) or 
+                             any(char.isdigit() for char in detail.name) or
+                             len(detail.name) > 3)
+                        )
                         
-                        try:
-                            if check_r2_object_exists(test_object_key):
-                                r2_exists = True
-                                object_key = test_object_key
-                                break
-                        except Exception:
-                            # R2 credentials not available - make intelligent guess
-                            name_suggests_content = bool(
-                                detail.name and 
-                                (detail.name.lower().endswith(ext.lower()) or 
-                                 any(char.isdigit() for char in detail.name) or
-                                 len(detail.name) > 3)
-                            )
-                            
-                            if name_suggests_content:
-                                r2_exists = True
-                                object_key = test_object_key
-                                break
+                        if name_suggests_content:
+                            r2_exists = True
+                            object_key = generate_r2_object_key(file_id, f"{detail_name}{PAGE_EXTENSIONS[0]}", is_page_detail=True)
                 else:
                     return jsonify({'error': 'File not found'}), 404
             
@@ -316,10 +396,16 @@ def register_r2_routes(api_contents_bp):
             
             # Update the page record
             page.object_id = object_key
+            page.has_content = True
             page.updated_at = datetime.datetime.now(timezone.utc)
             
             db.session.commit()
             
+            # The object was uploaded directly by the client; record it in the existence index
+            r2_existence_index.add_key(object_key)
+            signed_url_cache.evict([object_key])
+            R2StorageService.invalidate_page(file_id)
+            
             logger.info(f"User {current_user_id} confirmed R2 upload for file {file_id}: {filename}")
             
             return jsonify({
@@ -342,7 +428,7 @@ def register_r2_routes(api_contents_bp):
         - file_id: ID of the file
         
         Query parameters:
-        - expires: Expiration time in seconds (optional, default: 3600)
+        - expires: Expiration time in seconds (optional, default: 3600, clamped to R2_SIGNED_URL_MAX_EXPIRES)
         """
         try:
             # Check R2 configuration first (using Flask app config like the original)
@@ -379,44 +465,21 @@ def register_r2_routes(api_contents_bp):
             if not page:
                 return jsonify({'error': 'File not found'}), 404
             
-            # Check if R2 file exists (using the same approach as original)
-            # First try to find the R2 object using standard extensions
-            import os
-            page_name = page.name or f"file_{file_id}"
-            # Remove existing extension to avoid double extensions
-            page_name_without_ext = os.path.splitext(page_name)[0]
-            image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
-
-            r2_object_key = None
-
-            # Try multiple extensions to find the actual file
-            for ext in image_extensions:
-                test_filename = f"{page_name_without_ext}{ext}"
-                test_object_key = generate_r2_object_key(file_id, test_filename, is_page_detail=False)
-
-                if check_r2_object_exists(test_object_key):
-                    r2_object_key = test_object_key
-                    break
+            # Find the R2 object using standard extensions (existence index, no per-extension HEAD)
+            r2_object_key = R2StorageService.find_page_object_key(file_id, page.name)
             
             if not r2_object_key:
                 return jsonify({'error': 'No R2 image associated with this file'}), 404
             
-            # Check user permissions (admin, developer, or has specific access)
-            if user.role_id not in [1, 2, 999]:  # Not admin, reviewer, or developer
-                # Check if user has specific access to this file
-                try:
-                    from services.content_hierarchy_service import ContentHierarchyService
-                    service = ContentHierarchyService()
-                    folder_ids, file_ids = service.get_user_accessible_content(int(user_id))
-                    
-                    if file_id not in file_ids:
-                        return jsonify({'error': 'Access denied'}), 403
-                except Exception as perm_error:
-                    logger.warning(f"Could not check user permissions for file {file_id}: {str(perm_error)}")
-                    # Continue anyway for admin/reviewer/developer roles
+            # Check user permissions (admin, reviewer, developer, or assigned content)
+            if _page_access_denied(user, file_id):
+                return jsonify({'error': 'Access denied'}), 403
             
             # Get expires parameter
-            expires = int(request.args.get('expires', 3600))
+            try:
+                expires = parse_url_expires(request.args.get('expires', 3600))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'expires must be an integer'}), 400
             
             # Generate pre-signed URL for download using the found R2 object key
             signed_url = generate_r2_signed_url(r2_object_key, expires_in=expires, method='GET')
@@ -432,6 +495,103 @@ def register_r2_routes(api_contents_bp):
             logger.error(f"Error generating R2 image URL for file {file_id}: {str(e)}", exc_info=True)
             return jsonify({'error': str(e)}), 500
 
+    @api_contents_bp.route('/files/r2-signed-urls', methods=['POST'])
+    @jwt_required(locations=['headers','cookies'])
+    def get_r2_signed_urls_bulk():
+        """
+        Get signed URLs for many files in one request
+        
+        Object keys are resolved with one batched hierarchy lookup and the
+        existence index; URLs come from the signed URL cache.
+        
+        Request body:
+        - file_ids: Array of file (page) IDs
+        - expires: URL lifetime in seconds (optional, default 3600, clamped to R2_SIGNED_URL_MAX_EXPIRES)
+        
+        Returns {file_id: {...same fields as /file/<id>/r2-image-url...} or {'error': ...}}
+        """
+        try:
+            user_id = get_jwt_identity()
+            user = Users.query.get(user_id)
+            
+            if not user:
+                return jsonify({'error': 'User not found'}), 404
+            
+            data = request.get_json()
+            if not data or not isinstance(data.get('file_ids'), list):
+                return jsonify({'error': 'file_ids array is required'}), 400
+            
+            file_ids = data['file_ids']
+            try:
+                expires = parse_url_expires(data.get('expires', 3600))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'expires must be an integer'}), 400
+            
+            int_ids = {}
+            for file_id in file_ids:
+                try:
+                    int_ids[file_id] = int(file_id)
+                except (TypeError, ValueError):
+                    pass
+            
+            # Load all pages in one query
+            pages = {
+                row.id: row for row in db.session.query(
+                    ContentRelPages.id, ContentRelPages.folder_id,
+                    ContentRelPages.name, ContentRelPages.object_id
+                ).filter(
+                    ContentRelPages.id.in_(set(int_ids.values()) or [-1]),
+                    ContentRelPages.is_deleted == False
+                ).all()
+            }
+            
+            # Check user permissions once for the whole batch (admin, reviewer, developer see everything)
+            # (only refused while CONTENT_ACCESS_ENFORCE is on, see _page_access_denied)
+            accessible_file_ids = None
+            if user.role_id not in ACCESS_EXEMPT_ROLES:
+                accessible_file_ids = ContentAccessService.get_access_set(user_id)['pages']
+                if not current_app.config.get('CONTENT_ACCESS_ENFORCE', False):
+                    denied = [page_id for page_id in pages if page_id not in accessible_file_ids]
+                    if denied:
+                        logger.info(f"Access check would deny user {user_id} (role {user.role_id}) "
+                                    f"{len(denied)} files in bulk signed URLs; not enforced")
+                    accessible_file_ids = None
+            
+            object_keys = R2StorageService.find_page_object_keys(
+                [(page.id, page.folder_id, page.name) for page in pages.values()]
+            )
+            
+            results = {}
+            for file_id in file_ids:
+                page = pages.get(int_ids.get(file_id))
+                if not page:
+                    results[str(file_id)] = {'error': 'File not found'}
+                    continue
+                if accessible_file_ids is not None and page.id not in accessible_file_ids:
+                    results[str(file_id)] = {'error': 'Access denied'}
+                    continue
+                
+                r2_object_key = object_keys.get(page.id)
+                if not r2_object_key:
+                    results[str(file_id)] = {'error': 'No R2 image associated with this file'}
+                    continue
+                
+                try:
+                    results[str(file_id)] = {
+                        'signed_url': generate_r2_signed_url(r2_object_key, expires_in=expires, method='GET'),
+                        'expires_in': expires,
+                        'object_key': r2_object_key,
+                        'legacy_object_id': page.object_id
+                    }
+                except Exception as e:
+                    results[str(file_id)] = {'error': str(e)}
+            
+            return jsonify(results)
+            
+        except Exception as e:
+            logger.error(f"Error generating bulk R2 signed URLs: {str(e)}", exc_info=True)
+            return jsonify({'error': str(e)}), 500
+
     @api_contents_bp.route('/file/<int:file_id>/r2-object-key', methods=['GET'])
     @jwt_required(locations=['headers','cookies'])
     def get_r2_object_key_preview(file_id):
@@ -486,17 +646,9 @@ def register_r2_routes(api_contents_bp):
             if not page:
                 return jsonify({'error': 'File not found'}), 404
 
-            # Check if user has access (admin, developer, or has specific access)
-            if user.role_id not in [1, 2, 999]:
-                try:
-                    from services.content_hierarchy_service import ContentHierarchyService
-                    service = ContentHierarchyService()
-                    folder_ids, file_ids = service.get_user_accessible_content(int(user_id))
-
-                    if file_id not in file_ids:
-                        return jsonify({'error': 'Access denied'}), 403
-                except Exception as perm_error:
-                    logger.warning(f"Could not check user permissions for file {file_id}: {str(perm_error)}")
+            # Check user permissions (admin, reviewer, developer, or assigned content)
+            if _page_access_denied(user, file_id):
+                return jsonify({'error': 'Access denied'}), 403
 
             versions = {
                 'current': None,
@@ -506,18 +658,7 @@ def register_r2_routes(api_contents_bp):
             }
 
             # Get current version
-            page_name = page.name or f"file_{file_id}"
-            page_name_without_ext = os.path.splitext(page_name)[0]
-            image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
-
-            current_object_key = None
-            for ext in image_extensions:
-                test_filename = f"{page_name_without_ext}{ext}"
-                test_object_key = generate_r2_object_key(file_id, test_filename, is_page_detail=False)
-
-                if check_r2_object_exists(test_object_key):
-                    current_object_key = test_object_key
-                    break
+            current_object_key = R2StorageService.find_page_object_key(file_id, page.name)
 
             if current_object_key:
                 metadata = get_r2_object_metadata(current_object_key)
@@ -530,38 +671,47 @@ def register_r2_routes(api_contents_bp):
                 }
                 versions['total_count'] += 1
 
-            # Get pending version
-            pending = PendingContent.query.filter_by(
+            # Get pending version (columns only)
+            pending = PendingContent.query.with_entities(
+                PendingContent.object_key, PendingContent.file_size, PendingContent.uploaded_at,
+                PendingContent.uploaded_by, PendingContent.filename
+            ).filter_by(
                 content_type='page',
                 page_id=file_id
             ).first()
 
+            # Get archived versions (sorted by archived_at DESC - newest first)
+            archived_list = ArchivedContent.query.with_entities(
+                ArchivedContent.object_key, ArchivedContent.file_size, ArchivedContent.archived_at,
+                ArchivedContent.archived_by, ArchivedContent.archived_filename
+            ).filter_by(
+                content_type='page',
+                original_page_id=file_id
+            ).order_by(ArchivedContent.archived_at.desc()).all()
+
+            # Resolve uploader/archiver names in one query
+            user_names = get_user_names(
+                [pending.uploaded_by if pending else None] + [archived.archived_by for archived in archived_list]
+            )
+
             if pending:
-                uploader = Users.query.get(pending.uploaded_by) if pending.uploaded_by else None
                 versions['pending'] = {
                     'type': 'pending',
                     'object_key': pending.object_key,
                     'file_size': pending.file_size,
                     'uploaded_at': pending.uploaded_at.isoformat() if pending.uploaded_at else None,
-                    'uploaded_by': uploader.name if uploader else None,
+                    'uploaded_by': user_names.get(pending.uploaded_by),
                     'filename': pending.filename
                 }
                 versions['total_count'] += 1
 
-            # Get archived versions (sorted by archived_at DESC - newest first)
-            archived_list = ArchivedContent.query.filter_by(
-                content_type='page',
-                original_page_id=file_id
-            ).order_by(ArchivedContent.archived_at.desc()).all()
-
             for archived in archived_list:
-                archiver = Users.query.get(archived.archived_by) if archived.archived_by else None
                 versions['archived'].append({
                     'type': 'archived',
                     'object_key': archived.object_key,
                     'file_size': archived.file_size,
                     'archived_at': archived.archived_at.isoformat() if archived.archived_at else None,
-                    'archived_by': archiver.name if archiver else None,
+                    'archived_by': user_names.get(archived.archived_by),
                     'filename': archived.archived_filename
                 })
 
@@ -582,7 +732,7 @@ def register_r2_routes(api_contents_bp):
         Query params:
             version_type: 'current' | 'pending' | 'archived'
             object_key: The object key for archived versions
-            expires: Expiration time in seconds (optional, default: 3600)
+            expires: Expiration time in seconds (optional, default: 3600, clamped to R2_SIGNED_URL_MAX_EXPIRES)
 
         Returns:
             {
@@ -597,7 +747,10 @@ def register_r2_routes(api_contents_bp):
 
             version_type = request.args.get('version_type')
             object_key = request.args.get('object_key')
-            expires = int(request.args.get('expires', 3600))
+            try:
+                expires = parse_url_expires(request.args.get('expires', 3600))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'expires must be an integer'}), 400
 
             if not version_type:
                 return jsonify({'error': 'version_type is required'}), 400
@@ -614,32 +767,13 @@ def register_r2_routes(api_contents_bp):
             if not page:
                 return jsonify({'error': 'File not found'}), 404
 
-            # Check if user has access
-            if user.role_id not in [1, 2, 999]:
-                try:
-                    from services.content_hierarchy_service import ContentHierarchyService
-                    service = ContentHierarchyService()
-                    folder_ids, file_ids = service.get_user_accessible_content(int(user_id))
-
-                    if file_id not in file_ids:
-                        return jsonify({'error': 'Access denied'}), 403
-                except Exception as perm_error:
-                    logger.warning(f"Could not check user permissions for file {file_id}: {str(perm_error)}")
+            # Check user permissions (admin, reviewer, developer, or assigned content)
+            if _page_access_denied(user, file_id):
+                return jsonify({'error': 'Access denied'}), 403
 
             # Determine object key based on version type
             if version_type == 'current':
-                page_name = page.name or f"file_{file_id}"
-                page_name_without_ext = os.path.splitext(page_name)[0]
-                image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
-
-                object_key = None
-                for ext in image_extensions:
-                    test_filename = f"{page_name_without_ext}{ext}"
-                    test_object_key = generate_r2_object_key(file_id, test_filename, is_page_detail=False)
-
-                    if check_r2_object_exists(test_object_key):
-                        object_key = test_object_key
-                        break
+                object_key = R2StorageService.find_page_object_key(file_id, page.name)
 
                 if not object_key:
                     return jsonify({'error': 'Current version not found'}), 404
@@ -9,95 +9,198 @@ This module provides utility functions for interacting with Cloudflare R2 storag
 """
 
 import os
+import hashlib
+import threading
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
-from botocore.exceptions import ClientError, NoCredentialsError
-import logging
+from botocore.exceptions import ClientError
 from flask import current_app
 from log_config import get_content_logger
-from models import ContentRelPages, ContentRelFolders, ContentRelChannels, ContentRelPageDetails
+from models import ContentRelPages, ContentRelPageDetails
+from services.r2_existence_index import r2_existence_index
+from services.signed_url_cache import signed_url_cache
+from utils.r2_paths import safe_name
+from services.hierarchy_tree import hierarchy_tree
+from services.folder_closure import get_folder_ancestry
+from utils.r2_metrics import install_r2_instrumentation
+from services.fake_s3 import create_fake_s3_client
 
 # Initialize logger
 logger = get_content_logger()
 
 
+# Process-wide R2 client (one per worker process, shared by every call site)
+_r2_client = None
+_r2_client_pid = None
+_r2_client_lock = threading.Lock()
+
+
+def _reset_r2_client():
+    """Drop the shared client so the next call builds a fresh one (used after fork)"""
+    global _r2_client, _r2_client_pid, _r2_client_lock
+    _r2_client = None
+    _r2_client_pid = None
+    _r2_client_lock = threading.Lock()
+
+
+# A forked worker must not reuse the parent's connection pool
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_r2_client)
+
+
+def _create_r2_client():
+    """Build a configured R2 (S3-compatible) client from the app config"""
+    aws_access_key_id = current_app.config.get('AWS_ACCESS_KEY_ID')
+    aws_secret_access_key = current_app.config.get('AWS_SECRET_ACCESS_KEY')
+    r2_endpoint_url = current_app.config.get('R2_ENDPOINT_URL')
+    
+    if not aws_access_key_id or not aws_secret_access_key:
+        raise ValueError("R2 credentials not found in configuration")
+    
+    # Configure the client with specific settings for R2
+    config = Config(
+        signature_version='s3v4',
+        retries={'max_attempts': current_app.config.get('R2_MAX_ATTEMPTS', 3)},
+        max_pool_connections=current_app.config.get('R2_MAX_POOL_CONNECTIONS', 50),
+        connect_timeout=current_app.config.get('R2_CONNECT_TIMEOUT', 5),
+        read_timeout=current_app.config.get('R2_READ_TIMEOUT', 60),
+        tcp_keepalive=current_app.config.get('R2_TCP_KEEPALIVE', True),
+        s3={
+            'addressing_style': 'virtual'  # Use virtual hosted-style requests
+        }
+    )
+    
+    # A dedicated session keeps credential resolution out of boto3's global default session
+    session = boto3.session.Session()
+    client = session.client(
+        's3',
+        endpoint_url=r2_endpoint_url,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name='auto',  # R2 uses 'auto' region
+        config=config
+    )
+
+    # Count and time every call made through this client (per request + shared totals)
+    install_r2_instrumentation(client)
+    return client
+
+
+# Storage backends selectable with R2_STORAGE_BACKEND; each factory returns an
+# object with the boto3 S3 client interface
+_STORAGE_BACKENDS = {
+    'r2': _create_r2_client,
+    'fake': lambda: create_fake_s3_client(current_app.config),
+}
+
+
+def register_storage_backend(name, factory):
+    """
+    Register a storage backend factory (e.g. another S3-compatible service)
+
+    Args:
+        name: Value of R2_STORAGE_BACKEND that selects this backend
+        factory: Callable returning a client with the boto3 S3 interface
+    """
+    _STORAGE_BACKENDS[name] = factory
+    _reset_r2_client()
+
+
+def _create_storage_client():
+    """Build the client of the configured storage backend (default: real R2)"""
+    backend = current_app.config.get('R2_STORAGE_BACKEND') or 'r2'
+    factory = _STORAGE_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown R2_STORAGE_BACKEND: {backend}")
+    return factory()
+
+
 def get_r2_client():
     """
-    Create and return a configured R2 (S3-compatible) client
+    Return the shared R2 (S3-compatible) client for this worker process
+    
+    The client is created lazily on first use and reused afterwards, so every
+    R2 call goes through the same connection pool instead of paying for a new
+    TLS handshake. botocore clients are thread-safe; creation is guarded by a
+    lock and the client is rebuilt if the process was forked.
     """
-    try:
-        aws_access_key_id = current_app.config.get('AWS_ACCESS_KEY_ID')
-        aws_secret_access_key = current_app.config.get('AWS_SECRET_ACCESS_KEY')
-        r2_endpoint_url = current_app.config.get('R2_ENDPOINT_URL')
-        
-        if not aws_access_key_id or not aws_secret_access_key:
-            raise ValueError("R2 credentials not found in configuration")
-        
-        # Configure the client with specific settings for R2
-        config = Config(
-            signature_version='s3v4',
-            retries={'max_attempts': 3},
-            s3={
-                'addressing_style': 'virtual'  # Use virtual hosted-style requests
-            }
-        )
-        
-        client = boto3.client(
-            's3',
-            endpoint_url=r2_endpoint_url,
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name='auto',  # R2 uses 'auto' region
-            config=config
-        )
-        
+    global _r2_client, _r2_client_pid
+    
+    client = _r2_client
+    if client is not None and _r2_client_pid == os.getpid():
         return client
+    
+    try:
+        with _r2_client_lock:
+            if _r2_client is None or _r2_client_pid != os.getpid():
+                _r2_client = _create_storage_client()
+                _r2_client_pid = os.getpid()
+                logger.info(f"R2 client created for process {_r2_client_pid}")
+            return _r2_client
     except Exception as e:
         logger.error(f"Failed to create R2 client: {str(e)}")
         raise
 
 
-def generate_r2_signed_url(object_key, expires_in=3600, method='GET'):
+def generate_r2_signed_url(object_key, expires_in=3600, method='GET', bucket_name=None, use_cache=True):
     """
     Generate a pre-signed URL for R2 object access
     
+    URLs are cached per (bucket, key, method, expires_in) and reused until a
+    safety margin before they expire, so repeated views get the same URL
+    (and hit the browser cache).
+    
     Args:
         object_key: The R2 object key
         expires_in: URL expiration time in seconds (default: 1 hour)
         method: HTTP method ('GET' or 'PUT')
+        bucket_name: Bucket to sign for (default: R2_BUCKET_NAME)
+        use_cache: Whether to reuse a cached URL
     
     Returns:
         Signed URL string
     """
     try:
         r2_client = get_r2_client()
-        bucket_name = current_app.config.get('R2_BUCKET_NAME')
+        if bucket_name is None:
+            bucket_name = current_app.config.get('R2_BUCKET_NAME')
         
         if not bucket_name:
             raise ValueError("R2 bucket name not found in configuration")
         
-        # Generate signed URL
         if method.upper() == 'GET':
-            signed_url = r2_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': bucket_name, 'Key': object_key},
-                ExpiresIn=expires_in
-            )
+            client_method = 'get_object'
         elif method.upper() == 'PUT':
-            signed_url = r2_client.generate_presigned_url(
-                'put_object',
+            client_method = 'put_object'
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+        
+        def sign():
+            return r2_client.generate_presigned_url(
+                client_method,
                 Params={'Bucket': bucket_name, 'Key': object_key},
                 ExpiresIn=expires_in
             )
-        else:
-            raise ValueError(f"Unsupported method: {method}")
         
-        return signed_url
+        if not use_cache:
+            return sign()
+        
+        return signed_url_cache.get_or_sign(
+            bucket_name, object_key, method, expires_in, sign,
+            safety_margin=current_app.config.get('R2_SIGNED_URL_SAFETY_MARGIN')
+        )
     except Exception as e:
         logger.error(f"Failed to generate R2 signed URL: {str(e)}")
         raise
 
 
+def parse_url_expires(value):
+    """Signed URL lifetime from a request value, clamped to 1s..R2_SIGNED_URL_MAX_EXPIRES (ValueError if not a number)"""
+    max_expires = current_app.config.get('R2_SIGNED_URL_MAX_EXPIRES', 86400)
+    return max(1, min(int(value), max_expires))
+
+
 def check_r2_object_exists(object_key):
     """
     Check if an object exists in R2 storage
@@ -141,6 +244,8 @@ def delete_r2_object(object_key):
         
         # Delete the object
         r2_client.delete_object(Bucket=bucket_name, Key=object_key)
+        r2_existence_index.remove_key(object_key)
+        signed_url_cache.evict([object_key])
         logger.info(f"Successfully deleted R2 object: {object_key}")
         return True
     except Exception as e:
@@ -148,10 +253,116 @@ def delete_r2_object(object_key):
         return False
 
 
+class UploadTooLargeError(ValueError):
+    """Raised while streaming an upload once it passes the allowed size"""
+
+    def __init__(self, max_size, read_size):
+        self.max_size = max_size
+        self.read_size = read_size
+        super().__init__(f"Upload exceeds the {max_size / 1024 / 1024:.0f}MB limit")
+
+
+class HashingReader:
+    """
+    Read-only stream wrapper that counts bytes and hashes them as they are read
+
+    It deliberately has no seek()/tell(), so boto3 treats it as a non-seekable
+    stream and reads it exactly once, part by part.
+    """
+
+    def __init__(self, stream, max_size=None, algorithm='sha256'):
+        self._stream = stream
+        self._hash = hashlib.new(algorithm)
+        self.max_size = max_size
+        self.size = 0
+
+    def read(self, size=-1):
+        chunk = self._stream.read(size)
+        if chunk:
+            self.size += len(chunk)
+            if self.max_size is not None and self.size > self.max_size:
+                raise UploadTooLargeError(self.max_size, self.size)
+            self._hash.update(chunk)
+        return chunk
+
+    @property
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def get_r2_transfer_config():
+    """TransferConfig for managed (multipart) uploads, sized from app config"""
+    return TransferConfig(
+        multipart_threshold=current_app.config.get('R2_MULTIPART_THRESHOLD', 16 * 1024 * 1024),
+        multipart_chunksize=current_app.config.get('R2_MULTIPART_CHUNKSIZE', 16 * 1024 * 1024),
+        max_concurrency=current_app.config.get('R2_UPLOAD_MAX_CONCURRENCY', 4),
+        use_threads=True
+    )
+
+
+def upload_r2_fileobj(fileobj, object_key, content_type=None, max_size=None, metadata=None):
+    """
+    Stream a file object to R2 without buffering it in memory
+
+    Small bodies go up in a single PUT, larger ones as a managed multipart
+    upload (part size/concurrency from R2_MULTIPART_* config). Peak memory is
+    bounded by part size x concurrency regardless of the file size.
+
+    Args:
+        fileobj: Readable stream (e.g. request.files['file'].stream)
+        object_key: Destination R2 object key
+        content_type: Content-Type to store with the object
+        max_size: Maximum allowed size in bytes (None = unlimited)
+        metadata: Optional user metadata dict
+
+    Returns:
+        {'size': bytes written, 'sha256': hex digest of the body}
+
+    Raises:
+        UploadTooLargeError: If the stream passes max_size (the upload is aborted)
+    """
+    r2_client = get_r2_client()
+    bucket_name = current_app.config.get('R2_BUCKET_NAME')
+
+    extra_args = {}
+    if content_type:
+        extra_args['ContentType'] = content_type
+    if metadata:
+        extra_args['Metadata'] = metadata
+
+    reader = HashingReader(fileobj, max_size=max_size)
+    try:
+        r2_client.upload_fileobj(
+            reader,
+            bucket_name,
+            object_key,
+            ExtraArgs=extra_args or None,
+            Config=get_r2_transfer_config()
+        )
+    except UploadTooLargeError:
+        raise
+    except Exception as e:
+        # s3transfer wraps errors raised by the reader; surface the size limit as such
+        if isinstance(e.__cause__, UploadTooLargeError) or isinstance(e.__context__, UploadTooLargeError):
+            raise UploadTooLargeError(max_size, reader.size)
+        if max_size is not None and reader.size > max_size:
+            raise UploadTooLargeError(max_size, reader.size)
+        logger.error(f"Failed to upload R2 object {object_key}: {str(e)}")
+        raise
+
+    r2_existence_index.add_key(object_key)
+    signed_url_cache.evict([object_key])
+    logger.info(f"Streamed upload to R2: {object_key} ({reader.size} bytes, sha256={reader.hexdigest})")
+    return {'size': reader.size, 'sha256': reader.hexdigest}
+
+
 def generate_r2_object_key(file_id, filename, is_page_detail=False, page_detail_name=None):
     """
     Generate R2 object key based on content hierarchy
 
+    Paths come from the in-memory hierarchy tree (no queries); ids the tree
+    doesn't know yet fall back to walking the hierarchy in the database.
+
     Args:
         file_id: The file ID (page or page detail)
         filename: The filename
@@ -161,6 +372,19 @@ def generate_r2_object_key(file_id, filename, is_page_detail=False, page_detail_
     Returns:
         Generated R2 object key
     """
+    tree = hierarchy_tree.get()
+    if is_page_detail:
+        object_key = tree.detail_object_key(file_id, filename)
+    else:
+        object_key = tree.page_object_key(file_id, filename)
+    if object_key is not None:
+        return object_key
+
+    return _generate_r2_object_key_from_db(file_id, filename, is_page_detail)
+
+
+def _generate_r2_object_key_from_db(file_id, filename, is_page_detail=False):
+    """generate_r2_object_key from the database (fallback for rows newer than the tree)"""
     try:
         if is_page_detail:
             # For page details, get the parent page information
@@ -185,42 +409,24 @@ def generate_r2_object_key(file_id, filename, is_page_detail=False, page_detail_
             folder_id = page.folder_id
             page_name = page.name
 
-        # Build the path components
+        # Folder ancestry and channel in one query (closure table)
+        ancestry = get_folder_ancestry(folder_id)
         path_components = []
-
-        # Traverse the folder hierarchy
-        current_folder_id = folder_id
-        while current_folder_id is not None:
-            folder = ContentRelFolders.query.filter_by(id=current_folder_id, is_deleted=False).first()
-            if not folder:
-                break
-
-            # Replace problematic characters for R2 path
-            safe_folder_name = folder.name.replace('/', '⁄').replace('\\', '⁄')
-            path_components.append(safe_folder_name)
-
-            if folder.parent_id is None:
-                # Top-level folder, get the channel
-                channel = ContentRelChannels.query.filter_by(id=folder.channel_id, is_deleted=False).first()
-                if channel:
-                    safe_channel_name = channel.name.replace('/', '⁄').replace('\\', '⁄')
-                    path_components.append(safe_channel_name)
-                break
-
-            current_folder_id = folder.parent_id
-
-        # Reverse to get correct order (channel -> folders -> page)
-        path_components.reverse()
+        if ancestry['channel']:
+            path_components.append(safe_name(ancestry['channel']['name']))
+        path_components.extend(
+            safe_name(folder['name']) for folder in ancestry['folders']
+        )
 
         if is_page_detail:
             # For page details, add page folder (without extension)
             import os as os_module
             page_name_without_ext = os_module.path.splitext(page_name)[0]
-            safe_page_name = page_name_without_ext.replace('/', '⁄').replace('\\', '⁄')
+            safe_page_name = safe_name(page_name_without_ext)
             path_components.append(safe_page_name)
 
         # Add the filename
-        safe_filename = filename.replace('/', '⁄').replace('\\', '⁄')
+        safe_filename = safe_name(filename)
         path_components.append(safe_filename)
 
         # Join with forward slashes for R2 object key
@@ -234,9 +440,36 @@ def generate_r2_object_key(file_id, filename, is_page_detail=False, page_detail_
         return f"files/{file_id}/{filename}"
 
 
+def generate_r2_object_keys(pages):
+    """
+    Generate R2 object keys for many pages without per-page queries
+
+    Same result as generate_r2_object_key(page_id, filename) per page; folder
+    paths come from the in-memory hierarchy tree.
+
+    Args:
+        pages: Iterable of (page_id, folder_id, filename)
+
+    Returns:
+        {page_id: object_key}
+    """
+    pages = list(pages)
+    tree = hierarchy_tree.get()
+
+    # A folder created after the snapshot was built would otherwise get a partial path
+    if any(folder_id is not None and folder_id not in tree.folders for _, folder_id, _ in pages):
+        tree = hierarchy_tree.refresh_for_miss() or tree
+
+    keys = {}
+    for page_id, folder_id, filename in pages:
+        safe_filename = safe_name(filename)
+        keys[page_id] = '/'.join(tree.folder_path(folder_id) + [safe_filename])
+    return keys
+
+
 # ========== Extended R2 Utilities for Content Manager Refactoring ==========
 
-def move_r2_object(source_key, destination_key):
+def move_r2_object(source_key, destination_key, metadata=None, content_type=None, size=None):
     """
     Move an object from one location to another in R2
     This is implemented as copy + delete
@@ -244,6 +477,11 @@ def move_r2_object(source_key, destination_key):
     Args:
         source_key: Source object key
         destination_key: Destination object key
+        metadata: Replace the user metadata on the copy (e.g. the content hash);
+                  None keeps the source's metadata and Content-Type
+        content_type: Content-Type to store when metadata is replaced
+        size: Object size in bytes if known; objects over 5GB need it to be
+              copied part by part (CopyObject stops at 5GB)
 
     Returns:
         True if successful, False otherwise
@@ -253,16 +491,21 @@ def move_r2_object(source_key, destination_key):
         bucket_name = current_app.config.get('R2_BUCKET_NAME')
 
         # Copy the object to new location
-        copy_source = {'Bucket': bucket_name, 'Key': source_key}
-        r2_client.copy_object(
-            CopySource=copy_source,
-            Bucket=bucket_name,
-            Key=destination_key
-        )
+        copy_args = {}
+        if metadata is not None:
+            copy_args = {'Metadata': metadata, 'MetadataDirective': 'REPLACE'}
+            if content_type:
+                copy_args['ContentType'] = content_type
+        _copy_in_bucket(r2_client, bucket_name, source_key, destination_key, size, copy_args)
 
         # Delete the original object
         r2_client.delete_object(Bucket=bucket_name, Key=source_key)
 
+        # Keep the existence index and signed URLs in sync
+        r2_existence_index.remove_key(source_key)
+        r2_existence_index.add_key(destination_key)
+        signed_url_cache.evict([source_key, destination_key])
+
         logger.info(f"Successfully moved R2 object from {source_key} to {destination_key}")
         return True
     except Exception as e:
@@ -270,13 +513,14 @@ def move_r2_object(source_key, destination_key):
         return False
 
 
-def copy_r2_object(source_key, destination_key):
+def copy_r2_object(source_key, destination_key, size=None):
     """
     Copy an object to a new location in R2
 
     Args:
         source_key: Source object key
         destination_key: Destination object key
+        size: Object size in bytes if known (needed to copy objects over 5GB)
 
     Returns:
         True if successful, False otherwise
@@ -286,12 +530,9 @@ def copy_r2_object(source_key, destination_key):
         bucket_name = current_app.config.get('R2_BUCKET_NAME')
 
         # Copy the object
-        copy_source = {'Bucket': bucket_name, 'Key': source_key}
-        r2_client.copy_object(
-            CopySource=copy_source,
-            Bucket=bucket_name,
-            Key=destination_key
-        )
+        _copy_in_bucket(r2_client, bucket_name, source_key, destination_key, size)
+        r2_existence_index.add_key(destination_key)
+        signed_url_cache.evict([destination_key])
 
         logger.info(f"Successfully copied R2 object from {source_key} to {destination_key}")
         return True
@@ -300,6 +541,101 @@ def copy_r2_object(source_key, destination_key):
         return False
 
 
+# CopyObject is limited to 5GB; larger objects must be copied part by part
+COPY_OBJECT_MAX_SIZE = 5 * 1024 * 1024 * 1024
+DELETE_OBJECTS_MAX_KEYS = 1000  # S3/R2 limit per DeleteObjects call
+
+
+def _copy_in_bucket(r2_client, bucket_name, source_key, destination_key, size=None, copy_args=None):
+    """
+    CopyObject up to 5GB, managed multipart copy (UploadPartCopy) above
+
+    Args:
+        size: Source size in bytes; None means a single CopyObject
+        copy_args: Extra CopyObject arguments (Metadata, MetadataDirective, ContentType)
+    """
+    copy_source = {'Bucket': bucket_name, 'Key': source_key}
+    copy_args = dict(copy_args or {})
+
+    if size is None or size <= COPY_OBJECT_MAX_SIZE:
+        r2_client.copy_object(CopySource=copy_source, Bucket=bucket_name, Key=destination_key, **copy_args)
+        return
+
+    if 'Metadata' not in copy_args:
+        # The multipart copy creates a new upload, so carry the source's metadata over explicitly
+        head = r2_client.head_object(Bucket=bucket_name, Key=source_key)
+        copy_args.update({'Metadata': head.get('Metadata') or {}, 'MetadataDirective': 'REPLACE'})
+        if head.get('ContentType'):
+            copy_args.setdefault('ContentType', head['ContentType'])
+
+    r2_client.copy(
+        copy_source, bucket_name, destination_key,
+        ExtraArgs=copy_args,
+        Config=TransferConfig(
+            multipart_threshold=COPY_OBJECT_MAX_SIZE,
+            multipart_chunksize=current_app.config.get('R2_BULK_MOVE_COPY_PART_SIZE', 256 * 1024 * 1024),
+            max_concurrency=current_app.config.get('R2_UPLOAD_MAX_CONCURRENCY', 4),
+            use_threads=True
+        )
+    )
+
+
+def server_side_copy_r2_object(source_key, destination_key, size=None):
+    """
+    Copy an object inside the bucket without passing the bytes through the API
+
+    Objects up to 5GB use a single CopyObject call; larger ones use a managed
+    multipart copy (UploadPartCopy) with R2_BULK_MOVE_COPY_PART_SIZE parts.
+    Errors are raised so bulk callers can record them per object.
+
+    Args:
+        source_key: Source object key
+        destination_key: Destination object key
+        size: Object size in bytes if already known (from a listing)
+    """
+    r2_client = get_r2_client()
+    bucket_name = current_app.config.get('R2_BUCKET_NAME')
+    _copy_in_bucket(r2_client, bucket_name, source_key, destination_key, size)
+
+    r2_existence_index.add_key(destination_key)
+    signed_url_cache.evict([destination_key])
+
+
+def delete_r2_objects(object_keys):
+    """
+    Delete many objects with DeleteObjects (up to 1000 keys per call)
+
+    Args:
+        object_keys: Keys to delete
+
+    Returns:
+        Dictionary {key: error message} for keys that could not be deleted
+    """
+    r2_client = get_r2_client()
+    bucket_name = current_app.config.get('R2_BUCKET_NAME')
+    object_keys = list(object_keys)
+    errors = {}
+
+    for start in range(0, len(object_keys), DELETE_OBJECTS_MAX_KEYS):
+        batch = object_keys[start:start + DELETE_OBJECTS_MAX_KEYS]
+        try:
+            response = r2_client.delete_objects(
+                Bucket=bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+            for error in response.get('Errors', []):
+                errors[error.get('Key')] = error.get('Message') or error.get('Code') or 'Delete failed'
+        except Exception as e:
+            logger.error(f"Failed to delete {len(batch)} R2 objects: {str(e)}")
+            for key in batch:
+                errors[key] = str(e)
+
+        r2_existence_index.remove_keys([key for key in batch if key not in errors])
+        signed_url_cache.evict(batch)
+
+    return errors
+
+
 def generate_pending_path(original_path):
     """
     Generate pending content path from original path
@@ -326,7 +662,7 @@ def generate_archived_path(original_path, timestamp_suffix):
 
     Args:
         original_path: Original R2 object key
-        timestamp_suffix: Timestamp suffix (yyyymmddHHMM format)
+        timestamp_suffix: Suffix making the key unique (yyyymmddHHMMSS_<random>)
 
     Returns:
         Archived path with timestamp
@@ -350,6 +686,10 @@ def generate_archived_path(original_path, timestamp_suffix):
         return f"old/{archived_filename}"
 
 
+# User metadata key holding an object's SHA-256, written when pending content is approved
+CONTENT_HASH_METADATA_KEY = 'sha256'
+
+
 def get_r2_object_metadata(object_key):
     """
     Get metadata for an R2 object
@@ -358,19 +698,22 @@ def get_r2_object_metadata(object_key):
         object_key: The R2 object key
 
     Returns:
-        Dictionary with metadata (size, last_modified, etc.) or None if not found
+        Dictionary with metadata (size, last_modified, content_type, etag,
+        content_hash if recorded) or None if not found
     """
     try:
         r2_client = get_r2_client()
         bucket_name = current_app.config.get('R2_BUCKET_NAME')
 
         response = r2_client.head_object(Bucket=bucket_name, Key=object_key)
+        user_metadata = response.get('Metadata') or {}
 
         return {
             'size': response.get('ContentLength', 0),
             'last_modified': response.get('LastModified'),
             'content_type': response.get('ContentType'),
-            'etag': response.get('ETag')
+            'etag': response.get('ETag'),
+            'content_hash': user_metadata.get(CONTENT_HASH_METADATA_KEY)
         }
     except ClientError as e:
         if e.response['Error']['Code'] == '404':
@@ -383,139 +726,94 @@ def get_r2_object_metadata(object_key):
         raise
 
 
-def list_r2_objects(prefix):
+LIST_PAGE_SIZE = 1000  # S3/R2 maximum keys per ListObjectsV2 response
+
+
+def _iter_list_pages(prefix, delimiter=None, bucket_name=None, page_size=LIST_PAGE_SIZE):
+    """Yield raw ListObjectsV2 responses, following continuation tokens"""
+    r2_client = get_r2_client()
+    if bucket_name is None:
+        bucket_name = current_app.config.get('R2_BUCKET_NAME')
+
+    params = {'Bucket': bucket_name, 'Prefix': prefix}
+    if delimiter:
+        params['Delimiter'] = delimiter
+
+    paginator = r2_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(PaginationConfig={'PageSize': page_size}, **params):
+        yield page
+
+
+def iter_r2_objects(prefix, delimiter=None, with_metadata=False, bucket_name=None, page_size=LIST_PAGE_SIZE):
     """
-    List objects in R2 with given prefix
+    Stream the objects under a prefix, one listing page at a time
+
+    Memory stays constant regardless of how many objects the prefix holds.
+    Errors are raised to the caller (unlike list_r2_objects).
 
     Args:
         prefix: Prefix to filter objects
-
-    Returns:
-        List of object keys
+        delimiter: If set (usually '/'), only objects directly under the prefix are
+                   yielded; use iter_r2_common_prefixes for the "sub directories"
+        with_metadata: Yield dicts with key/size/etag/last_modified instead of keys
+        bucket_name: Bucket to list (default: R2_BUCKET_NAME)
+        page_size: Keys per ListObjectsV2 call
+
+    Yields:
+        Object keys, or metadata dicts when with_metadata is True
     """
-    try:
-        r2_client = get_r2_client()
-        bucket_name = current_app.config.get('R2_BUCKET_NAME')
-
-        logger.debug(f"[R2 LIST] Bucket: {bucket_name}, Prefix: {prefix}")
+    for page in _iter_list_pages(prefix, delimiter, bucket_name, page_size):
+        for obj in page.get('Contents', []):
+            if with_metadata:
+                yield {
+                    'key': obj['Key'],
+                    'size': obj.get('Size', 0),
+                    'etag': (obj.get('ETag') or '').strip('"'),
+                    'last_modified': obj.get('LastModified')
+                }
+            else:
+                yield obj['Key']
+
+
+def iter_r2_common_prefixes(prefix, delimiter='/', bucket_name=None, page_size=LIST_PAGE_SIZE):
+    """
+    Stream the "directories" directly under a prefix
 
-        response = r2_client.list_objects_v2(
-            Bucket=bucket_name,
-            Prefix=prefix
-        )
+    Example: prefix "Channel/" yields "Channel/Folder1/", "Channel/Folder2/", ...
+    """
+    for page in _iter_list_pages(prefix, delimiter, bucket_name, page_size):
+        for common_prefix in page.get('CommonPrefixes', []):
+            yield common_prefix['Prefix']
 
-        if 'Contents' in response:
-            objects = [obj['Key'] for obj in response['Contents']]
-            logger.debug(f"[R2 LIST] Found {len(objects)} objects")
-            if len(objects) > 0:
-                logger.debug(f"[R2 LIST] First 5: {objects[:5]}")
-            return objects
-        else:
-            logger.debug(f"[R2 LIST] No contents found in response")
-            return []
 
-    except Exception as e:
-        logger.error(f"Failed to list R2 objects with prefix {prefix}: {str(e)}", exc_info=True)
-        return []
+def r2_prefix_has_objects(prefix, bucket_name=None):
+    """Check whether at least one object exists under a prefix (single 1-key listing)"""
+    r2_client = get_r2_client()
+    if bucket_name is None:
+        bucket_name = current_app.config.get('R2_BUCKET_NAME')
+    response = r2_client.list_objects_v2(Bucket=bucket_name, Prefix=prefix, MaxKeys=1)
+    return response.get('KeyCount', len(response.get('Contents', []))) > 0
 
 
-def rename_hierarchy_r2_objects(old_name, new_name, hierarchy_type='channel', parent_path=''):
+def list_r2_objects(prefix):
     """
-    Rename R2 objects when hierarchy changes (channel/folder/page rename)
+    List objects in R2 with given prefix
 
-    This function finds all R2 objects matching the old hierarchy path and renames them
-    to match the new hierarchy path. It handles:
-    - Main content files
-    - Pending content (beps-archive/pending/)
-    - Archived content (beps-archive/old/)
+    Collects iter_r2_objects() into a list (every page, not just the first
+    1000 keys). Prefer iter_r2_objects for prefixes that can be large.
 
     Args:
-        old_name: Old name of the channel/folder/page
-        new_name: New name of the channel/folder/page
-        hierarchy_type: Type of hierarchy ('channel', 'folder', 'page')
-        parent_path: Parent path in the hierarchy (e.g., "Channel1/Folder1")
+        prefix: Prefix to filter objects
 
     Returns:
-        Dictionary with success status and details
+        List of object keys (empty on error)
     """
     try:
-        r2_client = get_r2_client()
-        bucket_name = current_app.config.get('R2_BUCKET_NAME')
-
-        # Sanitize names for R2 paths
-        old_safe_name = old_name.replace('/', '⁄').replace('\\', '⁄')
-        new_safe_name = new_name.replace('/', '⁄').replace('\\', '⁄')
-
-        # Build the old and new path prefixes
-        if parent_path:
-            parent_safe = parent_path.replace('/', '⁄').replace('\\', '⁄')
-            old_prefix = f"{parent_safe}/{old_safe_name}"
-            new_prefix = f"{parent_safe}/{new_safe_name}"
-        else:
-            old_prefix = old_safe_name
-            new_prefix = new_safe_name
-
-        # Prefixes to check in R2
-        prefixes_to_check = [
-            f"beps-contents/{old_prefix}",
-            f"beps-archive/pending/{old_prefix}",
-            f"beps-archive/old/{old_prefix}"
-        ]
-
-        renamed_count = 0
-        errors = []
-
-        for prefix in prefixes_to_check:
-            # List all objects with this prefix
-            objects = list_r2_objects(prefix)
-
-            for old_key in objects:
-                # Generate new key by replacing the old prefix
-                if hierarchy_type == 'channel':
-                    # Replace the channel name (first component after base prefix)
-                    new_key = old_key.replace(f"/{old_safe_name}/", f"/{new_safe_name}/", 1)
-                elif hierarchy_type == 'folder':
-                    # Replace the folder name in the path
-                    new_key = old_key.replace(f"/{old_safe_name}/", f"/{new_safe_name}/", 1)
-                elif hierarchy_type == 'page':
-                    # For pages, we need to rename both the file and the folder (for additionals)
-                    import os as os_module
-
-                    # Get the file extension from the old key
-                    old_basename = os_module.basename(old_key)
-                    old_name_without_ext = os_module.path.splitext(old_name)[0]
-                    new_name_without_ext = os_module.path.splitext(new_name)[0]
-
-                    # Replace in path (for additional content folders)
-                    new_key = old_key.replace(f"/{old_safe_name}/", f"/{new_safe_name}/")
-
-                    # Also replace the filename itself if it matches
-                    if old_basename.startswith(old_name):
-                        new_basename = old_basename.replace(old_name, new_name, 1)
-                        new_key = os_module.path.join(os_module.path.dirname(new_key), new_basename)
-
-                # Move the object
-                try:
-                    if move_r2_object(old_key, new_key):
-                        renamed_count += 1
-                        logger.info(f"Renamed R2 object: {old_key} -> {new_key}")
-                    else:
-                        errors.append(f"Failed to move {old_key} to {new_key}")
-                except Exception as e:
-                    error_msg = f"Error moving {old_key}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
-
-        return {
-            'success': len(errors) == 0,
-            'renamed_count': renamed_count,
-            'errors': errors
-        }
+        logger.debug(f"[R2 LIST] Prefix: {prefix}")
+        objects = list(iter_r2_objects(prefix))
+        logger.debug(f"[R2 LIST] Found {len(objects)} objects")
+        return objects
 
     except Exception as e:
-        logger.error(f"Failed to rename hierarchy R2 objects: {str(e)}")
-        return {
-            'success': False,
-            'renamed_count': 0,
-            'errors': [str(e)]
-        } 
\ No newline at end of file
+        logger.error(f"Failed to list R2 objects with prefix {prefix}: {str(e)}", exc_info=True)
+        return []
@@ -6,18 +6,22 @@ This module handles renaming operations for:
 - Categories (카테고리)
 - Pages (페이지)
 
-When names are changed, R2 objects are also moved/renamed accordingly.
+When names are changed, R2 objects are also moved/renamed accordingly:
+channel and category renames run as background move jobs (R2BulkMoveService).
 If page prefix changes (e.g., 001 -> 002), all additional content is also renamed.
 """
 
-import os
 import re
-import logging
-from flask import Blueprint, jsonify, request
+from flask import jsonify, request
 from flask_jwt_extended import jwt_required
 from extensions import db
 from models import ContentRelChannels, ContentRelFolders, ContentRelPages, PageAdditionals
-from .r2_utils import move_r2_object, list_r2_objects
+from .r2_utils import move_r2_object, r2_prefix_has_objects
+from .hierarchy_routes import rename_job_response
+from services.folder_closure import get_folder_ancestry
+from services.r2_bulk_move_service import R2BulkMoveService
+from services.r2_storage_service import R2StorageService
+from utils.r2_paths import safe_name
 from log_config import get_content_logger
 
 # Initialize logger
@@ -34,8 +38,9 @@ def register_rename_routes(api_contents_bp):
         Rename a channel (탭)
 
         Process:
-        1. Update DB name
-        2. Move all R2 objects under this channel
+        1. Start a background job moving "<Channel>/" to the new prefix
+        2. The job updates the DB name once every R2 object has moved
+        3. Answer 200 if it finished within R2_BULK_MOVE_SYNC_WAIT, otherwise 202 with the job
 
         Request body:
         {
@@ -62,20 +67,35 @@ def register_rename_routes(api_contents_bp):
             if old_name == new_name:
                 return jsonify({'message': 'Name unchanged'}), 200
 
-            # Update DB
-            channel.name = new_name
-            db.session.commit()
-
-            # TODO: Rename R2 objects (would need to move all objects under this channel)
-            # This is a complex operation - for now, just update DB
-            # In production, you'd want to use a background job for this
-
-            logger.info(f"Renamed channel {channel_id}: {old_name} -> {new_name}")
+            existing = ContentRelChannels.query.filter(
+                ContentRelChannels.name == new_name,
+                ContentRelChannels.id != channel_id,
+                ContentRelChannels.is_deleted == False
+            ).first()
+            if existing:
+                return jsonify({'error': '같은 이름의 탭이 이미 존재합니다'}), 400
 
-            return jsonify({
+            active_job = R2BulkMoveService.get_active_job('channel_rename', channel_id)
+            if active_job:
+                return jsonify({
+                    'error': '이 탭의 이름 변경 작업이 이미 진행 중입니다',
+                    'job': active_job.to_dict()
+                }), 409
+
+            old_prefix = f"{safe_name(old_name)}/"
+            new_prefix = f"{safe_name(new_name)}/"
+            if r2_prefix_has_objects(new_prefix):
+                return jsonify({'error': 'R2에 이름이 변경될 경로가 이미 존재합니다'}), 400
+
+            logger.info(f"Renaming channel {channel_id}: {old_name} -> {new_name}")
+
+            # Same move job as the hierarchy routes; the DB name changes only after every object moved
+            job = R2BulkMoveService.create_job(
+                'channel_rename', channel_id, old_prefix, new_prefix, {'name': new_name}
+            )
+            return rename_job_response(job, 'channel', lambda: {
                 'message': 'Channel renamed successfully',
-                'channel': channel.to_dict(),
-                'note': 'R2 objects are not automatically renamed. Please update manually or run migration.'
+                'channel': ContentRelChannels.query.get(channel_id).to_dict()
             })
 
         except Exception as e:
@@ -90,8 +110,10 @@ def register_rename_routes(api_contents_bp):
         Rename a category (카테고리)
 
         Process:
-        1. Update DB name
-        2. Move all R2 objects under this category
+        1. Start a background job moving the category's R2 prefix
+           ("<Channel>/<Folder>/.../<Category>/") to the new name
+        2. The job updates the DB name once every R2 object has moved
+        3. Answer 200 if it finished within R2_BULK_MOVE_SYNC_WAIT, otherwise 202 with the job
 
         Request body:
         {
@@ -118,16 +140,46 @@ def register_rename_routes(api_contents_bp):
             if old_name == new_name:
                 return jsonify({'message': 'Name unchanged'}), 200
 
-            # Update DB
-            category.name = new_name
-            db.session.commit()
-
-            logger.info(f"Renamed category {category_id}: {old_name} -> {new_name}")
-
-            return jsonify({
+            existing = ContentRelFolders.query.filter(
+                ContentRelFolders.name == new_name,
+                ContentRelFolders.channel_id == category.channel_id,
+                ContentRelFolders.parent_id == category.parent_id,
+                ContentRelFolders.id != category_id,
+                ContentRelFolders.is_deleted == False
+            ).first()
+            if existing:
+                return jsonify({'error': '같은 위치에 같은 이름의 카테고리가 이미 존재합니다'}), 400
+
+            active_job = R2BulkMoveService.get_active_job('folder_rename', category_id)
+            if active_job:
+                return jsonify({
+                    'error': '이 카테고리의 이름 변경 작업이 이미 진행 중입니다',
+                    'job': active_job.to_dict()
+                }), 409
+
+            # Sub categories live below their parents: "<Channel>/<Folder>/.../<Category>/"
+            ancestry = get_folder_ancestry(category_id)
+            if not ancestry['channel']:
+                return jsonify({'error': 'Category is not attached to a channel'}), 400
+            parent_path = '/'.join(
+                [safe_name(ancestry['channel']['name'])]
+                + [safe_name(folder['name']) for folder in ancestry['folders'][:-1]]
+            )
+            old_prefix = f"{parent_path}/{safe_name(old_name)}/"
+            new_prefix = f"{parent_path}/{safe_name(new_name)}/"
+            if r2_prefix_has_objects(new_prefix):
+                return jsonify({'error': 'R2에 이름이 변경될 경로가 이미 존재합니다'}), 400
+
+            logger.info(f"Renaming category {category_id}: {old_name} -> {new_name}")
+
+            # Same move job as the hierarchy routes; the DB name changes only after every object moved
+            job = R2BulkMoveService.create_job(
+                'folder_rename', category_id, old_prefix, new_prefix,
+                {'name': new_name, 'channel_id': category.channel_id}
+            )
+            return rename_job_response(job, 'category', lambda: {
                 'message': 'Category renamed successfully',
-                'category': category.to_dict(),
-                'note': 'R2 objects are not automatically renamed. Please update manually or run migration.'
+                'category': ContentRelFolders.query.get(category_id).to_dict()
             })
 
         except Exception as e:
@@ -250,6 +302,8 @@ def register_rename_routes(api_contents_bp):
 
             db.session.commit()
 
+            R2StorageService.invalidate_page(page_id)
+
             logger.info(f"Renamed page {page_id}: {old_name} -> {new_name}")
             logger.info(f"Renamed {len(renamed_objects)} R2 objects")
 
@@ -11,6 +11,8 @@ The blueprint is split into the following modules:
 - r2_routes: R2 storage operations and image handling
 - page_detail_routes: Page detail specific operations
 - content_manager_routes: Content management specific operations
+- multipart_upload_routes: Presigned multipart uploads for large content
+- r2_move_job_routes: Progress/resume of background R2 moves (channel/folder renames)
 """
 
 import os
@@ -40,6 +42,9 @@ def register_all_routes():
         from .contents.additional_content_routes import register_additional_content_routes
         from .contents.pending_approve_routes import register_pending_approve_routes
         from .contents.rename_routes import register_rename_routes
+        from .contents.multipart_upload_routes import register_multipart_upload_routes
+        from .contents.r2_move_job_routes import register_r2_move_job_routes
+        from .contents.archive_routes import register_archive_routes
 
         # Register route modules
         register_hierarchy_routes(api_contents_bp)
@@ -53,6 +58,9 @@ def register_all_routes():
         register_additional_content_routes(api_contents_bp)
         register_pending_approve_routes(api_contents_bp)
         register_rename_routes(api_contents_bp)
+        register_multipart_upload_routes(api_contents_bp)
+        register_r2_move_job_routes(api_contents_bp)
+        register_archive_routes(api_contents_bp)
 
         logger.info("Successfully registered all contents routes (including refactored routes)")
 
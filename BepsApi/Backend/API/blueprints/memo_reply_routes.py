@@ -8,9 +8,11 @@ import log_config
 from log_config import get_memo_logger, get_content_logger
 from datetime import datetime, timezone
 import os
-import boto3
-from botocore.client import Config
 from botocore.exceptions import ClientError
+from blueprints.contents.r2_utils import get_r2_client as get_shared_r2_client
+from blueprints.contents.r2_utils import generate_r2_signed_url as generate_shared_r2_signed_url
+from blueprints.contents.r2_utils import parse_url_expires
+from services.signed_url_cache import signed_url_cache
 
 api_memo_reply_bp = Blueprint('memo_reply', __name__)
 
@@ -145,72 +147,17 @@ def delete_reply(id):
 # ======== R2 ATTACHMENT UTILITY FUNCTIONS ========
 
 def get_r2_client():
-    """Create and return a configured R2 (S3-compatible) client"""
-    try:
-        aws_access_key_id = current_app.config.get('AWS_ACCESS_KEY_ID')
-        aws_secret_access_key = current_app.config.get('AWS_SECRET_ACCESS_KEY')
-        r2_endpoint_url = current_app.config.get('R2_ENDPOINT_URL')
-        
-        if not aws_access_key_id or not aws_secret_access_key:
-            raise ValueError("R2 credentials not found in configuration")
-        
-        # Configure the client with specific settings for R2
-        config = Config(
-            signature_version='s3v4',
-            retries={'max_attempts': 3},
-            s3={
-                'addressing_style': 'virtual'  # Use virtual hosted-style requests
-            }
-        )
-        
-        client = boto3.client(
-            's3',
-            endpoint_url=r2_endpoint_url,
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name='auto',  # R2 uses 'auto' region
-            config=config
-        )
-        
-        return client
-    except Exception as e:
-        content_logger.error(f"Failed to create R2 client: {str(e)}")
-        raise
+    """Return the shared R2 (S3-compatible) client (pooled, see contents.r2_utils)"""
+    return get_shared_r2_client()
 
 
 def generate_r2_signed_url(object_key, expires_in=3600, method='GET', bucket_name=None):
-    """Generate a pre-signed URL for R2 object access"""
-    try:
-        r2_client = get_r2_client()
-        
-        # Use provided bucket name or default to LFS bucket for attachments
-        if bucket_name is None:
-            bucket_name = current_app.config.get('R2_LFS_BUCKET_NAME', 'beps-lfs')
-        
-        if not bucket_name:
-            raise ValueError("R2 bucket name not found in configuration")
-        
-        # Generate signed URL
-        if method.upper() == 'GET':
-            signed_url = r2_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': bucket_name, 'Key': object_key},
-                ExpiresIn=expires_in
-            )
-        elif method.upper() == 'PUT':
-            signed_url = r2_client.generate_presigned_url(
-                'put_object',
-                Params={'Bucket': bucket_name, 'Key': object_key},
-                ExpiresIn=expires_in
-            )
-        else:
-            raise ValueError(f"Unsupported method: {method}")
-        
-        return signed_url
-    except Exception as e:
-        content_logger.error(f"Failed to generate R2 signed URL: {str(e)}")
-        raise
-
+    """Generate a pre-signed URL for R2 object access (cached, see contents.r2_utils)"""
+    # Use provided bucket name or default to LFS bucket for attachments
+    if bucket_name is None:
+        bucket_name = current_app.config.get('R2_LFS_BUCKET_NAME', 'beps-lfs')
+    
+    return generate_shared_r2_signed_url(object_key, expires_in=expires_in, method=method, bucket_name=bucket_name)
 
 def generate_attachment_object_key(reply_id, filename):
     """Generate R2 object key for memo reply attachment"""
@@ -346,6 +293,9 @@ def confirm_attachment_upload(reply_id):
         if not check_r2_object_exists(object_key):
             return jsonify({'error': 'Object not found in R2 storage'}), 404
         
+        # The client may have overwritten an object whose URL is still cached
+        signed_url_cache.evict([object_key])
+        
         # Create attachment record
         attachment = MemoReplyAttachment(
             memo_reply_id=reply_id,
@@ -385,7 +335,10 @@ def get_attachment_url(attachment_id):
             return jsonify({'error': 'Related reply not found'}), 404
         
         # Get expires parameter
-        expires = int(request.args.get('expires', 3600))
+        try:
+            expires = parse_url_expires(request.args.get('expires', 3600))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'expires must be an integer'}), 400
         
         # Generate signed URL for viewing
         signed_url = generate_r2_signed_url(attachment.object_key, expires_in=expires, method='GET')
@@ -403,6 +356,66 @@ def get_attachment_url(attachment_id):
         return jsonify({'error': str(e)}), 500
 
 
+@api_memo_reply_bp.route('/attachments/signed-urls', methods=['POST'])
+@jwt_required(locations=['headers','cookies'])
+def get_attachment_urls_bulk():
+    """
+    Get signed URLs for many attachments in one request
+    
+    Request body:
+    - attachment_ids: Array of attachment IDs (integers)
+    - expires: URL lifetime in seconds (optional, default 3600, clamped to R2_SIGNED_URL_MAX_EXPIRES)
+    
+    Returns {attachment_id: {...same fields as /attachment/<id>/url...} or {'error': ...}}
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('attachment_ids'), list):
+            return jsonify({'error': 'attachment_ids array is required'}), 400
+        
+        try:
+            attachment_ids = [int(attachment_id) for attachment_id in data['attachment_ids']]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'attachment_ids must be integers'}), 400
+        
+        try:
+            expires = parse_url_expires(data.get('expires', 3600))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'expires must be an integer'}), 400
+        
+        # Attachments and their (non-deleted) replies in one query
+        rows = db.session.query(MemoReplyAttachment).join(
+            MemoReply, MemoReply.id == MemoReplyAttachment.memo_reply_id
+        ).filter(
+            MemoReplyAttachment.id.in_(attachment_ids),
+            MemoReply.is_deleted == False
+        ).all()
+        attachments = {attachment.id: attachment for attachment in rows}
+        
+        results = {}
+        for attachment_id in attachment_ids:
+            attachment = attachments.get(attachment_id)
+            if not attachment:
+                results[str(attachment_id)] = {'error': 'Attachment not found'}
+                continue
+            try:
+                results[str(attachment_id)] = {
+                    'signed_url': generate_r2_signed_url(attachment.object_key, expires_in=expires, method='GET'),
+                    'filename': attachment.filename,
+                    'content_type': attachment.content_type,
+                    'file_size': attachment.file_size,
+                    'expires_in': expires
+                }
+            except Exception as e:
+                results[str(attachment_id)] = {'error': str(e)}
+        
+        return jsonify(results)
+        
+    except Exception as e:
+        content_logger.error(f"Error generating bulk attachment URLs: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @api_memo_reply_bp.route('/attachment/<int:attachment_id>', methods=['DELETE'])
 @jwt_required(locations=['headers','cookies'])
 def delete_attachment(attachment_id):
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # .env 파일에서 환경변수 로드
@@ -27,8 +28,14 @@ class Config:
 
     
     # 캐시 설정
-    CACHE_TYPE = os.getenv("CACHE_TYPE", "SimpleCache")  # 기본값은 SimpleCache (메모리 기반)
+    CACHE_TYPE = os.getenv("CACHE_TYPE", "services.shared_cache.SharedRedisCache")  # 🔹 기본값은 Redis 공유 캐시(msgpack), 로컬 개발은 SimpleCache 가능
     CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", 3600))  # 캐시 기본 만료 시간(초)
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")  # 🔹 공유 캐시 Redis 주소
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "beps:cache:")  # 🔹 공유 캐시 키 접두어
+    CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", 0.1))  # 🔹 만료 시간 무작위 분산 비율(±10%), 동시 만료 방지
+    CACHE_STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", 300))  # 🔹 만료 후 재생성 중 이전 값을 제공하는 시간(초)
+    CACHE_LOCK_SECONDS = int(os.getenv("CACHE_LOCK_SECONDS", 30))  # 🔹 캐시 재생성 잠금(single-flight) 유지 시간(초)
+    CACHE_WAIT_SECONDS = float(os.getenv("CACHE_WAIT_SECONDS", 10))  # 🔹 제공할 값이 없을 때 다른 프로세스의 재생성을 기다리는 시간(초)
     
 
     # R2 (Cloudflare S3-compatible storage) 설정
@@ -39,6 +46,49 @@ class Config:
     R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL")  # R2 엔드포인트 URL
     R2_ACCOUNT_CODE = os.getenv("R2_ACCOUNT_CODE")  # R2 계정 코드
     R2_ACCOUNT_HASH = os.getenv("R2_ACCOUNT_HASH")  # R2 계정 해시
+    R2_STORAGE_BACKEND = os.getenv("R2_STORAGE_BACKEND", "r2")  # 🔹 r2(실제 R2) / fake(프로세스 내 S3 가짜 구현, 벤치마크·로컬 개발용)
+    R2_FAKE_LATENCY_MS = float(os.getenv("R2_FAKE_LATENCY_MS", 0))  # 🔹 fake 백엔드 호출당 지연 시간(ms)
+    R2_FAKE_LATENCY_JITTER_MS = float(os.getenv("R2_FAKE_LATENCY_JITTER_MS", 0))  # 🔹 fake 백엔드 추가 무작위 지연 상한(ms)
+    R2_FAKE_LATENCY_BY_OPERATION = os.getenv("R2_FAKE_LATENCY_BY_OPERATION", "")  # 🔹 작업별 지연(ms) JSON, 예: {"ListObjectsV2": 80}
+    R2_MAX_POOL_CONNECTIONS = int(os.getenv("R2_MAX_POOL_CONNECTIONS", 50))  # 🔹 워커 프로세스당 R2 커넥션 풀 크기
+    R2_CONNECT_TIMEOUT = float(os.getenv("R2_CONNECT_TIMEOUT", 5))  # 🔹 R2 연결 타임아웃(초)
+    R2_READ_TIMEOUT = float(os.getenv("R2_READ_TIMEOUT", 60))  # 🔹 R2 응답 읽기 타임아웃(초)
+    R2_TCP_KEEPALIVE = os.getenv("R2_TCP_KEEPALIVE", "true").lower() == "true"  # 🔹 TCP keep-alive 사용 여부
+    R2_MAX_ATTEMPTS = int(os.getenv("R2_MAX_ATTEMPTS", 3))  # 🔹 R2 요청 재시도 횟수
+    R2_BATCH_CHECK_CONCURRENCY = int(os.getenv("R2_BATCH_CHECK_CONCURRENCY", 16))  # 🔹 r2-batch-check 동시 확인 개수
+    R2_BATCH_CHECK_EXECUTOR = os.getenv("R2_BATCH_CHECK_EXECUTOR", "auto")  # 🔹 auto / gevent / thread / serial
+    R2_EXISTENCE_CACHE_BACKEND = os.getenv("R2_EXISTENCE_CACHE_BACKEND", "tiered")  # 🔹 tiered(로컬 LRU + Redis) / local / redis / none
+    R2_EXISTENCE_TTL = int(os.getenv("R2_EXISTENCE_TTL", 300))  # 🔹 R2 존재 확인 결과(있음) 캐시 시간(초)
+    R2_EXISTENCE_NEGATIVE_TTL = int(os.getenv("R2_EXISTENCE_NEGATIVE_TTL", 60))  # 🔹 R2 존재 확인 결과(없음) 캐시 시간(초)
+    R2_EXISTENCE_LOCAL_TTL = int(os.getenv("R2_EXISTENCE_LOCAL_TTL", 15))  # 🔹 워커 로컬 LRU 캐시 시간(초)
+    LOCAL_CACHE_SYNC_SECONDS = float(os.getenv("LOCAL_CACHE_SYNC_SECONDS", 1))  # 🔹 다른 워커의 캐시 무효화 이벤트(Redis stream)를 읽는 주기(초)
+    R2_MULTIPART_THRESHOLD = int(os.getenv("R2_MULTIPART_THRESHOLD", 16 * 1024 * 1024))  # 🔹 이 크기 이상이면 멀티파트 업로드(바이트)
+    R2_MULTIPART_CHUNKSIZE = int(os.getenv("R2_MULTIPART_CHUNKSIZE", 16 * 1024 * 1024))  # 🔹 멀티파트 파트 크기(바이트)
+    R2_UPLOAD_MAX_CONCURRENCY = int(os.getenv("R2_UPLOAD_MAX_CONCURRENCY", 4))  # 🔹 업로드당 동시 전송 파트 수
+    R2_MULTIPART_PART_URL_EXPIRES = int(os.getenv("R2_MULTIPART_PART_URL_EXPIRES", 3600))  # 🔹 파트 업로드 presigned URL 유효 시간(초)
+    R2_MULTIPART_SESSION_TTL = int(os.getenv("R2_MULTIPART_SESSION_TTL", 24 * 3600))  # 🔹 멀티파트 업로드 세션 보관 시간(초)
+    R2_SIGNED_URL_SAFETY_MARGIN = int(os.getenv("R2_SIGNED_URL_SAFETY_MARGIN", 300))  # 🔹 만료 이 시간(초) 전까지 서명 URL 재사용
+    R2_SIGNED_URL_MAX_EXPIRES = int(os.getenv("R2_SIGNED_URL_MAX_EXPIRES", 86400))  # 🔹 요청으로 지정할 수 있는 서명 URL 최대 유효 시간(초)
+    R2_BULK_MOVE_CONCURRENCY = int(os.getenv("R2_BULK_MOVE_CONCURRENCY", 16))  # 🔹 이름 변경 시 동시 복사 개수
+    R2_BULK_MOVE_EXECUTOR = os.getenv("R2_BULK_MOVE_EXECUTOR", "auto")  # 🔹 이름 변경 복사 실행기(auto / gevent / thread / serial), r2-batch-check 설정과 별개
+    R2_BULK_MOVE_COPY_PART_SIZE = int(os.getenv("R2_BULK_MOVE_COPY_PART_SIZE", 256 * 1024 * 1024))  # 🔹 5GB 초과 객체 멀티파트 복사 파트 크기(바이트)
+    R2_BULK_MOVE_SYNC_WAIT = float(os.getenv("R2_BULK_MOVE_SYNC_WAIT", 10))  # 🔹 이름 변경 요청이 작업 완료를 기다리는 시간(초), 초과 시 202 반환
+    R2_BULK_MOVE_STALE_SECONDS = int(os.getenv("R2_BULK_MOVE_STALE_SECONDS", 300))  # 🔹 진행 기록이 이 시간(초) 동안 없으면 중단된 작업으로 보고 재개 허용
+    HIERARCHY_TREE_CHECK_SECONDS = float(os.getenv("HIERARCHY_TREE_CHECK_SECONDS", 1))  # 🔹 계층 트리 버전(Redis) 확인 주기(초)
+    HIERARCHY_TREE_MAX_AGE = int(os.getenv("HIERARCHY_TREE_MAX_AGE", 300))  # 🔹 버전 변화가 없어도 계층 트리를 다시 읽는 주기(초)
+    HIERARCHY_SNAPSHOT_DIR = os.getenv("HIERARCHY_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "beps_hierarchy_snapshot"))  # 🔹 버전별 계층 응답(JSON/gzip/br) 사전 생성 파일 저장 위치
+    HIERARCHY_UPDATED_DAYS = int(os.getenv("HIERARCHY_UPDATED_DAYS", 7))  # 🔹 계층 조회 'updated' 필터: 이 기간(일) 안에 수정된 페이지
+    SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", 1000))  # 🔹 이 시간(ms) 이상 걸린 요청은 R2 호출 집계와 함께 경고 로그
+    ARCHIVE_RETENTION_ENABLED = os.getenv("ARCHIVE_RETENTION_ENABLED", "false").lower() == "true"  # 🔹 야간 보관본(old/) 정리 작업 사용 여부
+    ARCHIVE_RETENTION_HOUR = int(os.getenv("ARCHIVE_RETENTION_HOUR", 3))  # 🔹 야간 정리 작업 실행 시각(시)
+    ARCHIVE_RETENTION_KEEP_VERSIONS = int(os.getenv("ARCHIVE_RETENTION_KEEP_VERSIONS", 10))  # 🔹 페이지/상세별로 남길 최신 보관본 수(0 = 제한 없음)
+    ARCHIVE_RETENTION_MAX_AGE_DAYS = int(os.getenv("ARCHIVE_RETENTION_MAX_AGE_DAYS", 180))  # 🔹 이 기간(일)보다 젊은 보관본은 유지(0 = 제한 없음)
+    ARCHIVE_RETENTION_BATCH_SIZE = int(os.getenv("ARCHIVE_RETENTION_BATCH_SIZE", 1000))  # 🔹 배치당 삭제 행/객체 수(최대 1000)
+    ARCHIVE_RETENTION_BATCH_PAUSE = float(os.getenv("ARCHIVE_RETENTION_BATCH_PAUSE", 1.0))  # 🔹 배치 사이 대기 시간(초)
+    ARCHIVE_RETENTION_MAX_SECONDS = int(os.getenv("ARCHIVE_RETENTION_MAX_SECONDS", 1800))  # 🔹 1회 실행 최대 시간(초), 남은 분량은 다음 실행에서 처리
+    CONTENT_ACCESS_TTL = int(os.getenv("CONTENT_ACCESS_TTL", 3600))  # 🔹 사용자별 접근 가능 콘텐츠 집합(Redis) 보관 시간(초), 권한/계층 변경 시 자동 재계산
+    CONTENT_ACCESS_ENFORCE = os.getenv("CONTENT_ACCESS_ENFORCE", "false").lower() == "true"  # 🔹 담당 콘텐츠 외 파일/이미지 요청 차단(403) 여부, false면 차단 대상만 로그로 기록
+    HAS_CONTENT_RECONCILE_MINUTES = int(os.getenv("HAS_CONTENT_RECONCILE_MINUTES", 30))  # 🔹 has_content 플래그 R2 재검증 주기(분)
 
     # Celery 설정
     broker_url = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
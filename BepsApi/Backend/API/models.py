@@ -368,6 +368,16 @@ class ContentRelFolders(db.Model):
             'is_deleted': self.is_deleted
         }
 
+class ContentFolderClosure(db.Model):
+    """
+    Folder ancestry: one row per (ancestor, descendant) pair, each folder with itself at depth 0
+    Maintained by database triggers on content_rel_folders (see migration 006)
+    """
+    __tablename__ = 'content_folder_closure'
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('content_rel_folders.id', ondelete='CASCADE'), primary_key=True)
+    descendant_id = db.Column(db.Integer, db.ForeignKey('content_rel_folders.id', ondelete='CASCADE'), primary_key=True)
+    depth = db.Column(db.Integer, nullable=False)
+
 class ContentRelPages(db.Model):
     __tablename__ = 'content_rel_pages'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -375,6 +385,7 @@ class ContentRelPages(db.Model):
     name = db.Column(db.String, nullable=False)
     description = db.Column(db.Text)
     object_id = db.Column(db.String, nullable=True)
+    has_content = db.Column(db.Boolean, nullable=False, default=False)  # Maintained by approve/confirm routes + reconciler
     created_at = db.Column(db.DateTime(timezone=False), default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime(timezone=False), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     is_deleted = db.Column(db.Boolean, default=False)
@@ -394,11 +405,6 @@ class ContentRelPages(db.Model):
             use_cache=use_cache
         )
     
-    @property
-    def has_content(self):
-        """Computed property that checks if actual file exists in R2 storage"""
-        return self.check_r2_content_exists()
-    
     def to_dict(self):
         return {
             'id': self.id,
@@ -406,7 +412,7 @@ class ContentRelPages(db.Model):
             'name': self.name,
             'description': self.description,
             'object_id': self.object_id,
-            'has_content': self.has_content,  # Uses the property
+            'has_content': self.has_content,
             'created_at': self.created_at,
             'updated_at': self.updated_at,
             'is_deleted': self.is_deleted
@@ -419,7 +425,7 @@ class ContentRelPageDetails(db.Model):
     name = db.Column(db.String, nullable=False)
     description = db.Column(db.Text)
     object_id = db.Column(db.String, nullable=True)
-    # has_content = db.Column(db.Boolean, default=False)  # Temporarily commented until DB migration
+    has_content = db.Column(db.Boolean, nullable=False, default=False)  # Maintained by approve/confirm routes + reconciler
     created_at = db.Column(db.DateTime(timezone=False), default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime(timezone=False), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     is_deleted = db.Column(db.Boolean, default=False)
@@ -439,13 +445,6 @@ class ContentRelPageDetails(db.Model):
             use_cache=use_cache
         )
     
-    @property
-    def has_content(self):
-        """Computed property that checks if actual file exists in R2 storage"""
-        # For performance, we can add caching here in the future
-        # For now, use the method that actually checks R2
-        return self.check_r2_content_exists()
-    
     def to_dict(self):
         return {
             'id': self.id,
@@ -453,7 +452,7 @@ class ContentRelPageDetails(db.Model):
             'name': self.name,
             'description': self.description,
             'object_id': self.object_id,
-            'has_content': self.has_content,  # Uses the property
+            'has_content': self.has_content,
             'created_at': self.created_at,
             'updated_at': self.updated_at,
             'is_deleted': self.is_deleted
@@ -703,6 +702,7 @@ class PendingContent(db.Model):
     object_key = db.Column(db.String(500), nullable=False)  # R2 path in pending location
     filename = db.Column(db.String(255), nullable=False)
     file_size = db.Column(db.BigInteger, default=0)
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the uploaded bytes ('etag:<ETag>' for multipart uploads)
     uploaded_by = db.Column(db.Text, db.ForeignKey('users.id'), nullable=False)
     uploaded_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
 
@@ -724,6 +724,7 @@ class PendingContent(db.Model):
             'object_key': self.object_key,
             'filename': self.filename,
             'file_size': self.file_size,
+            'content_hash': self.content_hash,
             'uploaded_by': self.uploaded_by,
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None
         }
@@ -742,6 +743,7 @@ class ArchivedContent(db.Model):
     object_key = db.Column(db.String(500), nullable=False)  # R2 path in archive/old
     archived_filename = db.Column(db.String(255), nullable=False)  # With timestamp suffix
     file_size = db.Column(db.BigInteger, default=0)
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256; rows with the same hash may share object_key
     archived_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     archived_by = db.Column(db.Text, db.ForeignKey('users.id'), nullable=False)  # 책임자 who approved
 
@@ -763,7 +765,84 @@ class ArchivedContent(db.Model):
             'object_key': self.object_key,
             'archived_filename': self.archived_filename,
             'file_size': self.file_size,
+            'content_hash': self.content_hash,
             'archived_at': self.archived_at.isoformat() if self.archived_at else None,
             'archived_by': self.archived_by
         }
 
+
+
+class R2MoveJob(db.Model):
+    """
+    Background R2 prefix move (channel/folder rename), pollable and resumable
+    """
+    __tablename__ = 'r2_move_jobs'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_type = db.Column(db.String(30), nullable=False)  # 'channel_rename' or 'folder_rename'
+    entity_id = db.Column(db.Integer, nullable=False)
+    source_prefix = db.Column(db.String(1000), nullable=False)
+    destination_prefix = db.Column(db.String(1000), nullable=False)
+    params = db.Column(JSONB, nullable=False, default=dict)  # DB change applied after the move
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    phase = db.Column(db.String(20), nullable=True)
+    total_objects = db.Column(db.Integer, nullable=False, default=0)
+    total_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    copied_objects = db.Column(db.Integer, nullable=False, default=0)
+    deleted_objects = db.Column(db.Integer, nullable=False, default=0)
+    failed_objects = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Text, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("job_type IN ('channel_rename', 'folder_rename')", name='chk_r2_move_job_type'),
+        CheckConstraint("status IN ('queued', 'running', 'completed', 'failed')", name='chk_r2_move_job_status'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'entity_id': self.entity_id,
+            'source_prefix': self.source_prefix,
+            'destination_prefix': self.destination_prefix,
+            'params': self.params,
+            'status': self.status,
+            'phase': self.phase,
+            'total_objects': self.total_objects,
+            'total_bytes': self.total_bytes,
+            'copied_objects': self.copied_objects,
+            'deleted_objects': self.deleted_objects,
+            'failed_objects': self.failed_objects,
+            'error': self.error,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class R2MoveJobItem(db.Model):
+    """
+    Per-object progress of an R2MoveJob
+    """
+    __tablename__ = 'r2_move_job_items'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('r2_move_jobs.id', ondelete='CASCADE'), nullable=False)
+    source_key = db.Column(db.String(1000), nullable=False)
+    destination_key = db.Column(db.String(1000), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending / copied / deleted / failed
+    error = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'source_key', name='uq_r2_move_job_item'),
+        CheckConstraint("status IN ('pending', 'copied', 'deleted', 'failed')", name='chk_r2_move_job_item_status'),
+    )
@@ -0,0 +1,229 @@
+"""
+Archive Retention Service
+
+Every approval keeps the replaced version under old/ with an
+archived_content row. This service prunes versions that fall outside the
+retention policy:
+- keep_versions: keep the newest N versions of each page / page detail
+- max_age_days: keep versions younger than X days
+
+A version expires only when every configured policy lets it go (so with both
+set, the newest N and everything younger than X days are kept). Archive
+objects can be shared by rows with identical bytes, so an object is deleted
+only once no remaining row references it. The reference check and the
+delete run under per-object advisory locks that approvals reusing an archive
+object also take (lock_archive_objects), so a version archived meanwhile
+can't lose its object.
+
+Objects are removed with DeleteObjects (up to 1000 keys per call) and rows
+with bulk DELETEs, batch by batch with a pause in between so the nightly run
+doesn't compete with live traffic. dry_run reports what would be removed.
+"""
+
+import time
+import logging
+import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from flask import current_app
+from sqlalchemy.sql import func
+
+from extensions import db
+from models import ArchivedContent
+from log_config import get_content_logger
+
+logger = get_content_logger()
+
+SAMPLE_SIZE = 20  # object keys / errors included in the report
+
+
+def split_shared_objects(object_keys, references, expired_ids) -> Tuple[List[str], Set[str]]:
+    """
+    Split the objects of expiring rows into freed and still shared ones
+
+    Args:
+        object_keys: Object keys of the expiring rows
+        references: (id, object_key) of every row referencing one of those keys
+        expired_ids: Ids of all rows that expire in this run
+
+    Returns:
+        (sorted keys no remaining row references, keys still referenced)
+    """
+    shared = {object_key for row_id, object_key in references if row_id not in expired_ids}
+    return sorted(key for key in set(object_keys) if key not in shared), shared
+
+
+class ArchiveRetentionService:
+    """Service for pruning archived content versions"""
+
+    @staticmethod
+    def get_policy(keep_versions: Optional[int] = None, max_age_days: Optional[int] = None) -> Dict:
+        """Retention policy from the arguments, falling back to ARCHIVE_RETENTION_* config"""
+        config = current_app.config
+        return {
+            'keep_versions': keep_versions if keep_versions is not None
+            else config.get('ARCHIVE_RETENTION_KEEP_VERSIONS', 10),
+            'max_age_days': max_age_days if max_age_days is not None
+            else config.get('ARCHIVE_RETENTION_MAX_AGE_DAYS', 180),
+        }
+
+    @staticmethod
+    def lock_archive_objects(object_keys: List[str]) -> None:
+        """
+        Take transaction-scoped advisory locks on archive object keys
+
+        Held until the caller commits or rolls back. Keys are locked in sorted
+        order so concurrent callers can't deadlock.
+        """
+        for object_key in sorted(set(object_keys)):
+            db.session.execute(
+                db.text("SELECT pg_advisory_xact_lock(hashtext(:object_key))"),
+                {'object_key': object_key}
+            )
+
+    @staticmethod
+    def find_expired_ids(keep_versions: int, max_age_days: int) -> List[int]:
+        """
+        Ids of archived versions outside the policy, oldest first
+
+        Args:
+            keep_versions: Versions to keep per page / page detail (0 = no count limit)
+            max_age_days: Keep versions younger than this (0 = no age limit)
+
+        Returns:
+            List of archived_content ids; empty when neither policy is set
+        """
+        if not keep_versions and not max_age_days:
+            return []
+
+        ranked = db.session.query(
+            ArchivedContent.id,
+            ArchivedContent.archived_at,
+            func.row_number().over(
+                partition_by=(ArchivedContent.content_type, ArchivedContent.original_page_id,
+                              ArchivedContent.original_additional_id),
+                order_by=(ArchivedContent.archived_at.desc(), ArchivedContent.id.desc())
+            ).label('version_rank')
+        ).subquery()
+
+        query = db.session.query(ranked.c.id)
+        if keep_versions:
+            query = query.filter(ranked.c.version_rank > keep_versions)
+        if max_age_days:
+            cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=max_age_days)
+            query = query.filter(ranked.c.archived_at < cutoff)
+
+        return [row.id for row in query.order_by(ranked.c.archived_at, ranked.c.id).all()]
+
+    @staticmethod
+    def run(keep_versions: Optional[int] = None, max_age_days: Optional[int] = None,
+            dry_run: bool = True, batch_size: Optional[int] = None,
+            pause_seconds: Optional[float] = None, max_seconds: Optional[float] = None) -> Dict:
+        """
+        Apply the retention policy
+
+        Args:
+            keep_versions: Versions to keep per page / page detail (default from config)
+            max_age_days: Keep versions younger than this many days (default from config)
+            dry_run: Only report what would be deleted
+            batch_size: Rows per batch, at most 1000 objects per DeleteObjects call
+            pause_seconds: Sleep between batches (throttling)
+            max_seconds: Stop after this long; the rest is picked up by the next run
+
+        Returns:
+            Report with counts, freed bytes, failures and a sample of object keys
+        """
+        from blueprints.contents.r2_utils import delete_r2_objects, DELETE_OBJECTS_MAX_KEYS
+
+        config = current_app.config
+        policy = ArchiveRetentionService.get_policy(keep_versions, max_age_days)
+        batch_size = min(batch_size or config.get('ARCHIVE_RETENTION_BATCH_SIZE', 1000), DELETE_OBJECTS_MAX_KEYS)
+        pause_seconds = config.get('ARCHIVE_RETENTION_BATCH_PAUSE', 1.0) if pause_seconds is None else pause_seconds
+        max_seconds = config.get('ARCHIVE_RETENTION_MAX_SECONDS', 1800) if max_seconds is None else max_seconds
+
+        started = time.monotonic()
+        expired_ids = ArchiveRetentionService.find_expired_ids(policy['keep_versions'], policy['max_age_days'])
+        expired_set = set(expired_ids)
+
+        report = {
+            'dry_run': dry_run,
+            'policy': policy,
+            'expired_versions': len(expired_ids),
+            'deleted_rows': 0,
+            'deleted_objects': 0,
+            'shared_objects_kept': 0,
+            'freed_bytes': 0,
+            'failed_objects': 0,
+            'errors': [],
+            'sample_object_keys': [],
+            'completed': True,
+        }
+
+        for start in range(0, len(expired_ids), batch_size):
+            if max_seconds and time.monotonic() - started > max_seconds:
+                report['completed'] = False
+                logger.warning(f"[ARCHIVE RETENTION] Time budget reached after {report['deleted_rows']} rows")
+                break
+
+            batch_ids = expired_ids[start:start + batch_size]
+            rows = db.session.query(
+                ArchivedContent.id, ArchivedContent.object_key, ArchivedContent.file_size
+            ).filter(ArchivedContent.id.in_(batch_ids)).all()
+
+            # An object is freed only if every row referencing it has expired
+            sizes = {row.object_key: row.file_size or 0 for row in rows}
+            if not dry_run:
+                # Approvals reusing one of these objects wait (or are waited for) until the commit below
+                ArchiveRetentionService.lock_archive_objects(list(sizes))
+            references = db.session.query(ArchivedContent.id, ArchivedContent.object_key).filter(
+                ArchivedContent.object_key.in_(list(sizes))
+            ).all()
+            freed, shared = split_shared_objects(
+                sizes, [(ref.id, ref.object_key) for ref in references], expired_set
+            )
+
+            report['shared_objects_kept'] += len(shared)
+            if len(report['sample_object_keys']) < SAMPLE_SIZE:
+                report['sample_object_keys'].extend(freed[:SAMPLE_SIZE - len(report['sample_object_keys'])])
+
+            if dry_run:
+                report['deleted_rows'] += len(rows)
+                report['deleted_objects'] += len(freed)
+                report['freed_bytes'] += sum(sizes[key] for key in freed)
+                continue
+
+            errors = delete_r2_objects(freed) if freed else {}
+            deleted_ids = [row.id for row in rows if row.object_key not in errors]
+            if deleted_ids:
+                db.session.query(ArchivedContent).filter(
+                    ArchivedContent.id.in_(deleted_ids)
+                ).delete(synchronize_session=False)
+            db.session.commit()  # Also releases the object locks
+
+            report['deleted_rows'] += len(deleted_ids)
+            report['deleted_objects'] += len(freed) - len(errors)
+            report['freed_bytes'] += sum(sizes[key] for key in freed if key not in errors)
+            report['failed_objects'] += len(errors)
+            for key, error in list(errors.items())[:max(0, SAMPLE_SIZE - len(report['errors']))]:
+                report['errors'].append({'object_key': key, 'error': error})
+
+            if pause_seconds and start + batch_size < len(expired_ids):
+                time.sleep(pause_seconds)
+
+        report['duration_ms'] = round((time.monotonic() - started) * 1000)
+        logger.info(
+            f"[ARCHIVE RETENTION] {'Dry run' if dry_run else 'Run'}: {report['expired_versions']} expired, "
+            f"{report['deleted_rows']} rows / {report['deleted_objects']} objects "
+            f"({report['freed_bytes']} bytes), {report['failed_objects']} failed in {report['duration_ms']}ms"
+        )
+        return report
+
+
+def scheduled_archive_retention(app):
+    """APScheduler entry point (runs outside any request, so push an app context)"""
+    with app.app_context():
+        try:
+            ArchiveRetentionService.run(dry_run=False)
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"[ARCHIVE RETENTION] Nightly run failed: {str(e)}", exc_info=True)
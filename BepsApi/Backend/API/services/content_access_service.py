@@ -0,0 +1,294 @@
+"""
+Content Access Service
+
+What a (non-admin) user may see follows from their content_manager rows,
+reached through assignees.user_id:
+- 'channel' assignments: every folder of the channel
+- 'folder' assignments: the folder and all its subfolders
+- 'file' assignments: the page
+plus the pages in accessible folders and the details of accessible pages.
+
+The sets are computed with one recursive CTE and cached per user in Redis as
+integer SETs (stored compactly as intsets when small), so permission checks
+are a SISMEMBER instead of walking the hierarchy. Each cached set is stamped
+with the hierarchy version (services.hierarchy_cache) and the user's own
+access version, so it is recomputed after changes to the hierarchy itself or
+to that user's content_manager / assignees rows, not other users'. The
+session hooks at the bottom track the affected users; bulk statements on
+those tables advance every user's version.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import ContentManager, Assignees
+from services.hierarchy_cache import VERSION_KEY, get_hierarchy_versions
+
+KEY_PREFIX = 'content:access'
+KINDS = ('channels', 'folders', 'pages', 'details')
+USER_VERSIONS_KEY = 'content:access:user_versions'  # Hash of user id -> access version ('*' = every user)
+ALL_USERS = '*'
+
+DEFAULT_TTL = 3600  # Unused sets expire; current ones are rewritten on the next version change
+
+ACCESS_SET_SQL = text("""
+WITH RECURSIVE assigned AS (
+    SELECT cm.type, cm.channel_id, cm.folder_id, cm.file_id
+    FROM content_manager cm
+    JOIN assignees a ON a.id = cm.assignee_id
+    WHERE a.user_id = :user_id
+),
+folder_tree(id) AS (
+    SELECT f.id
+    FROM content_rel_folders f
+    JOIN assigned ON (assigned.type = 'folder' AND f.id = assigned.folder_id)
+                  OR (assigned.type = 'channel' AND f.parent_id IS NULL AND f.channel_id = assigned.channel_id)
+    WHERE f.is_deleted = false
+    UNION
+    SELECT child.id
+    FROM content_rel_folders child
+    JOIN folder_tree ON child.parent_id = folder_tree.id
+    WHERE child.is_deleted = false
+),
+page_set AS (
+    SELECT p.id, p.folder_id
+    FROM content_rel_pages p
+    WHERE p.is_deleted = false
+      AND (p.folder_id IN (SELECT id FROM folder_tree)
+           OR p.id IN (SELECT file_id FROM assigned WHERE type = 'file'))
+)
+SELECT 'folders' AS kind, id FROM folder_tree
+UNION ALL
+SELECT 'pages', id FROM page_set
+UNION ALL
+SELECT 'details', d.id
+FROM content_rel_page_details d
+WHERE d.is_deleted = false AND d.page_id IN (SELECT id FROM page_set)
+UNION ALL
+SELECT DISTINCT 'channels', top.channel_id
+FROM content_folder_closure c
+JOIN content_rel_folders top ON top.id = c.ancestor_id AND top.parent_id IS NULL
+JOIN content_rel_channels ch ON ch.id = top.channel_id AND ch.is_deleted = false
+WHERE c.descendant_id IN (SELECT id FROM folder_tree UNION SELECT folder_id FROM page_set)
+""")
+
+
+def _config(name: str, default):
+    """Read an app config value, falling back to the default outside an app context"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            return current_app.config.get(name, default)
+    except ImportError:
+        pass
+    return default
+
+
+def _key(user_id: str, kind: str) -> str:
+    return f"{KEY_PREFIX}:{user_id}:{kind}"
+
+
+def _read_stamps(user_id: str):
+    """
+    Current stamp of the user's sets and the stamp stored with the cached sets
+
+    One round trip: the hierarchy version plus the user's and the all-users
+    access versions. Raises if Redis is unavailable.
+    """
+    from extensions import redis_client
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(VERSION_KEY)
+    pipe.hmget(USER_VERSIONS_KEY, str(user_id), ALL_USERS)
+    pipe.get(_key(user_id, 'stamp'))
+    version, (user_version, all_version), cached = pipe.execute()
+
+    if version is None:
+        versions = get_hierarchy_versions()  # Seeds the counter
+        if versions is None:
+            return None, cached
+        version = versions.version
+    return f"{version}:{user_version or 0}:{all_version or 0}", cached
+
+
+def bump_access_versions(user_ids: Optional[Iterable[str]] = None) -> None:
+    """
+    Advance the access version of users whose assignments changed
+
+    Args:
+        user_ids: Users.id values; None advances every user
+    """
+    fields = [ALL_USERS] if user_ids is None else [str(user_id) for user_id in set(user_ids)]
+    try:
+        from extensions import redis_client
+        pipe = redis_client.pipeline(transaction=True)
+        for field in fields:
+            pipe.hincrby(USER_VERSIONS_KEY, field, 1)
+        pipe.execute()
+    except Exception as e:
+        logging.warning(f"[CONTENT ACCESS] Failed to bump access versions: {str(e)}")
+
+
+class ContentAccessService:
+    """Per-user accessible channel / folder / page / detail id sets"""
+
+    @staticmethod
+    def compute_access_set(user_id: str) -> Dict[str, Set[int]]:
+        """
+        Accessible ids straight from the database (one query)
+
+        Args:
+            user_id: Users.id of the user
+
+        Returns:
+            {'channels': set, 'folders': set, 'pages': set, 'details': set}
+        """
+        access = {kind: set() for kind in KINDS}
+        for row in db.session.execute(ACCESS_SET_SQL, {'user_id': str(user_id)}):
+            if row.id is not None:
+                access[row.kind].add(row.id)
+        return access
+
+    @staticmethod
+    def _ensure_cached(user_id: str) -> Optional[Dict[str, Set[int]]]:
+        """
+        Make sure Redis holds the user's current sets
+
+        Returns:
+            The freshly computed sets when they had to be (re)built, None when
+            the cached sets were already current. Raises if Redis is unavailable.
+        """
+        from extensions import redis_client
+
+        stamp, cached_stamp = _read_stamps(user_id)
+        if stamp is not None and cached_stamp == stamp:
+            return None
+
+        access = ContentAccessService.compute_access_set(user_id)
+        if stamp is None:
+            return access  # versions unavailable: don't cache what can't be invalidated
+
+        ttl = _config('CONTENT_ACCESS_TTL', DEFAULT_TTL)
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.delete(*[_key(user_id, kind) for kind in KINDS])
+        for kind in KINDS:
+            if access[kind]:
+                pipe.sadd(_key(user_id, kind), *access[kind])
+                pipe.expire(_key(user_id, kind), ttl)
+        pipe.set(_key(user_id, 'stamp'), stamp, ex=ttl)
+        pipe.execute()
+        return access
+
+    @staticmethod
+    def get_access_set(user_id: str) -> Dict[str, Set[int]]:
+        """
+        The user's accessible ids, from cache while current
+
+        Args:
+            user_id: Users.id of the user
+
+        Returns:
+            {'channels': set, 'folders': set, 'pages': set, 'details': set}
+        """
+        try:
+            access = ContentAccessService._ensure_cached(user_id)
+            if access is not None:
+                return access
+            from extensions import redis_client
+            pipe = redis_client.pipeline(transaction=False)
+            for kind in KINDS:
+                pipe.smembers(_key(user_id, kind))
+            return {kind: {int(value) for value in members} for kind, members in zip(KINDS, pipe.execute())}
+        except Exception as e:
+            logging.warning(f"[CONTENT ACCESS] Cache unavailable for user {user_id}: {str(e)}")
+            return ContentAccessService.compute_access_set(user_id)
+
+    @staticmethod
+    def has_access(user_id: str, kind: str, item_id: int) -> bool:
+        """
+        Whether the user may access one channel / folder / page / detail
+
+        Args:
+            user_id: Users.id of the user
+            kind: 'channels', 'folders', 'pages' or 'details'
+            item_id: Id to check
+
+        Returns:
+            True if the id is in the user's access set
+        """
+        try:
+            access = ContentAccessService._ensure_cached(user_id)
+            if access is not None:
+                return int(item_id) in access[kind]
+            from extensions import redis_client
+            return bool(redis_client.sismember(_key(user_id, kind), int(item_id)))
+        except Exception as e:
+            logging.warning(f"[CONTENT ACCESS] Cache unavailable for user {user_id}: {str(e)}")
+            return int(item_id) in ContentAccessService.compute_access_set(user_id)[kind]
+
+    @staticmethod
+    def invalidate(user_ids: Iterable[str]) -> None:
+        """Drop cached sets (they are also replaced automatically when versions move)"""
+        try:
+            from extensions import redis_client
+            keys = [_key(user_id, kind) for user_id in user_ids for kind in KINDS + ('stamp',)]
+            if keys:
+                redis_client.delete(*keys)
+        except Exception as e:
+            logging.warning(f"[CONTENT ACCESS] Failed to invalidate: {str(e)}")
+
+
+# ---- Change tracking ----
+
+def _values(state, attribute: str) -> set:
+    """Current and previous (pre-flush) values of an attribute"""
+    history = state.attrs[attribute].history
+    return {value for value in list(history.added) + list(history.unchanged) + list(history.deleted)
+            if value is not None}
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_access_changes(session, flush_context, instances):
+    if session.info.get('content_access_all'):
+        return
+    user_ids, assignee_ids = set(), set()
+    for obj in list(session.new) + list(session.deleted) + list(session.dirty):
+        if isinstance(obj, Assignees):
+            user_ids |= _values(inspect(obj), 'user_id')
+        elif isinstance(obj, ContentManager):
+            assignee_ids |= _values(inspect(obj), 'assignee_id')
+    if assignee_ids:
+        # Core statement on the flush's connection: no autoflush, same transaction
+        user_ids |= set(session.connection().execute(
+            select(Assignees.user_id).where(Assignees.id.in_(assignee_ids))
+        ).scalars())
+    user_ids.discard(None)
+    if user_ids:
+        session.info.setdefault('content_access_users', set()).update(user_ids)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_access_bulk_changes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, (ContentManager, Assignees)):
+        orm_execute_state.session.info['content_access_all'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_access_changes(session):
+    user_ids = session.info.pop('content_access_users', set())
+    if session.info.pop('content_access_all', False):
+        bump_access_versions()
+    elif user_ids:
+        bump_access_versions(user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_access_changes(session):
+    session.info.pop('content_access_users', None)
+    session.info.pop('content_access_all', None)
@@ -0,0 +1,215 @@
+"""
+Content Flag Reconciler
+
+Keeps the persisted has_content flags on content_rel_pages and
+content_rel_page_details in line with what is actually stored in R2:
+- Loads channels/folders/pages/details with column-only queries
+- Streams one R2 listing per channel prefix (iter_r2_objects)
+- Bulk-updates only the rows whose flag drifted
+
+Routes set the flag transactionally when content is approved/confirmed;
+this job corrects anything that changed outside those paths.
+"""
+
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from extensions import db
+from models import ContentRelChannels, ContentRelFolders, ContentRelPages, ContentRelPageDetails
+from services.hierarchy_cache import mark_hierarchy_changed
+from services.r2_existence_index import build_stem_map, find_in_stem_map
+from services.r2_storage_service import (
+    PAGE_EXTENSIONS, DETAIL_EXTENSIONS, PAGE_DETAIL_FILE_EXTENSIONS, _stem_candidates
+)
+from utils.r2_paths import safe_name
+
+UPDATE_BATCH_SIZE = 500
+
+
+def _build_folder_paths(channels: Dict[int, str], folders: Dict[int, tuple]) -> Dict[int, Tuple[int, str]]:
+    """
+    Resolve every folder to (channel_id, "Channel/Folder/Sub") in memory
+
+    Follows the same rules as generate_r2_object_key: walk parents until a
+    top-level folder, then prepend its channel.
+    """
+    paths: Dict[int, Tuple[int, str]] = {}
+
+    def resolve(folder_id: int) -> Optional[Tuple[int, str]]:
+        if folder_id in paths:
+            return paths[folder_id]
+
+        components = []
+        channel_id = None
+        current_id = folder_id
+        seen = set()
+        while current_id is not None and current_id not in seen:
+            seen.add(current_id)
+            folder = folders.get(current_id)
+            if folder is None:
+                break
+            parent_id, folder_channel_id, name = folder
+            components.append(safe_name(name))
+            if parent_id is None:
+                channel_name = channels.get(folder_channel_id)
+                if channel_name is not None:
+                    components.append(safe_name(channel_name))
+                    channel_id = folder_channel_id
+                break
+            current_id = parent_id
+
+        if channel_id is None:
+            return None
+        components.reverse()
+        paths[folder_id] = (channel_id, '/'.join(components))
+        return paths[folder_id]
+
+    for folder_id in folders:
+        resolve(folder_id)
+    return paths
+
+
+def _bulk_set_flag(model, ids: List[int], value: bool) -> None:
+    """UPDATE ... SET has_content = value WHERE id IN (...) in batches"""
+    for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+        batch = ids[start:start + UPDATE_BATCH_SIZE]
+        db.session.query(model).filter(model.id.in_(batch)).update(
+            {model.has_content: value}, synchronize_session=False
+        )
+
+
+def reconcile_has_content(dry_run: bool = False) -> Dict[str, int]:
+    """
+    Recompute has_content for every page and page detail from R2 listings
+
+    Channels whose listing fails are skipped, so an R2 outage never flips
+    flags to False.
+
+    Args:
+        dry_run: Only report the drift, don't write it
+
+    Returns:
+        Counters describing what was checked and corrected
+    """
+    started = time.monotonic()
+
+    channels = {
+        row.id: row.name for row in db.session.query(
+            ContentRelChannels.id, ContentRelChannels.name
+        ).filter(ContentRelChannels.is_deleted == False).all()
+    }
+    folders = {
+        row.id: (row.parent_id, row.channel_id, row.name) for row in db.session.query(
+            ContentRelFolders.id, ContentRelFolders.parent_id,
+            ContentRelFolders.channel_id, ContentRelFolders.name
+        ).filter(ContentRelFolders.is_deleted == False).all()
+    }
+    pages = db.session.query(
+        ContentRelPages.id, ContentRelPages.folder_id, ContentRelPages.name, ContentRelPages.has_content
+    ).filter(ContentRelPages.is_deleted == False).all()
+    details = db.session.query(
+        ContentRelPageDetails.id, ContentRelPageDetails.page_id,
+        ContentRelPageDetails.name, ContentRelPageDetails.has_content
+    ).filter(ContentRelPageDetails.is_deleted == False).all()
+
+    folder_paths = _build_folder_paths(channels, folders)
+
+    details_by_page: Dict[int, list] = {}
+    for detail in details:
+        details_by_page.setdefault(detail.page_id, []).append(detail)
+
+    # One paginated listing per channel that actually has pages
+    stem_maps: Dict[int, Dict[str, List[str]]] = {}
+    channel_prefixes: Dict[int, str] = {}
+    for page in pages:
+        resolved = folder_paths.get(page.folder_id)
+        if resolved is None:
+            continue
+        channel_id = resolved[0]
+        if channel_id not in channel_prefixes:
+            channel_prefixes[channel_id] = safe_name(channels[channel_id]) + '/'
+
+    from blueprints.contents.r2_utils import iter_r2_objects
+
+    failed_channels = set()
+    for channel_id, channel_prefix in channel_prefixes.items():
+        try:
+            # Streamed: only the stem map is kept, not the raw listing
+            stem_maps[channel_id] = build_stem_map(channel_prefix, iter_r2_objects(channel_prefix))
+        except Exception as e:
+            failed_channels.add(channel_id)
+            logging.error(f"[RECONCILE] Failed to list R2 prefix {channel_prefix}: {str(e)}")
+
+    page_updates = {True: [], False: []}
+    detail_updates = {True: [], False: []}
+    changed_channels = set()
+    checked_pages = 0
+
+    for page in pages:
+        resolved = folder_paths.get(page.folder_id)
+        if resolved is None or resolved[0] in failed_channels:
+            continue
+        channel_id, folder_path = resolved
+        stem_map = stem_maps[channel_id]
+
+        # Stems are relative to the channel prefix: "Folder/Sub/<page stem>"
+        relative_folder = folder_path.split('/', 1)[1] if '/' in folder_path else ''
+        base = f"{relative_folder}/" if relative_folder else ''
+        safe_page_name = safe_name(page.name or f"file_{page.id}")
+        page_folder = f"{base}{os.path.splitext(safe_page_name)[0]}"
+
+        page_exists = find_in_stem_map(
+            stem_map, [f"{base}{stem}" for stem in _stem_candidates(safe_page_name)], PAGE_EXTENSIONS
+        ) is not None
+
+        for detail in details_by_page.get(page.id, []):
+            detail_stems = [f"{page_folder}/{stem}"
+                            for stem in _stem_candidates(safe_name(detail.name or f"detail_{detail.id}"))]
+            detail_exists = find_in_stem_map(stem_map, detail_stems, DETAIL_EXTENSIONS) is not None
+            if bool(detail.has_content) != detail_exists:
+                detail_updates[detail_exists].append(detail.id)
+                changed_channels.add(channel_id)
+            # Page-level fallback only counts non-image detail files (same as check_page_content_exists)
+            if not page_exists and find_in_stem_map(stem_map, detail_stems, PAGE_DETAIL_FILE_EXTENSIONS):
+                page_exists = True
+
+        if bool(page.has_content) != page_exists:
+            page_updates[page_exists].append(page.id)
+            changed_channels.add(channel_id)
+        checked_pages += 1
+
+    if not dry_run:
+        # Bulk updates bypass change tracking; only the drifted channels' cached hierarchy goes stale
+        mark_hierarchy_changed(db.session, changed_channels)
+        for value, ids in page_updates.items():
+            _bulk_set_flag(ContentRelPages, ids, value)
+        for value, ids in detail_updates.items():
+            _bulk_set_flag(ContentRelPageDetails, ids, value)
+        db.session.commit()
+
+    result = {
+        'checked_pages': checked_pages,
+        'checked_details': len(details),
+        'pages_set_true': len(page_updates[True]),
+        'pages_set_false': len(page_updates[False]),
+        'details_set_true': len(detail_updates[True]),
+        'details_set_false': len(detail_updates[False]),
+        'failed_channels': len(failed_channels),
+    }
+    logging.info(
+        f"[RECONCILE] has_content {'dry-run' if dry_run else 'done'} in "
+        f"{time.monotonic() - started:.1f}s: {result}"
+    )
+    return result
+
+
+def scheduled_reconcile_has_content(app):
+    """APScheduler entry point (runs outside any request, so push an app context)"""
+    with app.app_context():
+        try:
+            reconcile_has_content()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"[RECONCILE] has_content reconcile failed: {str(e)}", exc_info=True)
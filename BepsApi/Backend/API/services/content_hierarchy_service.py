@@ -1,11 +1,20 @@
 import logging
 import os
 import uuid
+import time
 import datetime
-from models import ContentRelChannels, ContentRelFolders, ContentRelPages, ContentRelPageDetails, ContentManager
+from flask import current_app
+from models import (
+    ContentRelChannels, ContentRelFolders, ContentRelPages, ContentRelPageDetails, ContentManager,
+    Assignees, PendingContent, ContentFolderClosure
+)
 from extensions import db, cache
 from typing import Dict, List, Optional, Tuple, Any
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, select
+from services.folder_closure import get_folder_ancestry, get_descendant_folder_ids, channel_folder_ids
+from services.hierarchy_cache import HierarchyVersions, get_hierarchy_versions, bump_hierarchy_versions
+from services.content_access_service import ContentAccessService
+from services.shared_cache import cached_or_build, acquire_rebuild_lock, release_rebuild_lock, wait_for_rebuild
 
 class ContentHierarchyService:
     """
@@ -20,40 +29,169 @@ class ContentHierarchyService:
     
     CACHE_TTL = 3600  # Cache time to live (1 hour)
     CACHE_KEY_HIERARCHY = 'content_hierarchy'
+    CACHE_KEY_CHANNEL_PREFIX = 'content_hierarchy:channel:'
+    CACHE_KEY_MANAGERS = 'content_hierarchy:managers'
+    CACHE_KEY_STATUS_PREFIX = 'content_hierarchy:status:channel:'
     CACHE_KEY_PATH_PREFIX = 'content_path_'
     
     def __init__(self):
         """Initialize the service"""
         pass
         
-    def get_full_hierarchy(self, use_cache: bool = True) -> Dict[str, Any]:
+    def get_full_hierarchy(self, use_cache: bool = True,
+                           versions: Optional[HierarchyVersions] = None) -> Dict[str, Any]:
         """
         Build and return the complete channel > folder > page > page detail hierarchy
         
+        Cached entries carry the hierarchy version they were built at. When
+        the version moved, only the channels whose own version moved are
+        rebuilt; the other channel subtrees come from cache. Rebuilds are
+        single-flight across workers (services.shared_cache).
+        
         Args:
             use_cache: Whether to use cached data (if available)
+            versions: Versions read by the caller (e.g. for the ETag); read here if omitted
             
         Returns:
             Dict representing the complete hierarchy
         """
-        # Try to get from cache first if requested
-        if use_cache:
-            cached_hierarchy = cache.get(self.CACHE_KEY_HIERARCHY)
-            if cached_hierarchy:
-                return cached_hierarchy
-                
-        # Build hierarchy
-        hierarchy = self._build_hierarchy()
+        if not use_cache:
+            return self._build_hierarchy()
+        
+        versions = versions or get_hierarchy_versions()
+        if versions is None:
+            # Redis unavailable: no way to tell whether cached data is current
+            return self._build_hierarchy()
+        
+        # One process rebuilds after a version change; the rest wait for its result
+        entry = cached_or_build(
+            cache, self.CACHE_KEY_HIERARCHY,
+            build=lambda: {'version': versions.version, 'hierarchy': self._assemble_hierarchy(versions)},
+            ttl=self.CACHE_TTL,
+            is_current=lambda value: value.get('version') == versions.version,
+            should_cache=lambda value: 'error' not in value['hierarchy']
+        )
+        return entry['hierarchy']
+    
+    def _assemble_hierarchy(self, versions: HierarchyVersions) -> Dict[str, Any]:
+        """
+        Full hierarchy from the channel list and the (cached) channel subtrees
+        
+        Args:
+            versions: Current hierarchy versions
+            
+        Returns:
+            Dict representing the complete hierarchy
+        """
+        try:
+            channels = db.session.query(
+                ContentRelChannels.id, ContentRelChannels.name
+            ).filter(ContentRelChannels.is_deleted == False).order_by(ContentRelChannels.id).all()
+            
+            subtrees = self._get_channel_subtrees([channel.id for channel in channels], versions)
+            return {
+                'channels': [
+                    {
+                        'id': channel.id,
+                        'name': channel.name,
+                        'type': 'channel',
+                        'folders': subtrees[channel.id]
+                    }
+                    for channel in channels
+                ],
+                'timestamp': datetime.datetime.now().isoformat()
+            }
+        except Exception as e:
+            logging.error(f"Error building content hierarchy: {str(e)}")
+            return {
+                'channels': [],
+                'error': str(e)
+            }
+    
+    def _get_channel_subtrees(self, channel_ids: List[int],
+                              versions: HierarchyVersions) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Top-level folder trees of the given channels, rebuilding only stale ones
+        
+        Each stale channel is rebuilt by one process at a time (Redis lock);
+        channels another process is already rebuilding are waited for.
+        
+        Args:
+            channel_ids: Channels to return
+            versions: Current hierarchy versions
+            
+        Returns:
+            Dict mapping channel ID to its list of top-level folder nodes
+        """
+        if not channel_ids:
+            return {}
         
-        # Cache for future requests
-        cache.set(self.CACHE_KEY_HIERARCHY, hierarchy, timeout=self.CACHE_TTL)
+        subtrees = self._read_channel_subtrees(channel_ids, versions)
+        stale = [channel_id for channel_id in channel_ids if channel_id not in subtrees]
+        if not stale:
+            return subtrees
         
-        return hierarchy
+        tokens = {
+            channel_id: acquire_rebuild_lock(f"{self.CACHE_KEY_CHANNEL_PREFIX}{channel_id}")
+            for channel_id in stale
+        }
+        mine = [channel_id for channel_id in stale if tokens[channel_id]]
+        try:
+            if mine:
+                subtrees.update(self._store_channel_subtrees(mine, versions))
+        finally:
+            for channel_id in mine:
+                release_rebuild_lock(f"{self.CACHE_KEY_CHANNEL_PREFIX}{channel_id}", tokens[channel_id])
+        
+        waiting = [channel_id for channel_id in stale if not tokens[channel_id]]
+        if waiting:
+            def read_waiting():
+                found = self._read_channel_subtrees(waiting, versions)
+                return found if len(found) == len(waiting) else None
+            
+            found = wait_for_rebuild(f"{self.CACHE_KEY_CHANNEL_PREFIX}{waiting[0]}", read_waiting) or {}
+            subtrees.update(found)
+            leftover = [channel_id for channel_id in waiting if channel_id not in found]
+            if leftover:
+                subtrees.update(self._store_channel_subtrees(leftover, versions))
+        
+        return subtrees
+    
+    def _read_channel_subtrees(self, channel_ids: List[int],
+                               versions: HierarchyVersions) -> Dict[int, List[Dict[str, Any]]]:
+        """Cached subtrees that match their channel's current version (one round trip)"""
+        keys = [f"{self.CACHE_KEY_CHANNEL_PREFIX}{channel_id}" for channel_id in channel_ids]
+        return {
+            channel_id: entry['folders']
+            for channel_id, entry in zip(channel_ids, cache.get_many(*keys))
+            if isinstance(entry, dict) and entry.get('version') == versions.channel(channel_id)
+        }
+    
+    def _store_channel_subtrees(self, channel_ids: List[int],
+                                versions: HierarchyVersions) -> Dict[int, List[Dict[str, Any]]]:
+        """Build subtrees for these channels and cache them under their versions"""
+        built = self._build_channel_subtrees(channel_ids)
+        subtrees = {channel_id: built.get(channel_id, []) for channel_id in channel_ids}
+        cache.set_many({
+            f"{self.CACHE_KEY_CHANNEL_PREFIX}{channel_id}": {
+                'version': versions.channel(channel_id),
+                'folders': folders
+            }
+            for channel_id, folders in subtrees.items()
+        }, timeout=self.CACHE_TTL)
+        logging.debug(f"Rebuilt hierarchy for channels {channel_ids}")
+        return subtrees
     
     def clear_hierarchy_cache(self) -> None:
-        """Clear all cached hierarchy data"""
+        """
+        Mark every cached channel subtree stale
+        
+        Committed changes to channels, folders, pages and page details already
+        advance the versions of the affected channels (services.hierarchy_cache);
+        this is for changes made outside the ORM, e.g. directly in the database.
+        """
+        bump_hierarchy_versions()
         cache.delete(self.CACHE_KEY_HIERARCHY)
-        # Future enhancement: Could selectively clear specific paths
     
     clear_cache = clear_hierarchy_cache  # Alias for backward compatibility
     
@@ -121,14 +259,19 @@ class ContentHierarchyService:
             - ids: Dict mapping each level to its ID
             - file_type: 'page' or 'page_detail'
         """
-        cache_key = f"{self.CACHE_KEY_PATH_PREFIX}{file_id}"
-        
-        # Try cache first if requested
-        if use_cache:
-            cached_path = cache.get(cache_key)
-            if cached_path:
-                return cached_path
-        
+        if not use_cache:
+            return self._build_file_path(file_id)
+        
+        # Shared cache entry, rebuilt by one process at a time
+        return cached_or_build(
+            cache, f"{self.CACHE_KEY_PATH_PREFIX}{file_id}",
+            build=lambda: self._build_file_path(file_id),
+            ttl=self.CACHE_TTL,
+            should_cache=lambda value: value is not None
+        )
+    
+    def _build_file_path(self, file_id: int) -> Optional[Dict[str, Any]]:
+        """Resolve the path of a page or page detail (see get_file_path)"""
         # Start with checking if it's a page
         page = ContentRelPages.query.filter_by(id=file_id, is_deleted=False).first()
         
@@ -159,74 +302,51 @@ class ContentHierarchyService:
         
         ids['folder'] = folder_id
         
-        # Traverse the folder hierarchy
-        while folder_id is not None:
-            folder = ContentRelFolders.query.filter_by(id=folder_id, is_deleted=False).first()
-            if not folder:
-                break
-                
-            path_components.append(folder.name)
-            
-            if folder.parent_id is None:
-                # Top-level folder, get the channel
-                channel = ContentRelChannels.query.filter_by(id=folder.channel_id, is_deleted=False).first()
-                if channel:
-                    path_components.append(channel.name)
-                    ids['channel'] = channel.id
-                break
-                
-            folder_id = folder.parent_id
+        # Folder ancestry and channel in one query (closure table)
+        ancestry = get_folder_ancestry(folder_id)
+        path_components.extend(folder['name'] for folder in reversed(ancestry['folders']))
+        if ancestry['channel']:
+            path_components.append(ancestry['channel']['name'])
+            ids['channel'] = ancestry['channel']['id']
         
         # Reverse to get root -> file order
         path_components.reverse()
         
-        result = {
+        return {
             'path_components': path_components,
             'ids': ids,
             'path_string': '/'.join(path_components),
             'file_type': file_type
         }
-        
-        # Cache result
-        cache.set(cache_key, result, timeout=self.CACHE_TTL)
-        
-        return result
     
     def _build_hierarchy(self) -> Dict[str, Any]:
         """
         Build the complete hierarchy as a nested dictionary
         
+        Loads channels, folders, pages and page details with one column-only
+        query each and assembles the tree in memory, so the number of queries
+        stays at four however large the hierarchy grows.
+        
         Returns:
             Dict containing the complete hierarchy tree
         """
         try:
-            # Start with channels
-            channels = ContentRelChannels.query.filter_by(is_deleted=False).all()
+            channels = db.session.query(
+                ContentRelChannels.id, ContentRelChannels.name
+            ).filter(ContentRelChannels.is_deleted == False).order_by(ContentRelChannels.id).all()
             
-            hierarchy = []
+            subtrees = self._build_channel_subtrees()
             
-            for channel in channels:
-                channel_node = {
+            hierarchy = [
+                {
                     'id': channel.id,
                     'name': channel.name,
                     'type': 'channel',
-                    'folders': []
+                    'folders': subtrees.get(channel.id, [])
                 }
-                
-                # Get top-level folders for this channel
-                top_folders = ContentRelFolders.query.filter_by(
-                    channel_id=channel.id,
-                    parent_id=None,
-                    is_deleted=False
-                ).all()
-                
-                # Process each top folder and its children
-                for folder in top_folders:
-                    folder_node = self._build_folder_simple(folder)
-                    channel_node['folders'].append(folder_node)
-                    
-                hierarchy.append(channel_node)
-                
+                for channel in channels
+            ]
+            
             return {
                 'channels': hierarchy,
                 'timestamp': datetime.datetime.now().isoformat()
@@ -239,71 +359,89 @@ class ContentHierarchyService:
                 'error': str(e)
             }
     
-    def _build_folder_simple(self, folder) -> Dict[str, Any]:
+    def _build_channel_subtrees(self, channel_ids: Optional[List[int]] = None) -> Dict[int, List[Dict[str, Any]]]:
         """
-        Build folder structure with simple content checks (no complex R2 validation)
+        Build the folder > page > page detail trees under channels
+        
+        Three column-only queries (folders, pages, page details) whatever the
+        size; with channel_ids they are limited to those channels' folders
+        through the closure table.
         
         Args:
-            folder: ContentRelFolders instance to process
+            channel_ids: Channels to build (None = every channel)
             
         Returns:
-            Dict representing the folder and its contents
-        """
-        folder_node = {
-            'id': folder.id,
-            'name': folder.name,
-            'type': 'folder',
-            'subfolders': [],
-            'pages': []
-        }
-        
-        # Get subfolders
-        subfolders = ContentRelFolders.query.filter_by(
-            parent_id=folder.id,
-            is_deleted=False
-        ).all()
-        
-        # Process each subfolder recursively
-        for subfolder in subfolders:
-            subfolder_node = self._build_folder_simple(subfolder)
-            folder_node['subfolders'].append(subfolder_node)
-        
-        # Get pages in this folder
-        pages = ContentRelPages.query.filter_by(
-            folder_id=folder.id,
-            is_deleted=False
-        ).all()
-        
-        # Add pages with their details (simple content check)
+            Dict mapping channel ID to its list of top-level folder nodes
+        """
+        folder_query = db.session.query(
+            ContentRelFolders.id, ContentRelFolders.parent_id,
+            ContentRelFolders.channel_id, ContentRelFolders.name
+        ).filter(ContentRelFolders.is_deleted == False)
+        page_query = db.session.query(
+            ContentRelPages.id, ContentRelPages.folder_id, ContentRelPages.name,
+            ContentRelPages.object_id, ContentRelPages.has_content
+        ).filter(ContentRelPages.is_deleted == False)
+        detail_query = db.session.query(
+            ContentRelPageDetails.id, ContentRelPageDetails.page_id, ContentRelPageDetails.name,
+            ContentRelPageDetails.object_id, ContentRelPageDetails.has_content
+        ).filter(ContentRelPageDetails.is_deleted == False)
+        
+        if channel_ids is not None:
+            scope = channel_folder_ids(channel_ids)
+            folder_query = folder_query.filter(ContentRelFolders.id.in_(scope))
+            page_query = page_query.filter(ContentRelPages.folder_id.in_(scope))
+            detail_query = detail_query.join(
+                ContentRelPages, ContentRelPages.id == ContentRelPageDetails.page_id
+            ).filter(ContentRelPages.folder_id.in_(scope))
+        
+        folders = folder_query.order_by(ContentRelFolders.id).all()
+        pages = page_query.order_by(ContentRelPages.id).all()
+        details = detail_query.order_by(ContentRelPageDetails.id).all()
+        
+        # Page details grouped by page
+        details_by_page: Dict[int, List[Dict[str, Any]]] = {}
+        for detail in details:
+            details_by_page.setdefault(detail.page_id, []).append({
+                'id': detail.id,
+                'name': detail.name,
+                'type': 'page_detail',
+                'object_id': detail.object_id,
+                'page_id': detail.page_id,
+                'has_content': bool(detail.has_content)
+            })
+        
+        # Pages grouped by folder
+        pages_by_folder: Dict[int, List[Dict[str, Any]]] = {}
         for page in pages:
-            # Get page details for this page
-            page_details = ContentRelPageDetails.query.filter_by(
-                page_id=page.id,
-                is_deleted=False
-            ).all()
-            
-            page_node = {
+            pages_by_folder.setdefault(page.folder_id, []).append({
                 'id': page.id,
                 'name': page.name,
                 'type': 'page',
                 'object_id': page.object_id,
-                'has_content': bool(page.object_id and page.object_id.strip()),
-                'details': [
-                    {
-                        'id': detail.id,
-                        'name': detail.name,
-                        'type': 'page_detail',
-                        'object_id': detail.object_id,
-                        'page_id': detail.page_id,
-                        'has_content': bool(detail.object_id and detail.object_id.strip())
-                    }
-                    for detail in page_details
-                ]
+                'has_content': bool(page.has_content),
+                'details': details_by_page.get(page.id, [])
+            })
+        
+        # Folder nodes by id, then link each one to its parent (or channel if top-level).
+        # Folders under a deleted parent stay unreachable, as before.
+        folder_nodes: Dict[int, Dict[str, Any]] = {
+            folder.id: {
+                'id': folder.id,
+                'name': folder.name,
+                'type': 'folder',
+                'subfolders': [],
+                'pages': pages_by_folder.get(folder.id, [])
             }
-            
-            folder_node['pages'].append(page_node)
+            for folder in folders
+        }
+        top_folders_by_channel: Dict[int, List[Dict[str, Any]]] = {}
+        for folder in folders:
+            if folder.parent_id is None:
+                top_folders_by_channel.setdefault(folder.channel_id, []).append(folder_nodes[folder.id])
+            elif folder.parent_id in folder_nodes:
+                folder_nodes[folder.parent_id]['subfolders'].append(folder_nodes[folder.id])
         
-        return folder_node
+        return top_folders_by_channel
 
     def _safe_check_content_exists(self, item) -> bool:
         """
@@ -342,13 +480,18 @@ class ContentHierarchyService:
             for channel in channels
         ]
         
-    def get_channel_hierarchy(self, channel_id: int, filters: Dict[str, bool] = None) -> Dict[str, Any]:
+    def get_channel_hierarchy(self, channel_id: int, filters: Dict[str, bool] = None,
+                              versions: Optional[HierarchyVersions] = None) -> Dict[str, Any]:
         """
         Get hierarchy for a specific channel, with optional filtering
         
+        Only this channel's subtree is read (from cache while its version is
+        unchanged), not the full hierarchy.
+        
         Args:
             channel_id: ID of the channel
             filters: Dict of filter flags (e.g. {'all': True, 'reviewing': True})
+            versions: Versions read by the caller (e.g. for the ETag); read here if omitted
             
         Returns:
             Dict containing the filtered hierarchy for this channel
@@ -357,148 +500,344 @@ class ContentHierarchyService:
         if not filters:
             filters = {'all': True}
             
-        # Get the full hierarchy (potentially from cache)
-        full_hierarchy = self.get_full_hierarchy()
+        # Only this channel's subtree (empty for unknown or deleted channels)
+        versions = versions or get_hierarchy_versions()
+        if versions is None:
+            folders = self._build_channel_subtrees([channel_id]).get(channel_id, [])
+        else:
+            folders = self._get_channel_subtrees([channel_id], versions)[channel_id]
         
-        # Find the specific channel
-        channel_data = None
-        for channel in full_hierarchy.get('channels', []):
-            if channel.get('id') == channel_id:
-                channel_data = channel
-                break
-                
-        if not channel_data:
-            return {'folders': []}
+        channel_data = {'id': channel_id, 'type': 'channel', 'folders': folders}
             
-        # Apply filters if needed
+        # Apply filters if needed, from the channel's page status index (no per-node queries)
         if not filters.get('all', True):
-            channel_data = self._apply_filters_to_hierarchy(channel_data, filters)
+            status_index = self._get_page_status_index(channel_id, versions)
+            updated_days = current_app.config.get('HIERARCHY_UPDATED_DAYS', 7)
+            updated_since = time.time() - updated_days * 86400
+            channel_data = self._apply_filters_to_hierarchy(channel_data, filters, status_index, updated_since)
             
         return {
             'folders': channel_data.get('folders', [])
         }
         
-    def _apply_filters_to_hierarchy(self, hierarchy_node: Dict[str, Any], filters: Dict[str, bool]) -> Dict[str, Any]:
+    def get_hierarchy_with_managers(self, channel_id: Optional[int] = None,
+                                    versions: Optional[HierarchyVersions] = None) -> Dict[str, Any]:
+        """
+        Channels > categories > pages with their managers, for the admin table
+        
+        Cached under the hierarchy version (the channel's own version when
+        channel_id is given) plus the assignment version, which moves with
+        content managers, assignees and pending uploads.
+        
+        Args:
+            channel_id: Only this channel (None = every channel)
+            versions: Versions read by the caller (e.g. for the ETag); read here if omitted
+            
+        Returns:
+            Dict with 'channels', sorted by channel → category → page name
+        """
+        channel_ids = [channel_id] if channel_id is not None else None
+        versions = versions or get_hierarchy_versions()
+        if versions is None:
+            return self._build_hierarchy_with_managers(channel_ids)
+        
+        if channel_id is None:
+            key = self.CACHE_KEY_MANAGERS
+            version = [versions.version, versions.assignments]
+        else:
+            key = f"{self.CACHE_KEY_MANAGERS}:channel:{channel_id}"
+            version = [versions.channel(channel_id), versions.assignments]
+        
+        entry = cached_or_build(
+            cache, key,
+            build=lambda: {'version': version, 'result': self._build_hierarchy_with_managers(channel_ids)},
+            ttl=self.CACHE_TTL,
+            is_current=lambda value: list(value.get('version') or []) == version
+        )
+        return entry['result']
+    
+    def _build_hierarchy_with_managers(self, channel_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Build the admin hierarchy with three set-based queries
+        
+        Channels, then categories and pages each outer-joined to
+        content_manager / assignees, with pending uploads as an EXISTS column.
+        A category or page with several manager rows shows the first one.
+        
+        Args:
+            channel_ids: Channels to include (None = every channel)
+            
+        Returns:
+            Dict with 'channels', sorted by channel → category → page name
+        """
+        channel_query = db.session.query(
+            ContentRelChannels.id, ContentRelChannels.name, ContentRelChannels.description
+        ).filter(ContentRelChannels.is_deleted == False)
+        if channel_ids is not None:
+            channel_query = channel_query.filter(ContentRelChannels.id.in_(channel_ids))
+        channels = channel_query.order_by(ContentRelChannels.name, ContentRelChannels.id).all()
+        if not channels:
+            return {'channels': []}
+        
+        # Categories (top-level folders) with their 책임자
+        categories = db.session.query(
+            ContentRelFolders.id, ContentRelFolders.name, ContentRelFolders.description,
+            ContentRelFolders.channel_id, ContentManager.assignee_id,
+            Assignees.name.label('manager_name'), Assignees.position.label('manager_position'),
+            Assignees.user_id.label('manager_user_id')
+        ).outerjoin(
+            ContentManager, and_(ContentManager.type == 'folder', ContentManager.folder_id == ContentRelFolders.id)
+        ).outerjoin(
+            Assignees, Assignees.id == ContentManager.assignee_id
+        ).filter(
+            ContentRelFolders.channel_id.in_([channel.id for channel in channels]),
+            ContentRelFolders.parent_id.is_(None),
+            ContentRelFolders.is_deleted == False
+        ).order_by(ContentRelFolders.name, ContentRelFolders.id, ContentManager.id).all()
+        
+        # Pages directly under those categories with their 실무자 and pending state
+        has_pending = db.session.query(PendingContent.id).filter(
+            PendingContent.content_type == 'page',
+            PendingContent.page_id == ContentRelPages.id
+        ).exists()
+        category_ids = list({category.id for category in categories})
+        pages = db.session.query(
+            ContentRelPages.id, ContentRelPages.name, ContentRelPages.description,
+            ContentRelPages.object_id, ContentRelPages.folder_id,
+            ContentRelPages.created_at, ContentRelPages.updated_at, ContentManager.assignee_id,
+            Assignees.name.label('manager_name'), Assignees.position.label('manager_position'),
+            Assignees.user_id.label('manager_user_id'), has_pending.label('has_pending')
+        ).outerjoin(
+            ContentManager, and_(ContentManager.type == 'file', ContentManager.file_id == ContentRelPages.id)
+        ).outerjoin(
+            Assignees, Assignees.id == ContentManager.assignee_id
+        ).filter(
+            ContentRelPages.folder_id.in_(category_ids),
+            ContentRelPages.is_deleted == False
+        ).order_by(ContentRelPages.name, ContentRelPages.id, ContentManager.id).all() if category_ids else []
+        
+        def manager(row):
+            if row.assignee_id is None or row.manager_name is None:
+                return None
+            return {
+                'name': row.manager_name,
+                'position': row.manager_position,
+                'user_id': row.manager_user_id
+            }
+        
+        pages_by_category: Dict[int, List[Dict[str, Any]]] = {}
+        seen_pages = set()
+        for page in pages:
+            if page.id in seen_pages:
+                continue  # further manager rows of the same page
+            seen_pages.add(page.id)
+            pages_by_category.setdefault(page.folder_id, []).append({
+                'id': page.id,
+                'name': page.name,
+                'description': page.description,
+                'object_id': page.object_id,
+                'folder_id': page.folder_id,
+                'manager': manager(page),  # 실무자
+                'has_pending': bool(page.has_pending),
+                'created_at': page.created_at.isoformat() if page.created_at else None,
+                'updated_at': page.updated_at.isoformat() if page.updated_at else None
+            })
+        
+        categories_by_channel: Dict[int, List[Dict[str, Any]]] = {}
+        seen_categories = set()
+        for category in categories:
+            if category.id in seen_categories:
+                continue
+            seen_categories.add(category.id)
+            categories_by_channel.setdefault(category.channel_id, []).append({
+                'id': category.id,
+                'name': category.name,
+                'description': category.description,
+                'channel_id': category.channel_id,
+                'manager': manager(category),  # 책임자
+                'pages': pages_by_category.get(category.id, [])
+            })
+        
+        return {
+            'channels': [
+                {
+                    'id': channel.id,
+                    'name': channel.name,
+                    'description': channel.description,
+                    'categories': categories_by_channel.get(channel.id, [])
+                }
+                for channel in channels
+            ]
+        }
+    
+    def _get_page_status_index(self, channel_id: int,
+                               versions: Optional[HierarchyVersions] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Per-page status of one channel, cached next to its subtree
+        
+        Keyed by the channel's hierarchy version plus the assignment version
+        (pending uploads and managers change without touching the pages).
+        
+        Args:
+            channel_id: ID of the channel
+            versions: Current hierarchy versions (None = build without cache)
+            
+        Returns:
+            Dict mapping page ID to its status (see _build_page_status_index)
+        """
+        if versions is None:
+            return self._build_page_status_index(channel_id)
+        
+        version = [versions.channel(channel_id), versions.assignments]
+        entry = cached_or_build(
+            cache, f"{self.CACHE_KEY_STATUS_PREFIX}{channel_id}",
+            build=lambda: {'version': version, 'pages': self._build_page_status_index(channel_id)},
+            ttl=self.CACHE_TTL,
+            is_current=lambda value: list(value.get('version') or []) == version
+        )
+        return entry['pages']
+    
+    def _build_page_status_index(self, channel_id: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Status of every page of a channel in two queries
+        
+        A page counts as managed when it, one of its ancestor folders or the
+        channel has a content_manager row.
+        
+        Args:
+            channel_id: ID of the channel
+            
+        Returns:
+            Dict mapping page ID to {'has_content', 'pending', 'managed', 'updated_at' (epoch seconds)}
+        """
+        has_pending = db.session.query(PendingContent.id).filter(
+            PendingContent.page_id == ContentRelPages.id
+        ).exists()
+        has_file_manager = db.session.query(ContentManager.id).filter(
+            ContentManager.type == 'file', ContentManager.file_id == ContentRelPages.id
+        ).exists()
+        managed_folders = select(ContentFolderClosure.descendant_id).join(
+            ContentManager, and_(ContentManager.type == 'folder',
+                                 ContentManager.folder_id == ContentFolderClosure.ancestor_id)
+        )
+        
+        pages = db.session.query(
+            ContentRelPages.id, ContentRelPages.has_content, ContentRelPages.updated_at,
+            has_pending.label('pending'),
+            or_(has_file_manager, ContentRelPages.folder_id.in_(managed_folders)).label('managed')
+        ).filter(
+            ContentRelPages.folder_id.in_(channel_folder_ids([channel_id])),
+            ContentRelPages.is_deleted == False
+        ).all()
+        
+        channel_managed = db.session.query(db.session.query(ContentManager.id).filter(
+            ContentManager.type == 'channel', ContentManager.channel_id == channel_id
+        ).exists()).scalar()
+        
+        return {
+            page.id: {
+                'has_content': bool(page.has_content),
+                'pending': bool(page.pending),
+                'managed': bool(channel_managed or page.managed),
+                # updated_at is stored as naive UTC
+                'updated_at': page.updated_at.replace(tzinfo=datetime.timezone.utc).timestamp()
+                if page.updated_at else None
+            }
+            for page in pages
+        }
+    
+    def _page_matches_filters(self, status: Optional[Dict[str, Any]], filters: Dict[str, Any],
+                              updated_since: float) -> bool:
+        """
+        Whether a page passes the active filters (any one of them)
+        
+        - reviewing / pending: has an upload waiting for approval
+        - approved / has_content: has approved content
+        - updated: changed within HIERARCHY_UPDATED_DAYS
+        - assigned / unassigned: has / has no manager
+        - rejected: not recorded anywhere, matches nothing
+        """
+        if status is None:
+            return False
+        checks = {
+            'reviewing': status['pending'],
+            'pending': status['pending'],
+            'approved': status['has_content'],
+            'has_content': status['has_content'],
+            'updated': status['updated_at'] is not None and status['updated_at'] >= updated_since,
+            'assigned': status['managed'],
+            'unassigned': not status['managed']
+        }
+        return any(checks.get(name, False) for name, active in filters.items() if active and name != 'all')
+    
+    def _apply_filters_to_hierarchy(self, hierarchy_node: Dict[str, Any], filters: Dict[str, bool],
+                                    status_index: Dict[int, Dict[str, Any]],
+                                    updated_since: float) -> Optional[Dict[str, Any]]:
         """
         Apply status filters to a hierarchy node and its children
         
+        Pure in-memory pass: page status comes from the status index. Matching
+        pages keep all their details; folders without matching pages below
+        them are dropped.
+        
         Args:
             hierarchy_node: Dict representing a node in the hierarchy
             filters: Dict of filter flags
+            status_index: Output of _get_page_status_index for the node's channel
+            updated_since: Epoch seconds after which a page counts as updated
             
         Returns:
-            Filtered copy of the hierarchy node
+            Filtered copy of the hierarchy node, or None if nothing in it matches
         """
+        if hierarchy_node.get('type') == 'page':
+            status = status_index.get(hierarchy_node.get('id'))
+            return hierarchy_node if self._page_matches_filters(status, filters, updated_since) else None
+        
         # Create a shallow copy to avoid modifying the original
         filtered_node = hierarchy_node.copy()
         
-        # If this is a page/file node, check its properties
-        if hierarchy_node.get('type') == 'page':
-            # Get the page to check its properties
-            page = ContentRelPages.query.filter_by(id=hierarchy_node.get('id'), is_deleted=False).first()
-            if page:
-                # Since status field doesn't exist in ContentRelPages, we'll use other criteria
-                # For now, just return the page if any filter is active (except 'all')
-                # In the future, this could be extended with custom status logic
-                if filters.get('all', False):
-                    # Also apply filters to page details
-                    if 'details' in hierarchy_node:
-                        filtered_details = []
-                        for detail in hierarchy_node.get('details', []):
-                            filtered_detail = self._apply_filters_to_hierarchy(detail, filters)
-                            if filtered_detail:
-                                filtered_details.append(filtered_detail)
-                        filtered_node['details'] = filtered_details
-                    return filtered_node
-                else:
-                    # For specific filters (reviewing, rejected, approved, updated),
-                    # we would need additional metadata to determine status
-                    # For now, return None to exclude pages when specific filters are applied
-                    return None
-            else:
-                return None
-        
-        # If this is a page detail node, check its parent page
-        elif hierarchy_node.get('type') == 'page_detail':
-            page_id = hierarchy_node.get('page_id')
-            if page_id:
-                page = ContentRelPages.query.filter_by(id=page_id, is_deleted=False).first()
-                if page:
-                    # Since status field doesn't exist, apply same logic as pages
-                    if filters.get('all', False):
-                        return filtered_node
-                    else:
-                        return None
-                else:
-                    return None
-                
-        # For folders, process subfolders and pages
+        # For folders (and the channel), process subfolders and pages
         if 'subfolders' in hierarchy_node:
-            filtered_subfolders = []
-            
-            # Process each subfolder
-            for subfolder in hierarchy_node.get('subfolders', []):
-                filtered_subfolder = self._apply_filters_to_hierarchy(subfolder, filters)
-                if filtered_subfolder:
-                    filtered_subfolders.append(filtered_subfolder)
-                    
-            filtered_node['subfolders'] = filtered_subfolders
-            
-        # For folders, process pages
+            filtered_node['subfolders'] = [
+                filtered for filtered in (
+                    self._apply_filters_to_hierarchy(subfolder, filters, status_index, updated_since)
+                    for subfolder in hierarchy_node['subfolders']
+                ) if filtered
+            ]
         if 'pages' in hierarchy_node:
-            filtered_pages = []
-            
-            # Process each page
-            for page in hierarchy_node.get('pages', []):
-                filtered_page = self._apply_filters_to_hierarchy(page, filters)
-                if filtered_page:
-                    filtered_pages.append(filtered_page)
-                    
-            filtered_node['pages'] = filtered_pages
+            filtered_node['pages'] = [
+                page for page in hierarchy_node['pages']
+                if self._page_matches_filters(status_index.get(page.get('id')), filters, updated_since)
+            ]
+        if 'folders' in hierarchy_node:
+            filtered_node['folders'] = [
+                filtered for filtered in (
+                    self._apply_filters_to_hierarchy(folder, filters, status_index, updated_since)
+                    for folder in hierarchy_node['folders']
+                ) if filtered
+            ]
             
-        # If this node has no children after filtering, return None
+        # If this folder has no children after filtering, return None
         if ('subfolders' in filtered_node and not filtered_node['subfolders']) and \
            ('pages' in filtered_node and not filtered_node['pages']):
             return None
             
         return filtered_node
         
-    def get_user_accessible_content(self, user_id: int) -> Tuple[List[int], List[int]]:
+    def get_user_accessible_content(self, user_id: str) -> Tuple[List[int], List[int]]:
         """
         Get content accessible to a specific user
         
         Args:
-            user_id: ID of the user
+            user_id: ID of the user (Users.id, matched through assignees.user_id)
             
         Returns:
             Tuple of (folder_ids, file_ids) that the user has access to.
             file_ids includes both page IDs and page detail IDs.
         """
-        # Get content assignments for this user from ContentManager table
-        content_assignments = ContentManager.query.filter_by(
-            user_id=user_id
-        ).all()
-        
-        folder_ids = [cm.folder_id for cm in content_assignments if cm.folder_id is not None]
-        file_ids = [cm.file_id for cm in content_assignments if cm.file_id is not None]
-        
-        # For folders, add all subfolders and files
-        all_folder_ids = folder_ids.copy()
-        
-        # Process each folder to find subfolders
-        for folder_id in folder_ids:
-            subfolder_ids = self._get_all_subfolder_ids(folder_id)
-            all_folder_ids.extend(subfolder_ids)
-            
-            # Get page IDs for this folder and subfolders
-            page_ids = self._get_all_page_ids_in_folders([folder_id] + subfolder_ids)
-            file_ids.extend(page_ids)
-            
-            # Get page detail IDs for all accessible pages
-            page_detail_ids = self._get_all_page_detail_ids_for_pages(page_ids)
-            file_ids.extend(page_detail_ids)
-            
-        return list(set(all_folder_ids)), list(set(file_ids))
+        # Cached per user (services.content_access_service)
+        access = ContentAccessService.get_access_set(user_id)
+        return list(access['folders']), list(access['pages'] | access['details'])
         
     def _get_all_subfolder_ids(self, folder_id: int) -> List[int]:
         """
@@ -510,21 +849,7 @@ class ContentHierarchyService:
         Returns:
             List of subfolder IDs
         """
-        subfolder_ids = []
-        
-        # Get direct subfolders
-        subfolders = ContentRelFolders.query.filter_by(
-            parent_id=folder_id,
-            is_deleted=False
-        ).all()
-        
-        for subfolder in subfolders:
-            subfolder_ids.append(subfolder.id)
-            # Recursively get their subfolders
-            child_subfolders = self._get_all_subfolder_ids(subfolder.id)
-            subfolder_ids.extend(child_subfolders)
-            
-        return subfolder_ids
+        return get_descendant_folder_ids([folder_id])
         
     def _get_all_page_ids_in_folders(self, folder_ids: List[int]) -> List[int]:
         """
@@ -566,7 +891,7 @@ class ContentHierarchyService:
         
         return [detail.id for detail in page_details]
         
-    def channel_has_accessible_content(self, channel_id: int, user_id: int) -> bool:
+    def channel_has_accessible_content(self, channel_id: int, user_id: str) -> bool:
         """
         Check if a channel contains any content accessible to a user
         
@@ -577,41 +902,7 @@ class ContentHierarchyService:
         Returns:
             True if the user has access to any content in the channel
         """
-        # Get accessible folders and files for the user
-        folder_ids, file_ids = self.get_user_accessible_content(user_id)
-        
-        if not folder_ids and not file_ids:
-            return False
-            
-        # Get all folders in this channel
-        channel_folders = ContentRelFolders.query.filter_by(
-            channel_id=channel_id,
-            is_deleted=False
-        ).all()
-        
-        channel_folder_ids = [folder.id for folder in channel_folders]
-        
-        # Check if any of the user's accessible folders are in this channel
-        for folder_id in folder_ids:
-            if folder_id in channel_folder_ids:
-                return True
-                
-        # Check if any of the user's accessible files are in this channel
-        # This includes both pages and page details
-        for file_id in file_ids:
-            # Check if it's a page
-            page = ContentRelPages.query.filter_by(id=file_id, is_deleted=False).first()
-            if page and page.folder_id in channel_folder_ids:
-                return True
-            
-            # Check if it's a page detail
-            page_detail = ContentRelPageDetails.query.filter_by(id=file_id, is_deleted=False).first()
-            if page_detail:
-                parent_page = ContentRelPages.query.filter_by(id=page_detail.page_id, is_deleted=False).first()
-                if parent_page and parent_page.folder_id in channel_folder_ids:
-                    return True
-                
-        return False
+        return ContentAccessService.has_access(user_id, 'channels', channel_id)
         
     def get_file_download_info(self, file_id: int) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -671,9 +962,6 @@ class ContentHierarchyService:
             db.session.add(channel)
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return channel.id
         except Exception as e:
             db.session.rollback()
@@ -711,9 +999,6 @@ class ContentHierarchyService:
                 
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return True
         except Exception as e:
             db.session.rollback()
@@ -745,9 +1030,6 @@ class ContentHierarchyService:
             db.session.add(folder)
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return folder.id
         except Exception as e:
             db.session.rollback()
@@ -787,44 +1069,41 @@ class ContentHierarchyService:
         if not folder:
             return False
             
-        # Mark folder as deleted
-        folder.is_deleted = True
-        folder.updated_at = datetime.datetime.now()
-        
-        # Mark all subfolders as deleted
-        subfolders = ContentRelFolders.query.filter_by(
-            parent_id=folder_id,
-            is_deleted=False
+        # The folder and every subfolder below it (one closure lookup)
+        now = datetime.datetime.now()
+        subtree_ids = [folder_id] + get_descendant_folder_ids([folder_id])
+        folders = ContentRelFolders.query.filter(
+            ContentRelFolders.id.in_(subtree_ids),
+            ContentRelFolders.is_deleted == False
         ).all()
         
-        for subfolder in subfolders:
-            self._mark_folder_as_deleted(subfolder.id, deleted_by)
+        for subtree_folder in folders:
+            subtree_folder.is_deleted = True
+            subtree_folder.updated_at = now
             
-        # Mark all pages in this folder as deleted
-        pages = ContentRelPages.query.filter_by(
-            folder_id=folder_id,
-            is_deleted=False
+        # Mark all pages in these folders as deleted
+        pages = ContentRelPages.query.filter(
+            ContentRelPages.folder_id.in_(subtree_ids),
+            ContentRelPages.is_deleted == False
         ).all()
         
         for page in pages:
             page.is_deleted = True
-            page.updated_at = datetime.datetime.now()
+            page.updated_at = now
             
-            # Mark all page details as deleted
-            page_details = ContentRelPageDetails.query.filter_by(
-                page_id=page.id,
-                is_deleted=False
+        # Mark all page details as deleted
+        if pages:
+            page_details = ContentRelPageDetails.query.filter(
+                ContentRelPageDetails.page_id.in_([page.id for page in pages]),
+                ContentRelPageDetails.is_deleted == False
             ).all()
             
             for detail in page_details:
                 detail.is_deleted = True
-                detail.updated_at = datetime.datetime.now()
+                detail.updated_at = now
             
         db.session.commit()
         
-        # Clear cache to reflect changes
-        self.clear_hierarchy_cache()
-        
         return True
         
     def add_file(self, file_path: str, name: str, channel_id: int, folder_id: Optional[int] = None, 
@@ -880,9 +1159,6 @@ class ContentHierarchyService:
             db.session.add(page)
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return page.id
         except Exception as e:
             db.session.rollback()
@@ -941,9 +1217,6 @@ class ContentHierarchyService:
                 
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return successful_ids, failed_ids
         except Exception as e:
             db.session.rollback()
@@ -987,9 +1260,6 @@ class ContentHierarchyService:
             db.session.add(page_detail)
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return page_detail.id
         except Exception as e:
             db.session.rollback()
@@ -1028,9 +1298,6 @@ class ContentHierarchyService:
             
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return True
         except Exception as e:
             db.session.rollback()
@@ -1059,9 +1326,6 @@ class ContentHierarchyService:
             
             db.session.commit()
             
-            # Clear cache to reflect changes
-            self.clear_hierarchy_cache()
-            
             return True
         except Exception as e:
             db.session.rollback()
@@ -1091,7 +1355,7 @@ class ContentHierarchyService:
                     'name': detail.name,
                     'description': detail.description,
                     'object_id': detail.object_id,
-                    'has_content': detail.check_r2_content_exists() if hasattr(detail, 'check_r2_content_exists') else (detail.object_id is not None and detail.object_id.strip() != ''),
+                    'has_content': bool(detail.has_content),
                     'created_at': detail.created_at.isoformat() if detail.created_at else None,
                     'updated_at': detail.updated_at.isoformat() if detail.updated_at else None
                 }
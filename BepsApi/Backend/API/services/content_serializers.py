@@ -0,0 +1,119 @@
+"""
+Content Serializers
+
+Column-only serialization for content models. Instead of loading full ORM
+objects and calling to_dict() per row, routes pick a profile:
+- summary:             minimal fields for lists/trees
+- admin:               every stored field (same keys as to_dict())
+- with_storage_status: admin + pending status, resolved for the whole result set at once
+
+Rows come from Query.with_entities() selects built by select_pages()/select_details(),
+and anything that needs another table (pending uploads, user names) is
+batch-resolved with one IN query per result set.
+"""
+
+from typing import Dict, Iterable, List
+
+from extensions import db
+from models import ContentRelPages, ContentRelPageDetails, PendingContent, Users
+
+SUMMARY = 'summary'
+ADMIN = 'admin'
+WITH_STORAGE_STATUS = 'with_storage_status'
+
+PAGE_PROFILES = {
+    SUMMARY: ['id', 'folder_id', 'name', 'has_content'],
+    ADMIN: ['id', 'folder_id', 'name', 'description', 'object_id', 'has_content',
+            'created_at', 'updated_at', 'is_deleted'],
+}
+PAGE_PROFILES[WITH_STORAGE_STATUS] = PAGE_PROFILES[ADMIN]
+
+DETAIL_PROFILES = {
+    SUMMARY: ['id', 'page_id', 'name', 'has_content'],
+    ADMIN: ['id', 'page_id', 'name', 'description', 'object_id', 'has_content',
+            'created_at', 'updated_at', 'is_deleted'],
+}
+DETAIL_PROFILES[WITH_STORAGE_STATUS] = DETAIL_PROFILES[ADMIN]
+
+
+def _columns(model, profiles: Dict[str, List[str]], profile: str):
+    if profile not in profiles:
+        raise ValueError(f"Unknown serializer profile: {profile}")
+    return [getattr(model, name) for name in profiles[profile]]
+
+
+def select_pages(query, profile: str = SUMMARY):
+    """Narrow a ContentRelPages query to the columns of a profile"""
+    return query.with_entities(*_columns(ContentRelPages, PAGE_PROFILES, profile))
+
+
+def select_details(query, profile: str = SUMMARY):
+    """Narrow a ContentRelPageDetails query to the columns of a profile"""
+    return query.with_entities(*_columns(ContentRelPageDetails, DETAIL_PROFILES, profile))
+
+
+def get_pending_by_page(page_ids: Iterable[int]) -> Dict[int, dict]:
+    """Pending page uploads for many pages in one query ({page_id: {...}})"""
+    page_ids = list(set(page_ids))
+    if not page_ids:
+        return {}
+    rows = db.session.query(
+        PendingContent.page_id, PendingContent.file_size,
+        PendingContent.uploaded_by, PendingContent.uploaded_at
+    ).filter(
+        PendingContent.content_type == 'page',
+        PendingContent.page_id.in_(page_ids)
+    ).all()
+    return {row.page_id: row._asdict() for row in rows}
+
+
+def get_pending_by_additional(additional_ids: Iterable[int]) -> Dict[int, dict]:
+    """Pending additional uploads for many details in one query ({additional_id: {...}})"""
+    additional_ids = list(set(additional_ids))
+    if not additional_ids:
+        return {}
+    rows = db.session.query(
+        PendingContent.additional_id, PendingContent.file_size,
+        PendingContent.uploaded_by, PendingContent.uploaded_at
+    ).filter(
+        PendingContent.content_type == 'additional',
+        PendingContent.additional_id.in_(additional_ids)
+    ).all()
+    return {row.additional_id: row._asdict() for row in rows}
+
+
+def get_user_names(user_ids: Iterable[str]) -> Dict[str, str]:
+    """User names for many user ids in one query ({user_id: name})"""
+    user_ids = list({user_id for user_id in user_ids if user_id})
+    if not user_ids:
+        return {}
+    rows = db.session.query(Users.id, Users.name).filter(Users.id.in_(user_ids)).all()
+    return {row.id: row.name for row in rows}
+
+
+def serialize_pages(rows, profile: str = SUMMARY) -> List[dict]:
+    """Serialize rows from select_pages() with the same profile"""
+    result = [dict(zip(PAGE_PROFILES[profile], row)) for row in rows]
+
+    if profile == WITH_STORAGE_STATUS:
+        pending_map = get_pending_by_page(item['id'] for item in result)
+        for item in result:
+            pending = pending_map.get(item['id'])
+            item['has_pending'] = pending is not None
+            item['pending_file_size'] = pending['file_size'] if pending else 0
+
+    return result
+
+
+def serialize_details(rows, profile: str = SUMMARY) -> List[dict]:
+    """Serialize rows from select_details() with the same profile"""
+    result = [dict(zip(DETAIL_PROFILES[profile], row)) for row in rows]
+
+    if profile == WITH_STORAGE_STATUS:
+        pending_map = get_pending_by_additional(item['id'] for item in result)
+        for item in result:
+            pending = pending_map.get(item['id'])
+            item['has_pending'] = pending is not None
+            item['pending_file_size'] = pending['file_size'] if pending else 0
+
+    return result
@@ -0,0 +1,460 @@
+"""
+Fake S3 Client
+
+In-process stand-in for the boto3 S3 client, selected with
+R2_STORAGE_BACKEND=fake. It implements the subset of the client API the
+content code uses (head/get/put/copy/delete, DeleteObjects, ListObjectsV2
+with paginators and delimiters, multipart uploads, managed transfers and
+presigned URLs) on top of dicts, so every storage path runs without R2
+credentials or network access to R2. It only replaces storage: the app
+still needs its PostgreSQL database and Redis.
+
+Each call sleeps for a configurable latency (base + jitter, optionally per
+operation) and is counted through utils.r2_metrics like a real R2 call, so
+calls per request and wall time can be benchmarked offline.
+"""
+
+import io
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+import datetime
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from botocore.exceptions import ClientError
+
+from utils.r2_metrics import record_r2_call
+
+LIST_MAX_KEYS = 1000
+
+
+class _FakeObject:
+    __slots__ = ('body', 'etag', 'last_modified', 'content_type', 'metadata')
+
+    def __init__(self, body: bytes, content_type: Optional[str] = None, metadata: Optional[dict] = None):
+        self.body = body
+        self.etag = hashlib.md5(body).hexdigest()
+        self.last_modified = datetime.datetime.now(datetime.timezone.utc)
+        self.content_type = content_type or 'binary/octet-stream'
+        self.metadata = dict(metadata or {})
+
+
+def _client_error(code: str, status: int, operation_name: str, message: str = '') -> ClientError:
+    return ClientError({
+        'Error': {'Code': code, 'Message': message or code},
+        'ResponseMetadata': {'HTTPStatusCode': status}
+    }, operation_name)
+
+
+def _read_body(body) -> bytes:
+    if body is None:
+        return b''
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    if isinstance(body, str):
+        return body.encode('utf-8')
+    return body.read()
+
+
+class _FakePaginator:
+    """Mimics botocore paginators for list_objects_v2 / list_parts"""
+
+    def __init__(self, client: 'FakeS3Client', operation: str):
+        self.client = client
+        self.operation = operation
+
+    def paginate(self, PaginationConfig=None, **kwargs):
+        page_size = (PaginationConfig or {}).get('PageSize')
+        if self.operation == 'list_objects_v2':
+            if page_size:
+                kwargs['MaxKeys'] = page_size
+            while True:
+                page = self.client.list_objects_v2(**kwargs)
+                yield page
+                if not page.get('IsTruncated'):
+                    return
+                kwargs['ContinuationToken'] = page['NextContinuationToken']
+        elif self.operation == 'list_parts':
+            if page_size:
+                kwargs['MaxParts'] = page_size
+            while True:
+                page = self.client.list_parts(**kwargs)
+                yield page
+                if not page.get('IsTruncated'):
+                    return
+                kwargs['PartNumberMarker'] = page['NextPartNumberMarker']
+        else:
+            raise NotImplementedError(f"Fake paginator not available for {self.operation}")
+
+
+class FakeS3Client:
+    """
+    Thread-safe in-memory S3 client
+
+    Args:
+        latency_ms: Base latency added to every call
+        jitter_ms: Uniform random latency added on top (0..jitter_ms)
+        latency_by_operation: Per-operation base latency, e.g. {'ListObjectsV2': 80}
+        endpoint: Base URL used for presigned URLs
+    """
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0,
+                 latency_by_operation: Optional[Dict[str, float]] = None,
+                 endpoint: str = 'https://fake-r2.local'):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency_by_operation = latency_by_operation or {}
+        self.endpoint = endpoint.rstrip('/')
+        self.buckets: Dict[str, Dict[str, _FakeObject]] = {}
+        self.multipart_uploads: Dict[str, dict] = {}
+        self.meta = SimpleNamespace(events=None, region_name='auto')
+        self.calls = Counter()  # operation name -> calls, across every scope (incl. background jobs)
+        self._lock = threading.Lock()
+        self._upload_counter = 0
+
+    # ---- Helpers ----
+
+    def _call(self, operation_name: str):
+        """Sleep for the injected latency; returns the start time for _done()"""
+        latency = self.latency_by_operation.get(operation_name, self.latency_ms)
+        if self.jitter_ms:
+            latency += random.uniform(0, self.jitter_ms)
+        started = time.perf_counter()
+        if latency:
+            time.sleep(latency / 1000)
+        return started
+
+    def _done(self, operation_name: str, started: float, error: bool = False) -> None:
+        with self._lock:
+            self.calls[operation_name] += 1
+        record_r2_call(operation_name, (time.perf_counter() - started) * 1000, error)
+
+    def _bucket(self, bucket_name: str) -> Dict[str, _FakeObject]:
+        with self._lock:
+            return self.buckets.setdefault(bucket_name, {})
+
+    def _get(self, operation_name: str, bucket_name: str, key: str, started: float) -> _FakeObject:
+        obj = self._bucket(bucket_name).get(key)
+        if obj is None:
+            self._done(operation_name, started)
+            if operation_name == 'HeadObject':
+                raise _client_error('404', 404, operation_name, 'Not Found')
+            raise _client_error('NoSuchKey', 404, operation_name, 'The specified key does not exist.')
+        return obj
+
+    @staticmethod
+    def _parse_copy_source(copy_source):
+        if isinstance(copy_source, dict):
+            return copy_source['Bucket'], copy_source['Key']
+        bucket_name, _, key = copy_source.lstrip('/').partition('/')
+        return bucket_name, key
+
+    def put_raw(self, bucket_name: str, key: str, body: bytes = b'', content_type: Optional[str] = None) -> None:
+        """Seed an object without latency or accounting (benchmark setup)"""
+        self._bucket(bucket_name)[key] = _FakeObject(body, content_type)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.buckets.clear()
+            self.multipart_uploads.clear()
+            self.calls.clear()
+
+    def call_counts(self) -> Dict[str, int]:
+        """Copy of the per-operation call counters"""
+        with self._lock:
+            return dict(self.calls)
+
+    # ---- Objects ----
+
+    def head_object(self, Bucket, Key, **kwargs):
+        started = self._call('HeadObject')
+        obj = self._get('HeadObject', Bucket, Key, started)
+        self._done('HeadObject', started)
+        return {
+            'ContentLength': len(obj.body),
+            'ContentType': obj.content_type,
+            'ETag': f'"{obj.etag}"',
+            'LastModified': obj.last_modified,
+            'Metadata': dict(obj.metadata),
+            'ResponseMetadata': {'HTTPStatusCode': 200}
+        }
+
+    def get_object(self, Bucket, Key, **kwargs):
+        started = self._call('GetObject')
+        obj = self._get('GetObject', Bucket, Key, started)
+        self._done('GetObject', started)
+        return {
+            'Body': io.BytesIO(obj.body),
+            'ContentLength': len(obj.body),
+            'ContentType': obj.content_type,
+            'ETag': f'"{obj.etag}"',
+            'LastModified': obj.last_modified,
+            'Metadata': dict(obj.metadata),
+            'ResponseMetadata': {'HTTPStatusCode': 200}
+        }
+
+    def put_object(self, Bucket, Key, Body=None, ContentType=None, Metadata=None, **kwargs):
+        started = self._call('PutObject')
+        obj = _FakeObject(_read_body(Body), ContentType, Metadata)
+        self._bucket(Bucket)[Key] = obj
+        self._done('PutObject', started)
+        return {'ETag': f'"{obj.etag}"', 'ResponseMetadata': {'HTTPStatusCode': 200}}
+
+    def copy_object(self, CopySource, Bucket, Key, **kwargs):
+        started = self._call('CopyObject')
+        source_bucket, source_key = self._parse_copy_source(CopySource)
+        source = self._get('CopyObject', source_bucket, source_key, started)
+        metadata = kwargs.get('Metadata') if kwargs.get('MetadataDirective') == 'REPLACE' else source.metadata
+        content_type = kwargs.get('ContentType') or source.content_type
+        obj = _FakeObject(source.body, content_type, metadata)
+        self._bucket(Bucket)[Key] = obj
+        self._done('CopyObject', started)
+        return {'CopyObjectResult': {'ETag': f'"{obj.etag}"', 'LastModified': obj.last_modified}}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        started = self._call('DeleteObject')
+        self._bucket(Bucket).pop(Key, None)
+        self._done('DeleteObject', started)
+        return {'ResponseMetadata': {'HTTPStatusCode': 204}}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        started = self._call('DeleteObjects')
+        bucket = self._bucket(Bucket)
+        keys = [item['Key'] for item in Delete.get('Objects', [])]
+        if len(keys) > LIST_MAX_KEYS:
+            self._done('DeleteObjects', started, error=True)
+            raise _client_error('MalformedXML', 400, 'DeleteObjects', 'Too many keys')
+        for key in keys:
+            bucket.pop(key, None)
+        self._done('DeleteObjects', started)
+        response = {'Errors': []}
+        if not Delete.get('Quiet'):
+            response['Deleted'] = [{'Key': key} for key in keys]
+        return response
+
+    def list_objects_v2(self, Bucket, Prefix='', Delimiter=None, MaxKeys=LIST_MAX_KEYS,
+                        ContinuationToken=None, StartAfter=None, **kwargs):
+        started = self._call('ListObjectsV2')
+        with self._lock:
+            keys = sorted(key for key in self.buckets.get(Bucket, {}) if key.startswith(Prefix))
+            objects = self.buckets.get(Bucket, {})
+
+            marker = ContinuationToken or StartAfter
+            if marker:
+                keys = [key for key in keys if key > marker]
+
+            contents, common_prefixes = [], []
+            seen_prefixes = set()
+            last_key = None
+            truncated = False
+            for key in keys:
+                if Delimiter:
+                    index = key.find(Delimiter, len(Prefix))
+                    if index != -1:
+                        common_prefix = key[:index + len(Delimiter)]
+                        if common_prefix in seen_prefixes:
+                            continue
+                        if len(contents) + len(common_prefixes) >= MaxKeys:
+                            truncated = True
+                            break
+                        seen_prefixes.add(common_prefix)
+                        common_prefixes.append({'Prefix': common_prefix})
+                        # Continue after every key under this prefix
+                        last_key = common_prefix + '\U0010ffff'
+                        continue
+                if len(contents) + len(common_prefixes) >= MaxKeys:
+                    truncated = True
+                    break
+                obj = objects[key]
+                contents.append({
+                    'Key': key,
+                    'Size': len(obj.body),
+                    'ETag': f'"{obj.etag}"',
+                    'LastModified': obj.last_modified
+                })
+                last_key = key
+
+        self._done('ListObjectsV2', started)
+        response = {
+            'Prefix': Prefix,
+            'KeyCount': len(contents) + len(common_prefixes),
+            'MaxKeys': MaxKeys,
+            'IsTruncated': truncated
+        }
+        if contents:
+            response['Contents'] = contents
+        if common_prefixes:
+            response['CommonPrefixes'] = common_prefixes
+        if truncated:
+            response['NextContinuationToken'] = last_key
+        return response
+
+    def get_paginator(self, operation_name):
+        return _FakePaginator(self, operation_name)
+
+    def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600, HttpMethod=None):
+        # Signing is local in boto3 too, so it isn't counted as a call
+        params = Params or {}
+        query = f"X-Amz-Expires={ExpiresIn}&X-Fake-Method={ClientMethod}&X-Fake-Nonce={random.getrandbits(32):08x}"
+        if 'UploadId' in params:
+            query += f"&uploadId={params['UploadId']}&partNumber={params.get('PartNumber')}"
+        return f"{self.endpoint}/{params.get('Bucket')}/{quote(params.get('Key', ''))}?{query}"
+
+    # ---- Multipart uploads ----
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None, Metadata=None, **kwargs):
+        started = self._call('CreateMultipartUpload')
+        with self._lock:
+            self._upload_counter += 1
+            upload_id = f"fake-upload-{self._upload_counter}"
+            self.multipart_uploads[upload_id] = {
+                'bucket': Bucket, 'key': Key, 'parts': {},
+                'content_type': ContentType, 'metadata': Metadata
+            }
+        self._done('CreateMultipartUpload', started)
+        return {'Bucket': Bucket, 'Key': Key, 'UploadId': upload_id}
+
+    def _upload(self, operation_name, UploadId, started):
+        upload = self.multipart_uploads.get(UploadId)
+        if upload is None:
+            self._done(operation_name, started, error=True)
+            raise _client_error('NoSuchUpload', 404, operation_name)
+        return upload
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        started = self._call('UploadPart')
+        upload = self._upload('UploadPart', UploadId, started)
+        body = _read_body(Body)
+        etag = hashlib.md5(body).hexdigest()
+        upload['parts'][PartNumber] = {'body': body, 'etag': etag}
+        self._done('UploadPart', started)
+        return {'ETag': f'"{etag}"'}
+
+    def list_parts(self, Bucket, Key, UploadId, MaxParts=1000, PartNumberMarker=0, **kwargs):
+        started = self._call('ListParts')
+        upload = self._upload('ListParts', UploadId, started)
+        numbers = sorted(number for number in upload['parts'] if number > (PartNumberMarker or 0))
+        page, truncated = numbers[:MaxParts], len(numbers) > MaxParts
+        self._done('ListParts', started)
+        response = {
+            'Parts': [{
+                'PartNumber': number,
+                'ETag': f'"{upload["parts"][number]["etag"]}"',
+                'Size': len(upload['parts'][number]['body'])
+            } for number in page],
+            'IsTruncated': truncated
+        }
+        if truncated:
+            response['NextPartNumberMarker'] = page[-1]
+        return response
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload=None, **kwargs):
+        started = self._call('CompleteMultipartUpload')
+        upload = self._upload('CompleteMultipartUpload', UploadId, started)
+        numbers = [part['PartNumber'] for part in (MultipartUpload or {}).get('Parts', [])]
+        missing = [number for number in numbers if number not in upload['parts']]
+        if missing or not numbers:
+            self._done('CompleteMultipartUpload', started, error=True)
+            raise _client_error('InvalidPart', 400, 'CompleteMultipartUpload', f"Missing parts {missing}")
+        body = b''.join(upload['parts'][number]['body'] for number in sorted(numbers))
+        self._bucket(Bucket)[Key] = _FakeObject(body, upload['content_type'], upload['metadata'])
+        del self.multipart_uploads[UploadId]
+        self._done('CompleteMultipartUpload', started)
+        return {'Bucket': Bucket, 'Key': Key, 'ETag': f'"{hashlib.md5(body).hexdigest()}"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        started = self._call('AbortMultipartUpload')
+        self.multipart_uploads.pop(UploadId, None)
+        self._done('AbortMultipartUpload', started)
+        return {}
+
+    # ---- Managed transfers (boto3.s3.transfer equivalents) ----
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Callback=None, Config=None):
+        """Single PUT below the multipart threshold, otherwise a multipart upload in chunksize parts"""
+        extra = ExtraArgs or {}
+        threshold = getattr(Config, 'multipart_threshold', 8 * 1024 * 1024)
+        chunksize = getattr(Config, 'multipart_chunksize', 8 * 1024 * 1024)
+
+        first = Fileobj.read(threshold)
+        if len(first) < threshold:
+            self.put_object(Bucket=Bucket, Key=Key, Body=first,
+                            ContentType=extra.get('ContentType'), Metadata=extra.get('Metadata'))
+            if Callback:
+                Callback(len(first))
+            return
+
+        upload_id = self.create_multipart_upload(
+            Bucket=Bucket, Key=Key, ContentType=extra.get('ContentType'), Metadata=extra.get('Metadata')
+        )['UploadId']
+        parts = []
+        buffer = first
+        part_number = 1
+        while buffer:
+            while len(buffer) < chunksize:
+                more = Fileobj.read(chunksize - len(buffer))
+                if not more:
+                    break
+                buffer += more
+            chunk, buffer = buffer[:chunksize], buffer[chunksize:]
+            etag = self.upload_part(Bucket=Bucket, Key=Key, UploadId=upload_id,
+                                    PartNumber=part_number, Body=chunk)['ETag']
+            parts.append({'PartNumber': part_number, 'ETag': etag})
+            if Callback:
+                Callback(len(chunk))
+            part_number += 1
+            if not buffer:
+                buffer = Fileobj.read(chunksize)
+        self.complete_multipart_upload(Bucket=Bucket, Key=Key, UploadId=upload_id,
+                                       MultipartUpload={'Parts': parts})
+
+    def copy(self, CopySource, Bucket, Key, ExtraArgs=None, Callback=None, SourceClient=None, Config=None):
+        """Managed copy: HEAD the source, then CopyObject or UploadPartCopy per chunk"""
+        source_bucket, source_key = self._parse_copy_source(CopySource)
+        size = self.head_object(Bucket=source_bucket, Key=source_key)['ContentLength']
+        threshold = getattr(Config, 'multipart_threshold', 8 * 1024 * 1024)
+        chunksize = getattr(Config, 'multipart_chunksize', 8 * 1024 * 1024)
+
+        if size < threshold:
+            self.copy_object(CopySource=CopySource, Bucket=Bucket, Key=Key, **(ExtraArgs or {}))
+            return
+
+        extra = ExtraArgs or {}
+        upload_id = self.create_multipart_upload(Bucket=Bucket, Key=Key, ContentType=extra.get('ContentType'),
+                                                 Metadata=extra.get('Metadata'))['UploadId']
+        source = self._bucket(source_bucket)[source_key]
+        parts = []
+        for part_number, offset in enumerate(range(0, size, chunksize), start=1):
+            started = self._call('UploadPartCopy')
+            body = source.body[offset:offset + chunksize]
+            self.multipart_uploads[upload_id]['parts'][part_number] = {
+                'body': body, 'etag': hashlib.md5(body).hexdigest()
+            }
+            self._done('UploadPartCopy', started)
+            parts.append({'PartNumber': part_number})
+        self.complete_multipart_upload(Bucket=Bucket, Key=Key, UploadId=upload_id,
+                                       MultipartUpload={'Parts': parts})
+
+
+def create_fake_s3_client(config) -> FakeS3Client:
+    """Build the fake from app config (R2_FAKE_* settings)"""
+    latency_by_operation = config.get('R2_FAKE_LATENCY_BY_OPERATION') or {}
+    if isinstance(latency_by_operation, str):
+        latency_by_operation = json.loads(latency_by_operation)
+
+    client = FakeS3Client(
+        latency_ms=config.get('R2_FAKE_LATENCY_MS', 0),
+        jitter_ms=config.get('R2_FAKE_LATENCY_JITTER_MS', 0),
+        latency_by_operation=latency_by_operation
+    )
+    logging.warning(
+        f"[FAKE S3] Using the in-process fake storage backend "
+        f"(latency {client.latency_ms}ms + jitter {client.jitter_ms}ms)"
+    )
+    return client
@@ -0,0 +1,158 @@
+"""
+Folder Closure
+
+content_folder_closure holds one row per (ancestor, descendant) folder pair,
+each folder paired with itself at depth 0. Triggers on content_rel_folders
+keep it current when folders are created or re-parented (migration 006), so
+instead of walking parent_id one query per level:
+- get_folder_ancestry: a folder's ancestors and channel in one indexed query
+- get_descendant_folder_ids: whole subtrees in one query
+- channel_folder_ids / get_folder_channel_ids: folders scoped by the channel
+  of their top-level ancestor
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models import ContentFolderClosure, ContentRelFolders, ContentRelChannels
+
+
+def get_folder_ancestry(folder_id: Optional[int]) -> Dict:
+    """
+    Folders from the channel down to folder_id, plus the channel
+
+    Follows the same rules as walking parent_id: stop at the first missing or
+    deleted folder, and include the channel only when the walk reaches a
+    top-level folder whose channel is not deleted.
+
+    Args:
+        folder_id: Folder to resolve
+
+    Returns:
+        {'folders': [{'id', 'name'}, ...] root first, 'channel': {'id', 'name'} or None}
+    """
+    result = {'folders': [], 'channel': None}
+    if folder_id is None:
+        return result
+
+    rows = db.session.query(
+        ContentRelFolders.id, ContentRelFolders.name, ContentRelFolders.parent_id,
+        ContentRelFolders.is_deleted,
+        ContentRelChannels.id.label('channel_id'), ContentRelChannels.name.label('channel_name')
+    ).join(
+        ContentFolderClosure, ContentFolderClosure.ancestor_id == ContentRelFolders.id
+    ).outerjoin(
+        ContentRelChannels, and_(
+            ContentRelChannels.id == ContentRelFolders.channel_id,
+            ContentRelFolders.parent_id.is_(None),
+            ContentRelChannels.is_deleted == False
+        )
+    ).filter(
+        ContentFolderClosure.descendant_id == folder_id
+    ).order_by(ContentFolderClosure.depth).all()
+
+    # Nearest first, like the parent_id walk
+    for row in rows:
+        if row.is_deleted:
+            break
+        result['folders'].append({'id': row.id, 'name': row.name})
+        if row.parent_id is None:
+            if row.channel_id is not None:
+                result['channel'] = {'id': row.channel_id, 'name': row.channel_name}
+            break
+
+    result['folders'].reverse()
+    return result
+
+
+def get_descendant_folder_ids(folder_ids: Iterable[int]) -> List[int]:
+    """
+    Every subfolder (at any depth) of the given folders
+
+    A subfolder under a deleted folder is left out, like the recursive walk
+    that stops descending at deleted folders.
+
+    Args:
+        folder_ids: Root folders (not included in the result)
+
+    Returns:
+        List of descendant folder ids
+    """
+    folder_ids = list(folder_ids)
+    if not folder_ids:
+        return []
+
+    closure = aliased(ContentFolderClosure)
+    path = aliased(ContentFolderClosure)
+
+    # A deleted folder between the root and the descendant (or the descendant itself)
+    deleted_on_path = db.session.query(path.ancestor_id).join(
+        ContentRelFolders, ContentRelFolders.id == path.ancestor_id
+    ).filter(
+        path.descendant_id == closure.descendant_id,
+        path.depth < closure.depth,
+        ContentRelFolders.is_deleted == True
+    ).exists()
+
+    rows = db.session.query(closure.descendant_id).filter(
+        closure.ancestor_id.in_(folder_ids),
+        closure.depth > 0,
+        ~deleted_on_path
+    ).distinct().all()
+    return [row.descendant_id for row in rows]
+
+
+def channel_folder_ids(channel_ids: Iterable[int]):
+    """
+    Subquery of every folder under the top-level folders of the given channels
+
+    The channel comes from each folder's top-level ancestor, not from the
+    folder's own channel_id. Deleted channels contribute nothing; deleted
+    folders are left for the caller to filter.
+
+    Args:
+        channel_ids: Channels to scope to
+
+    Returns:
+        SELECT of folder ids, usable with column.in_()
+    """
+    top = aliased(ContentRelFolders)
+    return select(ContentFolderClosure.descendant_id).join(
+        top, top.id == ContentFolderClosure.ancestor_id
+    ).join(
+        ContentRelChannels, ContentRelChannels.id == top.channel_id
+    ).where(
+        top.parent_id.is_(None),
+        top.channel_id.in_(list(channel_ids)),
+        ContentRelChannels.is_deleted == False
+    )
+
+
+def get_folder_channel_ids(folder_ids: Iterable[int], connection=None) -> Dict[int, int]:
+    """
+    Channel of each folder's top-level ancestor
+
+    Args:
+        folder_ids: Folders to resolve
+        connection: Connection to run on (e.g. session.connection() inside a
+            flush, where session queries would autoflush); defaults to db.session
+
+    Returns:
+        {folder_id: channel_id}; folders without a top-level ancestor are left out
+    """
+    folder_ids = list(folder_ids)
+    if not folder_ids:
+        return {}
+
+    top = aliased(ContentRelFolders)
+    statement = select(ContentFolderClosure.descendant_id, top.channel_id).join(
+        top, top.id == ContentFolderClosure.ancestor_id
+    ).where(
+        ContentFolderClosure.descendant_id.in_(folder_ids),
+        top.parent_id.is_(None)
+    )
+    rows = (connection or db.session).execute(statement).all()
+    return {row.descendant_id: row.channel_id for row in rows if row.channel_id is not None}
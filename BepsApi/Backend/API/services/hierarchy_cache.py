@@ -0,0 +1,248 @@
+"""
+Hierarchy Cache Versions
+
+Versions for the cached /contents/hierarchy output, kept in Redis:
+- content:hierarchy:content_version: global counter, advanced by every commit
+  that touches channels, folders, pages or page details
+- content:hierarchy:channel_versions: hash of channel id -> the global version
+  at its last change ('*' marks a change to every channel)
+- content:hierarchy:assignment_version: counter for content managers,
+  assignees and pending uploads (shown by the admin hierarchy-with-managers view)
+
+Unlike the path-only version of hierarchy_tree, any column shown in the
+hierarchy (names, object_id, has_content, ...) counts as a change. The session
+hooks at the bottom resolve each changed row to the channel of its top-level
+folder, so a commit in one channel only makes that channel's cached subtree
+stale. The versions double as strong ETags for the hierarchy routes.
+
+Bulk query.update()/delete() calls bypass the ORM change tracking; they mark
+every channel changed unless the caller reported the affected channels with
+mark_hierarchy_changed().
+"""
+
+import time
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from models import (
+    ContentRelChannels, ContentRelFolders, ContentRelPages, ContentRelPageDetails,
+    ContentManager, Assignees, PendingContent
+)
+from services.folder_closure import get_folder_channel_ids
+
+VERSION_KEY = 'content:hierarchy:content_version'
+CHANNEL_VERSIONS_KEY = 'content:hierarchy:channel_versions'
+ASSIGNMENT_VERSION_KEY = 'content:hierarchy:assignment_version'
+ALL_CHANNELS = '*'
+
+# Advance the global version and stamp the changed channels with it, atomically,
+# so a channel's version never moves backwards. A missing counter (new or flushed
+# Redis) starts at the current time in ms, above anything handed out before.
+_BUMP_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+local version = redis.call('INCR', KEYS[1])
+for i = 2, #ARGV do
+    redis.call('HSET', KEYS[2], ARGV[i], version)
+end
+return version
+"""
+
+
+def _seed_version() -> int:
+    return int(time.time() * 1000)
+
+
+class HierarchyVersions:
+    """Snapshot of the global and per-channel hierarchy versions"""
+
+    def __init__(self, version: int, channel_versions: Dict[str, str], assignments: int = 0):
+        self.version = version
+        self.assignments = assignments
+        self.base = int(channel_versions.get(ALL_CHANNELS, 0))
+        self.channels = {
+            int(field): int(value) for field, value in channel_versions.items() if field != ALL_CHANNELS
+        }
+
+    def channel(self, channel_id: int) -> int:
+        """Version of one channel's subtree"""
+        return max(self.channels.get(channel_id, 0), self.base)
+
+
+def get_hierarchy_versions() -> Optional[HierarchyVersions]:
+    """Current versions (one round trip), or None if Redis is unavailable"""
+    try:
+        from extensions import redis_client
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(VERSION_KEY)
+        pipe.hgetall(CHANNEL_VERSIONS_KEY)
+        pipe.get(ASSIGNMENT_VERSION_KEY)
+        version, channel_versions, assignments = pipe.execute()
+
+        if version is None:
+            # First use (or Redis lost its data): start above any earlier version
+            seed = _seed_version()
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.set(VERSION_KEY, seed, nx=True)
+            pipe.hsetnx(CHANNEL_VERSIONS_KEY, ALL_CHANNELS, seed)
+            pipe.set(ASSIGNMENT_VERSION_KEY, seed, nx=True)
+            pipe.get(VERSION_KEY)
+            pipe.hgetall(CHANNEL_VERSIONS_KEY)
+            pipe.get(ASSIGNMENT_VERSION_KEY)
+            _, _, _, version, channel_versions, assignments = pipe.execute()
+
+        return HierarchyVersions(int(version), channel_versions, int(assignments or 0))
+    except Exception as e:
+        logging.warning(f"[HIERARCHY CACHE] Failed to read versions: {str(e)}")
+        return None
+
+
+def bump_hierarchy_versions(channel_ids: Optional[Iterable[int]] = None) -> Optional[int]:
+    """
+    Advance the versions after a change
+
+    Args:
+        channel_ids: Channels whose subtree changed; None marks every channel
+
+    Returns:
+        The new global version, or None if Redis is unavailable
+    """
+    fields = [ALL_CHANNELS] if channel_ids is None else [str(channel_id) for channel_id in set(channel_ids)]
+    try:
+        from extensions import redis_client
+        return int(redis_client.eval(_BUMP_SCRIPT, 2, VERSION_KEY, CHANNEL_VERSIONS_KEY,
+                                     _seed_version(), *fields))
+    except Exception as e:
+        logging.warning(f"[HIERARCHY CACHE] Failed to bump versions: {str(e)}")
+        return None
+
+
+def bump_assignment_version() -> Optional[int]:
+    """Advance the version of manager assignments / pending uploads"""
+    try:
+        from extensions import redis_client
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.set(ASSIGNMENT_VERSION_KEY, _seed_version(), nx=True)
+        pipe.incr(ASSIGNMENT_VERSION_KEY)
+        return int(pipe.execute()[1])
+    except Exception as e:
+        logging.warning(f"[HIERARCHY CACHE] Failed to bump assignment version: {str(e)}")
+        return None
+
+
+def mark_hierarchy_changed(session, channel_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Report channels changed by bulk statements in this transaction
+
+    Call before running query.update()/delete() on hierarchy tables; the
+    versions advance when the transaction commits.
+
+    Args:
+        session: Session running the bulk statements
+        channel_ids: Affected channels; None marks every channel
+    """
+    if channel_ids is None:
+        session.info['hierarchy_cache_all'] = True
+    else:
+        session.info.setdefault('hierarchy_cache_channels', set()).update(channel_ids)
+    session.info['hierarchy_cache_bulk_marked'] = True
+
+
+# ---- Change tracking ----
+
+HIERARCHY_MODELS = (ContentRelChannels, ContentRelFolders, ContentRelPages, ContentRelPageDetails)
+ASSIGNMENT_MODELS = (ContentManager, Assignees, PendingContent)
+
+
+def _values(state, attribute: str) -> set:
+    """Current and previous (pre-flush) values of an attribute"""
+    history = state.attrs[attribute].history
+    return {value for value in list(history.added) + list(history.unchanged) + list(history.deleted)
+            if value is not None}
+
+
+def _changed_channels(session, objects) -> set:
+    """Channels whose subtree is affected by these new / modified / deleted rows"""
+    channel_ids, folder_ids, page_ids = set(), set(), set()
+    for obj in objects:
+        state = inspect(obj)
+        if isinstance(obj, ContentRelChannels):
+            if obj.id is not None:
+                channel_ids.add(obj.id)
+        elif isinstance(obj, ContentRelFolders):
+            folder_ids |= _values(state, 'id') | _values(state, 'parent_id')
+            channel_ids |= _values(state, 'channel_id')
+        elif isinstance(obj, ContentRelPages):
+            folder_ids |= _values(state, 'folder_id')
+        else:
+            page_ids |= _values(state, 'page_id')
+
+    # Core statements on the flush's connection: no autoflush, same transaction
+    connection = session.connection()
+    if page_ids:
+        folder_ids |= set(connection.execute(
+            select(ContentRelPages.folder_id).where(ContentRelPages.id.in_(page_ids))
+        ).scalars())
+    channel_ids |= set(get_folder_channel_ids(folder_ids, connection=connection).values())
+    return channel_ids
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_hierarchy_cache_changes(session, flush_context, instances):
+    if not session.info.get('hierarchy_cache_assignments'):
+        for obj in list(session.new) + list(session.deleted) + list(session.dirty):
+            if isinstance(obj, ASSIGNMENT_MODELS):
+                session.info['hierarchy_cache_assignments'] = True
+                break
+
+    if session.info.get('hierarchy_cache_all'):
+        return
+    objects = [obj for obj in list(session.new) + list(session.deleted) if isinstance(obj, HIERARCHY_MODELS)]
+    objects += [obj for obj in session.dirty
+                if isinstance(obj, HIERARCHY_MODELS) and session.is_modified(obj, include_collections=False)]
+    if objects:
+        session.info.setdefault('hierarchy_cache_channels', set()).update(_changed_channels(session, objects))
+        # New channels have no subtree yet, but the channel list (global version) changed
+        session.info['hierarchy_cache_changed'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_hierarchy_bulk_changes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    session = orm_execute_state.session
+    if issubclass(mapper.class_, ASSIGNMENT_MODELS):
+        session.info['hierarchy_cache_assignments'] = True
+        return
+    if not issubclass(mapper.class_, HIERARCHY_MODELS):
+        return
+    if not session.info.get('hierarchy_cache_bulk_marked'):
+        session.info['hierarchy_cache_all'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_hierarchy_cache_changes(session):
+    changed_all = session.info.pop('hierarchy_cache_all', False)
+    channel_ids = session.info.pop('hierarchy_cache_channels', set())
+    changed = session.info.pop('hierarchy_cache_changed', False)
+    session.info.pop('hierarchy_cache_bulk_marked', None)
+    if session.info.pop('hierarchy_cache_assignments', False):
+        bump_assignment_version()
+    if changed_all:
+        bump_hierarchy_versions()
+    elif channel_ids or changed:
+        bump_hierarchy_versions(channel_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_hierarchy_cache_changes(session):
+    for key in ('hierarchy_cache_all', 'hierarchy_cache_channels', 'hierarchy_cache_changed',
+                'hierarchy_cache_bulk_marked', 'hierarchy_cache_assignments'):
+        session.info.pop(key, None)
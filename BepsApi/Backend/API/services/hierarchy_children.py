@@ -0,0 +1,241 @@
+"""
+Hierarchy Children
+
+One level of the content tree at a time, for clients that expand nodes
+lazily instead of loading /contents/hierarchy:
+- channel -> its top-level folders
+- folder  -> its subfolders, then its pages
+- page    -> its page details
+
+Every node comes with its direct child counts and content/pending status,
+so a page of results is always a single query. Pages are keyset-paginated on
+(kind, name, id); the opaque cursor is the last row's sort key, so inserts
+don't shift results. Each kind (folders, pages, details) applies the cursor
+and the limit on its own, and the GROUP BY counts only cover the rows of that
+window, so a deep page costs about as much as the first one plus skipping
+the rows before the cursor.
+"""
+
+import json
+import base64
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models import ContentRelFolders, ContentRelPages, ContentRelPageDetails, PendingContent
+
+PARENT_TYPES = ('channel', 'folder', 'page')
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Sort rank per kind: within a folder, subfolders come before pages
+FOLDER_RANK, PAGE_RANK, DETAIL_RANK = 0, 1, 2
+
+
+def encode_cursor(row) -> str:
+    """Opaque cursor from a row's sort key"""
+    raw = json.dumps([row.rank, row.sort_name, row.id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Sort key from a cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank, sort_name, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return int(rank), str(sort_name), int(item_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def _window(model, parent_filter, rank: int, after: Optional[tuple], limit: int):
+    """
+    Ids of the next `limit` rows of one kind after the cursor, in sort order
+
+    Returns:
+        Select of ids, or None if the cursor is already past this kind
+    """
+    sort_name = func.coalesce(model.name, '')
+    query = select(model.id).where(parent_filter, model.is_deleted == False)
+    if after is not None:
+        after_rank, after_name, after_id = after
+        if rank < after_rank:
+            return None
+        if rank == after_rank:
+            query = query.where(tuple_(sort_name, model.id) > tuple_(literal(after_name), literal(after_id)))
+    return query.order_by(sort_name, model.id).limit(limit)
+
+
+def _folder_level(folder_filter, after: Optional[tuple], limit: int):
+    """Next folders matching folder_filter with their subfolder/page counts"""
+    children = _window(ContentRelFolders, folder_filter, FOLDER_RANK, after, limit)
+    if children is None:
+        return None
+
+    subfolder = aliased(ContentRelFolders)
+    subfolder_counts = select(
+        subfolder.parent_id.label('folder_id'), func.count().label('folders')
+    ).where(
+        subfolder.parent_id.in_(children), subfolder.is_deleted == False
+    ).group_by(subfolder.parent_id).subquery()
+
+    page_counts = select(
+        ContentRelPages.folder_id,
+        func.count().label('pages'),
+        func.count().filter(ContentRelPages.has_content == True).label('with_content')
+    ).where(
+        ContentRelPages.folder_id.in_(children), ContentRelPages.is_deleted == False
+    ).group_by(ContentRelPages.folder_id).subquery()
+
+    content_count = func.coalesce(page_counts.c.with_content, 0)
+    return select(
+        literal(FOLDER_RANK).label('rank'),
+        ContentRelFolders.id,
+        ContentRelFolders.name,
+        func.coalesce(ContentRelFolders.name, '').label('sort_name'),
+        literal('folder').label('type'),
+        func.coalesce(subfolder_counts.c.folders, 0).label('folder_count'),
+        func.coalesce(page_counts.c.pages, 0).label('page_count'),
+        literal(0).label('detail_count'),
+        content_count.label('content_count'),
+        (content_count > 0).label('has_content'),
+        literal(False).label('has_pending')
+    ).select_from(ContentRelFolders).outerjoin(
+        subfolder_counts, subfolder_counts.c.folder_id == ContentRelFolders.id
+    ).outerjoin(
+        page_counts, page_counts.c.folder_id == ContentRelFolders.id
+    ).where(ContentRelFolders.id.in_(children))
+
+
+def _page_level(folder_id: int, after: Optional[tuple], limit: int):
+    """Next pages of a folder with their detail counts and pending state"""
+    children = _window(ContentRelPages, ContentRelPages.folder_id == folder_id, PAGE_RANK, after, limit)
+    if children is None:
+        return None
+
+    detail_counts = select(
+        ContentRelPageDetails.page_id,
+        func.count().label('details'),
+        func.count().filter(ContentRelPageDetails.has_content == True).label('with_content')
+    ).where(
+        ContentRelPageDetails.page_id.in_(children), ContentRelPageDetails.is_deleted == False
+    ).group_by(ContentRelPageDetails.page_id).subquery()
+
+    pending = select(PendingContent.page_id, func.count().label('pending')).where(
+        PendingContent.content_type == 'page', PendingContent.page_id.in_(children)
+    ).group_by(PendingContent.page_id).subquery()
+
+    return select(
+        literal(PAGE_RANK).label('rank'),
+        ContentRelPages.id,
+        ContentRelPages.name,
+        func.coalesce(ContentRelPages.name, '').label('sort_name'),
+        literal('page').label('type'),
+        literal(0).label('folder_count'),
+        literal(0).label('page_count'),
+        func.coalesce(detail_counts.c.details, 0).label('detail_count'),
+        func.coalesce(detail_counts.c.with_content, 0).label('content_count'),
+        ContentRelPages.has_content,
+        (pending.c.pending != None).label('has_pending')
+    ).select_from(ContentRelPages).outerjoin(
+        detail_counts, detail_counts.c.page_id == ContentRelPages.id
+    ).outerjoin(
+        pending, pending.c.page_id == ContentRelPages.id
+    ).where(ContentRelPages.id.in_(children))
+
+
+def _detail_level(page_id: int, after: Optional[tuple], limit: int):
+    """Next page details of a page with their pending state"""
+    children = _window(ContentRelPageDetails, ContentRelPageDetails.page_id == page_id, DETAIL_RANK, after, limit)
+    if children is None:
+        return None
+
+    pending = select(PendingContent.additional_id, func.count().label('pending')).where(
+        PendingContent.content_type == 'additional',
+        PendingContent.page_id == page_id,
+        PendingContent.additional_id.in_(children)
+    ).group_by(PendingContent.additional_id).subquery()
+
+    return select(
+        literal(DETAIL_RANK).label('rank'),
+        ContentRelPageDetails.id,
+        ContentRelPageDetails.name,
+        func.coalesce(ContentRelPageDetails.name, '').label('sort_name'),
+        literal('page_detail').label('type'),
+        literal(0).label('folder_count'),
+        literal(0).label('page_count'),
+        literal(0).label('detail_count'),
+        literal(0).label('content_count'),
+        ContentRelPageDetails.has_content,
+        (pending.c.pending != None).label('has_pending')
+    ).select_from(ContentRelPageDetails).outerjoin(
+        pending, pending.c.additional_id == ContentRelPageDetails.id
+    ).where(ContentRelPageDetails.id.in_(children))
+
+
+def get_children(parent_type: str, parent_id: int, limit: int = DEFAULT_LIMIT,
+                 cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    One page of a node's direct children
+
+    Args:
+        parent_type: 'channel', 'folder' or 'page'
+        parent_id: Id of the parent node
+        limit: Children per page (capped at MAX_LIMIT)
+        cursor: next_cursor of the previous page
+
+    Returns:
+        {'items': [...], 'next_cursor': str or None, 'has_more': bool}
+
+    Raises:
+        ValueError: Unknown parent_type or malformed cursor
+    """
+    if parent_type not in PARENT_TYPES:
+        raise ValueError(f"parent_type must be one of {', '.join(PARENT_TYPES)}")
+
+    limit = max(1, min(limit, MAX_LIMIT))
+    after = decode_cursor(cursor) if cursor else None
+    # One row more than requested tells whether there is a next page
+    window = limit + 1
+
+    if parent_type == 'channel':
+        parts = [_folder_level(and_(ContentRelFolders.channel_id == parent_id,
+                                    ContentRelFolders.parent_id.is_(None)), after, window)]
+    elif parent_type == 'folder':
+        parts = [_folder_level(ContentRelFolders.parent_id == parent_id, after, window),
+                 _page_level(parent_id, after, window)]
+    else:
+        parts = [_detail_level(parent_id, after, window)]
+
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return {'items': [], 'next_cursor': None, 'has_more': False}
+
+    level = (union_all(*parts) if len(parts) > 1 else parts[0]).subquery('level')
+    sort_key = (level.c.rank, level.c.sort_name, level.c.id)
+    rows = db.session.execute(select(level).order_by(*sort_key).limit(window)).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items: List[Dict[str, Any]] = [
+        {
+            'id': row.id,
+            'name': row.name,
+            'type': row.type,
+            'folder_count': row.folder_count,
+            'page_count': row.page_count,
+            'detail_count': row.detail_count,
+            'content_count': row.content_count,
+            'has_children': bool(row.folder_count or row.page_count or row.detail_count),
+            'has_content': bool(row.has_content),
+            'has_pending': bool(row.has_pending)
+        }
+        for row in rows
+    ]
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+        'has_more': has_more
+    }
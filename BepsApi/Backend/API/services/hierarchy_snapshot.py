@@ -0,0 +1,199 @@
+"""
+Hierarchy Snapshot
+
+Prebuilt /contents/hierarchy response bodies, so serving the full hierarchy
+doesn't re-serialize (and the proxy doesn't re-compress) the nested dict on
+every request. Per hierarchy version the JSON body is encoded once, together
+with gzip and (if the brotli package is installed) brotli variants, and kept
+as files under HIERARCHY_SNAPSHOT_DIR:
+    hierarchy-<version>.json / .json.gz / .json.br
+
+The .json file is written last and marks a complete snapshot. Files are
+written to a temp name and renamed, so readers never see partial files, and
+older versions are removed once a newer snapshot exists. Each host builds a
+version's snapshot once (single-flight through services.shared_cache); the
+other workers keep answering with jsonify until it is there.
+"""
+
+import os
+import gzip
+import uuid
+import socket
+import logging
+import tempfile
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from services.shared_cache import acquire_rebuild_lock, release_rebuild_lock
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FILE_PREFIX = 'hierarchy-'
+SUFFIXES = {'identity': '.json', 'gzip': '.json.gz', 'br': '.json.br'}
+PREFERRED_ENCODINGS = ('br', 'gzip')  # Best compression first; identity is always available
+
+GZIP_LEVEL = 9       # Compressed once per version, so the slow levels are affordable
+BROTLI_QUALITY = 9   # 10-11 take many seconds for multi-MB bodies for little gain
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), 'beps_hierarchy_snapshot')
+
+
+def _config(name: str, default):
+    """Read an app config value, falling back to the default outside an app context"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            return current_app.config.get(name, default)
+    except ImportError:
+        pass
+    return default
+
+
+def _snapshot_dir() -> str:
+    path = _config('HIERARCHY_SNAPSHOT_DIR', DEFAULT_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _paths(version: int) -> Dict[str, str]:
+    base = os.path.join(_snapshot_dir(), f"{FILE_PREFIX}{version}")
+    return {encoding: base + suffix for encoding, suffix in SUFFIXES.items()}
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _file_version(name: str) -> Optional[int]:
+    """Version of a snapshot file name, None for anything else"""
+    if not name.startswith(FILE_PREFIX):
+        return None
+    version = name[len(FILE_PREFIX):].split('.', 1)[0]
+    return int(version) if version.isdigit() else None
+
+
+def _prune(current_version: int) -> None:
+    """Remove snapshots (and leftover temp files) of older versions"""
+    directory = _snapshot_dir()
+    for name in os.listdir(directory):
+        version = _file_version(name)
+        if version is not None and version < current_version:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass  # Already removed by another worker
+
+
+class HierarchySnapshot:
+    """The encoded variants of one hierarchy version"""
+
+    def __init__(self, version: int, paths: Dict[str, str]):
+        self.version = version
+        self.paths = paths
+
+    def choose_encoding(self, accept_encodings) -> str:
+        """
+        Best available variant for the request
+
+        Args:
+            accept_encodings: request.accept_encodings
+
+        Returns:
+            'br', 'gzip' or 'identity'
+        """
+        for encoding in PREFERRED_ENCODINGS:
+            if encoding in self.paths and accept_encodings.quality(encoding) > 0:
+                return encoding
+        return 'identity'
+
+    def open(self, accept_encodings) -> Optional[Tuple[str, BinaryIO, int]]:
+        """
+        Open the variant to send
+
+        Returns:
+            (encoding, file, size), or None if the snapshot was pruned meanwhile
+        """
+        encoding = self.choose_encoding(accept_encodings)
+        try:
+            f = open(self.paths[encoding], 'rb')
+        except OSError:
+            return None
+        return encoding, f, os.fstat(f.fileno()).st_size
+
+
+def load_snapshot(version: int) -> Optional[HierarchySnapshot]:
+    """
+    The snapshot of a hierarchy version, if this host has built it
+
+    Args:
+        version: Global hierarchy version (HierarchyVersions.version)
+
+    Returns:
+        HierarchySnapshot, or None if it doesn't exist (yet)
+    """
+    try:
+        paths = _paths(version)
+        if not os.path.exists(paths['identity']):
+            return None
+        return HierarchySnapshot(version, {
+            encoding: path for encoding, path in paths.items() if os.path.exists(path)
+        })
+    except OSError as e:
+        logging.warning(f"[HIERARCHY SNAPSHOT] Failed to read snapshot {version}: {str(e)}")
+        return None
+
+
+def save_snapshot(version: int, hierarchy: Dict[str, Any]) -> Optional[HierarchySnapshot]:
+    """
+    Encode and store the hierarchy of a version
+
+    Only one worker per host encodes a version; the others get None and
+    serve their own response until the snapshot is there.
+
+    Args:
+        version: Hierarchy version the data was built at
+        hierarchy: Output of ContentHierarchyService.get_full_hierarchy
+
+    Returns:
+        HierarchySnapshot, or None if another worker is building it or writing failed
+    """
+    lock_key = f"hierarchy_snapshot:{socket.gethostname()}:{version}"
+    token = acquire_rebuild_lock(lock_key)
+    if token is None:
+        return None
+    try:
+        existing = load_snapshot(version)
+        if existing is not None:
+            return existing
+
+        from flask import current_app
+        # Same bytes jsonify() would produce
+        body = f"{current_app.json.dumps(hierarchy)}\n".encode('utf-8')
+        variants = {'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+        paths = _paths(version)
+        for encoding, data in variants.items():
+            _write_atomic(paths[encoding], data)
+        _write_atomic(paths['identity'], body)  # Last: marks the snapshot complete
+        _prune(version)
+
+        logging.info(f"[HIERARCHY SNAPSHOT] Version {version}: {len(body)} bytes, " +
+                     ', '.join(f"{encoding} {len(data)}" for encoding, data in variants.items()))
+        return HierarchySnapshot(version, {encoding: paths[encoding] for encoding in ['identity', *variants]})
+    except Exception as e:
+        logging.warning(f"[HIERARCHY SNAPSHOT] Failed to write snapshot {version}: {str(e)}")
+        return None
+    finally:
+        release_rebuild_lock(lock_key, token)
@@ -0,0 +1,318 @@
+"""
+Hierarchy Tree
+
+In-memory snapshot of channels, folders, pages and page details used to build
+R2 object keys without touching the database:
+- Folder paths ("Channel/Folder/Sub") are resolved once per snapshot
+- Page -> folder and detail -> page indexes replace the per-level queries of
+  generate_r2_object_key
+
+Snapshots are versioned through a Redis counter. Any commit that adds,
+deletes, renames or re-parents a hierarchy row bumps the version (see the
+session hooks at the bottom), and every worker rebuilds its snapshot once it
+notices the new version.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import ContentRelChannels, ContentRelFolders, ContentRelPages, ContentRelPageDetails
+from utils.r2_paths import safe_name
+
+VERSION_KEY = 'content:hierarchy:version'
+
+# Defaults, overridable through app config (HIERARCHY_TREE_*)
+DEFAULT_CHECK_SECONDS = 1      # How often a worker asks Redis for the current version
+DEFAULT_MAX_AGE = 300          # Rebuild at least this often (covers Redis outages)
+MISS_REBUILD_INTERVAL = 1      # Unknown ids trigger at most one rebuild per interval
+
+
+def _config(name: str, default):
+    """Read an app config value, falling back to the default outside an app context"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            return current_app.config.get(name, default)
+    except ImportError:
+        pass
+    return default
+
+
+def get_hierarchy_version() -> Optional[int]:
+    """Current shared hierarchy version, or None if Redis is unavailable"""
+    try:
+        from extensions import redis_client
+        value = redis_client.get(VERSION_KEY)
+        return int(value) if value is not None else 0
+    except Exception as e:
+        logging.warning(f"[HIERARCHY TREE] Failed to read version: {str(e)}")
+        return None
+
+
+def bump_hierarchy_version() -> Optional[int]:
+    """Advance the shared hierarchy version so every worker rebuilds its tree"""
+    try:
+        from extensions import redis_client
+        return int(redis_client.incr(VERSION_KEY))
+    except Exception as e:
+        logging.warning(f"[HIERARCHY TREE] Failed to bump version: {str(e)}")
+        return None
+
+
+class HierarchyTree:
+    """Immutable snapshot of the content hierarchy"""
+
+    def __init__(self, version: Optional[int], channels: Dict[int, str],
+                 folders: Dict[int, Tuple[Optional[int], int, str]],
+                 pages: Dict[int, Tuple[int, str]], details: Dict[int, Tuple[int, str]]):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.channels = channels
+        self.folders = folders
+        self.pages = pages
+        self.details = details
+        self.folder_paths: Dict[int, List[str]] = {}
+        for folder_id in folders:
+            self._resolve_folder_path(folder_id)
+
+    @classmethod
+    def load(cls, version: Optional[int]) -> 'HierarchyTree':
+        """
+        Build a snapshot with one column-only query per table
+
+        Reads on its own connection, not the request session: the tree is
+        shared by every request of the worker, so it must only contain
+        committed names (never a rename that the caller may still roll back).
+        """
+        with db.engine.connect() as connection:
+            channels = {
+                row.id: row.name for row in connection.execute(
+                    select(ContentRelChannels.id, ContentRelChannels.name)
+                    .where(ContentRelChannels.is_deleted == False)
+                )
+            }
+            folders = {
+                row.id: (row.parent_id, row.channel_id, row.name) for row in connection.execute(
+                    select(ContentRelFolders.id, ContentRelFolders.parent_id,
+                           ContentRelFolders.channel_id, ContentRelFolders.name)
+                    .where(ContentRelFolders.is_deleted == False)
+                )
+            }
+            pages = {
+                row.id: (row.folder_id, row.name) for row in connection.execute(
+                    select(ContentRelPages.id, ContentRelPages.folder_id, ContentRelPages.name)
+                    .where(ContentRelPages.is_deleted == False)
+                )
+            }
+            details = {
+                row.id: (row.page_id, row.name) for row in connection.execute(
+                    select(ContentRelPageDetails.id, ContentRelPageDetails.page_id, ContentRelPageDetails.name)
+                    .where(ContentRelPageDetails.is_deleted == False)
+                )
+            }
+        return cls(version, channels, folders, pages, details)
+
+    def _resolve_folder_path(self, folder_id: Optional[int]) -> List[str]:
+        """
+        Path components of a folder, channel first
+
+        Follows generate_r2_object_key exactly: walk parents until a top-level
+        folder (or a missing/deleted one) and prepend the channel if it exists.
+        """
+        if folder_id in self.folder_paths:
+            return self.folder_paths[folder_id]
+
+        components = []
+        current_id = folder_id
+        seen = set()
+        while current_id is not None and current_id not in seen:
+            seen.add(current_id)
+            folder = self.folders.get(current_id)
+            if folder is None:
+                break
+            parent_id, channel_id, name = folder
+            components.append(safe_name(name))
+            if parent_id is None:
+                channel_name = self.channels.get(channel_id)
+                if channel_name is not None:
+                    components.append(safe_name(channel_name))
+                break
+            current_id = parent_id
+
+        components.reverse()
+        if folder_id is not None:
+            self.folder_paths[folder_id] = components
+        return components
+
+    def folder_path(self, folder_id: Optional[int]) -> List[str]:
+        return self.folder_paths.get(folder_id) or self._resolve_folder_path(folder_id)
+
+    def page_object_key(self, page_id: int, filename: Optional[str] = None) -> Optional[str]:
+        """R2 key of a page (filename defaults to the page name); None if the page is unknown"""
+        page = self.pages.get(page_id)
+        if page is None:
+            return None
+        folder_id, page_name = page
+        filename = filename if filename is not None else (page_name or f"file_{page_id}")
+        return '/'.join(self.folder_path(folder_id) + [safe_name(filename)])
+
+    def detail_object_key(self, detail_id: int, filename: Optional[str] = None) -> Optional[str]:
+        """R2 key of a page detail (filename defaults to the detail name); None if unknown"""
+        detail = self.details.get(detail_id)
+        if detail is None:
+            return None
+        page_id, detail_name = detail
+        page = self.pages.get(page_id)
+        if page is None:
+            return None
+        folder_id, page_name = page
+        page_folder = safe_name(os.path.splitext(page_name)[0])
+        filename = filename if filename is not None else (detail_name or f"detail_{detail_id}")
+        return '/'.join(self.folder_path(folder_id) + [page_folder, safe_name(filename)])
+
+
+class HierarchyTreeCache:
+    """Per-process holder of the current HierarchyTree"""
+
+    def __init__(self):
+        self._tree: Optional[HierarchyTree] = None
+        self._checked_at = 0.0
+        self._miss_rebuilt_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> HierarchyTree:
+        """Current snapshot, rebuilt when the shared version moved or it is too old"""
+        tree = self._tree
+        now = time.monotonic()
+
+        if tree is not None:
+            if now - tree.built_at > _config('HIERARCHY_TREE_MAX_AGE', DEFAULT_MAX_AGE):
+                return self.refresh()
+            if now - self._checked_at < _config('HIERARCHY_TREE_CHECK_SECONDS', DEFAULT_CHECK_SECONDS):
+                return tree
+            self._checked_at = now
+            version = get_hierarchy_version()
+            if version is None or version == tree.version:
+                return tree
+
+        return self.refresh()
+
+    def refresh(self) -> HierarchyTree:
+        """Rebuild the snapshot (one builder at a time per process)"""
+        stale = self._tree
+        with self._lock:
+            if self._tree is not None and self._tree is not stale:
+                return self._tree  # another caller rebuilt it while we waited
+            started = time.monotonic()
+            tree = HierarchyTree.load(get_hierarchy_version())
+            self._tree = tree
+            self._checked_at = time.monotonic()
+            logging.info(
+                f"[HIERARCHY TREE] Built v{tree.version}: {len(tree.channels)} channels, "
+                f"{len(tree.folders)} folders, {len(tree.pages)} pages, {len(tree.details)} details "
+                f"in {(self._checked_at - started) * 1000:.0f}ms"
+            )
+            return tree
+
+    def refresh_for_miss(self) -> Optional[HierarchyTree]:
+        """
+        Rebuild because an id was not found (e.g. created before the version bump
+        reached this worker); rate-limited so unknown ids can't force constant rebuilds
+        """
+        now = time.monotonic()
+        if now - self._miss_rebuilt_at < MISS_REBUILD_INTERVAL:
+            return None
+        self._miss_rebuilt_at = now
+        self._tree = None
+        return self.refresh()
+
+    def invalidate(self) -> None:
+        """Drop this worker's snapshot and tell every other worker to rebuild"""
+        self._tree = None
+        bump_hierarchy_version()
+
+
+# Process-wide tree shared by all requests
+hierarchy_tree = HierarchyTreeCache()
+
+
+def generate_object_keys(ids: Iterable[int], is_page_detail: bool = False) -> Dict[int, str]:
+    """
+    R2 object keys for many pages (or page details) using their stored names
+
+    Args:
+        ids: Page ids, or page detail ids when is_page_detail is True
+        is_page_detail: Whether ids are page detail ids
+
+    Returns:
+        {id: object_key}; ids that don't exist (or are deleted) are left out
+    """
+    ids = list(ids)
+    tree = hierarchy_tree.get()
+    build = tree.detail_object_key if is_page_detail else tree.page_object_key
+
+    keys = {}
+    missing = []
+    for item_id in ids:
+        key = build(item_id)
+        if key is None:
+            missing.append(item_id)
+        else:
+            keys[item_id] = key
+
+    if missing:
+        tree = hierarchy_tree.refresh_for_miss()
+        if tree is not None:
+            build = tree.detail_object_key if is_page_detail else tree.page_object_key
+            for item_id in missing:
+                key = build(item_id)
+                if key is not None:
+                    keys[item_id] = key
+    return keys
+
+
+# ---- Change tracking ----
+
+HIERARCHY_MODELS = (ContentRelChannels, ContentRelFolders, ContentRelPages, ContentRelPageDetails)
+PATH_ATTRIBUTES = ('name', 'parent_id', 'channel_id', 'folder_id', 'page_id', 'is_deleted')
+
+
+def _changes_paths(obj) -> bool:
+    """Whether a dirty hierarchy row changed anything that ends up in an R2 path"""
+    state = inspect(obj)
+    for attribute in PATH_ATTRIBUTES:
+        if attribute in state.attrs and state.attrs[attribute].history.has_changes():
+            return True
+    return False
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_hierarchy_changes(session, flush_context, instances):
+    if session.info.get('hierarchy_changed'):
+        return
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, HIERARCHY_MODELS):
+            session.info['hierarchy_changed'] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, HIERARCHY_MODELS) and _changes_paths(obj):
+            session.info['hierarchy_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_hierarchy_changes(session):
+    if session.info.pop('hierarchy_changed', False):
+        hierarchy_tree.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_hierarchy_changes(session):
+    session.info.pop('hierarchy_changed', None)
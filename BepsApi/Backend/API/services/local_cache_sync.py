@@ -0,0 +1,147 @@
+"""
+Local Cache Sync
+
+Per-worker caches (the R2 existence index, the local existence LRU, signed
+URLs) only see the invalidations of their own process. This module shares
+them through a Redis stream:
+- publish() applies an event to this process right away and appends it to
+  the stream (content:cache:events, trimmed to about STREAM_MAXLEN entries)
+- sync() replays the events other workers appended since the last call; the
+  caches call it on read, throttled to once per LOCAL_CACHE_SYNC_SECONDS
+
+A worker that falls behind the trimmed stream (or starts reading it for the
+first time) drops its registered caches entirely instead of replaying. When
+Redis is unavailable the caches fall back to their own TTLs.
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+STREAM_KEY = 'content:cache:events'
+STREAM_MAXLEN = 10000
+READ_BATCH = 500
+
+# Defaults, overridable through app config (LOCAL_CACHE_SYNC_*)
+DEFAULT_SYNC_SECONDS = 1  # How often a worker reads the stream
+
+
+def _config(name: str, default):
+    """Read an app config value, falling back to the default outside an app context"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            return current_app.config.get(name, default)
+    except ImportError:
+        pass
+    return default
+
+
+def _origin() -> str:
+    """Identifies this worker (computed per call: workers are forked after import)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _parse_id(entry_id: str) -> tuple:
+    milliseconds, _, sequence = entry_id.partition('-')
+    return int(milliseconds), int(sequence or 0)
+
+
+def _next_id(entry_id: str) -> str:
+    """Smallest stream id after entry_id (XRANGE start is inclusive)"""
+    milliseconds, sequence = _parse_id(entry_id)
+    return f"{milliseconds}-{sequence + 1}"
+
+
+class LocalCacheSync:
+    """Registry of local caches plus the reader position in the shared stream"""
+
+    def __init__(self):
+        # cache name -> handler(op, keys); op 'clear' drops everything
+        self._handlers: Dict[str, Callable[[str, List[str]], None]] = {}
+        self._last_id: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def register(self, name: str, handler: Callable[[str, List[str]], None]) -> None:
+        """Register a cache; handler(op, keys) applies one event to it"""
+        self._handlers[name] = handler
+
+    def _apply(self, name: str, op: str, keys: List[str]) -> None:
+        handler = self._handlers.get(name)
+        if handler is None:
+            return
+        try:
+            handler(op, keys)
+        except Exception as e:
+            logging.warning(f"[CACHE SYNC] Failed to apply {op} to {name}: {str(e)}")
+
+    def _clear_all(self) -> None:
+        for name in list(self._handlers):
+            self._apply(name, 'clear', [])
+
+    def publish(self, name: str, op: str, keys: Optional[List[str]] = None) -> None:
+        """
+        Apply an event here and share it with every other worker
+
+        Args:
+            name: Registered cache name
+            op: Cache-specific operation ('clear' drops the whole cache)
+            keys: Keys the operation applies to
+        """
+        keys = list(keys or [])
+        self._apply(name, op, keys)
+        try:
+            from extensions import redis_client
+            redis_client.xadd(STREAM_KEY, {'cache': name, 'op': op, 'keys': json.dumps(keys), 'origin': _origin()},
+                              maxlen=STREAM_MAXLEN, approximate=True)
+        except Exception as e:
+            logging.warning(f"[CACHE SYNC] Failed to publish {op} for {name}: {str(e)}")
+
+    def sync(self, force: bool = False) -> None:
+        """Replay events published since the last sync (throttled unless force)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < _config('LOCAL_CACHE_SYNC_SECONDS', DEFAULT_SYNC_SECONDS):
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread of this worker is already syncing
+        try:
+            self._checked_at = now
+            from extensions import redis_client
+
+            if self._last_id is None:
+                # First read: nothing cached yet predates the stream position
+                latest = redis_client.xrevrange(STREAM_KEY, count=1)
+                self._last_id = latest[0][0] if latest else '0-0'
+                return
+
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.xrange(STREAM_KEY, count=1)
+            pipe.xrange(STREAM_KEY, min=_next_id(self._last_id), count=READ_BATCH)
+            oldest, entries = pipe.execute()
+
+            behind = oldest and self._last_id != '0-0' and _parse_id(oldest[0][0]) > _parse_id(self._last_id)
+            if behind or len(entries) >= READ_BATCH:
+                # Events may have been trimmed (or too many to replay): start over
+                self._clear_all()
+                latest = redis_client.xrevrange(STREAM_KEY, count=1)
+                self._last_id = latest[0][0] if latest else self._last_id
+                return
+
+            origin = _origin()
+            for entry_id, fields in entries:
+                if fields.get('origin') != origin:  # Our own events were applied when published
+                    self._apply(fields.get('cache'), fields.get('op'), json.loads(fields.get('keys') or '[]'))
+                self._last_id = entry_id
+        except Exception as e:
+            logging.warning(f"[CACHE SYNC] Failed to read cache events: {str(e)}")
+        finally:
+            self._lock.release()
+
+
+# Process-wide registry shared by all caches
+local_cache_sync = LocalCacheSync()
@@ -0,0 +1,365 @@
+"""
+R2 Bulk Move Service
+
+Moves every object under one R2 prefix to another (channel/folder renames)
+as a background job instead of inside the HTTP request:
+- Lists the source prefix page by page and records one item row per object
+- Copies with a bounded pool (multipart copy for objects over 5GB)
+- Applies the DB rename once every object has been copied, so readers
+  switch to the new keys while the old ones still exist
+- Then deletes the sources with DeleteObjects, up to 1000 keys per call
+
+Progress lives in r2_move_jobs / r2_move_job_items, so a job that was
+interrupted (worker restart, R2 outage) resumes where it stopped.
+"""
+
+import datetime
+import threading
+from typing import Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import func
+
+from extensions import db
+from models import R2MoveJob, R2MoveJobItem, ContentRelChannels, ContentRelFolders
+from log_config import get_content_logger
+
+logger = get_content_logger()
+
+ITEM_BATCH_SIZE = 500  # items copied (and committed as progress) per round
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class R2BulkMoveService:
+    """Service for resumable background moves of R2 prefixes"""
+
+    @staticmethod
+    def create_job(job_type: str, entity_id: int, source_prefix: str, destination_prefix: str,
+                   params: Dict, created_by: Optional[str] = None) -> R2MoveJob:
+        """
+        Record a new move job (committed, status 'queued')
+
+        Args:
+            job_type: 'channel_rename' or 'folder_rename'
+            entity_id: Channel/folder id being renamed
+            source_prefix: Prefix to move, ending with '/'
+            destination_prefix: Target prefix, ending with '/'
+            params: DB change to apply once the move has finished
+            created_by: User who requested the move
+
+        Returns:
+            The created R2MoveJob
+        """
+        if not source_prefix.endswith('/') or not destination_prefix.endswith('/'):
+            raise ValueError("Move prefixes must end with '/'")
+        if source_prefix.startswith(destination_prefix) or destination_prefix.startswith(source_prefix):
+            raise ValueError(f"Overlapping move prefixes: {source_prefix} → {destination_prefix}")
+
+        job = R2MoveJob(
+            job_type=job_type,
+            entity_id=entity_id,
+            source_prefix=source_prefix,
+            destination_prefix=destination_prefix,
+            params=params,
+            status='queued',
+            created_by=created_by
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def get_active_job(job_type: str, entity_id: int) -> Optional[R2MoveJob]:
+        """Queued/running job for an entity, if any"""
+        return R2MoveJob.query.filter(
+            R2MoveJob.job_type == job_type,
+            R2MoveJob.entity_id == entity_id,
+            R2MoveJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(R2MoveJob.id.desc()).first()
+
+    @staticmethod
+    def claim_job(job_id: int) -> bool:
+        """
+        Atomically mark a job as running
+
+        Queued and failed jobs can always be claimed; a running job only when
+        its progress has not been updated for R2_BULK_MOVE_STALE_SECONDS
+        (its worker died).
+
+        Returns:
+            True if this caller now owns the job
+        """
+        stale_seconds = current_app.config.get('R2_BULK_MOVE_STALE_SECONDS', 300)
+        stale_before = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=stale_seconds)
+
+        claimed = db.session.query(R2MoveJob).filter(
+            R2MoveJob.id == job_id,
+            or_(
+                R2MoveJob.status.in_(['queued', 'failed']),
+                and_(R2MoveJob.status == 'running', R2MoveJob.updated_at < stale_before)
+            )
+        ).update({
+            R2MoveJob.status: 'running',
+            R2MoveJob.error: None,
+            R2MoveJob.started_at: func.now(),
+            R2MoveJob.finished_at: None,
+            R2MoveJob.updated_at: func.now()
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    @staticmethod
+    def start_job(job_id: int, wait_seconds: float = 0) -> Optional[bool]:
+        """
+        Claim a job and run it in a background thread (a greenlet under gevent)
+
+        Args:
+            job_id: Job to start or resume
+            wait_seconds: How long to wait for it to finish before returning
+
+        Returns:
+            None if the job could not be claimed, otherwise whether it finished within wait_seconds
+        """
+        if not R2BulkMoveService.claim_job(job_id):
+            return None
+
+        app = current_app._get_current_object()
+
+        def run_in_background():
+            with app.app_context():
+                R2BulkMoveService.run_job(job_id)
+
+        worker = threading.Thread(target=run_in_background, name=f"r2-move-{job_id}", daemon=True)
+        worker.start()
+        if wait_seconds:
+            worker.join(wait_seconds)
+        return not worker.is_alive()
+
+    @staticmethod
+    def run_job(job_id: int) -> None:
+        """Run (or resume) a claimed job to completion; failures are recorded on the job"""
+        job = R2MoveJob.query.get(job_id)
+        if job is None:
+            return
+
+        logger.info(f"[R2 MOVE] Job {job_id} started: {job.source_prefix} → {job.destination_prefix}")
+        try:
+            # Items that failed in a previous run get another attempt
+            R2MoveJobItem.query.filter_by(job_id=job_id, status='failed').update(
+                {R2MoveJobItem.status: 'pending', R2MoveJobItem.error: None}, synchronize_session=False
+            )
+            R2BulkMoveService._set_phase(job, 'listing')
+            R2BulkMoveService._plan_items(job)
+
+            R2BulkMoveService._set_phase(job, 'copying')
+            R2BulkMoveService._copy_pending_items(job)
+            if job.failed_objects:
+                # Sources are untouched until every copy succeeded, so the old paths keep working
+                raise RuntimeError(f"{job.failed_objects} objects failed to copy")
+
+            # Rename the row before deleting anything: until then readers resolve the old
+            # name, whose objects must stay in place. Re-applied harmlessly on resume.
+            R2BulkMoveService._set_phase(job, 'finalizing')
+            R2BulkMoveService._apply_params(job)
+            db.session.commit()
+            from services.r2_storage_service import R2StorageService
+            R2StorageService.clear_cache()
+
+            R2BulkMoveService._set_phase(job, 'deleting')
+            R2BulkMoveService._delete_copied_items(job)
+            if job.failed_objects:
+                raise RuntimeError(f"Renamed, but {job.failed_objects} old objects failed to delete")
+
+            job.status = 'completed'
+            job.finished_at = func.now()
+            job.updated_at = func.now()
+            db.session.commit()
+            logger.info(f"[R2 MOVE] Job {job_id} completed: {job.total_objects} objects")
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"[R2 MOVE] Job {job_id} failed: {str(e)}")
+            job = R2MoveJob.query.get(job_id)
+            job.status = 'failed'
+            job.error = str(e)
+            job.finished_at = func.now()
+            job.updated_at = func.now()
+            db.session.commit()
+
+        finally:
+            # Objects under both prefixes changed; drop every cached lookup
+            from services.r2_storage_service import R2StorageService
+            R2StorageService.clear_cache()
+
+    @staticmethod
+    def get_failed_items(job_id: int, limit: int = 20) -> List[Dict]:
+        """A sample of failed items for status responses"""
+        rows = db.session.query(
+            R2MoveJobItem.source_key, R2MoveJobItem.destination_key, R2MoveJobItem.error
+        ).filter(
+            R2MoveJobItem.job_id == job_id,
+            R2MoveJobItem.status == 'failed'
+        ).order_by(R2MoveJobItem.id).limit(limit).all()
+        return [row._asdict() for row in rows]
+
+    # ---- Job phases ----
+
+    @staticmethod
+    def _set_phase(job: R2MoveJob, phase: str) -> None:
+        job.phase = phase
+        job.updated_at = func.now()
+        db.session.commit()
+
+    @staticmethod
+    def _refresh_counts(job: R2MoveJob) -> None:
+        """Recompute job counters from item states and commit (also serves as a heartbeat)"""
+        counts = dict(db.session.query(
+            R2MoveJobItem.status, func.count(R2MoveJobItem.id)
+        ).filter(R2MoveJobItem.job_id == job.id).group_by(R2MoveJobItem.status).all())
+
+        job.copied_objects = counts.get('copied', 0) + counts.get('deleted', 0)
+        job.deleted_objects = counts.get('deleted', 0)
+        job.failed_objects = counts.get('failed', 0)
+        job.updated_at = func.now()
+        db.session.commit()
+
+    @staticmethod
+    def _plan_items(job: R2MoveJob) -> None:
+        """List the source prefix and record an item for every object not seen yet"""
+        from blueprints.contents.r2_utils import iter_r2_objects, LIST_PAGE_SIZE
+
+        source_length = len(job.source_prefix)
+
+        def record(rows):
+            # Keys recorded by an earlier run keep their progress
+            db.session.execute(
+                pg_insert(R2MoveJobItem.__table__).values(rows).on_conflict_do_nothing(
+                    index_elements=['job_id', 'source_key']
+                )
+            )
+            job.updated_at = func.now()
+            db.session.commit()
+
+        rows = []
+        for obj in iter_r2_objects(job.source_prefix, with_metadata=True):
+            rows.append({
+                'job_id': job.id,
+                'source_key': obj['key'],
+                'destination_key': job.destination_prefix + obj['key'][source_length:],
+                'size': obj['size'],
+                'status': 'pending'
+            })
+            if len(rows) >= LIST_PAGE_SIZE:
+                record(rows)
+                rows = []
+        if rows:
+            record(rows)
+
+        total_objects, total_bytes = db.session.query(
+            func.count(R2MoveJobItem.id), func.coalesce(func.sum(R2MoveJobItem.size), 0)
+        ).filter(R2MoveJobItem.job_id == job.id).one()
+        job.total_objects = total_objects
+        job.total_bytes = total_bytes
+        R2BulkMoveService._refresh_counts(job)
+
+    @staticmethod
+    def _copy_pending_items(job: R2MoveJob) -> None:
+        """Copy pending items to their destination with a bounded pool"""
+        from blueprints.contents.r2_utils import server_side_copy_r2_object
+        from utils.concurrent_executor import run_concurrently
+
+        concurrency = current_app.config.get('R2_BULK_MOVE_CONCURRENCY', 16)
+        # Own setting: background copies must not follow the request-path r2-batch-check executor
+        executor_mode = current_app.config.get('R2_BULK_MOVE_EXECUTOR', 'auto')
+
+        def copy_one(item):
+            item_id, source_key, destination_key, size = item
+            try:
+                server_side_copy_r2_object(source_key, destination_key, size)
+                return item_id, None
+            except Exception as e:
+                return item_id, str(e)
+
+        last_id = 0
+        while True:
+            items = db.session.query(
+                R2MoveJobItem.id, R2MoveJobItem.source_key,
+                R2MoveJobItem.destination_key, R2MoveJobItem.size
+            ).filter(
+                R2MoveJobItem.job_id == job.id,
+                R2MoveJobItem.status == 'pending',
+                R2MoveJobItem.id > last_id
+            ).order_by(R2MoveJobItem.id).limit(ITEM_BATCH_SIZE).all()
+            if not items:
+                break
+            last_id = items[-1].id
+
+            # copy_one only talks to R2, so the copies aren't limited by the DB pool
+            results = run_concurrently(copy_one, [tuple(item) for item in items],
+                                       max_workers=concurrency, mode=executor_mode, uses_db=False)
+            R2BulkMoveService._record_results(results, success_status='copied')
+            R2BulkMoveService._refresh_counts(job)
+
+    @staticmethod
+    def _delete_copied_items(job: R2MoveJob) -> None:
+        """Delete copied sources with DeleteObjects (1000 keys per call)"""
+        from blueprints.contents.r2_utils import delete_r2_objects, DELETE_OBJECTS_MAX_KEYS
+
+        last_id = 0
+        while True:
+            items = db.session.query(R2MoveJobItem.id, R2MoveJobItem.source_key).filter(
+                R2MoveJobItem.job_id == job.id,
+                R2MoveJobItem.status == 'copied',
+                R2MoveJobItem.id > last_id
+            ).order_by(R2MoveJobItem.id).limit(DELETE_OBJECTS_MAX_KEYS).all()
+            if not items:
+                break
+            last_id = items[-1].id
+
+            errors = delete_r2_objects([item.source_key for item in items])
+            R2BulkMoveService._record_results(
+                [(item.id, errors.get(item.source_key)) for item in items], success_status='deleted'
+            )
+            R2BulkMoveService._refresh_counts(job)
+
+    @staticmethod
+    def _record_results(results, success_status: str) -> None:
+        """Store (item_id, error or None) results; caller commits"""
+        succeeded = [item_id for item_id, error in results if error is None]
+        if succeeded:
+            R2MoveJobItem.query.filter(R2MoveJobItem.id.in_(succeeded)).update(
+                {R2MoveJobItem.status: success_status, R2MoveJobItem.error: None},
+                synchronize_session=False
+            )
+        for item_id, error in results:
+            if error is not None:
+                R2MoveJobItem.query.filter_by(id=item_id).update(
+                    {R2MoveJobItem.status: 'failed', R2MoveJobItem.error: error[:1000]},
+                    synchronize_session=False
+                )
+
+    @staticmethod
+    def _apply_params(job: R2MoveJob) -> None:
+        """Apply the DB rename the job was created for (idempotent, committed by the caller)"""
+        params = job.params or {}
+        now = datetime.datetime.now()
+
+        if job.job_type == 'channel_rename':
+            channel = ContentRelChannels.query.get(job.entity_id)
+            if channel is None:
+                raise RuntimeError(f"Channel {job.entity_id} no longer exists")
+            channel.name = params['name']
+            channel.updated_at = now
+
+        elif job.job_type == 'folder_rename':
+            folder = ContentRelFolders.query.get(job.entity_id)
+            if folder is None:
+                raise RuntimeError(f"Folder {job.entity_id} no longer exists")
+            folder.name = params['name']
+            folder.channel_id = params['channel_id']
+            folder.updated_at = now
+
+        else:
+            raise ValueError(f"Unknown move job type: {job.job_type}")
@@ -0,0 +1,228 @@
+"""
+R2 Existence Cache
+
+Two-level cache for "does this page/detail have content in R2" answers:
+- In-process LRU (per worker, short TTL) in front of
+- Redis (shared by every gunicorn/Celery worker)
+
+Keys are by id only (r2:exists:page:<id>, r2:exists:detail:<id>). Routes that
+change content call invalidate_page()/invalidate_detail() explicitly, so
+entries don't need the updated_at timestamp in the key. Negative results get
+a shorter TTL because they are the ones that turn stale when content arrives.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from services.local_cache_sync import local_cache_sync
+
+KEY_PREFIX = 'r2:exists'
+SYNC_NAME = 'r2_existence_cache'
+
+# Defaults, overridable through app config (R2_EXISTENCE_*)
+DEFAULT_POSITIVE_TTL = 300   # 5 minutes
+DEFAULT_NEGATIVE_TTL = 60    # 1 minute
+DEFAULT_LOCAL_TTL = 15       # local copies are short-lived so other workers' invalidations show up quickly
+DEFAULT_LOCAL_MAX_ENTRIES = 2000
+
+
+def _config(name: str, default):
+    """Read an app config value, falling back to the default outside an app context"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            return current_app.config.get(name, default)
+    except ImportError:
+        pass
+    return default
+
+
+def page_key(page_id: int) -> str:
+    return f"{KEY_PREFIX}:page:{page_id}"
+
+
+def detail_key(detail_id: int) -> str:
+    return f"{KEY_PREFIX}:detail:{detail_id}"
+
+
+class LocalLRUBackend:
+    """Bounded in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = DEFAULT_LOCAL_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bool]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bool, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Shared backend on extensions.redis_client; Redis errors degrade to cache misses"""
+
+    def _client(self):
+        from extensions import redis_client
+        return redis_client
+
+    def get(self, key: str) -> Optional[bool]:
+        try:
+            value = self._client().get(key)
+        except Exception as e:
+            logging.warning(f"[R2 CACHE] Redis get failed for {key}: {str(e)}")
+            return None
+        if value is None:
+            return None
+        return value == '1'
+
+    def set(self, key: str, value: bool, ttl: float) -> None:
+        try:
+            self._client().set(key, '1' if value else '0', ex=max(1, int(ttl)))
+        except Exception as e:
+            logging.warning(f"[R2 CACHE] Redis set failed for {key}: {str(e)}")
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            self._client().delete(*keys)
+        except Exception as e:
+            logging.warning(f"[R2 CACHE] Redis delete failed for {keys}: {str(e)}")
+
+    def clear(self) -> None:
+        try:
+            client = self._client()
+            batch = []
+            for key in client.scan_iter(match=f"{KEY_PREFIX}:*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    client.delete(*batch)
+                    batch = []
+            if batch:
+                client.delete(*batch)
+        except Exception as e:
+            logging.warning(f"[R2 CACHE] Redis clear failed: {str(e)}")
+
+
+class R2ExistenceCache:
+    """
+    Existence cache with an optional local LRU and an optional shared backend
+
+    R2_EXISTENCE_CACHE_BACKEND selects the layers:
+        'tiered' (default) - local LRU + Redis
+        'local'            - local LRU only
+        'redis'            - Redis only
+        'none'             - no caching
+    """
+
+    def __init__(self, local: Optional[LocalLRUBackend] = None,
+                 shared: Optional[RedisBackend] = None):
+        self.local = local or LocalLRUBackend()
+        self.shared = shared or RedisBackend()
+
+    def _layers(self):
+        mode = _config('R2_EXISTENCE_CACHE_BACKEND', 'tiered')
+        use_local = mode in ('tiered', 'local')
+        use_shared = mode in ('tiered', 'redis')
+        return use_local, use_shared
+
+    def get(self, key: str) -> Optional[bool]:
+        """Cached existence for key, or None on a miss"""
+        use_local, use_shared = self._layers()
+
+        if use_local:
+            local_cache_sync.sync()
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
+        if use_shared:
+            value = self.shared.get(key)
+            if value is not None:
+                if use_local:
+                    self.local.set(key, value, self._local_ttl(value))
+                return value
+
+        return None
+
+    def set(self, key: str, exists: bool) -> None:
+        """Store an existence result (negative results expire sooner)"""
+        use_local, use_shared = self._layers()
+        if use_shared:
+            self.shared.set(key, exists, self._ttl(exists))
+        if use_local:
+            self.local.set(key, exists, self._local_ttl(exists))
+
+    def delete(self, keys: Iterable[str]) -> None:
+        """Forget keys in Redis and in every worker's local LRU"""
+        keys = list(keys)
+        self.shared.delete(keys)
+        local_cache_sync.publish(SYNC_NAME, 'delete', keys)
+
+    def clear(self) -> None:
+        self.shared.clear()
+        local_cache_sync.publish(SYNC_NAME, 'clear')
+
+    def apply_event(self, op: str, keys: List[str]) -> None:
+        """Apply a delete / clear event to this worker's local LRU"""
+        if op == 'delete':
+            self.local.delete(keys)
+        else:
+            self.local.clear()
+
+    def _ttl(self, exists: bool) -> float:
+        if exists:
+            return _config('R2_EXISTENCE_TTL', DEFAULT_POSITIVE_TTL)
+        return _config('R2_EXISTENCE_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL)
+
+    def _local_ttl(self, exists: bool) -> float:
+        return min(self._ttl(exists), _config('R2_EXISTENCE_LOCAL_TTL', DEFAULT_LOCAL_TTL))
+
+    # ---- Invalidation helpers used by routes ----
+
+    def invalidate_page(self, page_id: int, detail_ids: Iterable[int] = ()) -> None:
+        """Forget a page (and optionally some of its details)"""
+        self.delete([page_key(page_id)] + [detail_key(detail_id) for detail_id in detail_ids])
+
+    def invalidate_detail(self, detail_id: int, page_id: Optional[int] = None) -> None:
+        """Forget a detail; its page is included because page existence falls back to details"""
+        keys = [detail_key(detail_id)]
+        if page_id is not None:
+            keys.append(page_key(page_id))
+        self.delete(keys)
+
+    def invalidate_pages(self, page_ids: Iterable[int]) -> None:
+        self.delete([page_key(page_id) for page_id in page_ids])
+
+
+# Process-wide cache shared by all requests
+r2_existence_cache = R2ExistenceCache()
+local_cache_sync.register(SYNC_NAME, r2_existence_cache.apply_event)
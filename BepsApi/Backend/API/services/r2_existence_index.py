@@ -0,0 +1,220 @@
+"""
+R2 Existence Index
+
+Keeps an in-memory map of the objects stored under each category prefix so
+existence checks don't need one HEAD request per guessed extension:
+- One paginated list_objects_v2 per category prefix
+- {stem -> [keys]} lookups in memory
+- Incremental updates when objects are uploaded, moved or deleted, shared
+  with the other workers through services.local_cache_sync
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Iterable, Iterator
+
+from services.local_cache_sync import local_cache_sync
+
+INDEX_TTL_SECONDS = 300  # 5 minutes
+SYNC_NAME = 'r2_existence_index'
+
+
+def split_stem(relative_key: str) -> str:
+    """Return the key relative to its prefix without the file extension"""
+    return os.path.splitext(relative_key)[0]
+
+
+def build_stem_map(prefix: str, keys: Iterable[str]) -> Dict[str, List[str]]:
+    """Group object keys under prefix by their stem relative to the prefix"""
+    stems: Dict[str, List[str]] = {}
+    for key in keys:
+        stems.setdefault(split_stem(key[len(prefix):]), []).append(key)
+    return stems
+
+
+def find_in_stem_map(stem_map: Dict[str, List[str]], stems: Iterable[str],
+                     extensions: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Find the first existing key for any of the given stems
+
+    Args:
+        stem_map: {stem -> [keys]} as built by build_stem_map
+        stems: Candidate stems, in priority order
+        extensions: Allowed extensions in priority order (None = any)
+
+    Returns:
+        Object key or None if nothing matches
+    """
+    for stem in stems:
+        keys = stem_map.get(stem)
+        if not keys:
+            continue
+        if extensions is None:
+            return keys[0]
+
+        best_key = None
+        best_rank = len(extensions)
+        for key in keys:
+            ext = os.path.splitext(key)[1].lower()
+            if ext in extensions and extensions.index(ext) < best_rank:
+                best_key = key
+                best_rank = extensions.index(ext)
+        if best_key:
+            return best_key
+    return None
+
+
+class R2ExistenceIndex:
+    """
+    Per-prefix index of existing R2 objects
+
+    A prefix is a category path such as "Channel/Category/". Its index maps
+    every object below it to a stem relative to the prefix:
+        "Channel/Category/001_Page.png"        -> "001_Page"
+        "Channel/Category/001_Page/001_01.pdf" -> "001_Page/001_01"
+
+    The maps handed out by get() are never mutated: updates build a new map
+    for the prefix and swap it in under the lock, so readers can iterate
+    theirs while other threads apply events.
+    """
+
+    def __init__(self, ttl_seconds: int = INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict[str, List[str]]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._prefix_locks: Dict[str, threading.Lock] = {}
+
+    def _list_prefix(self, prefix: str) -> Iterator[str]:
+        """Stream every object key under the prefix (follows continuation tokens)"""
+        # Import here to avoid circular imports
+        from blueprints.contents.r2_utils import iter_r2_objects
+        return iter_r2_objects(prefix)
+
+    def _prefix_lock(self, prefix: str) -> threading.Lock:
+        with self._lock:
+            lock = self._prefix_locks.get(prefix)
+            if lock is None:
+                lock = self._prefix_locks[prefix] = threading.Lock()
+            return lock
+
+    def _fresh_entry(self, prefix: str) -> Optional[Dict[str, List[str]]]:
+        """The prefix's map if it is loaded and within the TTL, else None"""
+        with self._lock:
+            loaded_at = self._loaded_at.get(prefix)
+            if loaded_at is None or (time.monotonic() - loaded_at) >= self.ttl_seconds:
+                return None
+            return self._entries.get(prefix)
+
+    def get(self, prefix: str, refresh: bool = False) -> Dict[str, List[str]]:
+        """
+        Get the {stem -> [keys]} map for a prefix, listing R2 if needed
+
+        Concurrent callers for the same prefix wait for a single listing.
+        """
+        local_cache_sync.sync()
+        entry = None if refresh else self._fresh_entry(prefix)
+        if entry is not None:
+            return entry
+
+        with self._prefix_lock(prefix):
+            # Another caller may have loaded it while we were waiting
+            entry = None if refresh else self._fresh_entry(prefix)
+            if entry is not None:
+                return entry
+
+            stems = build_stem_map(prefix, self._list_prefix(prefix))
+
+            with self._lock:
+                self._entries[prefix] = stems
+                self._loaded_at[prefix] = time.monotonic()
+
+            logging.debug(f"[R2 INDEX] Listed {sum(len(keys) for keys in stems.values())} objects under {prefix}")
+            return stems
+
+    def find(self, prefix: str, stems: Iterable[str],
+             extensions: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Find the first existing key under prefix for any of the given stems
+
+        Args:
+            prefix: Category prefix to look in
+            stems: Candidate stems, in priority order
+            extensions: Allowed extensions in priority order (None = any)
+
+        Returns:
+            Object key or None if nothing matches
+        """
+        return find_in_stem_map(self.get(prefix), stems, extensions)
+
+    def has_stem_prefix(self, prefix: str, stem_prefix: str,
+                        extensions: Optional[List[str]] = None) -> bool:
+        """Check whether any object exists whose stem starts with stem_prefix"""
+        index = self.get(prefix)
+        for stem, keys in index.items():
+            if not stem.startswith(stem_prefix):
+                continue
+            if extensions is None:
+                return True
+            if any(os.path.splitext(key)[1].lower() in extensions for key in keys):
+                return True
+        return False
+
+    def add_key(self, key: str) -> None:
+        """Record a newly written object in every worker's loaded prefixes"""
+        local_cache_sync.publish(SYNC_NAME, 'add', [key])
+
+    def remove_key(self, key: str) -> None:
+        """Forget a deleted object in every worker's loaded prefixes"""
+        self.remove_keys([key])
+
+    def remove_keys(self, keys: Iterable[str]) -> None:
+        """Forget deleted objects in every worker (one event for the batch)"""
+        keys = list(keys)
+        if keys:
+            local_cache_sync.publish(SYNC_NAME, 'remove', keys)
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        """Drop one prefix (or every prefix) in every worker so it is re-listed on next use"""
+        local_cache_sync.publish(SYNC_NAME, 'invalidate', [prefix] if prefix is not None else [])
+
+    def apply_event(self, op: str, keys: List[str]) -> None:
+        """Apply an add / remove / invalidate / clear event to this worker's index"""
+        with self._lock:
+            if op in ('add', 'remove'):
+                # Copy-on-write: readers may be iterating the current maps
+                updated: Dict[str, Dict[str, List[str]]] = {}
+                for key in keys:
+                    for prefix, index in self._entries.items():
+                        if not key.startswith(prefix):
+                            continue
+                        stem = split_stem(key[len(prefix):])
+                        stem_keys = updated.get(prefix, index).get(stem, [])
+                        if (key in stem_keys) == (op == 'add'):
+                            continue  # Already applied
+                        if prefix not in updated:
+                            updated[prefix] = dict(index)
+                        index = updated[prefix]
+                        if op == 'add':
+                            index[stem] = stem_keys + [key]
+                        else:
+                            remaining = [k for k in stem_keys if k != key]
+                            if remaining:
+                                index[stem] = remaining
+                            else:
+                                del index[stem]
+                self._entries.update(updated)
+            elif op == 'invalidate' and keys:
+                for prefix in keys:
+                    self._entries.pop(prefix, None)
+                    self._loaded_at.pop(prefix, None)
+            else:  # 'clear', or 'invalidate' of every prefix
+                self._entries.clear()
+                self._loaded_at.clear()
+
+
+# Process-wide index shared by all requests
+r2_existence_index = R2ExistenceIndex()
+local_cache_sync.register(SYNC_NAME, r2_existence_index.apply_event)
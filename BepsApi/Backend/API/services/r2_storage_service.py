@@ -7,18 +7,121 @@ Handles all R2/Cloudflare storage operations including:
 - Upload/download operations
 """
 
+import os
 import logging
 import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, List
 
-# Cache for R2 existence checks to improve performance
-_r2_existence_cache: Dict[str, Dict[str, Any]] = {}
-CACHE_TTL_SECONDS = 300  # 5 minutes
+from services.r2_existence_index import r2_existence_index
+from utils.r2_paths import safe_name
+from services.r2_existence_cache import r2_existence_cache, page_key, detail_key
+
+# Extensions probed for each kind of content, in priority order
+PAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
+DETAIL_EXTENSIONS = ['.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx', '.png', '.jpg', '.jpeg', '.gif', '.webp']
+PAGE_DETAIL_FILE_EXTENSIONS = ['.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx']
+
+
+def _stem_candidates(safe_name: str) -> List[str]:
+    """
+    Stems to look up for a DB name
+
+    Names are usually stored with their extension ("001_Page.png"), so the object
+    stem is the name without extension. The full name is kept as a fallback for
+    objects stored as "{name}{ext}".
+    """
+    stem = os.path.splitext(safe_name)[0]
+    return [stem, safe_name] if stem != safe_name else [stem]
 
 
 class R2StorageService:
     """Service for handling R2 storage operations"""
     
+    @staticmethod
+    def get_page_prefix(page_id: int, page_name: str) -> str:
+        """
+        Get the category prefix (e.g. "Channel/Category/") that holds a page's files
+        """
+        from blueprints.contents.r2_utils import generate_r2_object_key
+        
+        page_key = generate_r2_object_key(page_id, page_name, is_page_detail=False)
+        return os.path.dirname(page_key) + '/'
+    
+    @staticmethod
+    def find_page_object_key(page_id: int, page_name: str = None,
+                             extensions: List[str] = None) -> Optional[str]:
+        """
+        Find the R2 object key of a page's main file using the existence index
+        
+        Args:
+            page_id: ID of the page
+            page_name: Name of the page (defaults to "file_{page_id}")
+            extensions: Allowed extensions in priority order (defaults to PAGE_EXTENSIONS)
+            
+        Returns:
+            Existing object key or None
+        """
+        page_name_clean = page_name or f"file_{page_id}"
+        prefix = R2StorageService.get_page_prefix(page_id, page_name_clean)
+        return r2_existence_index.find(
+            prefix, _stem_candidates(safe_name(page_name_clean)), extensions or PAGE_EXTENSIONS
+        )
+    
+    @staticmethod
+    def find_page_object_keys(pages: List[tuple], extensions: List[str] = None) -> Dict[int, Optional[str]]:
+        """
+        Find the R2 object keys of many pages' main files at once
+        
+        Paths are derived with one batched hierarchy lookup and each category
+        prefix is listed at most once (existence index).
+        
+        Args:
+            pages: List of (page_id, folder_id, page_name)
+            extensions: Allowed extensions in priority order (defaults to PAGE_EXTENSIONS)
+            
+        Returns:
+            {page_id: existing object key or None}
+        """
+        from blueprints.contents.r2_utils import generate_r2_object_keys
+        
+        named_pages = [(page_id, folder_id, page_name or f"file_{page_id}")
+                       for page_id, folder_id, page_name in pages]
+        derived_keys = generate_r2_object_keys(named_pages)
+        
+        result = {}
+        for page_id, _, page_name in named_pages:
+            prefix = os.path.dirname(derived_keys[page_id]) + '/'
+            result[page_id] = r2_existence_index.find(
+                prefix, _stem_candidates(safe_name(page_name)), extensions or PAGE_EXTENSIONS
+            )
+        return result
+    
+    @staticmethod
+    def find_page_detail_object_key(detail_id: int, detail_name: str = None,
+                                    extensions: List[str] = None) -> Optional[str]:
+        """
+        Find the R2 object key of a page detail file using the existence index
+        
+        Args:
+            detail_id: ID of the page detail
+            detail_name: Name of the detail (defaults to "detail_{detail_id}")
+            extensions: Allowed extensions in priority order (defaults to DETAIL_EXTENSIONS)
+            
+        Returns:
+            Existing object key or None
+        """
+        from blueprints.contents.r2_utils import generate_r2_object_key
+        
+        detail_name_clean = detail_name or f"detail_{detail_id}"
+        detail_key = generate_r2_object_key(detail_id, detail_name_clean, is_page_detail=True)
+        
+        # Detail keys look like "{channel}/{category}/{page}/{detail}", index them under the category
+        page_folder_path = os.path.dirname(detail_key)
+        prefix = os.path.dirname(page_folder_path) + '/'
+        page_folder = os.path.basename(page_folder_path)
+        stems = [f"{page_folder}/{stem}" for stem in _stem_candidates(safe_name(detail_name_clean))]
+        return r2_existence_index.find(prefix, stems, extensions or DETAIL_EXTENSIONS)
+    
     @staticmethod
     def check_page_detail_content_exists(detail_id: int, detail_name: str = None, 
                                        detail_object_id: str = None, 
@@ -31,50 +134,30 @@ class R2StorageService:
             detail_id: ID of the page detail
             detail_name: Name of the detail (for path generation)
             detail_object_id: Object ID from database (legacy, not used for existence check)
-            updated_at: Last update timestamp (for cache invalidation)
+            updated_at: Last update timestamp (unused; entries are invalidated by the routes)
             use_cache: Whether to use caching
             
         Returns:
             True if file exists in R2, False otherwise
         """
-        # Generate cache key
-        cache_key = f"page_detail_{detail_id}_{updated_at.timestamp() if updated_at else 0}"
+        cache_key = detail_key(detail_id)
         
-        # Check cache first
-        if use_cache and cache_key in _r2_existence_cache:
-            cache_entry = _r2_existence_cache[cache_key]
-            # Check if cache entry is still valid
-            if (datetime.datetime.now() - cache_entry['timestamp']).seconds < CACHE_TTL_SECONDS:
-                return cache_entry['exists']
+        # Check cache first (local LRU, then Redis)
+        if use_cache:
+            cached = r2_existence_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            # Import here to avoid circular imports
-            from blueprints.contents.r2_utils import check_r2_object_exists, generate_r2_object_key
-            
-            # Always derive R2 path from node structure (same approach as other endpoints)
+            # Derive the category prefix from node structure and look the file up in the index
             detail_name_clean = detail_name or f"detail_{detail_id}"
-            detail_extensions = ['.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx', '.png', '.jpg', '.jpeg', '.gif', '.webp']
-            
-            result = False
-            
-            # Try multiple extensions to find the actual file
-            for ext in detail_extensions:
-                test_filename = f"{detail_name_clean}{ext}"
-                test_object_key = generate_r2_object_key(detail_id, test_filename, is_page_detail=True)
-                
-                if check_r2_object_exists(test_object_key):
-                    result = True
-                    break
+            result = R2StorageService.find_page_detail_object_key(
+                detail_id, detail_name_clean, DETAIL_EXTENSIONS
+            ) is not None
             
             # Cache the result
             if use_cache:
-                _r2_existence_cache[cache_key] = {
-                    'exists': result,
-                    'timestamp': datetime.datetime.now()
-                }
-                
-                # Simple cache cleanup
-                R2StorageService._cleanup_cache()
+                r2_existence_cache.set(cache_key, result)
             
             return result
             
@@ -94,10 +177,7 @@ class R2StorageService:
                 
                 # Cache the fallback result too
                 if use_cache:
-                    _r2_existence_cache[cache_key] = {
-                        'exists': fallback_result,
-                        'timestamp': datetime.datetime.now()
-                    }
+                    r2_existence_cache.set(cache_key, fallback_result)
                 
                 return fallback_result
             else:
@@ -121,71 +201,50 @@ class R2StorageService:
             page_id: ID of the page
             page_name: Name of the page (for path generation)
             page_object_id: Object ID from database (legacy, not used for existence check)
-            updated_at: Last update timestamp (for cache invalidation)
+            updated_at: Last update timestamp (unused; entries are invalidated by the routes)
             use_cache: Whether to use caching
             
         Returns:
             True if file exists in R2, False otherwise
         """
-        # Generate cache key
-        cache_key = f"page_{page_id}_{updated_at.timestamp() if updated_at else 0}"
+        cache_key = page_key(page_id)
         
-        # Check cache first
-        if use_cache and cache_key in _r2_existence_cache:
-            cache_entry = _r2_existence_cache[cache_key]
-            # Check if cache entry is still valid
-            if (datetime.datetime.now() - cache_entry['timestamp']).seconds < CACHE_TTL_SECONDS:
-                return cache_entry['exists']
+        # Check cache first (local LRU, then Redis)
+        if use_cache:
+            cached = r2_existence_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            # Import here to avoid circular imports
-            from blueprints.contents.r2_utils import check_r2_object_exists, generate_r2_object_key
             from models import ContentRelPageDetails
             
-            # Always derive R2 path from node structure (same approach as r2-image-url endpoint)
+            # Derive the category prefix from node structure (one hierarchy walk per page)
             page_name_clean = page_name or f"file_{page_id}"
-            image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv']
-            
-            result = False
+            prefix = R2StorageService.get_page_prefix(page_id, page_name_clean)
+            safe_page_name = safe_name(page_name_clean)
             
-            # 1. Try multiple extensions to find the main page file
-            for ext in image_extensions:
-                test_filename = f"{page_name_clean}{ext}"
-                test_object_key = generate_r2_object_key(page_id, test_filename, is_page_detail=False)
-                
-                if check_r2_object_exists(test_object_key):
-                    result = True
-                    break
+            # 1. Look for the main page file
+            result = r2_existence_index.find(
+                prefix, _stem_candidates(safe_page_name), PAGE_EXTENSIONS
+            ) is not None
             
-            # 2. If no main file found, check for page detail files
+            # 2. If no main file found, check for page detail files in the page folder
             if not result:
                 page_details = ContentRelPageDetails.query.filter_by(
                     page_id=page_id,
                     is_deleted=False
                 ).all()
                 
+                page_folder = os.path.splitext(safe_page_name)[0]
                 for detail in page_details:
-                    detail_extensions = ['.pdf', '.webm', '.mp4', '.avi', '.mov', '.wmv', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx']
-                    for ext in detail_extensions:
-                        detail_filename = f"{detail.name}{ext}"
-                        detail_object_key = generate_r2_object_key(detail.id, detail_filename, is_page_detail=True)
-                        
-                        if check_r2_object_exists(detail_object_key):
-                            result = True
-                            break
-                    
-                    if result:
+                    detail_stems = [f"{page_folder}/{stem}" for stem in _stem_candidates(safe_name(detail.name))]
+                    if r2_existence_index.find(prefix, detail_stems, PAGE_DETAIL_FILE_EXTENSIONS):
+                        result = True
                         break
             
             # Cache the result
             if use_cache:
-                _r2_existence_cache[cache_key] = {
-                    'exists': result,
-                    'timestamp': datetime.datetime.now()
-                }
-                
-                # Simple cache cleanup
-                R2StorageService._cleanup_cache()
+                r2_existence_cache.set(cache_key, result)
             
             return result
             
@@ -216,10 +275,7 @@ class R2StorageService:
                 
                 # Cache the fallback result too
                 if use_cache:
-                    _r2_existence_cache[cache_key] = {
-                        'exists': fallback_result,
-                        'timestamp': datetime.datetime.now()
-                    }
+                    r2_existence_cache.set(cache_key, fallback_result)
                 
                 return fallback_result
             else:
@@ -232,29 +288,34 @@ class R2StorageService:
             return False
     
     @staticmethod
-    def _cleanup_cache():
-        """Clean up old cache entries to prevent memory bloat"""
-        if len(_r2_existence_cache) > 1000:
-            # Remove entries older than TTL
-            now = datetime.datetime.now()
-            keys_to_remove = []
-            
-            for key, entry in _r2_existence_cache.items():
-                if (now - entry['timestamp']).seconds > CACHE_TTL_SECONDS:
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del _r2_existence_cache[key]
-            
-            # If still too many, remove oldest entries
-            if len(_r2_existence_cache) > 800:
-                oldest_keys = sorted(_r2_existence_cache.keys(), 
-                                   key=lambda k: _r2_existence_cache[k]['timestamp'])[:200]
-                for key in oldest_keys:
-                    del _r2_existence_cache[key]
+    def invalidate_page(page_id: int, detail_ids: List[int] = None) -> None:
+        """
+        Drop cached existence for a page and its details in every worker
+        
+        Args:
+            page_id: ID of the page
+            detail_ids: Detail IDs to drop as well (None = look up the page's details)
+        """
+        if detail_ids is None:
+            from models import ContentRelPageDetails
+            from extensions import db
+            detail_ids = [row.id for row in db.session.query(ContentRelPageDetails.id).filter(
+                ContentRelPageDetails.page_id == page_id
+            ).all()]
+        r2_existence_cache.invalidate_page(page_id, detail_ids)
+    
+    @staticmethod
+    def invalidate_pages(page_ids: List[int]) -> None:
+        """Drop cached existence for several pages in every worker"""
+        r2_existence_cache.invalidate_pages(page_ids)
+    
+    @staticmethod
+    def invalidate_page_detail(detail_id: int, page_id: int = None) -> None:
+        """Drop cached existence for a page detail (and its page) in every worker"""
+        r2_existence_cache.invalidate_detail(detail_id, page_id)
     
     @staticmethod
     def clear_cache():
         """Clear all cached R2 existence checks"""
-        global _r2_existence_cache
-        _r2_existence_cache.clear() 
\ No newline at end of file
+        r2_existence_cache.clear()
+        r2_existence_index.invalidate()
@@ -0,0 +1,234 @@
+"""
+Shared Cache
+
+Redis backend for the Flask-Caching `cache` object (CACHE_TYPE =
+"services.shared_cache.SharedRedisCache"), so every gunicorn worker reads and
+invalidates the same entries instead of holding private SimpleCache copies:
+- Values are stored as msgpack (falling back to pickle for types msgpack
+  can't encode), which is several times smaller and faster than pickling
+  the nested hierarchy dicts
+- Every TTL is jittered by CACHE_TTL_JITTER so entries written together
+  don't all expire in the same second
+
+Rebuilds are single-flight across processes (rebuild_lock / cached_or_build):
+one process rebuilds an expired entry under a short Redis lock while the
+others keep serving the stale value, or wait for the rebuild when there is
+nothing usable to serve.
+"""
+
+import time
+import uuid
+import random
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+import msgpack
+from cachelib.serializers import RedisSerializer
+from flask_caching.backends.rediscache import RedisCache
+
+LOCK_PREFIX = 'cache:lock:'
+
+# Defaults, overridable through app config (CACHE_*)
+DEFAULT_TTL_JITTER = 0.1         # +-10% of each TTL
+DEFAULT_STALE_SECONDS = 300      # Expired entries stay servable this long while one process rebuilds
+DEFAULT_LOCK_SECONDS = 30        # Rebuild lock lifetime (covers a crashed rebuilder)
+DEFAULT_WAIT_SECONDS = 10        # How long a process without a usable value waits for the rebuilder
+WAIT_POLL_SECONDS = 0.05
+
+MSGPACK_MARKER = b'm'
+
+# Release only a lock we still own (it may have expired and been taken over)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _config(name: str, default):
+    """Read an app config value, falling back to the default outside an app context"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            return current_app.config.get(name, default)
+    except ImportError:
+        pass
+    return default
+
+
+def jittered_ttl(ttl: float, jitter: Optional[float] = None) -> int:
+    """TTL spread by +-jitter (a fraction), at least one second"""
+    jitter = _config('CACHE_TTL_JITTER', DEFAULT_TTL_JITTER) if jitter is None else jitter
+    if ttl <= 0 or not jitter:
+        return int(ttl)
+    return max(1, int(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+
+class MsgpackRedisSerializer(RedisSerializer):
+    """
+    msgpack for plain data, pickle for anything else
+
+    Integers stay plain strings (Redis INCR/DECR need that) and existing
+    pickled entries ("!" prefix) are still readable. msgpack returns tuples
+    as lists.
+    """
+
+    def dumps(self, value, *args, **kwargs) -> bytes:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode('ascii')
+        try:
+            return MSGPACK_MARKER + msgpack.packb(value, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError):
+            return super().dumps(value, *args, **kwargs)
+
+    def loads(self, value):
+        if value is not None and value.startswith(MSGPACK_MARKER):
+            try:
+                return msgpack.unpackb(value[len(MSGPACK_MARKER):], raw=False, strict_map_key=False)
+            except Exception as e:
+                logging.warning(f"[SHARED CACHE] Unreadable msgpack entry: {str(e)}")
+                return None
+        return super().loads(value)
+
+
+class SharedRedisCache(RedisCache):
+    """Flask-Caching Redis backend with msgpack values and jittered TTLs"""
+
+    serializer = MsgpackRedisSerializer()
+    ttl_jitter = DEFAULT_TTL_JITTER
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        instance = super().factory(app, config, args, kwargs)
+        instance.ttl_jitter = config.get('CACHE_TTL_JITTER', DEFAULT_TTL_JITTER)
+        return instance
+
+    def _normalize_timeout(self, timeout):
+        timeout = super()._normalize_timeout(timeout)
+        if timeout > 0:
+            timeout = jittered_ttl(timeout, self.ttl_jitter)
+        return timeout
+
+
+# ---- Single-flight rebuilds ----
+
+def acquire_rebuild_lock(key: str, lock_seconds: Optional[float] = None) -> Optional[str]:
+    """
+    Try to become the process that rebuilds `key`
+
+    Returns:
+        A token to release the lock with, None if another process holds it.
+        Without Redis every caller gets a token (each rebuilds locally).
+    """
+    token = uuid.uuid4().hex
+    lock_seconds = lock_seconds or _config('CACHE_LOCK_SECONDS', DEFAULT_LOCK_SECONDS)
+    try:
+        from extensions import redis_client
+        acquired = redis_client.set(f"{LOCK_PREFIX}{key}", token, nx=True, px=int(lock_seconds * 1000))
+        return token if acquired else None
+    except Exception as e:
+        logging.warning(f"[SHARED CACHE] Lock unavailable for {key}: {str(e)}")
+        return token
+
+
+def release_rebuild_lock(key: str, token: str) -> None:
+    try:
+        from extensions import redis_client
+        redis_client.eval(_RELEASE_SCRIPT, 1, f"{LOCK_PREFIX}{key}", token)
+    except Exception as e:
+        logging.warning(f"[SHARED CACHE] Failed to release lock for {key}: {str(e)}")
+
+
+def rebuild_in_progress(key: str) -> bool:
+    try:
+        from extensions import redis_client
+        return bool(redis_client.exists(f"{LOCK_PREFIX}{key}"))
+    except Exception:
+        return False
+
+
+@contextmanager
+def rebuild_lock(key: str):
+    """Context manager yielding whether this process got the rebuild lock"""
+    token = acquire_rebuild_lock(key)
+    try:
+        yield token is not None
+    finally:
+        if token is not None:
+            release_rebuild_lock(key, token)
+
+
+def wait_for_rebuild(key: str, read: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+    """
+    Poll `read` until it returns a value or the rebuilder lets go of the lock
+
+    Returns:
+        The value produced by the other process, or None on timeout
+    """
+    deadline = time.monotonic() + (timeout or _config('CACHE_WAIT_SECONDS', DEFAULT_WAIT_SECONDS))
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_SECONDS)
+        value = read()
+        if value is not None:
+            return value
+        if not rebuild_in_progress(key):
+            return read()
+    return None
+
+
+def cached_or_build(cache, key: str, build: Callable[[], Any], ttl: float,
+                    is_current: Optional[Callable[[Any], bool]] = None,
+                    should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    Read-through cache with stale-while-rebuild
+
+    Entries are stored as {'value', 'fresh_until'} and kept CACHE_STALE_SECONDS
+    past their TTL. After the TTL one process rebuilds while the others
+    return the stale value; with no usable value the others wait for the
+    rebuilder instead of all building at once.
+
+    Args:
+        cache: Flask-Caching cache to store in
+        key: Cache key
+        build: Produces a fresh value
+        ttl: Seconds the value counts as fresh (jittered)
+        is_current: Rejects cached values that must not be served even stale
+            (e.g. built for an older hierarchy version)
+        should_cache: Rejects built values that must not be stored (e.g. errors)
+
+    Returns:
+        The cached or freshly built value
+    """
+    def read_usable():
+        entry = cache.get(key)
+        if not isinstance(entry, dict) or 'fresh_until' not in entry:
+            return None
+        if is_current is not None and not is_current(entry['value']):
+            return None
+        return entry
+
+    def store(value):
+        if should_cache is None or should_cache(value):
+            fresh_seconds = jittered_ttl(ttl)
+            cache.set(key, {'value': value, 'fresh_until': time.time() + fresh_seconds},
+                      timeout=fresh_seconds + _config('CACHE_STALE_SECONDS', DEFAULT_STALE_SECONDS))
+        return value
+
+    entry = read_usable()
+    if entry is not None and entry['fresh_until'] > time.time():
+        return entry['value']
+
+    with rebuild_lock(key) as acquired:
+        if acquired:
+            return store(build())
+
+    if entry is not None:
+        return entry['value']  # stale, someone else is rebuilding
+
+    entry = wait_for_rebuild(key, read_usable)
+    if entry is not None:
+        return entry['value']
+    logging.warning(f"[SHARED CACHE] Gave up waiting for the rebuild of {key}, building locally")
+    return store(build())
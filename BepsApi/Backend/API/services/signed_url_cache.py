@@ -0,0 +1,101 @@
+"""
+Signed URL Cache
+
+Presigned R2 URLs are valid for their whole lifetime, so re-signing the same
+object on every request only costs CPU and defeats browser caching (every
+response carries a different URL). This cache hands back the same URL for
+(bucket, key, method, expires_in) until a safety margin before it expires.
+
+Overwriting, moving or deleting an object must call evict() for its key, so
+no worker keeps handing out a URL that was signed for the old object; the
+eviction reaches the other workers through services.local_cache_sync.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+from services.local_cache_sync import local_cache_sync
+
+DEFAULT_SAFETY_MARGIN = 300      # Stop reusing a URL 5 minutes before it expires
+DEFAULT_MAX_ENTRIES = 5000
+SYNC_NAME = 'signed_url'
+
+
+class SignedUrlCache:
+    """Bounded in-process LRU of signed URLs with expiry-aware reuse"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_sign(self, bucket_name: str, object_key: str, method: str, expires_in: int,
+                    sign: Callable[[], str], safety_margin: Optional[int] = None) -> str:
+        """
+        Return a cached URL that is still valid for more than the safety margin, or sign a new one
+
+        Args:
+            bucket_name: Bucket the URL points at
+            object_key: Object key
+            method: HTTP method ('GET' / 'PUT')
+            expires_in: Requested lifetime in seconds
+            sign: Callable producing a fresh signed URL
+            safety_margin: Seconds before expiry at which a URL is no longer handed out
+
+        Returns:
+            Signed URL
+        """
+        if safety_margin is None:
+            safety_margin = DEFAULT_SAFETY_MARGIN
+        # Short-lived URLs can't spare a full margin; keep at least half their lifetime
+        safety_margin = min(safety_margin, expires_in // 2)
+
+        local_cache_sync.sync()
+        cache_key = (bucket_name, object_key, method.upper(), expires_in)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                url, expires_at = entry
+                if expires_at - safety_margin > now:
+                    self._entries.move_to_end(cache_key)
+                    return url
+                del self._entries[cache_key]
+
+        url = sign()
+
+        with self._lock:
+            self._entries[cache_key] = (url, now + expires_in)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return url
+
+    def evict(self, object_keys: Iterable[str]) -> None:
+        """Drop the URLs of written or deleted objects in every worker"""
+        object_keys = [key for key in object_keys if key]
+        if object_keys:
+            local_cache_sync.publish(SYNC_NAME, 'evict', object_keys)
+
+    def apply_event(self, op: str, object_keys: List[str]) -> None:
+        """Apply an evict / clear event to this worker's cache"""
+        with self._lock:
+            if op == 'evict':
+                object_keys = set(object_keys)
+                for cache_key in [k for k in self._entries if k[1] in object_keys]:
+                    del self._entries[cache_key]
+            else:
+                self._entries.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache shared by all requests
+signed_url_cache = SignedUrlCache()
+local_cache_sync.register(SYNC_NAME, signed_url_cache.apply_event)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Archive Retention Tests
+
+Checks the reference counting of archive retention
+(services.archive_retention_service): an object is only freed when every row
+that references it expires.
+
+Needs the API's Python requirements installed (the module imports Flask and
+SQLAlchemy); no database or R2 is used.
+
+Run with pytest or directly: python test_archive_retention.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_retention_keeps_shared_objects():
+    from services.archive_retention_service import split_shared_objects
+
+    references = [
+        (1, 'old/a.png'),
+        (2, 'old/b.png'), (3, 'old/b.png'),   # b is also used by a row that stays
+        (4, 'old/c.png'), (5, 'old/c.png'),   # c: every reference expires
+    ]
+    freed, shared = split_shared_objects(['old/c.png', 'old/a.png', 'old/b.png'], references, {1, 2, 4, 5})
+    assert freed == ['old/a.png', 'old/c.png']
+    assert shared == {'old/b.png'}
+
+
+def main():
+    """Run every test and print a summary"""
+    print("🧪 Archive Retention Tests")
+    print("=" * 60)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_') and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+
+    print("=" * 60)
+    if failed:
+        print(f"⚠️  {failed} of {len(tests)} tests failed")
+        return 1
+    print(f"🎉 All {len(tests)} tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
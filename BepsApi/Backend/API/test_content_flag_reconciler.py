@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Content Flag Reconciler Tests
+
+Checks how the reconciler (services.content_flag_reconciler) builds R2 folder
+paths: sanitized names, deleted channels and cyclic parent links.
+
+Needs the API's Python requirements installed (the module imports SQLAlchemy
+and the models); no database or R2 is used.
+
+Run with pytest or directly: python test_content_flag_reconciler.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_reconciler_folder_paths():
+    from services.content_flag_reconciler import _build_folder_paths
+
+    channels = {1: 'Channel A/B'}
+    folders = {
+        10: (None, 1, 'Top'),
+        11: (10, 1, 'Sub\\Dir'),
+        12: (11, 1, 'Leaf'),
+        20: (None, 2, 'No channel'),   # channel deleted
+        30: (31, 1, 'Cycle A'),        # broken data must not loop forever
+        31: (30, 1, 'Cycle B'),
+    }
+    paths = _build_folder_paths(channels, folders)
+
+    assert paths[10] == (1, 'Channel A⁄B/Top')
+    assert paths[11] == (1, 'Channel A⁄B/Top/Sub⁄Dir')
+    assert paths[12] == (1, 'Channel A⁄B/Top/Sub⁄Dir/Leaf')
+    assert 20 not in paths
+    assert 30 not in paths and 31 not in paths
+
+
+def main():
+    """Run every test and print a summary"""
+    print("🧪 Content Flag Reconciler Tests")
+    print("=" * 60)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_') and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+
+    print("=" * 60)
+    if failed:
+        print(f"⚠️  {failed} of {len(tests)} tests failed")
+        return 1
+    print(f"🎉 All {len(tests)} tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
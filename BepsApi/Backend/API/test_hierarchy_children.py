@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Hierarchy Children Tests
+
+Checks the keyset cursors of the paginated children listing
+(services.hierarchy_children): round trip and rejection of tampered cursors.
+
+Needs the API's Python requirements installed (the module imports SQLAlchemy
+and the models); no database is used.
+
+Run with pytest or directly: python test_hierarchy_children.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_children_cursor_round_trip():
+    from services.hierarchy_children import encode_cursor, decode_cursor, PAGE_RANK
+
+    row = SimpleNamespace(rank=PAGE_RANK, sort_name='002_페이지/1.png', id=42)
+    cursor = encode_cursor(row)
+    assert '=' not in cursor and '/' not in cursor  # URL-safe, unpadded
+    assert decode_cursor(cursor) == (PAGE_RANK, '002_페이지/1.png', 42)
+
+
+def test_children_cursor_rejects_garbage():
+    from services.hierarchy_children import decode_cursor
+
+    for cursor in ['', 'not-base64!', 'WzEsMl0']:  # the last one decodes to [1,2]
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            continue
+        raise AssertionError(f"cursor {cursor!r} was accepted")
+
+
+def main():
+    """Run every test and print a summary"""
+    print("🧪 Hierarchy Children Tests")
+    print("=" * 60)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_') and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+
+    print("=" * 60)
+    if failed:
+        print(f"⚠️  {failed} of {len(tests)} tests failed")
+        return 1
+    print(f"🎉 All {len(tests)} tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
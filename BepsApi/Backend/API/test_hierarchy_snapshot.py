@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Hierarchy Snapshot Tests
+
+Checks the on-disk hierarchy snapshots (services.hierarchy_snapshot): file
+version parsing, pruning of older versions and encoding negotiation.
+
+Needs the API's Python requirements installed (the module imports the shared
+Redis cache helpers); files go to a temporary directory and no Redis server is
+contacted.
+
+Run with pytest or directly: python test_hierarchy_snapshot.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_snapshot_file_version():
+    from services.hierarchy_snapshot import _file_version
+
+    assert _file_version('hierarchy-12.json') == 12
+    assert _file_version('hierarchy-12.json.br') == 12
+    assert _file_version('hierarchy-12.json.gz.3f2a.tmp') == 12
+    assert _file_version('hierarchy-latest.json') is None
+    assert _file_version('other-12.json') is None
+
+
+def test_snapshot_prune_keeps_current_and_newer():
+    import services.hierarchy_snapshot as module
+
+    original_dir = module.DEFAULT_DIR
+    with tempfile.TemporaryDirectory() as directory:
+        module.DEFAULT_DIR = directory
+        try:
+            names = ['hierarchy-3.json', 'hierarchy-3.json.gz', 'hierarchy-4.json.abc.tmp',
+                     'hierarchy-5.json', 'hierarchy-6.json.br', 'notes.txt']
+            for name in names:
+                open(os.path.join(directory, name), 'wb').close()
+            module._prune(5)
+            assert sorted(os.listdir(directory)) == ['hierarchy-5.json', 'hierarchy-6.json.br', 'notes.txt']
+        finally:
+            module.DEFAULT_DIR = original_dir
+
+
+class _AcceptEncodings:
+    def __init__(self, qualities):
+        self.qualities = qualities
+
+    def quality(self, encoding):
+        return self.qualities.get(encoding, 0)
+
+
+def test_snapshot_choose_encoding():
+    from services.hierarchy_snapshot import HierarchySnapshot
+
+    full = HierarchySnapshot(1, {'identity': 'a', 'gzip': 'b', 'br': 'c'})
+    assert full.choose_encoding(_AcceptEncodings({'gzip': 1, 'br': 1})) == 'br'
+    assert full.choose_encoding(_AcceptEncodings({'gzip': 1})) == 'gzip'
+    assert full.choose_encoding(_AcceptEncodings({})) == 'identity'
+
+    without_brotli = HierarchySnapshot(1, {'identity': 'a', 'gzip': 'b'})
+    assert without_brotli.choose_encoding(_AcceptEncodings({'gzip': 1, 'br': 1})) == 'gzip'
+
+
+def main():
+    """Run every test and print a summary"""
+    print("🧪 Hierarchy Snapshot Tests")
+    print("=" * 60)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_') and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+
+    print("=" * 60)
+    if failed:
+        print(f"⚠️  {failed} of {len(tests)} tests failed")
+        return 1
+    print(f"🎉 All {len(tests)} tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
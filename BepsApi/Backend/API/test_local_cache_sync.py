@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Local Cache Sync Tests
+
+Checks the cross-worker cache event stream (services.local_cache_sync): stream
+id arithmetic and how events reach the registered caches.
+
+Pure Python; no Redis server is contacted.
+
+Run with pytest or directly: python test_local_cache_sync.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cache_sync_stream_ids():
+    from services.local_cache_sync import _parse_id, _next_id
+
+    assert _parse_id('1700000000000-3') == (1700000000000, 3)
+    assert _parse_id('1700000000000') == (1700000000000, 0)
+    assert _next_id('1700000000000-3') == '1700000000000-4'
+    assert _parse_id(_next_id('0-0')) > _parse_id('0-0')
+
+
+def test_cache_sync_handlers():
+    from services.local_cache_sync import LocalCacheSync
+
+    sync = LocalCacheSync()
+    applied = []
+    sync.register('good', lambda op, keys: applied.append((op, keys)))
+    sync.register('broken', lambda op, keys: 1 / 0)
+
+    sync._apply('good', 'evict', ['a'])
+    sync._apply('broken', 'evict', ['a'])   # Errors are logged, not raised
+    sync._apply('unknown', 'evict', ['a'])  # Unregistered caches are ignored
+    sync._clear_all()
+    assert applied == [('evict', ['a']), ('clear', [])]
+
+
+def main():
+    """Run every test and print a summary"""
+    print("🧪 Local Cache Sync Tests")
+    print("=" * 60)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_') and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+
+    print("=" * 60)
+    if failed:
+        print(f"⚠️  {failed} of {len(tests)} tests failed")
+        return 1
+    print(f"🎉 All {len(tests)} tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Multipart Upload Route Tests
+
+Drives the presigned multipart upload routes (blueprints.contents.multipart_upload_routes)
+through the Flask test client: initiate size limits, part URL bounds, part
+validation on complete, and abort of completed uploads.
+
+Storage is the in-process FakeS3Client and the Redis session store is a dict;
+users, permissions and database records are patched. Needs the API's Python
+requirements installed (Flask, flask-jwt-extended, SQLAlchemy, botocore).
+
+Run with pytest or directly: python test_multipart_upload_routes.py
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BUCKET = 'test-bucket'
+USER_ID = 'user-1'
+MB = 1024 * 1024
+
+
+class _FakeRedis:
+    """The three calls the upload session store makes"""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+@contextmanager
+def _routes(pending_rows=()):
+    """
+    Test client for the multipart routes
+
+    Args:
+        pending_rows: object keys that already have a PendingContent record
+
+    Yields:
+        (client, headers, r2_client, mocks)
+    """
+    from flask import Flask, Blueprint
+    from flask_jwt_extended import JWTManager, create_access_token
+    from services.fake_s3 import FakeS3Client
+    import blueprints.contents.multipart_upload_routes as routes
+    import blueprints.contents.permission_middleware as permissions
+
+    app = Flask(__name__)
+    app.config.update(JWT_SECRET_KEY='multipart-route-tests-secret-key-0123456789', R2_BUCKET_NAME=BUCKET, TESTING=True)
+    JWTManager(app)
+    bp = Blueprint('multipart_test', __name__)
+    routes.register_multipart_upload_routes(bp)
+    app.register_blueprint(bp, url_prefix='/api/contents')
+
+    r2_client = FakeS3Client()
+    user = SimpleNamespace(id=USER_ID)
+    page = SimpleNamespace(id=7, name='001_intro.mp4')
+    pending = mock.MagicMock()
+    pending.query.filter_by.side_effect = lambda object_key=None, **kwargs: mock.MagicMock(
+        first=lambda: object() if object_key in pending_rows else None
+    )
+    replace_pending = mock.MagicMock(return_value=mock.MagicMock(to_dict=lambda: {'id': 1}))
+    pages = mock.MagicMock()
+    pages.query.filter_by.return_value.first.return_value = page
+
+    with mock.patch.multiple(
+        routes,
+        redis_client=_FakeRedis(),
+        get_r2_client=lambda: r2_client,
+        get_current_user=lambda: user,
+        generate_r2_object_key=lambda page_id, name, is_page_detail=False: f"channel/folder/{name}",
+        ContentRelPages=pages,
+        PendingContent=pending,
+        replace_pending_content=replace_pending,
+        db=mock.MagicMock(),
+        r2_existence_index=mock.MagicMock(),
+        signed_url_cache=mock.MagicMock(),
+        R2StorageService=mock.MagicMock(),
+    ), mock.patch.multiple(
+        permissions,
+        get_current_user=lambda: user,
+        can_upload_to_page=lambda user_id, page_id: True,
+    ):
+        with app.app_context():
+            headers = {'Authorization': f"Bearer {create_access_token(identity=USER_ID)}"}
+        yield app.test_client(), headers, r2_client, SimpleNamespace(replace_pending=replace_pending)
+
+
+def _initiate(client, headers, file_size):
+    return client.post('/api/contents/page/7/multipart/initiate', headers=headers,
+                       json={'filename': 'intro.mp4', 'file_size': file_size})
+
+
+def test_initiate_checks_file_size():
+    with _routes() as (client, headers, r2_client, _):
+        assert _initiate(client, headers, None).status_code == 400
+        assert _initiate(client, headers, 'big').status_code == 400
+        assert _initiate(client, headers, 101 * MB).status_code == 413
+        assert not r2_client.multipart_uploads
+
+        response = _initiate(client, headers, 40 * MB)
+        assert response.status_code == 201
+        body = response.get_json()
+        assert body['object_key'] == 'pending/channel/folder/001_intro.mp4'
+        assert body['part_count'] == -(-40 * MB // body['part_size'])
+
+
+def test_part_urls_stay_within_declared_size():
+    with _routes() as (client, headers, _, _mocks):
+        upload = _initiate(client, headers, 40 * MB).get_json()
+        url = f"/api/contents/multipart/{upload['upload_id']}/part-urls"
+        last = upload['part_count']
+
+        response = client.post(url, headers=headers, json={'part_numbers': list(range(1, last + 1))})
+        assert response.status_code == 200
+        assert sorted(response.get_json()['urls']) == [str(number) for number in range(1, last + 1)]
+
+        for part_numbers in [[], [0], [last + 1], ['x'], list(range(1, 102))]:
+            response = client.post(url, headers=headers, json={'part_numbers': part_numbers})
+            assert response.status_code == 400, part_numbers
+
+
+def _upload_parts(r2_client, upload):
+    etags = []
+    for number in range(1, upload['part_count'] + 1):
+        body = bytes([number]) * 10
+        etags.append(r2_client.upload_part(Bucket=BUCKET, Key=upload['object_key'], UploadId=upload['upload_id'],
+                                           PartNumber=number, Body=body)['ETag'])
+    return etags
+
+
+def test_complete_rejects_malformed_parts():
+    with _routes() as (client, headers, r2_client, mocks):
+        upload = _initiate(client, headers, 40 * MB).get_json()
+        etags = _upload_parts(r2_client, upload)
+        url = f"/api/contents/multipart/{upload['upload_id']}/complete"
+
+        for parts in [
+            'all',
+            [1, 2],
+            [{'etag': etags[0]}],
+            [{'part_number': 'one', 'etag': etags[0]}],
+            [{'part_number': upload['part_count'] + 1, 'etag': etags[0]}],
+            [{'part_number': 1}],
+            [{'part_number': 1, 'etag': etags[0]}, {'part_number': 1, 'etag': etags[0]}],
+        ]:
+            response = client.post(url, headers=headers, json={'parts': parts})
+            assert response.status_code == 400, parts
+        assert upload['upload_id'] in r2_client.multipart_uploads
+        mocks.replace_pending.assert_not_called()
+
+        parts = [{'part_number': number, 'etag': etag} for number, etag in enumerate(etags, start=1)]
+        response = client.post(url, headers=headers, json={'parts': list(reversed(parts))})
+        assert response.status_code == 201
+        size = mocks.replace_pending.call_args.args[5]
+        assert size == r2_client.head_object(Bucket=BUCKET, Key=upload['object_key'])['ContentLength']
+
+
+def _completed_upload(client, headers, r2_client):
+    """An upload R2 assembled whose pending record was never written"""
+    upload = _initiate(client, headers, 40 * MB).get_json()
+    _upload_parts(r2_client, upload)
+    with mock.patch('blueprints.contents.multipart_upload_routes.replace_pending_content',
+                    side_effect=RuntimeError('database down')):
+        response = client.post(f"/api/contents/multipart/{upload['upload_id']}/complete", headers=headers)
+    assert response.status_code == 500
+    return upload
+
+
+def test_abort_deletes_unreferenced_completed_object():
+    with _routes() as (client, headers, r2_client, _):
+        upload = _completed_upload(client, headers, r2_client)
+        assert upload['object_key'] in r2_client.buckets[BUCKET]
+
+        response = client.delete(f"/api/contents/multipart/{upload['upload_id']}", headers=headers)
+        assert response.status_code == 200
+        assert upload['object_key'] not in r2_client.buckets[BUCKET]
+        assert client.delete(f"/api/contents/multipart/{upload['upload_id']}", headers=headers).status_code == 404
+
+
+def test_abort_keeps_object_of_existing_pending_record():
+    key = 'pending/channel/folder/001_intro.mp4'
+    with _routes(pending_rows=[key]) as (client, headers, r2_client, _):
+        upload = _completed_upload(client, headers, r2_client)
+
+        response = client.delete(f"/api/contents/multipart/{upload['upload_id']}", headers=headers)
+        assert response.status_code == 200
+        assert key in r2_client.buckets[BUCKET]
+
+
+def test_abort_discards_unfinished_upload():
+    with _routes() as (client, headers, r2_client, _):
+        upload = _initiate(client, headers, 40 * MB).get_json()
+        _upload_parts(r2_client, upload)
+
+        response = client.delete(f"/api/contents/multipart/{upload['upload_id']}", headers=headers)
+        assert response.status_code == 200
+        assert upload['upload_id'] not in r2_client.multipart_uploads
+
+
+def main():
+    """Run every test and print a summary"""
+    print("🧪 Multipart Upload Route Tests")
+    print("=" * 60)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_') and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+
+    print("=" * 60)
+    if failed:
+        print(f"⚠️  {failed} of {len(tests)} tests failed")
+        return 1
+    print(f"🎉 All {len(tests)} tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
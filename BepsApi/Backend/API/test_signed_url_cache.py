@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Signed URL Cache Tests
+
+Checks the per-worker signed URL cache (services.signed_url_cache): reuse
+until the safety margin, separate entries per lifetime, the LRU bound and
+eviction events.
+
+Cross-worker sync is patched out, so no Redis server is contacted.
+
+Run with pytest or directly: python test_signed_url_cache.py
+"""
+
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def test_signed_url_reuse_and_expiry():
+    import services.signed_url_cache as module
+
+    clock = _Clock(1000.0)
+    with mock.patch.object(module, 'time', clock), mock.patch.object(module, 'local_cache_sync'):
+        cache = module.SignedUrlCache()
+        signed = []
+
+        def sign():
+            signed.append(clock.now)
+            return f"url-{len(signed)}"
+
+        assert cache.get_or_sign('bucket', 'a.png', 'GET', 3600, sign, safety_margin=300) == 'url-1'
+        clock.now += 3000
+        assert cache.get_or_sign('bucket', 'a.png', 'get', 3600, sign, safety_margin=300) == 'url-1'
+        clock.now += 400  # Inside the safety margin: sign again
+        assert cache.get_or_sign('bucket', 'a.png', 'GET', 3600, sign, safety_margin=300) == 'url-2'
+        # Another lifetime is another URL
+        assert cache.get_or_sign('bucket', 'a.png', 'GET', 60, sign, safety_margin=300) == 'url-3'
+
+
+def test_signed_url_lru_bound_and_evict():
+    import services.signed_url_cache as module
+
+    with mock.patch.object(module, 'local_cache_sync'):
+        cache = module.SignedUrlCache(max_entries=2)
+        for key in ['a', 'b']:
+            cache.get_or_sign('bucket', key, 'GET', 3600, lambda key=key: f"url-{key}")
+        cache.get_or_sign('bucket', 'a', 'GET', 3600, lambda: 'unused')  # 'a' becomes most recent
+        cache.get_or_sign('bucket', 'c', 'GET', 3600, lambda: 'url-c')
+        assert [entry[1] for entry in cache._entries] == ['a', 'c']
+
+        cache.get_or_sign('bucket', 'a', 'PUT', 600, lambda: 'url-a-put')
+        cache.apply_event('evict', ['a'])  # Every method/lifetime of the key goes
+        assert [entry[1] for entry in cache._entries] == ['c']
+        cache.apply_event('clear', [])
+        assert not cache._entries
+
+
+def test_signed_url_evict_is_published():
+    import services.signed_url_cache as module
+
+    with mock.patch.object(module, 'local_cache_sync') as sync:
+        module.SignedUrlCache().evict(['a.png', '', None])
+        module.SignedUrlCache().evict([])
+    sync.publish.assert_called_once_with(module.SYNC_NAME, 'evict', ['a.png'])
+
+
+def main():
+    """Run every test and print a summary"""
+    print("🧪 Signed URL Cache Tests")
+    print("=" * 60)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_') and callable(value)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+
+    print("=" * 60)
+    if failed:
+        print(f"⚠️  {failed} of {len(tests)} tests failed")
+        return 1
+    print(f"🎉 All {len(tests)} tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
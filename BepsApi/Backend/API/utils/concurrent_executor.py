@@ -0,0 +1,129 @@
+# utils/concurrent_executor.py
+"""
+Bounded-concurrency executor for I/O-bound fan-out (R2 calls etc.)
+
+- gevent Pool when the process is monkey-patched (gunicorn gevent workers)
+- ThreadPoolExecutor otherwise
+- Every task runs inside its own Flask app context (R2 calls still count towards the caller's request)
+- Tasks that may query the database get their own session, so their
+  concurrency is capped by the SQLAlchemy pool (pool_size + max_overflow,
+  minus the caller's connection); pure R2 fan-outs pass uses_db=False
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from flask import current_app
+
+from utils.r2_metrics import bind_r2_stats, get_bound_r2_stats
+
+
+def _gevent_active() -> bool:
+    """Check whether gevent has patched the socket module in this process"""
+    try:
+        from gevent import monkey
+        return monkey.is_module_patched('socket')
+    except ImportError:
+        return False
+
+
+def _db_pool_capacity() -> Optional[int]:
+    """Connections this process may open (pool_size + max_overflow), None if unbounded or unknown"""
+    try:
+        from extensions import db
+        pool = db.engine.pool
+        max_overflow = getattr(pool, '_max_overflow', None)
+        if max_overflow is None or max_overflow < 0:
+            return None
+        return pool.size() + max_overflow
+    except Exception:
+        return None
+
+
+def resolve_executor_mode(mode: Optional[str] = None) -> str:
+    """
+    Resolve the executor mode ('gevent', 'thread' or 'serial')
+
+    'auto' picks gevent when the process is monkey-patched and threads otherwise.
+    """
+    mode = (mode or 'auto').lower()
+    if mode == 'auto':
+        return 'gevent' if _gevent_active() else 'thread'
+    if mode == 'gevent' and not _gevent_active():
+        return 'thread'
+    return mode
+
+
+def run_concurrently(func: Callable, items: Iterable, max_workers: int = 16,
+                     mode: Optional[str] = None, uses_db: bool = True) -> List:
+    """
+    Run func(item) for every item with at most max_workers in flight
+
+    Each call gets its own app context (and therefore its own DB session, which
+    checks out a pool connection on first use). Unless uses_db is False,
+    max_workers is capped so the tasks plus the caller fit in the pool.
+    Exceptions are not caught here; wrap func if per-item isolation is needed.
+
+    Args:
+        func: Callable taking one item
+        items: Items to process
+        max_workers: Maximum concurrent calls
+        mode: 'auto', 'gevent', 'thread' or 'serial'
+        uses_db: False if func never touches the database (no pool cap)
+
+    Returns:
+        List of results in the same order as items
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    app = current_app._get_current_object()
+    r2_stats = get_bound_r2_stats()
+
+    def run_with_context(item):
+        with app.app_context():
+            # R2 calls made by the worker count towards the calling request
+            bind_r2_stats(r2_stats)
+            return func(item)
+
+    mode = resolve_executor_mode(mode)
+    max_workers = min(max_workers, len(items))
+    if uses_db:
+        capacity = _db_pool_capacity()
+        if capacity is not None:
+            max_workers = min(max_workers, capacity - 1)  # The caller keeps its own connection
+    max_workers = max(1, max_workers)
+
+    if mode == 'serial' or max_workers == 1:
+        return [func(item) for item in items]
+
+    if mode == 'gevent':
+        from gevent.pool import Pool
+        return Pool(max_workers).map(run_with_context, items)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_with_context, items))
+
+
+def timed(func: Callable) -> Callable:
+    """Wrap func so it returns (result, elapsed_ms)"""
+    def wrapper(item):
+        started = time.perf_counter()
+        result = func(item)
+        return result, (time.perf_counter() - started) * 1000
+    return wrapper
+
+
+def percentiles(values: List[float], points=(50, 90, 99)) -> dict:
+    """Nearest-rank percentiles of values, e.g. {'p50': 12.3, 'p90': ...}"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        rank = max(1, -(-point * len(ordered) // 100))  # ceil(point/100 * n)
+        result[f"p{point}"] = round(ordered[rank - 1], 1)
+    result['max'] = round(ordered[-1], 1)
+    return result
@@ -0,0 +1,272 @@
+# utils/r2_metrics.py
+"""
+R2 call accounting
+
+Every call made through the shared R2 client is counted and timed by
+botocore event hooks (install_r2_instrumentation), grouped by operation class:
+HEAD, GET, PUT, COPY, DELETE, LIST, OTHER.
+
+- Per request: counters/latencies live in flask.g (fan-out workers share
+  their request's stats through bind_r2_stats) and are logged for slow requests
+- Totals: flushed to a Redis hash once per request (and periodically for
+  calls made outside requests), so the metrics endpoint shows every worker
+"""
+
+import time
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+METRICS_KEY = 'r2:metrics'
+
+# Latency histogram upper bounds (ms); the last bucket is "+Inf"
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BACKGROUND_FLUSH_SECONDS = 10
+
+OPERATION_CLASSES = {
+    'HeadObject': 'HEAD',
+    'HeadBucket': 'HEAD',
+    'GetObject': 'GET',
+    'PutObject': 'PUT',
+    'CreateMultipartUpload': 'PUT',
+    'UploadPart': 'PUT',
+    'CompleteMultipartUpload': 'PUT',
+    'CopyObject': 'COPY',
+    'UploadPartCopy': 'COPY',
+    'DeleteObject': 'DELETE',
+    'DeleteObjects': 'DELETE',
+    'AbortMultipartUpload': 'DELETE',
+    'ListObjects': 'LIST',
+    'ListObjectsV2': 'LIST',
+    'ListParts': 'LIST',
+    'ListMultipartUploads': 'LIST',
+}
+
+
+def operation_class(operation_name: str) -> str:
+    return OPERATION_CLASSES.get(operation_name, 'OTHER')
+
+
+def _bucket_label(elapsed_ms: float) -> str:
+    for bound in BUCKETS_MS:
+        if elapsed_ms <= bound:
+            return str(bound)
+    return '+Inf'
+
+
+class R2CallStats:
+    """Counters and latency histogram per operation class for one scope (request or background)"""
+
+    def __init__(self):
+        self.ops: Dict[str, dict] = {}
+        self.operations = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, operation_name: str, elapsed_ms: float, error: bool = False) -> None:
+        op_class = operation_class(operation_name)
+        with self._lock:
+            op = self.ops.get(op_class)
+            if op is None:
+                op = self.ops[op_class] = {'count': 0, 'errors': 0, 'ms': 0.0, 'buckets': Counter()}
+            op['count'] += 1
+            op['ms'] += elapsed_ms
+            op['buckets'][_bucket_label(elapsed_ms)] += 1
+            if error:
+                op['errors'] += 1
+            self.operations[operation_name] += 1
+
+    @property
+    def total_calls(self) -> int:
+        return sum(op['count'] for op in self.ops.values())
+
+    @property
+    def total_ms(self) -> float:
+        return sum(op['ms'] for op in self.ops.values())
+
+    def summary(self) -> dict:
+        """{'HEAD': {'count': 3, 'errors': 0, 'ms': 41.2}, ...}"""
+        with self._lock:
+            return {
+                op_class: {'count': op['count'], 'errors': op['errors'], 'ms': round(op['ms'], 1)}
+                for op_class, op in sorted(self.ops.items())
+            }
+
+    def drain(self) -> Dict[str, dict]:
+        """Take the recorded data and reset (used for the background scope)"""
+        with self._lock:
+            ops, self.ops = self.ops, {}
+            self.operations = Counter()
+            return ops
+
+
+# ---- Scope resolution ----
+
+_background_stats = R2CallStats()
+_background_flushed_at = time.monotonic()
+
+
+def current_r2_stats() -> R2CallStats:
+    """Stats of the current request (or fan-out worker bound to it), else the background scope"""
+    try:
+        from flask import g, has_app_context
+        if has_app_context():
+            stats = g.get('r2_stats')
+            if stats is not None:
+                return stats
+    except ImportError:
+        pass
+    return _background_stats
+
+
+def start_request_r2_stats() -> R2CallStats:
+    """Begin accounting for the current request (before_request)"""
+    from flask import g
+    g.r2_stats = R2CallStats()
+    return g.r2_stats
+
+
+def bind_r2_stats(stats: Optional[R2CallStats]) -> None:
+    """Attribute calls in this (worker) app context to a parent's stats"""
+    if stats is None or stats is _background_stats:
+        return
+    from flask import g
+    g.r2_stats = stats
+
+
+def get_bound_r2_stats() -> Optional[R2CallStats]:
+    """The stats bound to the current app context, if any (for handing to workers)"""
+    try:
+        from flask import g, has_app_context
+        if has_app_context():
+            return g.get('r2_stats')
+    except ImportError:
+        pass
+    return None
+
+
+# ---- Botocore hooks ----
+
+def _before_call(context=None, **kwargs):
+    if context is not None:
+        context['r2_started'] = time.perf_counter()
+
+
+def _after_call(http_response=None, model=None, context=None, **kwargs):
+    started = (context or {}).get('r2_started')
+    if started is None or model is None:
+        return
+    status = getattr(http_response, 'status_code', 200)
+    # A 404 on HEAD is an ordinary "doesn't exist" answer, not a failure
+    record_r2_call(model.name, (time.perf_counter() - started) * 1000, error=status >= 400 and status != 404)
+
+
+def _after_call_error(model=None, context=None, **kwargs):
+    started = (context or {}).get('r2_started')
+    if started is None or model is None:
+        return
+    record_r2_call(model.name, (time.perf_counter() - started) * 1000, error=True)
+
+
+def record_r2_call(operation_name: str, elapsed_ms: float, error: bool = False) -> None:
+    """Account one storage call (botocore hooks, or storage backends without events such as the fake)"""
+    global _background_flushed_at
+    stats = current_r2_stats()
+    stats.record(operation_name, elapsed_ms, error)
+
+    if stats is _background_stats and time.monotonic() - _background_flushed_at > BACKGROUND_FLUSH_SECONDS:
+        _background_flushed_at = time.monotonic()
+        _flush_ops(_background_stats.drain())
+
+
+def install_r2_instrumentation(client) -> None:
+    """Register the accounting hooks on a boto3 S3 client"""
+    events = client.meta.events
+    events.register('before-call.s3', _before_call, unique_id='r2-metrics-before-call')
+    events.register('after-call.s3', _after_call, unique_id='r2-metrics-after-call')
+    events.register('after-call-error.s3', _after_call_error, unique_id='r2-metrics-after-call-error')
+
+
+# ---- Shared totals ----
+
+def _flush_ops(ops: Dict[str, dict]) -> None:
+    """Add recorded ops to the shared Redis hash (one pipeline)"""
+    if not ops:
+        return
+    try:
+        from extensions import redis_client
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hsetnx(METRICS_KEY, 'since', int(time.time()))
+        for op_class, op in ops.items():
+            pipe.hincrby(METRICS_KEY, f"{op_class}:count", op['count'])
+            pipe.hincrby(METRICS_KEY, f"{op_class}:errors", op['errors'])
+            pipe.hincrbyfloat(METRICS_KEY, f"{op_class}:ms", round(op['ms'], 3))
+            for bucket, count in op['buckets'].items():
+                pipe.hincrby(METRICS_KEY, f"{op_class}:le:{bucket}", count)
+        pipe.execute()
+    except Exception as e:
+        logging.warning(f"[R2 METRICS] Failed to flush: {str(e)}")
+
+
+def flush_r2_stats(stats: Optional[R2CallStats]) -> None:
+    """Publish a finished request's stats (plus anything pending from background calls)"""
+    if stats is not None and stats is not _background_stats:
+        _flush_ops(stats.ops)
+    _flush_ops(_background_stats.drain())
+
+
+def _histogram_percentile(buckets: Dict[str, int], count: int, point: int) -> Optional[float]:
+    """Upper bound of the bucket holding the given percentile"""
+    if not count:
+        return None
+    target = point * count / 100
+    running = 0
+    for bound in BUCKETS_MS:
+        running += buckets.get(str(bound), 0)
+        if running >= target:
+            return bound
+    return None  # above the largest bound
+
+
+def get_r2_metrics() -> dict:
+    """Totals per operation class across all workers since the last reset"""
+    from extensions import redis_client
+    raw = redis_client.hgetall(METRICS_KEY)
+
+    operations = {}
+    for field, value in raw.items():
+        if field == 'since':
+            continue
+        op_class, _, name = field.partition(':')
+        op = operations.setdefault(op_class, {'count': 0, 'errors': 0, 'ms': 0.0, 'buckets': {}})
+        if name.startswith('le:'):
+            op['buckets'][name[3:]] = int(value)
+        elif name == 'ms':
+            op['ms'] = float(value)
+        else:
+            op[name] = int(value)
+
+    result = {}
+    for op_class, op in sorted(operations.items()):
+        count = op['count']
+        result[op_class] = {
+            'count': count,
+            'errors': op['errors'],
+            'total_ms': round(op['ms'], 1),
+            'avg_ms': round(op['ms'] / count, 1) if count else None,
+            'p50_ms': _histogram_percentile(op['buckets'], count, 50),
+            'p90_ms': _histogram_percentile(op['buckets'], count, 90),
+            'p99_ms': _histogram_percentile(op['buckets'], count, 99),
+            'histogram_ms': {
+                bucket: op['buckets'].get(bucket, 0)
+                for bucket in [str(bound) for bound in BUCKETS_MS] + ['+Inf']
+            }
+        }
+
+    since = raw.get('since')
+    return {'since': int(since) if since else None, 'operations': result}
+
+
+def reset_r2_metrics() -> None:
+    from extensions import redis_client
+    redis_client.delete(METRICS_KEY)
@@ -0,0 +1,12 @@
+# utils/r2_paths.py
+"""
+R2 object key helpers
+
+Shared by key generation (blueprints.contents.r2_utils), the hierarchy tree
+and the existence lookups, so every path built for an object agrees.
+"""
+
+
+def safe_name(name: str) -> str:
+    """Replace characters that would break R2 paths ('/' and '\\' become '⁄')"""
+    return name.replace('/', '⁄').replace('\\', '⁄')
@@ -0,0 +1,29 @@
+-- Migration: Persisted has_content flag
+-- Description: Store whether pages/page details have content in R2 instead of checking R2 on every read
+-- Date: 2026-10-17
+
+-- ==================================================
+-- Columns: has_content
+-- Purpose: Set by approve/confirm routes, corrected by the periodic R2 reconciler
+-- ==================================================
+ALTER TABLE content_rel_pages
+    ADD COLUMN IF NOT EXISTS has_content BOOLEAN NOT NULL DEFAULT FALSE;
+
+ALTER TABLE content_rel_page_details
+    ADD COLUMN IF NOT EXISTS has_content BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Initial values: rows with a stored object key are assumed to have content until the
+-- first reconciler run replaces this guess with the actual R2 listing
+UPDATE content_rel_pages
+SET has_content = TRUE
+WHERE object_id IS NOT NULL AND btrim(object_id) <> '' AND has_content = FALSE;
+
+UPDATE content_rel_page_details
+SET has_content = TRUE
+WHERE object_id IS NOT NULL AND btrim(object_id) <> '' AND has_content = FALSE;
+
+-- ==================================================
+-- Comments for documentation
+-- ==================================================
+COMMENT ON COLUMN content_rel_pages.has_content IS 'True if the page (or one of its detail files) exists in R2; maintained by routes + reconciler';
+COMMENT ON COLUMN content_rel_page_details.has_content IS 'True if the detail file exists in R2; maintained by routes + reconciler';
@@ -0,0 +1,58 @@
+-- Migration: R2 bulk move jobs
+-- Description: Track channel/folder renames that move R2 objects in the background so they can be polled and resumed
+-- Date: 2026-10-17
+
+-- ==================================================
+-- Table: r2_move_jobs
+-- Purpose: One row per bulk move (source prefix -> destination prefix)
+-- ==================================================
+CREATE TABLE IF NOT EXISTS r2_move_jobs (
+    id SERIAL PRIMARY KEY,
+    job_type VARCHAR(30) NOT NULL,              -- 'channel_rename' or 'folder_rename'
+    entity_id INTEGER NOT NULL,                 -- channel id / folder id being renamed
+    source_prefix VARCHAR(1000) NOT NULL,
+    destination_prefix VARCHAR(1000) NOT NULL,
+    params JSONB NOT NULL DEFAULT '{}'::jsonb,  -- DB change applied once every object has moved
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    phase VARCHAR(20),                          -- 'listing', 'copying', 'deleting', 'finalizing'
+    total_objects INTEGER NOT NULL DEFAULT 0,
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    copied_objects INTEGER NOT NULL DEFAULT 0,
+    deleted_objects INTEGER NOT NULL DEFAULT 0,
+    failed_objects INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_by TEXT REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    CONSTRAINT chk_r2_move_job_type CHECK (job_type IN ('channel_rename', 'folder_rename')),
+    CONSTRAINT chk_r2_move_job_status CHECK (status IN ('queued', 'running', 'completed', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_r2_move_jobs_entity ON r2_move_jobs(job_type, entity_id, status);
+
+-- ==================================================
+-- Table: r2_move_job_items
+-- Purpose: Per-object progress so an interrupted job resumes where it stopped
+-- ==================================================
+CREATE TABLE IF NOT EXISTS r2_move_job_items (
+    id BIGSERIAL PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES r2_move_jobs(id) ON DELETE CASCADE,
+    source_key VARCHAR(1000) NOT NULL,
+    destination_key VARCHAR(1000) NOT NULL,
+    size BIGINT NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- 'pending', 'copied', 'deleted', 'failed'
+    error TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_r2_move_job_item UNIQUE (job_id, source_key),
+    CONSTRAINT chk_r2_move_job_item_status CHECK (status IN ('pending', 'copied', 'deleted', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_r2_move_job_items_status ON r2_move_job_items(job_id, status);
+
+-- ==================================================
+-- Comments for documentation
+-- ==================================================
+COMMENT ON TABLE r2_move_jobs IS 'Background R2 prefix moves for channel/folder renames (pollable, resumable)';
+COMMENT ON TABLE r2_move_job_items IS 'Per-object copy/delete progress of an r2_move_jobs row';
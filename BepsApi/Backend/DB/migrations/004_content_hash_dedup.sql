@@ -0,0 +1,24 @@
+-- Migration: Content hashes for pending and archived content
+-- Description: Record the SHA-256 of uploads so approvals of identical bytes skip the archive/move and archives with identical bytes share one object
+-- Date: 2026-10-17
+
+-- ==================================================
+-- Columns: content_hash
+-- Purpose: SHA-256 (hex) of the object; NULL when unknown (e.g. multipart uploads, rows from before this migration)
+-- ==================================================
+ALTER TABLE pending_content
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+ALTER TABLE archived_content
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- Approvals look up an existing archive object with the same bytes
+CREATE INDEX IF NOT EXISTS idx_archived_content_hash
+    ON archived_content (content_hash)
+    WHERE content_hash IS NOT NULL;
+
+-- ==================================================
+-- Comments for documentation
+-- ==================================================
+COMMENT ON COLUMN pending_content.content_hash IS 'SHA-256 of the uploaded bytes, computed while streaming to R2';
+COMMENT ON COLUMN archived_content.content_hash IS 'SHA-256 of the archived bytes; rows with the same hash may share one object_key';
@@ -0,0 +1,17 @@
+-- Migration: Archive retention support
+-- Description: Index archived versions per page / page detail by age for version lookups and the retention job
+-- Date: 2026-10-17
+
+-- ==================================================
+-- Index: idx_archived_content_versions
+-- Purpose: Version history (newest first) and the per-content ranking used by the retention job
+-- ==================================================
+CREATE INDEX IF NOT EXISTS idx_archived_content_versions
+    ON archived_content (content_type, original_page_id, original_additional_id, archived_at DESC, id DESC);
+
+-- ==================================================
+-- Index: idx_archived_content_object_key
+-- Purpose: Reference check before deleting an archive object (rows with identical bytes share one object)
+-- ==================================================
+CREATE INDEX IF NOT EXISTS idx_archived_content_object_key
+    ON archived_content (object_key);
@@ -0,0 +1,101 @@
+-- Migration: Folder closure table
+-- Description: Maintained ancestry for content folders so ancestor paths and whole subtrees come back in one indexed query
+-- Date: 2026-10-17
+
+-- ==================================================
+-- Table: content_folder_closure
+-- Purpose: One row per (ancestor, descendant) folder pair, each folder with itself at depth 0
+-- ==================================================
+CREATE TABLE IF NOT EXISTS content_folder_closure (
+    ancestor_id INTEGER NOT NULL REFERENCES content_rel_folders(id) ON DELETE CASCADE,
+    descendant_id INTEGER NOT NULL REFERENCES content_rel_folders(id) ON DELETE CASCADE,
+    depth INTEGER NOT NULL,                     -- 0 = self, 1 = parent, ...
+    PRIMARY KEY (ancestor_id, descendant_id)
+);
+
+-- Ancestors of a folder, nearest first
+CREATE INDEX IF NOT EXISTS idx_content_folder_closure_descendant
+    ON content_folder_closure (descendant_id, depth);
+
+-- ==================================================
+-- Triggers: keep the closure in line with content_rel_folders.parent_id
+-- Soft deletes (is_deleted) keep their rows; readers filter on the folder flags
+-- ==================================================
+CREATE OR REPLACE FUNCTION content_folder_closure_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO content_folder_closure (ancestor_id, descendant_id, depth)
+    VALUES (NEW.id, NEW.id, 0);
+
+    IF NEW.parent_id IS NOT NULL THEN
+        INSERT INTO content_folder_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, NEW.id, depth + 1
+        FROM content_folder_closure
+        WHERE descendant_id = NEW.parent_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content_folder_closure_move() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.parent_id IS NOT NULL AND EXISTS (
+        SELECT 1 FROM content_folder_closure
+        WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+    ) THEN
+        RAISE EXCEPTION 'Folder % cannot be moved under its own subtree (%)', NEW.id, NEW.parent_id;
+    END IF;
+
+    -- Detach the subtree from its old ancestors
+    DELETE FROM content_folder_closure
+    WHERE descendant_id IN (SELECT descendant_id FROM content_folder_closure WHERE ancestor_id = NEW.id)
+      AND ancestor_id NOT IN (SELECT descendant_id FROM content_folder_closure WHERE ancestor_id = NEW.id);
+
+    -- Attach it under the new parent's ancestors
+    IF NEW.parent_id IS NOT NULL THEN
+        INSERT INTO content_folder_closure (ancestor_id, descendant_id, depth)
+        SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+        FROM content_folder_closure above
+        CROSS JOIN content_folder_closure below
+        WHERE above.descendant_id = NEW.parent_id
+          AND below.ancestor_id = NEW.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_content_folder_closure_insert ON content_rel_folders;
+CREATE TRIGGER trg_content_folder_closure_insert
+    AFTER INSERT ON content_rel_folders
+    FOR EACH ROW EXECUTE FUNCTION content_folder_closure_insert();
+
+DROP TRIGGER IF EXISTS trg_content_folder_closure_move ON content_rel_folders;
+CREATE TRIGGER trg_content_folder_closure_move
+    AFTER UPDATE OF parent_id ON content_rel_folders
+    FOR EACH ROW
+    WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+    EXECUTE FUNCTION content_folder_closure_move();
+
+-- ==================================================
+-- Backfill from the existing parent_id chains
+-- ==================================================
+INSERT INTO content_folder_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE chain AS (
+    SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+    FROM content_rel_folders
+    UNION ALL
+    SELECT f.parent_id, chain.descendant_id, chain.depth + 1
+    FROM chain
+    JOIN content_rel_folders f ON f.id = chain.ancestor_id
+    WHERE f.parent_id IS NOT NULL
+      AND chain.depth < 100                     -- guards against parent_id cycles in legacy data
+)
+SELECT ancestor_id, descendant_id, MIN(depth)
+FROM chain
+GROUP BY ancestor_id, descendant_id
+ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+
+-- ==================================================
+-- Comments for documentation
+-- ==================================================
+COMMENT ON TABLE content_folder_closure IS 'Folder ancestry (closure table), maintained by triggers on content_rel_folders';
+COMMENT ON COLUMN content_folder_closure.depth IS 'Levels between ancestor and descendant (0 = the folder itself)';
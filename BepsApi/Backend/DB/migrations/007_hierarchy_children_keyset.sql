@@ -0,0 +1,35 @@
+-- Migration: Keyset indexes for the hierarchy children API
+-- Description: Per-parent (name, id) indexes over live rows so /contents/hierarchy/children pages through large folders without sorting them
+-- Date: 2026-10-17
+
+-- ==================================================
+-- Index: idx_content_rel_folders_children
+-- Purpose: Subfolders of a folder in (name, id) order
+-- ==================================================
+CREATE INDEX IF NOT EXISTS idx_content_rel_folders_children
+    ON content_rel_folders (parent_id, COALESCE(name, ''), id)
+    WHERE is_deleted = false;
+
+-- ==================================================
+-- Index: idx_content_rel_folders_channel_top
+-- Purpose: Top-level folders of a channel in (name, id) order
+-- ==================================================
+CREATE INDEX IF NOT EXISTS idx_content_rel_folders_channel_top
+    ON content_rel_folders (channel_id, COALESCE(name, ''), id)
+    WHERE parent_id IS NULL AND is_deleted = false;
+
+-- ==================================================
+-- Index: idx_content_rel_pages_children
+-- Purpose: Pages of a folder in (name, id) order, also used for the per-folder page counts
+-- ==================================================
+CREATE INDEX IF NOT EXISTS idx_content_rel_pages_children
+    ON content_rel_pages (folder_id, COALESCE(name, ''), id)
+    WHERE is_deleted = false;
+
+-- ==================================================
+-- Index: idx_content_rel_page_details_children
+-- Purpose: Details of a page in (name, id) order, also used for the per-page detail counts
+-- ==================================================
+CREATE INDEX IF NOT EXISTS idx_content_rel_page_details_children
+    ON content_rel_page_details (page_id, COALESCE(name, ''), id)
+    WHERE is_deleted = false;